@@ -12,6 +12,7 @@ from view.common_routes import common_bp
 from view.public_routes import public_bp
 from view.parameters_route import params_bp
 from view.ssma_routes import ssma_bp
+from controller.excel_templates import preload_templates
 
 # Pega as configurações do arquivo .ini
 config = configparser.ConfigParser()
@@ -64,6 +65,9 @@ app.register_blueprint(public_bp)
 app.register_blueprint(params_bp)
 app.register_blueprint(ssma_bp)
 
+# Templates Excel das exportações lidos uma única vez (recarregados se o arquivo mudar)
+preload_templates()
+
 # Roda o servidor com o host e porta do arquivo .ini
 if __name__ == '__main__':
     if DEBUG:
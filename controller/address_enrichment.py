@@ -0,0 +1,107 @@
+"""
+Enriquecimento offline de endereços - Sistema RPZ v3.0.0.0
+
+Rastreadores como o SASGC não informam a rua dos pontos. Este módulo completa esses pontos
+com o endereço conhecido mais próximo (índice persistente `address_index`, alimentado pelos
+arquivos Sascar/Positron), sem depender de serviços externos de geocodificação.
+"""
+
+try:
+    import pandas as pd
+except ImportError:
+    print("AVISO: pandas não disponível, usando stub")
+    import pandas_stub as pd
+
+from model.drivers.address_index_driver import AddressIndexDriver, ADDRESS_COORD_DECIMALS
+from model.drivers.uploaded_data_driver import geo_cell, haversine_m, GEO_ROW_FACTOR
+from global_vars import ADDRESS_MAX_DISTANCE_M
+
+
+def _neighbour_cells(cell: int) -> list:
+    """Retorna a célula e as 8 vizinhas (a distância máxima é menor que o tamanho da célula)."""
+    row, col = divmod(cell, GEO_ROW_FACTOR)
+    return [(row + dr) * GEO_ROW_FACTOR + (col + dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1)]
+
+
+def _missing_street_mask(df: pd.DataFrame):
+    return df['rua'].isna() | (df['rua'].astype(str).str.strip() == '')
+
+
+def index_known_addresses(df: pd.DataFrame, address_driver: AddressIndexDriver) -> int:
+    """
+    Alimenta o índice de endereços com os pontos do arquivo que possuem rua.
+
+    :param df: DataFrame no formato de `extract_data`.
+    :param address_driver: Driver do índice de endereços.
+    :return: Quantidade de endereços enviados ao índice.
+    """
+    if df is None or df.empty:
+        return 0
+
+    known = df.loc[~_missing_street_mask(df), ['latitude', 'longitude', 'uf', 'cidade', 'rua']]
+    return address_driver.add_addresses(known.itertuples(index=False, name=None))
+
+
+def enrich_missing_addresses(df: pd.DataFrame, address_driver: AddressIndexDriver,
+                             max_distance_m: float = ADDRESS_MAX_DISTANCE_M) -> int:
+    """
+    Preenche 'rua' (e 'cidade'/'uf', quando vazias) dos pontos sem endereço com o endereço
+    conhecido mais próximo dentro de `max_distance_m`.
+
+    As coordenadas do arquivo são deduplicadas e os candidatos de todas as células envolvidas são
+    lidos do banco de uma só vez, então o custo é de poucas consultas por arquivo.
+
+    :param df: DataFrame no formato de `extract_data` (alterado no próprio objeto).
+    :param address_driver: Driver do índice de endereços.
+    :param max_distance_m: Distância máxima, em metros, para aceitar um endereço vizinho.
+    :return: Quantidade de pontos que receberam endereço.
+    """
+    if df is None or df.empty:
+        return 0
+
+    missing = _missing_street_mask(df) & df['latitude'].notna() & df['longitude'].notna()
+    if not missing.any():
+        return 0
+
+    lat_r = df.loc[missing, 'latitude'].astype(float).round(ADDRESS_COORD_DECIMALS)
+    lon_r = df.loc[missing, 'longitude'].astype(float).round(ADDRESS_COORD_DECIMALS)
+    coords = set(zip(lat_r, lon_r))
+
+    cells = set()
+    for lat, lon in coords:
+        cells.update(_neighbour_cells(geo_cell(lat, lon)))
+
+    candidates_by_cell = {}
+    for cell, lat, lon, uf, cidade, rua in address_driver.retrieve_by_cells(cells):
+        candidates_by_cell.setdefault(cell, []).append((lat, lon, uf, cidade, rua))
+
+    nearest = {}
+    for lat, lon in coords:
+        best, best_distance = None, max_distance_m
+        for cell in _neighbour_cells(geo_cell(lat, lon)):
+            for candidate in candidates_by_cell.get(cell, ()):
+                distance = haversine_m(lat, lon, candidate[0], candidate[1])
+                if distance <= best_distance:
+                    best, best_distance = candidate, distance
+        if best is not None:
+            nearest[(lat, lon)] = best
+
+    if not nearest:
+        return 0
+
+    matches = [nearest.get(key) for key in zip(lat_r, lon_r)]
+    index = lat_r.index
+
+    rua = pd.Series([m[4] if m else None for m in matches], index=index)
+    cidade = pd.Series([m[3] if m else None for m in matches], index=index)
+    uf = pd.Series([m[2] if m else None for m in matches], index=index)
+
+    found = rua.notna()
+    df.loc[index[found.values], 'rua'] = rua[found]
+
+    for column, values in (('cidade', cidade), ('uf', uf)):
+        empty = df.loc[index, column].isna() | (df.loc[index, column].astype(str).str.strip() == '')
+        fill = found & empty
+        df.loc[index[fill.values], column] = values[fill]
+
+    return int(found.sum())
@@ -0,0 +1,148 @@
+"""
+Exportação em lote do fechamento - Sistema RPZ v3.0.0.0
+
+Gera o PDF e/ou o Excel de fechamento de vários motoristas (por padrão, todos os ativos do fechamento)
+em um período e grava tudo em um único arquivo ZIP em disco. Os documentos são montados em um pool de
+processos; o processo principal recebe cada documento assim que fica pronto e o escreve no ZIP, então
+nenhum arquivo fica acumulado em memória. A exportação roda como um job da fila de relatórios
+(controller/report_jobs.py), que guarda o ZIP no mesmo diretório de artefatos e o remove ao expirar, e
+informa à fila, a cada documento gravado, quantos já foram concluídos e quantos falharam.
+"""
+
+import json
+import multiprocessing
+import os
+import time
+import traceback
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from controller.utils import CustomLogger
+from global_vars import DEBUG
+
+# Formatos aceitos -> nome da pasta dentro do ZIP
+EXPORT_FORMATS = ('pdf', 'excel')
+
+export_logger = CustomLogger(source="CLOSURE_EXPORT", debug=DEBUG)
+
+
+def build_document(builder: Callable, formato: str, motorist_id: int, from_date: str, to_date: str) -> Dict:
+    """
+    Gera um documento de um motorista (executado nos processos do pool).
+
+    :param builder: Função (motorist_id, from_date, to_date) -> (nome do arquivo, bytes).
+    :param formato: 'pdf' ou 'excel'.
+    :param motorist_id: ID do motorista.
+    :param from_date: Data inicial ('YYYY-MM-DD').
+    :param to_date: Data final ('YYYY-MM-DD').
+    :return: Dicionário {motorist_id, formato, filename, content, erro}.
+    """
+    result = {'motorist_id': motorist_id, 'formato': formato, 'filename': None, 'content': None, 'erro': None}
+    try:
+        result['filename'], result['content'] = builder(motorist_id, from_date, to_date)
+    except Exception as e:
+        result['erro'] = f"{type(e).__name__}: {e}"
+        traceback.print_exc()
+    return result
+
+
+def _build_document_args(args: tuple) -> Dict:
+    return build_document(*args)
+
+
+def check_closure_export(from_date: str, to_date: str, motorist_ids: List[int],
+                         formatos: Optional[List[str]] = None) -> List[str]:
+    """
+    Valida os parâmetros de uma exportação em lote antes de enfileirá-la.
+
+    :param from_date: Data inicial ('YYYY-MM-DD').
+    :param to_date: Data final ('YYYY-MM-DD').
+    :param motorist_ids: IDs dos motoristas.
+    :param formatos: Formatos a gerar (padrão: todos de EXPORT_FORMATS).
+    :return: Lista de formatos a gerar.
+    :raises ValueError: Se as datas ou os formatos forem inválidos, ou não houver motoristas.
+    """
+    if datetime.strptime(from_date, '%Y-%m-%d') > datetime.strptime(to_date, '%Y-%m-%d'):
+        raise ValueError("A data inicial deve ser anterior ou igual à data final.")
+
+    formatos = list(formatos or EXPORT_FORMATS)
+    invalid = [formato for formato in formatos if formato not in EXPORT_FORMATS]
+    if invalid:
+        raise ValueError(f"Formato(s) inválido(s): {', '.join(invalid)}. Use {', '.join(EXPORT_FORMATS)}.")
+    if not motorist_ids:
+        raise ValueError("Nenhum motorista para exportar.")
+    return formatos
+
+
+def write_closure_zip(builders: Dict[str, Callable], path: str, from_date: str, to_date: str,
+                      motorist_ids: List[int], formatos: List[str], max_workers: int = 0,
+                      progress: Optional[Callable] = None) -> str:
+    """
+    Gera os documentos e grava o ZIP (executado por um worker da fila de relatórios).
+
+    Os documentos que falharem não interrompem a exportação: ficam listados no resumo.json do ZIP.
+
+    :param builders: Formato -> função (motorist_id, from_date, to_date) -> (nome do arquivo, bytes)
+                     (precisa ser uma função de módulo para ir ao pool).
+    :param path: Caminho do ZIP.
+    :param from_date: Data inicial ('YYYY-MM-DD').
+    :param to_date: Data final ('YYYY-MM-DD').
+    :param motorist_ids: IDs dos motoristas.
+    :param formatos: Formatos a gerar ('pdf', 'excel').
+    :param max_workers: Quantidade de processos (limitada à quantidade de CPUs). 0 usa a quantidade de CPUs;
+                        1 processa no próprio processo.
+    :param progress: Função chamada com os contadores concluidos, total e erros a cada documento gravado.
+    :return: Nome do ZIP para download.
+    """
+    started = time.perf_counter()
+    tasks = [(builders[formato], formato, motorist_id, from_date, to_date)
+             for motorist_id in motorist_ids for formato in formatos]
+    erros: List[Dict] = []
+    done = 0
+
+    def report_progress():
+        if progress:
+            progress(concluidos=done, total=len(tasks), erros=len(erros))
+
+    def store(archive: zipfile.ZipFile, result: Dict):
+        nonlocal done
+        if result['erro']:
+            erros.append({'motorist_id': result['motorist_id'], 'formato': result['formato'],
+                          'erro': result['erro']})
+        else:
+            # O ID evita colisão entre motoristas com o mesmo nome
+            archive.writestr(f"{result['formato']}/{result['motorist_id']}_{result['filename']}", result['content'])
+        done += 1
+        report_progress()
+
+    report_progress()
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        cpus = os.cpu_count() or 1
+        workers = min(max_workers, cpus) if max_workers else cpus
+        if workers > 1 and len(tasks) > 1:
+            # 'spawn': o ZIP é gravado por uma thread da fila, e um fork de processo com várias threads pode
+            # herdar locks (log, SQLite) presos por outra thread e travar os processos do pool
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                     mp_context=multiprocessing.get_context('spawn')) as executor:
+                futures = [executor.submit(_build_document_args, task) for task in tasks]
+                for future in as_completed(futures):
+                    store(archive, future.result())
+        else:
+            for task in tasks:
+                store(archive, _build_document_args(task))
+
+        elapsed = round(time.perf_counter() - started, 2)
+        archive.writestr('resumo.json', json.dumps({
+            'periodo': {'inicio': from_date, 'fim': to_date},
+            'formatos': formatos,
+            'motoristas': len(motorist_ids),
+            'total': len(tasks),
+            'erros': erros,
+            'tempo_s': elapsed
+        }, ensure_ascii=False, indent=2))
+
+    export_logger.register_log(f"Exportação do fechamento {from_date} a {to_date}: {len(tasks)} documento(s), "
+                               f"{len(erros)} erro(s) em {elapsed}s.")
+    return f"fechamento_{from_date}_a_{to_date}.zip"
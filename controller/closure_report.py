@@ -0,0 +1,475 @@
+"""
+Cálculo do relatório de fechamento - Sistema RPZ v3.0.0.0
+
+Serviço único que lê as jornadas (perm_data_fecham), folgas (dayoff_fecham) e classificações de blocos
+de um motorista em um período e calcula os totais (horas, horas extras, diárias e ajuda de alimentação).
+O modal do relatório, o PDF e o Excel apenas formatam o mesmo `ClosureResult`.
+
+O resultado é memorizado por (motorista, período) e reaproveitado enquanto a versão dos dados do motorista
+(`ClosureVersionDriver`, mantida por triggers) não mudar: abrir o modal e baixar o PDF e o Excel em seguida
+calcula uma única vez.
+"""
+
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from controller.utils import CustomLogger
+
+DIAS_SEMANA = {0: 'Segunda-feira', 1: 'Terça-feira', 2: 'Quarta-feira', 3: 'Quinta-feira',
+               4: 'Sexta-feira', 5: 'Sábado', 6: 'Domingo'}
+
+# Abreviações do dia da semana no modal ('Seg.') e no PDF ('SEG')
+_ABREV_MODAL = {'Segunda-feira': 'Seg.', 'Terça-feira': 'Ter.', 'Quarta-feira': 'Qua.', 'Quinta-feira': 'Qui.',
+                'Sexta-feira': 'Sex.', 'Sábado': 'Sáb.', 'Domingo': 'Dom.'}
+_ABREV_PDF = {'Segunda-feira': 'SEG', 'Terça-feira': 'TER', 'Quarta-feira': 'QUA', 'Quinta-feira': 'QUI',
+              'Sexta-feira': 'SEX', 'Sábado': 'SÁB', 'Domingo': 'DOM'}
+
+# Classificação do bloco -> (texto exibido, classe CSS do badge)
+CLASSIFICATION_BADGES = {
+    'VALIDO': ('VÁLIDO', 'badge-valid'),
+    'GARAGEM': ('GARAGEM', 'badge-garagem'),
+    'CARGA_DESCARGA': ('CARGA/DESCARGA', 'badge-carga-descarga'),
+    'INVALIDO': ('INVÁLIDO', 'badge-invalid'),
+}
+
+# Colunas de tempo somadas nos totais: chave do total -> atributo de ClosureDay
+TIME_TOTALS = (('intervalo', 'tempo_intervalo'), ('almoco', 'tempo_refeicao'), ('h_trab', 'jornada_total'),
+               ('carga_horaria', 'carga_horaria'), ('h_extra50', 'hextra_50'), ('h_extra100', 'hextra_100'),
+               ('h_e_not', 'he_noturno'))
+
+_CACHE_SIZE = 128
+
+
+def tempo_para_minutos(tempo_str) -> int:
+    """Converte 'HH:MM' (ou '-HH:MM') em minutos; valores vazios ou inválidos contam como 0."""
+    if not tempo_str or tempo_str == "NULL" or ':' not in str(tempo_str):
+        return 0
+    try:
+        tempo_str = str(tempo_str)
+        is_negative = tempo_str.startswith('-')
+        horas, minutos = map(int, tempo_str.replace('-', '').split(':'))
+        resultado = horas * 60 + minutos
+        return -resultado if is_negative else resultado
+    except ValueError:
+        return 0
+
+
+def minutos_para_tempo(minutos: int) -> str:
+    """Converte minutos em 'HH:MM' (com '-' se negativo)."""
+    if minutos == 0:
+        return "00:00"
+    horas, mins = divmod(abs(minutos), 60)
+    resultado = f"{horas:02d}:{mins:02d}"
+    return f"-{resultado}" if minutos < 0 else resultado
+
+
+def valor_monetario(valor) -> float:
+    """Converte o valor gravado (REAL ou texto) em float; vazio ou inválido vale 0."""
+    if valor is None or valor == "" or valor == "NULL":
+        return 0.0
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def formatar_moeda(valor) -> str:
+    """Formata um valor como 'R$ 0,00'."""
+    return f"R$ {valor_monetario(valor):.2f}".replace('.', ',')
+
+
+def parse_period_date(value: str) -> datetime:
+    """
+    Converte a data do período ('YYYY-MM-DD', formato das rotas, ou 'DD-MM-YYYY').
+
+    :raises ValueError: Se a data não estiver em nenhum dos formatos.
+    """
+    for fmt in ('%Y-%m-%d', '%d-%m-%Y'):
+        try:
+            return datetime.strptime(value, fmt)
+        except (TypeError, ValueError):
+            continue
+    raise ValueError(f"Data inválida: {value}")
+
+
+class MotoristNotFoundError(Exception):
+    """Motorista do fechamento não cadastrado (as rotas respondem 404 só para este erro)."""
+
+
+class ClosureDay:
+    """
+    Linha do fechamento: um dia de jornada (perm_data_fecham) ou uma folga (dayoff_fecham).
+
+    Atributos principais: tipo ('jornada' ou 'folga'), data ('DD-MM-YYYY'), data_obj, dia_semana (nome
+    completo), placa, truck_id, horários e tempos ('HH:MM'), daily_value/food_value (float), motivo (folgas)
+    e classification (classificação do bloco, se houver).
+    """
+
+    __slots__ = ('tipo', 'data', 'data_obj', 'dia_semana', 'placa', 'truck_id', 'inicio_jornada', 'in_refeicao',
+                 'fim_refeicao', 'fim_jornada', 'observacao', 'tempo_refeicao', 'tempo_intervalo', 'jornada_total',
+                 'carga_horaria', 'hextra_50', 'hextra_100', 'he_noturno', 'daily_value', 'food_value', 'motivo',
+                 'classification')
+
+    def __init__(self, tipo: str, data: str, data_obj: datetime, **values):
+        self.tipo = tipo
+        self.data = data
+        self.data_obj = data_obj
+        for name in self.__slots__[3:]:
+            setattr(self, name, values.get(name))
+
+    @property
+    def is_dayoff(self) -> bool:
+        return self.tipo == 'folga'
+
+    def badge(self) -> Tuple[str, str]:
+        """(texto, classe CSS) da classificação do bloco; sem classificação, o dia é válido."""
+        return CLASSIFICATION_BADGES.get(self.classification, CLASSIFICATION_BADGES['VALIDO'])
+
+
+class ClosureTotals:
+    """
+    Totais do período: minutos de cada coluna de tempo (TIME_TOTALS) e soma de diárias e ajuda de alimentação.
+    """
+
+    def __init__(self, rows: List[ClosureDay]):
+        self.minutos: Dict[str, int] = {key: 0 for key, _ in TIME_TOTALS}
+        self.diaria = 0.0
+        self.aj_aliment = 0.0
+        for row in rows:
+            if row.is_dayoff:
+                continue  # Folgas não entram nos totais
+            for key, attr in TIME_TOTALS:
+                self.minutos[key] += tempo_para_minutos(getattr(row, attr))
+            self.diaria += row.daily_value
+            self.aj_aliment += row.food_value
+
+    def as_dict(self) -> Dict[str, str]:
+        """Totais formatados, no formato usado pelo modal, PDF e Excel."""
+        totais = {key: minutos_para_tempo(minutes) for key, minutes in self.minutos.items()}
+        totais['ad_not'] = totais['h_e_not']  # Adicional noturno = hora extra noturna
+        totais['diaria'] = formatar_moeda(self.diaria)
+        totais['aj_aliment'] = formatar_moeda(self.aj_aliment)
+        return totais
+
+
+class ClosureResult:
+    """
+    Resultado do fechamento de um motorista em um período.
+
+    Atributos:
+    - motorist_id, motorist_name, motorist_cpf, motorist_company: dados do motorista.
+    - from_date / to_date (datetime): período.
+    - rows (list[ClosureDay]): jornadas e folgas do período, por data (jornadas antes das folgas no mesmo dia).
+    - totals (ClosureTotals): totais do período.
+    - has_records (bool): se o motorista tem algum registro de fechamento (em qualquer período).
+    - version (tuple): versão dos dados usada no cálculo.
+    """
+
+    def __init__(self, motorist_id: int, motorist_row: tuple, from_date: datetime, to_date: datetime,
+                 rows: List[ClosureDay], has_records: bool, version: tuple):
+        self.motorist_id = motorist_id
+        self.motorist_name = motorist_row[1]
+        self.motorist_cpf = motorist_row[3]
+        self.motorist_company = motorist_row[30] if len(motorist_row) > 30 else ''
+        self.from_date = from_date
+        self.to_date = to_date
+        self.rows = rows
+        self.totals = ClosureTotals(rows)
+        self.has_records = has_records
+        self.version = version
+
+    @property
+    def dayoffs(self) -> List[ClosureDay]:
+        return [row for row in self.rows if row.is_dayoff]
+
+    def modal_rows(self) -> List[Dict]:
+        """Linhas no formato do modal do relatório (closure_report_modal.html)."""
+        processed = []
+        for row in self.rows:
+            classificacao, classificacao_class = row.badge()
+            if row.is_dayoff:
+                item = dict.fromkeys(('inicio_jornada', 'almoco_inicio', 'almoco_fim', 'fim_jornada', 'intervalo',
+                                      'almoco', 'h_trab', 'carga_horaria', 'h_extra50', 'h_extra100', 'h_e_not',
+                                      'ad_not'), '')
+                item.update({'placa': row.motivo, 'observacao': row.motivo})
+            else:
+                item = {
+                    'placa': row.placa or '',
+                    'inicio_jornada': row.inicio_jornada or '',
+                    'almoco_inicio': row.in_refeicao or '',
+                    'almoco_fim': row.fim_refeicao or '',
+                    'fim_jornada': row.fim_jornada or '',
+                    'intervalo': row.tempo_intervalo or '',
+                    'almoco': row.tempo_refeicao or '',
+                    'h_trab': row.jornada_total or '',
+                    'carga_horaria': row.carga_horaria or '',
+                    'h_extra50': row.hextra_50 or '',
+                    'h_extra100': row.hextra_100 or '',
+                    'h_e_not': row.he_noturno or '',
+                    'ad_not': row.he_noturno or '',
+                }
+            item.update({
+                'data': row.data,
+                'dia_semana': _ABREV_MODAL.get(row.dia_semana, row.dia_semana),
+                'classificacao': classificacao,
+                'classificacao_class': classificacao_class,
+                'diaria': formatar_moeda(row.daily_value),
+                'aj_aliment': formatar_moeda(row.food_value),
+            })
+            processed.append(item)
+        return processed
+
+    def pdf_rows(self) -> List[Dict]:
+        """Linhas no formato de `generate_closure_pdf_report` (datas 'DD/MM/YYYY')."""
+        processed = []
+        for row in self.rows:
+            if row.is_dayoff:
+                item = dict.fromkeys(('inicio_jornada', 'almoco_inicio', 'almoco_fim', 'fim_jornada', 'intervalo',
+                                      'almoco', 'h_trab', 'carga_horaria', 'h_extra50', 'h_extra100', 'h_e_not',
+                                      'ad_not'), '')
+                item.update({'placa': row.motivo, 'observacao': row.motivo})
+            else:
+                item = {
+                    'placa': row.placa or '',
+                    'inicio_jornada': row.inicio_jornada or '',
+                    'almoco_inicio': row.in_refeicao or '',
+                    'almoco_fim': row.fim_refeicao or '',
+                    'fim_jornada': row.fim_jornada or '',
+                    'intervalo': row.tempo_intervalo or '',
+                    'almoco': row.tempo_refeicao or '',
+                    'h_trab': row.jornada_total or '',
+                    'carga_horaria': row.carga_horaria or '',
+                    'h_extra50': row.hextra_50 or '',
+                    'h_extra100': row.hextra_100 or '',
+                    'h_e_not': row.he_noturno or '',
+                    'ad_not': row.he_noturno or '',
+                    'observacao': row.observacao or '',
+                }
+            item.update({
+                'data': row.data_obj.strftime('%d/%m/%Y'),
+                'dia_semana': _ABREV_PDF.get(row.dia_semana, row.dia_semana),
+                'diaria': formatar_moeda(row.daily_value),
+                'aj_aliment': formatar_moeda(row.food_value),
+            })
+            processed.append(item)
+        return processed
+
+    def excel_rows(self) -> List[List[str]]:
+        """Linhas (listas de células) no formato de `fill_excel_fecham`."""
+        processed = []
+        for row in self.rows:
+            if row.is_dayoff:
+                cells = [row.motivo or '', row.data, ''] + [''] * 9
+            else:
+                cells = [
+                    row.placa or '',
+                    row.data,
+                    row.dia_semana or '',
+                    row.inicio_jornada or '',
+                    f"{row.in_refeicao or ''}, {row.fim_refeicao or ''}",
+                    row.fim_jornada or '',
+                    row.tempo_intervalo or '',
+                    row.jornada_total or '',
+                    row.carga_horaria or '',
+                    row.hextra_50 or '',
+                    row.he_noturno or '',  # Adicional Noturno usa he_noturno
+                    row.he_noturno or '',
+                ]
+            processed.append(cells + [formatar_moeda(row.daily_value), formatar_moeda(row.food_value)])
+        return processed
+
+    def excel_totals(self) -> Dict[str, str]:
+        """Totais com as chaves usadas pelos placeholders do template de fechamento."""
+        totais = self.totals.as_dict()
+        totais['refeicao'] = totais['almoco']
+        return totais
+
+    def folgas(self) -> List[Dict]:
+        """Folgas do período ({data, motivo})."""
+        return [{'data': row.data, 'motivo': row.motivo} for row in self.dayoffs]
+
+    def folgas_line(self) -> str:
+        """Resumo das folgas por motivo para o cabeçalho do PDF, ex.: 'FOLGA (01/01/2025, 08/01/2025)'."""
+        motivos_to_dates: Dict[str, List[ClosureDay]] = {}
+        for row in self.dayoffs:
+            motivo_key = (row.motivo or '').strip().upper() or 'N/A'
+            motivos_to_dates.setdefault(motivo_key, []).append(row)
+        if not motivos_to_dates:
+            return "-"
+
+        parts = []
+        for motivo_key in sorted(motivos_to_dates):
+            datas = sorted(motivos_to_dates[motivo_key], key=lambda r: r.data_obj)
+            parts.append(f"{motivo_key} (" + ", ".join(r.data_obj.strftime('%d/%m/%Y') for r in datas) + ")")
+        return "; ".join(parts)
+
+
+class ClosureReportService:
+    """
+    Calcula e memoriza o fechamento de motoristas.
+
+    Parâmetros:
+    - logger (CustomLogger): instância de logger personalizada.
+    - db_path (str): caminho para o banco de dados SQLite.
+    - max_entries (int): quantidade de resultados mantidos em memória (LRU).
+    """
+
+    def __init__(self, logger: CustomLogger, db_path: str, max_entries: int = _CACHE_SIZE):
+        from model.drivers.closure_analyzed_data import AnalyzedClosureData
+        from model.drivers.closure_dayoff_driver import ClosureDayOffDriver
+        from model.drivers.closure_version_driver import ClosureVersionDriver
+        from model.drivers.motorist_driver import MotoristDriver
+
+        self.logger = logger
+        self.db_path = db_path
+        self.max_entries = max_entries
+        # Garante as tabelas de origem (com date_iso) antes dos triggers de versão
+        AnalyzedClosureData(logger=logger, db_path=db_path)
+        ClosureDayOffDriver(logger=logger, db_path=db_path)
+        self.version_driver = ClosureVersionDriver(logger=logger, db_path=db_path)
+        self.motorist_driver = MotoristDriver(logger=logger, db_path=db_path)
+        self._cache: "OrderedDict[tuple, ClosureResult]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, motorist_id, from_date: str, to_date: str) -> ClosureResult:
+        """
+        Fechamento de um motorista no período, reaproveitando o cálculo se os dados não mudaram.
+
+        :param motorist_id: ID do motorista.
+        :param from_date: Data inicial ('YYYY-MM-DD' ou 'DD-MM-YYYY').
+        :param to_date: Data final ('YYYY-MM-DD' ou 'DD-MM-YYYY').
+        :return: Instância de ClosureResult (compartilhada; não deve ser alterada).
+        :raises MotoristNotFoundError: Se o motorista não existir.
+        :raises ValueError: Se as datas forem inválidas.
+        """
+        motorist_id = int(motorist_id)
+        start, end = parse_period_date(from_date), parse_period_date(to_date)
+        key = (motorist_id, start, end)
+        version = self.version_driver.get_version(motorist_id)
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached.version == version:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        result = self.compute(motorist_id, start, end, version)
+
+        with self._lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return result
+
+    def compute(self, motorist_id: int, start: datetime, end: datetime, version: tuple = (0, 0)) -> ClosureResult:
+        """
+        Calcula o fechamento sem usar o cache.
+
+        :raises MotoristNotFoundError: Se o motorista não existir.
+        """
+        motorist_row = self.motorist_driver.retrieve_motorist(['id'], (motorist_id,))
+        if not motorist_row:
+            raise MotoristNotFoundError("Motorista não encontrado")
+
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        try:
+            cursor = conn.cursor()
+            period_rows = self._fetch_period(cursor, motorist_id, start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'))
+            has_records = bool(period_rows) or self._has_records(cursor, motorist_id)
+        finally:
+            conn.close()
+
+        rows = []
+        for (kind, data, dia_semana, inicio_jornada, in_refeicao, fim_refeicao, fim_jornada, observacao,
+             tempo_refeicao, tempo_intervalo, jornada_total, carga_horaria, hextra_50, hextra_100, he_noturno,
+             daily_value, food_value, placa, truck_id, motivo, classification) in period_rows:
+            try:
+                data_obj = datetime.strptime(data, '%d-%m-%Y')
+            except (TypeError, ValueError):
+                continue
+
+            if kind == 0:
+                rows.append(ClosureDay('jornada', data, data_obj, dia_semana=dia_semana, placa=placa,
+                                       truck_id=truck_id, inicio_jornada=inicio_jornada, in_refeicao=in_refeicao,
+                                       fim_refeicao=fim_refeicao, fim_jornada=fim_jornada, observacao=observacao,
+                                       tempo_refeicao=tempo_refeicao, tempo_intervalo=tempo_intervalo,
+                                       jornada_total=jornada_total, carga_horaria=carga_horaria, hextra_50=hextra_50,
+                                       hextra_100=hextra_100, he_noturno=he_noturno,
+                                       daily_value=valor_monetario(daily_value), food_value=valor_monetario(food_value),
+                                       classification=classification))
+            else:
+                rows.append(ClosureDay('folga', data, data_obj, dia_semana=DIAS_SEMANA[data_obj.weekday()],
+                                       motivo=motivo, daily_value=valor_monetario(daily_value),
+                                       food_value=valor_monetario(food_value), classification=classification))
+
+        return ClosureResult(motorist_id, motorist_row, start, end, rows, has_records, version)
+
+    @staticmethod
+    def _fetch_period(cursor, motorist_id: int, start_iso: str, end_iso: str) -> list:
+        """
+        Jornadas e folgas do motorista no período em uma única consulta, já ordenadas por data (jornadas antes
+        das folgas no mesmo dia). O filtro usa o índice (motorist_id, date_iso) das duas tabelas.
+
+        :return: Tuplas (tipo: 0 jornada / 1 folga, data, dia_da_semana, ...colunas de perm_data_fecham...,
+                 placa, truck_id, motivo, classificação do bloco).
+        """
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name IN ('trucks', 'closure_block_classifications')")
+        existing = {row[0] for row in cursor.fetchall()}
+
+        if 'trucks' in existing:
+            placa, trucks_join = "t.placa", "LEFT JOIN trucks t ON p.truck_id = t.id"
+        else:
+            placa, trucks_join = "''", ""
+
+        if 'closure_block_classifications' in existing:
+            # Mesma chave da tela de classificação: data + caminhão (ou só data, sem caminhão)
+            classification_sql = """(SELECT c.classification FROM closure_block_classifications c
+                                     WHERE c.motorist_id = {0}.motorist_id AND c.data = {0}.data
+                                       AND IFNULL(c.truck_id, 0) = {1}
+                                     ORDER BY c.id DESC LIMIT 1)"""
+            journey_classification = classification_sql.format('p', 'IFNULL(p.truck_id, 0)')
+            dayoff_classification = classification_sql.format('d', '0')
+        else:
+            journey_classification = dayoff_classification = "NULL"
+
+        cursor.execute(f"""
+            SELECT 0 AS tipo, p.date_iso, p.data, p.dia_da_semana, p.inicio_jornada, p.in_refeicao, p.fim_refeicao,
+                   p.fim_jornada, p.observacao, p.tempo_refeicao, p.tempo_intervalo, p.jornada_total, p.carga_horaria,
+                   p.hextra_50, p.hextra_100, p.he_noturno, p.daily_value, p.food_value, {placa}, p.truck_id,
+                   NULL, {journey_classification}
+            FROM perm_data_fecham p
+            {trucks_join}
+            WHERE p.motorist_id = ? AND p.date_iso BETWEEN ? AND ?
+            UNION ALL
+            SELECT 1 AS tipo, d.date_iso, d.data, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL,
+                   NULL, NULL, d.daily_value, d.food_value, NULL, NULL, d.motivo, {dayoff_classification}
+            FROM dayoff_fecham d
+            WHERE d.motorist_id = ? AND d.date_iso BETWEEN ? AND ?
+            ORDER BY 2, 1
+        """, (motorist_id, start_iso, end_iso, motorist_id, start_iso, end_iso))
+
+        # date_iso só é usado na ordenação
+        return [row[:1] + row[2:] for row in cursor.fetchall()]
+
+    @staticmethod
+    def _has_records(cursor, motorist_id: int) -> bool:
+        """Se o motorista tem alguma jornada ou folga de fechamento, em qualquer período."""
+        cursor.execute("""
+            SELECT EXISTS (SELECT 1 FROM perm_data_fecham WHERE motorist_id = ?)
+                OR EXISTS (SELECT 1 FROM dayoff_fecham WHERE motorist_id = ?)
+        """, (motorist_id, motorist_id))
+        return bool(cursor.fetchone()[0])
+
+    def cache_info(self) -> Dict:
+        """Estatísticas do cache (acertos, falhas e tamanho)."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._cache),
+                    'max_entries': self.max_entries}
@@ -0,0 +1,384 @@
+"""
+Registro de regras de conformidade - Sistema RPZ v3.0.0.0
+
+Cada regra de infração é declarada com:
+
+- o tipo de infração (chave de INFRACTION_DICT) e a ordem em que é emitida dentro do dia;
+- as colunas do DataFrame de que precisa;
+- os limites que usa (nomes de `DEFAULT_THRESHOLDS`, que podem ser alterados por operação na tabela
+  limites_regras, ver `ParametersDriver.get_rule_thresholds`);
+- um predicado vetorizado que recebe o contexto já carregado e devolve as infrações encontradas.
+
+O motor (`evaluate_rules`) carrega cada coluna uma única vez, avalia todas as regras sobre os mesmos
+vetores e mede o tempo de cada regra. Valores derivados usados por mais de uma regra (duração da
+jornada, interstício, contadores de dias consecutivos...) também são calculados uma única vez.
+Acrescentar uma regra é só registrar mais uma função com `@compliance_rule`.
+"""
+
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+try:
+    import pandas as pd
+except ImportError:
+    print("AVISO: pandas não disponível, usando stub")
+    import pandas_stub as pd
+
+from controller.driving_time import PAUSE_SLOTS, driving_infractions_from_minutes
+from global_vars import (INFRACTION_DICT, TEMPO_ALMOCO, TEMPO_TRABALHO_DIARIO, TEMPO_INTERSTICIO,
+                         TEMPO_MAX_DIRECAO, TEMPO_MIN_DESCANSO, MAX_DIAS_CONSECUTIVOS_TRABALHADOS,
+                         MAX_HORAS_SEMANAIS, MIN_DESCANSO_SEMANAL)
+
+# Limites padrão (em segundos, exceto dias), com os mesmos nomes de global_vars
+DEFAULT_THRESHOLDS = {
+    'TEMPO_ALMOCO': TEMPO_ALMOCO,
+    'TEMPO_TRABALHO_DIARIO': TEMPO_TRABALHO_DIARIO,
+    'TEMPO_INTERSTICIO': TEMPO_INTERSTICIO,
+    'TEMPO_MAX_DIRECAO': TEMPO_MAX_DIRECAO,
+    'TEMPO_MIN_DESCANSO': TEMPO_MIN_DESCANSO,
+    'MAX_DIAS_CONSECUTIVOS_TRABALHADOS': MAX_DIAS_CONSECUTIVOS_TRABALHADOS,
+    'MAX_HORAS_SEMANAIS': MAX_HORAS_SEMANAIS,
+    'MIN_DESCANSO_SEMANAL': MIN_DESCANSO_SEMANAL,
+}
+
+# Colunas de texto (as demais são horários convertidos para datetime)
+TEXT_COLUMNS = {'intersticio'}
+
+# Chave usada em `timings` para o tempo de carga das colunas
+LOAD_TIMING_KEY = 'carga_colunas'
+
+
+def _parse_interstice(value):
+    """
+    Converte o interstício 'HH:MM' em (horas, minutos), com as mesmas regras de `get_interstice_infraction`.
+
+    :return: Tupla (horas, minutos) ou None se o valor for vazio ou inválido.
+    """
+    try:
+        if pd.isna(value) or not value:
+            return None
+    except (TypeError, ValueError):
+        return None
+    try:
+        hours, minutes = map(int, value.split(":"))
+    except (ValueError, AttributeError):
+        return None
+    return hours, minutes
+
+
+def _format_seconds(seconds) -> str:
+    """Formata segundos como 'HH:MM' com a mesma aritmética de `split_time_delta`."""
+    return f"{int(seconds // 3600):02}:{int((seconds % 3600) // 60):02}"
+
+
+def rolling_counters(data: pd.Series, work_seconds: pd.Series, previous: dict = None) -> tuple:
+    """
+    Contadores acumulados por sequência de dias trabalhados (lacunas de mais de um dia reiniciam a sequência).
+
+    Sem `previous`, a primeira sequência começa com o contador zerado e sem as horas do primeiro dia, como na
+    versão linha a linha. Com `previous` (estado gravado do último dia trabalhado antes de `data`, formato de
+    `compute_rolling_state`), a sequência em andamento continua dos contadores gravados, como na contagem
+    completa; uma lacuna de mais de um dia em relação ao estado gravado inicia nova sequência em 1.
+
+    :return: Tupla de Series (início de nova sequência, dias consecutivos, segundos trabalhados na sequência).
+    """
+    if previous is None:
+        not_first = pd.Series(data.index > 0, index=data.index)
+        gap = (data.diff().dt.days > 1) & not_first
+        run_id = gap.cumsum()
+        consecutive_days = run_id.groupby(run_id).cumcount() + (run_id > 0).astype(int)
+        weekly_seconds = work_seconds.where(not_first, 0.0).groupby(run_id).cumsum()
+        return gap, consecutive_days, weekly_seconds
+
+    gap = data.diff().dt.days > 1
+    gap.iloc[0] = (data.iloc[0] - datetime.strptime(previous['data'], '%d-%m-%Y')).days > 1
+    run_id = gap.cumsum()
+    continuing = (run_id == 0).astype(int)
+    consecutive_days = run_id.groupby(run_id).cumcount() + 1 + continuing * previous['dias_consecutivos']
+    weekly_seconds = work_seconds.groupby(run_id).cumsum() + continuing * previous['horas_semanais_s']
+    return gap, consecutive_days, weekly_seconds
+
+
+class ComplianceRule:
+    """
+    Regra de conformidade registrada no motor.
+
+    Atributos:
+    - infraction_type (int): tipo da infração (chave de INFRACTION_DICT).
+    - name (str): nome da regra (usado no relatório de tempos).
+    - columns (list): colunas do DataFrame de que a regra precisa.
+    - params (list): nomes dos limites usados (chaves de DEFAULT_THRESHOLDS).
+    - order (int): ordem de emissão dentro do mesmo dia.
+    - predicate (callable): função (contexto, limites) -> lista de (posição, sequência, infração).
+    """
+
+    def __init__(self, infraction_type: int, name: str, columns: List[str], params: List[str], order: int,
+                 predicate: Callable):
+        self.infraction_type = infraction_type
+        self.name = name
+        self.columns = columns
+        self.params = params
+        self.order = order
+        self.predicate = predicate
+
+
+# Regras registradas, na ordem de registro
+RULE_REGISTRY: List[ComplianceRule] = []
+
+
+def compliance_rule(infraction_type: int, columns: List[str], params: List[str], order: int):
+    """
+    Decorador que registra uma função como regra de conformidade.
+
+    :param infraction_type: Tipo da infração.
+    :param columns: Colunas do DataFrame de que a regra precisa.
+    :param params: Limites usados pela regra.
+    :param order: Ordem de emissão dentro do mesmo dia.
+    """
+    def decorator(func):
+        RULE_REGISTRY.append(ComplianceRule(infraction_type, func.__name__, columns, params, order, func))
+        return func
+    return decorator
+
+
+class RuleContext:
+    """
+    Vetores compartilhados por todas as regras em uma avaliação. Cada coluna é convertida uma única vez
+    e os valores derivados ficam em cache.
+
+    :param previous: Estado gravado do último dia trabalhado antes do DataFrame (ver `compute_rolling_state`).
+                     Com ele, o primeiro dia não é tratado como início do histórico: é avaliado como os demais
+                     e os contadores das regras 6, 7 e 8 continuam do estado gravado.
+    """
+
+    def __init__(self, df: pd.DataFrame, previous: Optional[Dict] = None):
+        self.df = df
+        self.previous = previous
+        self.n = df.shape[0]
+        self.positions = pd.RangeIndex(self.n)
+        self._columns = {}
+        self._minutes = {}
+        self._derived = {}
+
+    def column(self, name: str) -> pd.Series:
+        """Retorna a coluna indexada por posição (horários em datetime; coluna ausente vira NaT/None)."""
+        if name not in self._columns:
+            if name not in self.df.columns:
+                values = [None] * self.n if name in TEXT_COLUMNS else pd.to_datetime(pd.Series([None] * self.n))
+            elif name in TEXT_COLUMNS:
+                values = self.df[name].values
+            else:
+                values = pd.to_datetime(self.df[name]).values
+            self._columns[name] = pd.Series(values, index=self.positions)
+        return self._columns[name]
+
+    def minutes(self, name: str) -> List[Optional[int]]:
+        """Retorna a coluna de horários em minutos inteiros desde a época (None para vazio)."""
+        if name not in self._minutes:
+            minutes = (self.column(name) - pd.Timestamp(0)) // pd.Timedelta(minutes=1)
+            self._minutes[name] = [None if pd.isna(value) else int(value) for value in minutes]
+        return self._minutes[name]
+
+    def derived(self, key: str, build: Callable):
+        """Retorna um valor derivado, calculando-o na primeira chamada."""
+        if key not in self._derived:
+            self._derived[key] = build(self)
+        return self._derived[key]
+
+    # Valores derivados compartilhados
+
+    def date_str(self) -> pd.Series:
+        return self.derived('date_str', lambda c: c.column('data').dt.strftime('%d-%m-%Y'))
+
+    def start_hm(self) -> pd.Series:
+        return self.derived('start_hm', lambda c: c.column('inicio_jornada').dt.strftime('%H:%M'))
+
+    def end_hm(self) -> pd.Series:
+        return self.derived('end_hm', lambda c: c.column('fim_jornada').dt.strftime('%H:%M'))
+
+    def work_seconds(self) -> pd.Series:
+        return self.derived('work_seconds',
+                            lambda c: (c.column('fim_jornada') - c.column('inicio_jornada')).dt.total_seconds())
+
+    def not_first(self) -> pd.Series:
+        return self.derived('not_first', lambda c: pd.Series((c.positions > 0) | (c.previous is not None),
+                                                             index=c.positions))
+
+    def interstice(self) -> tuple:
+        """
+        :return: Tupla (valores (horas, minutos), máscara de válidos, segundos).
+        :raises ValueError: Se o interstício for inválido a partir do segundo dia (como na versão linha a linha).
+        """
+        return self.derived('interstice', _build_interstice)
+
+    def rolling(self) -> tuple:
+        """:return: Tupla (início de nova sequência, dias consecutivos, segundos acumulados na sequência)."""
+        return self.derived('rolling', lambda c: rolling_counters(c.column('data'), c.work_seconds(), c.previous))
+
+    def emit(self, mask: pd.Series, infraction_type: int, times: pd.Series, durations: Callable) -> List[tuple]:
+        """Converte uma máscara de dias em infrações (posição, sequência, infração)."""
+        date_str = self.date_str()
+        return [(i, 0, {
+            'infraction_type': infraction_type,
+            'date': date_str[i],
+            'time': times[i],
+            'duration': durations(i)
+        }) for i in self.positions[mask.values]]
+
+
+def _build_interstice(ctx: RuleContext) -> tuple:
+    parsed = pd.Series([_parse_interstice(v) for v in ctx.column('intersticio').values], index=ctx.positions)
+    valid = parsed.notna()
+    if ctx.n > 1 and not valid.iloc[1:].all():
+        first_invalid = int(ctx.positions[1:][~valid.iloc[1:].values][0])
+        raise ValueError(f"Interstício inválido na linha {first_invalid}: {ctx.df['intersticio'].iloc[first_invalid]!r}")
+
+    seconds = parsed.map(lambda hm: hm[0] * 3600 + hm[1] * 60 if hm else 0).astype(float)
+    return parsed, valid, seconds
+
+
+@compliance_rule(2, columns=['data', 'in_refeicao', 'fim_refeicao'], params=['TEMPO_ALMOCO'], order=0)
+def meal_time_rule(ctx: RuleContext, thresholds: Dict) -> List[tuple]:
+    """Tipo 2: refeição menor que o mínimo."""
+    if 'in_refeicao' not in ctx.df.columns or 'fim_refeicao' not in ctx.df.columns:
+        return []
+
+    in_ref = ctx.column('in_refeicao')
+    fim_ref = ctx.column('fim_refeicao')
+    meal_seconds = (fim_ref - in_ref).dt.total_seconds()
+    mask = in_ref.notna() & fim_ref.notna() & (meal_seconds < thresholds['TEMPO_ALMOCO'])
+    return ctx.emit(mask, 2, in_ref.dt.strftime('%H:%M'), lambda i: _format_seconds(meal_seconds[i]))
+
+
+@compliance_rule(3, columns=['data', 'inicio_jornada', 'fim_jornada'], params=['TEMPO_TRABALHO_DIARIO'], order=1)
+def daily_work_rule(ctx: RuleContext, thresholds: Dict) -> List[tuple]:
+    """Tipo 3: jornada diária acima do limite."""
+    work_seconds = ctx.work_seconds()
+    return ctx.emit(work_seconds > thresholds['TEMPO_TRABALHO_DIARIO'], 3, ctx.end_hm(),
+                    lambda i: _format_seconds(work_seconds[i]))
+
+
+@compliance_rule(5, columns=['data', 'inicio_jornada', 'fim_jornada'] + [c for _, i, f in PAUSE_SLOTS for c in (i, f)],
+                 params=['TEMPO_MAX_DIRECAO', 'TEMPO_MIN_DESCANSO'], order=2)
+def continuous_driving_rule(ctx: RuleContext, thresholds: Dict) -> List[tuple]:
+    """Tipo 5: direção sem descanso suficiente (motor de tempo de direção)."""
+    columns = ['inicio_jornada', 'fim_jornada'] + [c for _, i, f in PAUSE_SLOTS for c in (i, f)]
+    per_day = driving_infractions_from_minutes(ctx.date_str().tolist(), {c: ctx.minutes(c) for c in columns},
+                                               thresholds['TEMPO_MAX_DIRECAO'], thresholds['TEMPO_MIN_DESCANSO'])
+    return [(i, seq, infraction) for i, day in enumerate(per_day) for seq, infraction in enumerate(day)]
+
+
+@compliance_rule(4, columns=['data', 'inicio_jornada', 'intersticio'], params=['TEMPO_INTERSTICIO'], order=3)
+def interstice_rule(ctx: RuleContext, thresholds: Dict) -> List[tuple]:
+    """Tipo 4: interstício menor que o mínimo (ignora interstício zerado e o primeiro dia)."""
+    parsed, valid, seconds = ctx.interstice()
+    mask = ctx.not_first() & valid & (seconds != 0) & (seconds < thresholds['TEMPO_INTERSTICIO'])
+    return ctx.emit(mask, 4, ctx.start_hm(), lambda i: f'{parsed[i][0]:02}:{parsed[i][1]:02}')
+
+
+@compliance_rule(8, columns=['data', 'inicio_jornada', 'fim_jornada', 'intersticio'],
+                 params=['MIN_DESCANSO_SEMANAL'], order=4)
+def weekly_rest_rule(ctx: RuleContext, thresholds: Dict) -> List[tuple]:
+    """Tipo 8: descanso semanal (interstício antes de uma nova sequência de dias) abaixo do mínimo."""
+    _, valid, seconds = ctx.interstice()
+    gap, _, _ = ctx.rolling()
+    # Só o primeiro dia pode estar sem interstício; com estado anterior ele pode iniciar nova sequência
+    return ctx.emit(gap & valid & (seconds < thresholds['MIN_DESCANSO_SEMANAL']), 8, ctx.start_hm(),
+                    lambda i: _format_seconds(seconds[i]))
+
+
+@compliance_rule(6, columns=['data', 'inicio_jornada', 'fim_jornada'],
+                 params=['MAX_DIAS_CONSECUTIVOS_TRABALHADOS'], order=5)
+def consecutive_days_rule(ctx: RuleContext, thresholds: Dict) -> List[tuple]:
+    """Tipo 6: dias consecutivos acima do máximo."""
+    gap, consecutive_days, _ = ctx.rolling()
+    mask = ctx.not_first() & ~gap & (consecutive_days > thresholds['MAX_DIAS_CONSECUTIVOS_TRABALHADOS'])
+    return ctx.emit(mask, 6, ctx.end_hm(), lambda i: int(consecutive_days[i]))
+
+
+@compliance_rule(7, columns=['data', 'inicio_jornada', 'fim_jornada'], params=['MAX_HORAS_SEMANAIS'], order=6)
+def weekly_hours_rule(ctx: RuleContext, thresholds: Dict) -> List[tuple]:
+    """Tipo 7: horas acumuladas na sequência acima do máximo semanal."""
+    gap, _, weekly_seconds = ctx.rolling()
+    mask = ctx.not_first() & ~gap & (weekly_seconds > thresholds['MAX_HORAS_SEMANAIS'])
+    return ctx.emit(mask, 7, ctx.end_hm(), lambda i: _format_seconds(weekly_seconds[i]))
+
+
+def resolve_thresholds(overrides: Optional[Dict] = None) -> Dict:
+    """
+    Combina os limites padrão com os valores alterados.
+
+    :param overrides: Dicionário {nome do limite: valor}. Nomes desconhecidos são ignorados.
+    :return: Dicionário completo de limites.
+    """
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    for name, value in (overrides or {}).items():
+        if name in thresholds and value is not None:
+            thresholds[name] = int(value)
+    return thresholds
+
+
+def describe_rules(overrides: Optional[Dict] = None) -> List[Dict]:
+    """
+    Descreve as regras registradas e os limites em uso.
+
+    :param overrides: Limites alterados (ver `resolve_thresholds`).
+    :return: Lista de dicionários {tipo, regra, descricao, colunas, parametros: {nome: valor}}.
+    """
+    thresholds = resolve_thresholds(overrides)
+    return [{
+        'tipo': rule.infraction_type,
+        'regra': rule.name,
+        'descricao': INFRACTION_DICT.get(rule.infraction_type),
+        'colunas': rule.columns,
+        'parametros': {name: thresholds[name] for name in rule.params}
+    } for rule in RULE_REGISTRY]
+
+
+def evaluate_rules(df: pd.DataFrame, thresholds: Optional[Dict] = None, rules: Optional[List[ComplianceRule]] = None,
+                   timings: Optional[Dict] = None, previous: Optional[Dict] = None) -> list:
+    """
+    Avalia as regras sobre um DataFrame de jornadas (formato de `convert_json_to_df`).
+
+    :param df: DataFrame de jornadas ordenado por data.
+    :param thresholds: Limites alterados (ver `resolve_thresholds`). None usa os padrões.
+    :param rules: Regras a avaliar. None usa todas as registradas.
+    :param timings: Dicionário opcional que recebe o tempo (s) de carga das colunas e de cada regra,
+                    somado aos valores já existentes.
+    :param previous: Estado gravado do último dia trabalhado antes do DataFrame (ver `RuleContext`). Sem ele,
+                     o primeiro dia é tratado como início do histórico.
+    :return: Lista de dicionários {infraction_type, date, time, duration, infraction_desc}, ordenada por dia
+             e, dentro do dia, pela ordem das regras.
+    :raises ValueError: Se início/fim de jornada estiverem ausentes ou o interstício for inválido a partir do
+                        segundo dia (mesmos casos da versão linha a linha).
+    """
+    if df is None or df.empty:
+        return []
+
+    rules = RULE_REGISTRY if rules is None else rules
+    limits = resolve_thresholds(thresholds)
+    ctx = RuleContext(df, previous)
+    timings = {} if timings is None else timings
+
+    started = time.perf_counter()
+    if ctx.column('inicio_jornada').isna().any() or ctx.column('fim_jornada').isna().any():
+        raise ValueError("O valor fornecido não é do tipo pd.Timedelta nem pd.Timestamp nem datetime.timedelta")
+    for column in dict.fromkeys(c for rule in rules for c in rule.columns):
+        ctx.column(column)
+    timings[LOAD_TIMING_KEY] = timings.get(LOAD_TIMING_KEY, 0.0) + time.perf_counter() - started
+
+    found = []  # (posição, ordem da regra, sequência, infração)
+    for rule in rules:
+        started = time.perf_counter()
+        found.extend((i, rule.order, seq, infraction) for i, seq, infraction in rule.predicate(ctx, limits))
+        timings[rule.name] = timings.get(rule.name, 0.0) + time.perf_counter() - started
+
+    found.sort(key=lambda item: item[:3])
+
+    infractions = []
+    for _, _, _, infraction in found:
+        infraction['infraction_desc'] = INFRACTION_DICT.get(infraction['infraction_type'])
+        infractions.append(infraction)
+
+    return infractions
@@ -16,21 +16,23 @@ from typing import List, Dict
 
 from global_vars import ALLOWED_EXTENSIONS, DEBUG
 
-from openpyxl import load_workbook, Workbook
-from openpyxl.styles import Alignment, Border, Side
-from copy import copy
+from openpyxl import Workbook
+from openpyxl.styles import Border, Side, PatternFill
+from openpyxl.cell import WriteOnlyCell
 import io
 import tempfile
 import os
 from reportlab.lib.pagesizes import A4, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
 from reportlab.lib.units import cm
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
-import math
 import re
 from controller.utils import CustomLogger
+from controller.excel_templates import get_template, BASE_LINE, BORDER_COLUMNS
+from controller.text_layout import measure_column, pdf_line_count
+from controller.pdf_report import (text_cell, JOURNEY_TITLE_STYLE, JOURNEY_INFRACTION_STYLE, JOURNEY_TOTALS_COL_WIDTHS,
+                                   JOURNEY_TOTALS_TABLE_STYLE, JOURNEY_COL_WIDTHS, JOURNEY_TABLE_STYLE,
+                                   JOURNEY_CELL_PADDING)
+from openpyxl.utils import get_column_letter
 
 
 def convert_data(data_str: str, mode="to_iso") -> str:
@@ -66,13 +68,15 @@ def allowed_file(filename: str) -> bool:
     return '.' in filename and filename.rsplit('.')[-1].lower() in ALLOWED_EXTENSIONS
 
 
-def make_data_block(records_df, date) -> List[Dict] | dict:
+def make_data_block(records_df, date, geofence_matcher=None) -> List[Dict] | dict:
     """
     Cria um bloco de dados com base nos registros fornecidos e na data.
 
     Parâmetros:
         records_df (pd.DataFrame): DataFrame com os registros de dados de rastreamento.
         date (str): Data no formato 'YYYY-MM-DD'.
+        geofence_matcher (GeofenceMatcher | None): Se informado, cada parada recebe o local cadastrado
+            onde ocorreu ('local') e a classificação sugerida para ela ('classificacao_sugerida').
 
     Retorna:
         dict: Dicionário contendo o bloco de dados com informações de jornada, paradas, e se há movimento ou não.
@@ -167,7 +171,7 @@ def make_data_block(records_df, date) -> List[Dict] | dict:
 
     for _, row in df_records_by_speed.iterrows():
         if row['type'] == 'rest':
-            bloco["paradas"].append({
+            parada = {
                 "inicio": row['start'].strftime('%H:%M'),
                 "fim": row['end'].strftime('%H:%M'),
                 "lat": row['latitude'],
@@ -176,8 +180,18 @@ def make_data_block(records_df, date) -> List[Dict] | dict:
                 "rua": row['rua'],
                 "link": f"https://www.google.com/maps?q={row['latitude']},{row['longitude']}",
                 "tempo": seconds_to_str_HM(row['duration']),
-                "validacao": "vel"
-            })
+                "validacao": "vel",
+                "local": None,
+                "classificacao_sugerida": None
+            }
+
+            if geofence_matcher is not None:
+                local = geofence_matcher.match(row['latitude'], row['longitude'])
+                if local:
+                    parada["local"] = local['nome']
+                    parada["classificacao_sugerida"] = local['classificacao']
+
+            bloco["paradas"].append(parada)
     return bloco
 
 
@@ -787,136 +801,43 @@ def fill_excel(name, start, end, tabela, totals, template_path="file_templates/e
         'end': end
     }
 
-    wb = load_workbook(template_path)
+    # Template lido uma única vez (recarregado se o arquivo mudar) e clonado em memória
+    excel_template = get_template(template_path)
+    wb = excel_template.new_workbook()
     ws = wb.active
 
-    # Substituir placeholders
-    for row in ws.iter_rows():
-        for cell in row:
-            if isinstance(cell.value, str):
-                for chave, valor in replace_dict.items():
-                    placeholder = f'{{{{{chave}}}}}'
-                    if placeholder in cell.value:
-                        cell.value = cell.value.replace(placeholder, str(valor))
+    # Substituir placeholders (apenas nas células que os contêm no template)
+    excel_template.fill_placeholders(ws, replace_dict)
 
-    base_line = 11
+    base_line = BASE_LINE
     current_order = [2, 0, 1, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14]
     line_height_per_wrap = 13
     start_col = 3
 
-    style_template = {}
-    for j in range(len(current_order)):
-        col = start_col + j
-        cell = ws.cell(row=base_line, column=col)
-        style_template[col] = {
-            "font": copy(cell.font),
-            "fill": copy(cell.fill),
-            "border": copy(cell.border),
-            "number_format": copy(cell.number_format),
-            "protection": copy(cell.protection),
-            "alignment": Alignment(wrap_text=True),
-        }
-
-    def calculate_required_height(cell_value, column_width, font_size=11):
-        """
-        Calcula a altura necessária para uma célula baseada no conteúdo e largura da coluna.
-        Usa cálculo preciso baseado no tamanho das palavras e largura da fonte.
-        
-        Args:
-            cell_value (str): Conteúdo da célula
-            column_width (float): Largura da coluna em caracteres
-            font_size (int): Tamanho da fonte
-        
-        Returns:
-            int: Número de linhas necessárias
-        """
-        if not cell_value or cell_value.strip() == "":
-            return 1
-        
-        # Quebras de linha explícitas
-        explicit_lines = cell_value.count('\n') + 1
-        
-        # Largura da fonte em pixels (aproximação baseada no tamanho da fonte)
-        # Fonte 11pt ≈ 8.25 pixels de largura média por caractere
-        font_width_px = font_size * 0.75
-        
-        # Largura da coluna em pixels (aproximação)
-        # Excel usa aproximadamente 7 pixels por caractere de largura de coluna
-        # Adiciona pequena margem de segurança (5%)
-        column_width_px = column_width * 7 * 0.95
-        
-        def get_char_width(char):
-            """Retorna a largura aproximada de um caractere em pixels"""
-            if char.isupper():
-                return font_width_px * 1.1  # Letras maiúsculas são mais largas
-            elif char.isdigit():
-                return font_width_px * 0.9  # Números são mais estreitos
-            elif char in 'WwMm':
-                return font_width_px * 1.3  # Caracteres muito largos
-            elif char in 'IiLl':
-                return font_width_px * 0.6  # Caracteres muito estreitos
-            elif char.isspace():
-                return font_width_px * 0.5  # Espaços são mais estreitos
-            else:
-                return font_width_px  # Largura padrão
-        
-        # Calcula quantas linhas são necessárias para o texto
-        text_lines = 0
-        for line in cell_value.split('\n'):
-            if line.strip():
-                # Calcula a largura total do texto em pixels
-                total_text_width = sum(get_char_width(char) for char in line)
-                
-                # Se o texto cabe em uma linha
-                if total_text_width <= column_width_px:
-                    text_lines += 1
-                else:
-                    # Calcula quantas linhas são necessárias
-                    # Considera que palavras não são quebradas no meio
-                    words = line.split()
-                    current_line_width = 0
-                    lines_needed = 1
-                    
-                    for word in words:
-                        # Calcula largura da palavra considerando cada caractere
-                        word_width = sum(get_char_width(char) for char in word)
-                        space_width = get_char_width(' ')  # Espaço entre palavras
-                        
-                        # Se a palavra cabe na linha atual
-                        if current_line_width + word_width <= column_width_px:
-                            current_line_width += word_width + space_width
-                        else:
-                            # Nova linha
-                            lines_needed += 1
-                            current_line_width = word_width + space_width
-                    
-                    text_lines += lines_needed
-            else:
-                text_lines += 1  # Linha vazia conta como uma linha
-        
-        # Retorna o máximo entre linhas explícitas e calculadas
-        return max(explicit_lines, text_lines)
+    style_template = {start_col + j: excel_template.data_style(start_col + j) for j in range(len(current_order))}
 
+    cell_values = []
     for i, data_row in enumerate(tabela):
         ordered_row = [data_row[idx] for idx in current_order]
-        max_lines = 1
         excel_row = base_line + i
 
-        for col_index in [2, 18]:  # B e R
-            base_cell = ws.cell(row=base_line, column=col_index)
+        for col_index in BORDER_COLUMNS:  # B e R
+            base_style = excel_template.base_styles[col_index]
             target_cell = ws.cell(row=excel_row, column=col_index)
-            target_cell.font = copy(base_cell.font)
-            target_cell.fill = copy(base_cell.fill)
-            target_cell.border = copy(base_cell.border)
-            target_cell.number_format = copy(base_cell.number_format)
-            target_cell.protection = copy(base_cell.protection)
-            target_cell.alignment = copy(base_cell.alignment)
-
+            target_cell.font = base_style["font"]
+            target_cell.fill = base_style["fill"]
+            target_cell.border = base_style["border"]
+            target_cell.number_format = base_style["number_format"]
+            target_cell.protection = base_style["protection"]
+            target_cell.alignment = base_style["alignment"]
+
+        row_values = []
         for j, value in enumerate(ordered_row):
             col = start_col + j
             cell = ws.cell(row=excel_row, column=col)
             cell_value = str(value) if value is not None else ""
             cell.value = cell_value
+            row_values.append(cell_value)
 
             template = style_template[col]
             cell.font = template["font"]
@@ -925,21 +846,24 @@ def fill_excel(name, start, end, tabela, totals, template_path="file_templates/e
             cell.number_format = template["number_format"]
             cell.protection = template["protection"]
             cell.alignment = template["alignment"]
+        cell_values.append(row_values)
 
-            # Obtém a largura da coluna (mantém a largura padrão do modelo)
-            column_letter = cell.column_letter
-            column_width = ws.column_dimensions[column_letter].width
-            if column_width is None:
-                column_width = 10  # Largura padrão se não estiver definida
-            
-            # Calcula a altura necessária para esta célula
-            required_lines = calculate_required_height(cell_value, column_width, 
-                                                     font_size=template["font"].size or 11)
-            max_lines = max(max_lines, required_lines)
+    # Linhas necessárias por célula, medindo cada coluna de uma vez (mantém a largura padrão do modelo)
+    lines_per_column = []
+    for j in range(len(current_order)):
+        col = start_col + j
+        column_width = ws.column_dimensions[get_column_letter(col)].width
+        if column_width is None:
+            column_width = 10  # Largura padrão se não estiver definida
+        lines_per_column.append(measure_column([row[j] for row in cell_values], column_width,
+                                               font_size=style_template[col]["font"].size or 11))
+
+    font_size = style_template[start_col + len(current_order) - 1]["font"].size or 11
+
+    for i in range(len(tabela)):
+        excel_row = base_line + i
+        max_lines = max([1] + [column_lines[i] for column_lines in lines_per_column])
 
-        # Define a altura da linha baseada no conteúdo calculado
-        font_size = template["font"].size or 11
-        
         # Se precisa de apenas uma linha, usa altura mínima
         if max_lines == 1:
             final_height = max(15, font_size * 1.1)
@@ -1037,20 +961,17 @@ def fill_excel_fecham(name, start, end, tabela, totals, template_path="file_temp
         'total_interval': totals.get('intervalo', ''),
     }
 
-    wb = load_workbook(template_path)
+    # Template lido uma única vez (recarregado se o arquivo mudar) e clonado em memória
+    excel_template = get_template(template_path)
+    wb = excel_template.new_workbook()
     ws = wb.active
 
-    # Substituir placeholders nas células
-    for row in ws.iter_rows():
-        for cell in row:
-            if isinstance(cell.value, str):
-                for chave, valor in replace_dict.items():
-                    placeholder = f'{{{{{chave}}}}}'
-                    if placeholder in cell.value:
-                        cell.value = cell.value.replace(placeholder, str(valor))
+    # Substituir placeholders (apenas nas células que os contêm no template)
+    excel_template.fill_placeholders(ws, replace_dict)
 
-    base_line = 11
+    base_line = BASE_LINE
     start_col = 3
+    row_height = max(excel_template.base_row_height or 15, 15)
 
     # Preencher linhas (ordem idêntica à exibida no modal/relatório PDF)
     for i, data_row in enumerate(tabela):
@@ -1059,37 +980,23 @@ def fill_excel_fecham(name, start, end, tabela, totals, template_path="file_temp
         excel_row = base_line + i
 
         # Bordas externas (colunas B e R) caso existam na linha modelo
-        for col_index in [2, 18]:
-            base_cell = ws.cell(row=base_line, column=col_index)
+        for col_index in BORDER_COLUMNS:
+            base_style = excel_template.base_styles[col_index]
             target_cell = ws.cell(row=excel_row, column=col_index)
-            target_cell.font = copy(base_cell.font)
-            target_cell.fill = copy(base_cell.fill)
-            target_cell.border = copy(base_cell.border)
-            target_cell.number_format = copy(base_cell.number_format)
-            target_cell.protection = copy(base_cell.protection)
-            target_cell.alignment = copy(base_cell.alignment)
-
-        # Estilos base por coluna, copiados da linha modelo
-        style_template = {}
-        for j in range(len(data_row)):
-            col = start_col + j
-            ref_cell = ws.cell(row=base_line, column=col)
-            style_template[col] = {
-                "font": copy(ref_cell.font),
-                "fill": copy(ref_cell.fill),
-                "border": copy(ref_cell.border),
-                "number_format": copy(ref_cell.number_format),
-                "protection": copy(ref_cell.protection),
-                "alignment": Alignment(wrap_text=True),
-            }
-
-        # Escrever células
+            target_cell.font = base_style["font"]
+            target_cell.fill = base_style["fill"]
+            target_cell.border = base_style["border"]
+            target_cell.number_format = base_style["number_format"]
+            target_cell.protection = base_style["protection"]
+            target_cell.alignment = base_style["alignment"]
+
+        # Escrever células (estilos da linha modelo pré-calculados no template)
         for j, value in enumerate(data_row):
             col = start_col + j
             cell = ws.cell(row=excel_row, column=col)
             cell_value = "" if value is None else str(value)
             cell.value = cell_value
-            tmpl = style_template.get(col)
+            tmpl = excel_template.data_style(col)
             if tmpl:
                 cell.font = tmpl["font"]
                 cell.fill = tmpl["fill"]
@@ -1099,7 +1006,7 @@ def fill_excel_fecham(name, start, end, tabela, totals, template_path="file_temp
                 cell.alignment = tmpl["alignment"]
 
         # Altura mínima da linha
-        ws.row_dimensions[excel_row].height = max(ws.row_dimensions[base_line].height or 15, 15)
+        ws.row_dimensions[excel_row].height = row_height
 
     # Ajustes de borda inferior da última linha (igual ao fill_excel padrão)
     if tabela:
@@ -1154,6 +1061,92 @@ def fill_excel_fecham(name, start, end, tabela, totals, template_path="file_temp
 
     return wb
 
+# Relatório de jornada (download_report): cabeçalhos exibidos e colunas correspondentes de perm_data
+JOURNEY_REPORT_COLUMNS = [
+    "Nome Motorista", "Placa do Caminhão", "Data", "Dia da Semana", "Início da Jornada", "Fim Jornada",
+    "Observação", "Tempo de Refeição", "Tempo Intervalo", "Jornada Total", "Tempo de Direção", "Direção sem Pausa",
+    "1° Descanso Início", "1° Descanso Fim", "2° Descanso Início", "2° Descanso Fim", "3° Descanso Início",
+    "3° Descanso Fim", "4° Descanso Início", "4° Descanso Fim", "5° Descanso Início", "5° Descanso Fim",
+    "6° Descanso Início", "6° Descanso Fim", "7° Descanso Início", "7° Descanso Fim", "8° Descanso Início",
+    "8° Descanso Fim", "1° Carregamento Descanso Início", "1° Carregamento Descanso Fim",
+    "2° Carregamento Descanso Início", "2° Carregamento Descanso Fim", "3° Carregamento Descanso Início",
+    "3° Carregamento Descanso Fim", "4° Carregamento Descanso Início", "4° Carregamento Descanso Fim",
+    "5° Carregamento Descanso Início", "5° Carregamento Descanso Fim", "6° Carregamento Descanso Início",
+    "6° Carregamento Descanso Fim", "7° Carregamento Descanso Início", "7° Carregamento Descanso Fim"
+]
+JOURNEY_REPORT_FIELDS = [
+    'nome', 'placa', 'data', 'dia_da_semana', 'inicio_jornada', 'fim_jornada', 'observacao', 'tempo_refeicao',
+    'tempo_intervalo', 'jornada_total', 'tempo_direcao', 'direcao_sem_pausa'
+] + [f"{prefix}_descanso_{i}" for i in range(1, 9) for prefix in ('in', 'fim')] \
+  + [f"{prefix}_car_desc_{i}" for i in range(1, 8) for prefix in ('in', 'fim')]
+JOURNEY_INFRACTION_COLUMNS = ["Data", "Hora", "Duração", "Descrição"]
+JOURNEY_INFRACTION_FIELDS = ['data', 'hora', 'duration', 'desc_infracao']
+
+
+def fill_journey_report(df_perm_data: pd.DataFrame, df_infractions: pd.DataFrame) -> Workbook:
+    """
+    Monta o relatório de jornada (download_report): para cada dia, cabeçalho e linha da jornada seguidos das
+    infrações daquele dia.
+
+    As infrações são agrupadas por data em uma única passada e as larguras das colunas são calculadas a partir
+    dos valores antes da escrita, então a planilha é gravada em modo write_only (linhas em sequência, sem
+    reler as células).
+
+    :param df_perm_data: Jornadas (colunas de JOURNEY_REPORT_FIELDS).
+    :param df_infractions: Infrações do período (colunas de JOURNEY_INFRACTION_FIELDS).
+    :return: Workbook write_only pronto para ser salvo.
+    """
+    header_fill = PatternFill(start_color="4176a8", end_color="4176a8", fill_type="solid")
+    # Fundo mais claro para o cabeçalho de infrações
+    infraction_header_fill = PatternFill(start_color="A9C8E3", end_color="A9C8E3", fill_type="solid")
+
+    infractions_by_date = {}
+    for infraction in df_infractions[JOURNEY_INFRACTION_FIELDS].itertuples(index=False, name=None):
+        infractions_by_date.setdefault(infraction[0], []).append(list(infraction))
+
+    journeys = [list(row) for row in df_perm_data[JOURNEY_REPORT_FIELDS].itertuples(index=False, name=None)]
+
+    # Larguras: maior texto de cada coluna (cabeçalhos, jornadas e infrações) + 2
+    widths = [len(str(value)) for value in JOURNEY_REPORT_COLUMNS]
+    widths[0] = max(widths[0], len('Infrações'))
+    for index, value in enumerate(JOURNEY_INFRACTION_COLUMNS):
+        widths[index] = max(widths[index], len(value))
+    for values in journeys + [row for rows in infractions_by_date.values() for row in rows]:
+        for index, value in enumerate(values):
+            if value is not None:
+                widths[index] = max(widths[index], len(str(value)))
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    # No modo write_only as dimensões precisam ser definidas antes da primeira linha
+    for index, width in enumerate(widths, start=1):
+        ws.column_dimensions[get_column_letter(index)].width = width + 2
+
+    def header_row(columns, fill):
+        cells = []
+        for value in columns:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.fill = fill
+            cells.append(cell)
+        return cells
+
+    for values in journeys:
+        ws.append(header_row(JOURNEY_REPORT_COLUMNS, header_fill))
+        ws.append(values)
+        ws.append(['Infrações'])
+
+        # Infrações do dia, se existirem
+        day_infractions = infractions_by_date.get(values[2])
+        if day_infractions:
+            ws.append(header_row(JOURNEY_INFRACTION_COLUMNS, infraction_header_fill))
+            for infraction in day_infractions:
+                ws.append(infraction)
+
+        # Linha em branco entre os dias
+        ws.append([])
+
+    return wb
+
 def fill_pdf(name, start, end, tabela, totals):
     """
     Gera um PDF com tabela usando reportlab, com controle preciso sobre o tamanho das linhas.
@@ -1181,55 +1174,11 @@ def fill_pdf(name, start, end, tabela, totals):
         bottomMargin=1*cm
     )
     
-    # Estilos
-    styles = getSampleStyleSheet()
-    
-    # Estilo para título
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=10,
-        spaceAfter=5,
-        alignment=TA_CENTER,
-        textColor=colors.darkblue
-    )
-    
-    # Estilo para subtítulo
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle',
-        parent=styles['Heading2'],
-        fontSize=10,
-        spaceAfter=5,
-        alignment=TA_CENTER,
-        textColor=colors.darkblue
-    )
-    
-    # Estilo para parágrafos
-    normal_style = ParagraphStyle(
-        'CustomNormal',
-        parent=styles['Normal'],
-        fontSize=10,
-        spaceAfter=0,
-        alignment=TA_LEFT
-    )
-    
-    # Estilo para célula de infrações
-    infraction_style = ParagraphStyle(
-        'InfractionCell',
-        parent=styles['Normal'],
-        fontSize=6,  # Diminuída de 7 para 6
-        alignment=TA_LEFT,
-        wordWrap='CJK',
-        leading=8,  # Diminuída de 9 para 8
-        spaceAfter=0,
-        spaceBefore=0,
-    )
-    
     # Elementos do PDF
     elements = []
     
     # Título
-    title = Paragraph(f"Relatório de Jornada - {name}", title_style)
+    title = Paragraph(f"Relatório de Jornada - {name}", JOURNEY_TITLE_STYLE)
     elements.append(title)
     
     # Totais e período em uma linha só
@@ -1239,36 +1188,8 @@ def fill_pdf(name, start, end, tabela, totals):
     ]
     
     # Criar tabela de totais compacta
-    totals_table = Table(totals_data, colWidths=[120, 80, 60, 80, 80, 80, 80, 80, 60], spaceAfter=5)
-    
-    # Estilo da tabela de totais compacta
-    totals_style = TableStyle([
-        # Cabeçalho
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 7),
-        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 2),  # Diminuída de 4 para 3
-        ('TOPPADDING', (0, 0), (-1, 0), 2),  # Diminuída de 4 para 3
-        
-        # Valores
-        ('FONTNAME', (0, 1), (-1, 1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, 1), 8),
-        ('ALIGN', (0, 1), (-1, 1), 'CENTER'),
-        
-        # Padding mínimo
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
-        ('TOPPADDING', (0, 0), (-1, -1), 0),
-        ('LEFTPADDING', (0, 0), (-1, -1), 3),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 3),
-        
-        # Bordas
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('BOX', (0, 0), (-1, -1), 1, colors.black),
-    ])
-    
-    totals_table.setStyle(totals_style)
+    totals_table = Table(totals_data, colWidths=JOURNEY_TOTALS_COL_WIDTHS, spaceAfter=5)
+    totals_table.setStyle(JOURNEY_TOTALS_TABLE_STYLE)
     elements.append(totals_table)
     
     #elements.append(Spacer(1, 5))  # Reduzido de 20 para 15
@@ -1287,6 +1208,8 @@ def fill_pdf(name, start, end, tabela, totals):
         
         # Ordem das colunas (ordem correta da página, sem observação)
         current_order = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14]
+        # Largura útil da coluna de infrações
+        infraction_width = JOURNEY_COL_WIDTHS[-1] - 2 * JOURNEY_CELL_PADDING
         
         for row in tabela:
             # Garante que todos os campos são string
@@ -1299,79 +1222,13 @@ def fill_pdf(name, start, end, tabela, totals):
             infractions_text = re.sub(r'\([^)]*\)', '', infractions_text)
             infractions_text = re.sub(r'\s+', ' ', infractions_text).strip()
             ordered_row.pop(14)
-            ordered_row.append(Paragraph(infractions_text, infraction_style))
+            # Paragraph só quando o texto precisa quebrar linha
+            ordered_row.append(text_cell(infractions_text, JOURNEY_INFRACTION_STYLE, infraction_width))
             table_data.append(ordered_row)
         
-        # Calcular larguras das colunas (em pontos)
-        # A4 landscape: 842 pontos de largura, menos margens = ~780 pontos
-        available_width = 780
-        num_cols = len(headers)
-        
-        # Larguras específicas para cada coluna (em pontos) - removida observação, aumentada infrações
-        column_widths = [
-            50,   # Data
-            50,   # Dia
-            60,   # Placa
-            40,   # Início Jornada (só horário HH:mm)
-            40,   # In. Refeição (só horário HH:mm)
-            40,   # Fim Refeição (só horário HH:mm)
-            40,   # Fim Jornada (só horário HH:mm)
-            40,   # Tempo Refeição (só horário HH:mm)
-            50,   # Interstício
-            40,   # Tempo Intervalo (só horário HH:mm)
-            40,   # Tempo C/D (só horário HH:mm)
-            40,   # Jornada Total (só horário HH:mm)
-            40,   # Tempo Direção (só horário HH:mm)
-            50,   # Direção s/ Pausa
-            370   # Infrações 
-        ]
-        
-        # Ajustar larguras para caber na página
-        total_width = sum(column_widths)
-        if total_width > available_width:
-            scale_factor = available_width / total_width
-            column_widths = [w * scale_factor for w in column_widths]
-        
-        # Criar tabela
-        table = Table(table_data, colWidths=column_widths)
-        
-        # Estilo da tabela
-        table_style = TableStyle([
-            # Cabeçalho
-            ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 2),  # Diminuída de 4 para 3
-            ('TOPPADDING', (0, 0), (-1, 0), 2),  # Diminuída de 4 para 3
-            ('LEFTPADDING', (0, 0), (-1, 0), 4),
-            ('RIGHTPADDING', (0, 0), (-1, 0), 4),
-            
-            # Dados - todas as colunas centralizadas exceto infrações
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 6),
-            ('ALIGN', (0, 1), (-2, -1), 'CENTER'),  # Todas exceto última coluna
-            ('ALIGN', (-1, 1), (-1, -1), 'LEFT'),   # Última coluna (infrações) alinhada à esquerda
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 0),  # Diminuída de 2 para 1
-            ('TOPPADDING', (0, 1), (-1, -1), 0),  # Diminuída de 2 para 1
-            ('LEFTPADDING', (0, 0), (-1, -1), 3),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 3),
-            
-            # Bordas
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('BOX', (0, 0), (-1, -1), 1, colors.black),
-            
-            # Linhas alternadas
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-            
-            # Quebra de linha para cabeçalhos e dados
-            ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
-            ('VALIGN', (0, 1), (-1, -1), 'TOP'),
-            ('WORDWRAP', (0, 0), (-1, -1), True),
-        ])
-        
-        table.setStyle(table_style)
+        # Criar tabela (larguras e estilo calculados uma única vez em controller.pdf_report)
+        table = Table(table_data, colWidths=JOURNEY_COL_WIDTHS)
+        table.setStyle(JOURNEY_TABLE_STYLE)
         elements.append(table)
     
     # Gerar PDF
@@ -1397,31 +1254,8 @@ def calculate_pdf_row_height(cell_value, column_width, font_size=6):
     if not cell_value or str(cell_value).strip() == "":
         return font_size * 1.0  # Altura mínima reduzida de 1.2 para 1.0
     
-    # Largura aproximada de um caractere em pontos
-    char_width = font_size * 0.6
-    
-    # Número de caracteres que cabem na coluna
-    chars_per_line = max(1, int(column_width / char_width))
-    
-    # Quebras de linha explícitas
-    explicit_lines = str(cell_value).count('\n') + 1
-    
-    # Calcular linhas necessárias para o texto
-    text_lines = 0
-    for line in str(cell_value).split('\n'):
-        if line.strip():
-            # Se o texto cabe em uma linha
-            if len(line) <= chars_per_line:
-                text_lines += 1
-            else:
-                # Calcular quantas linhas são necessárias
-                lines_needed = math.ceil(len(line) / chars_per_line)
-                text_lines += lines_needed
-        else:
-            text_lines += 1
-    
-    # Altura total necessária
-    total_lines = max(explicit_lines, text_lines)
+    # Linhas necessárias (memorizado em controller.text_layout)
+    total_lines = pdf_line_count(str(cell_value), column_width, font_size)
     row_height = total_lines * font_size * 1.0  # Diminuída de 1.1 para 1.0
     
     # Limites mínimo e máximo
@@ -0,0 +1,184 @@
+"""
+Motor de tempo de direção contínua - Sistema RPZ v3.0.0.0
+
+Avalia a infração tipo 5 (5h30 de direção sem 30 minutos de descanso, que pode ser fracionado)
+para todos os dias de um DataFrame de uma só vez:
+
+- Os horários de todos os dias são convertidos em minutos inteiros com operações sobre colunas inteiras.
+- Os períodos de trabalho de cada dia são o complemento das pausas (refeição, descanso e carga/descarga)
+  dentro da jornada.
+- Uma única varredura pela sequência de intervalos acumula direção e descanso, dividindo o período
+  de trabalho sempre que o limite é atingido.
+
+O resultado é o mesmo de `get_sorted_events_with_work_periods` + `get_rest_between_work_infractions`,
+que continuam sendo a referência para validação.
+"""
+
+from typing import List, Optional
+
+try:
+    import pandas as pd
+except ImportError:
+    print("AVISO: pandas não disponível, usando stub")
+    import pandas_stub as pd
+
+from global_vars import TEMPO_MAX_DIRECAO, TEMPO_MIN_DESCANSO
+
+WORK_EVENT = 'trabalho'
+
+# Pausas na mesma ordem de `get_sorted_events_with_work_periods` (é o critério de desempate na ordenação)
+PAUSE_SLOTS = (
+    [('refeicao', 'in_refeicao', 'fim_refeicao')]
+    + [('descanso', f'in_descanso_{i}', f'fim_descanso_{i}') for i in range(1, 9)]
+    + [('carga_descarga', f'in_car_desc_{i}', f'fim_car_desc_{i}') for i in range(1, 8)]
+)
+
+
+def _to_minutes(df: pd.DataFrame, column: str) -> List[Optional[int]]:
+    """Converte uma coluna de horários em minutos inteiros desde a época (None para vazio ou coluna ausente)."""
+    if column not in df.columns:
+        return [None] * df.shape[0]
+    minutes = (pd.to_datetime(df[column]) - pd.Timestamp(0)) // pd.Timedelta(minutes=1)
+    return [None if pd.isna(value) else int(value) for value in minutes]
+
+
+def _after(a: Optional[int], b: Optional[int]) -> bool:
+    """a > b, falso quando algum dos horários é vazio (mesmo comportamento das comparações com NaT)."""
+    return a is not None and b is not None and a > b
+
+
+def build_day_intervals(start: Optional[int], end: Optional[int], pauses: List[tuple]) -> List[tuple]:
+    """
+    Monta a sequência de intervalos de um dia: as pausas ordenadas e, entre elas, os períodos de trabalho.
+
+    :param start: Início da jornada (minutos).
+    :param end: Fim da jornada (minutos).
+    :param pauses: Tuplas (ordem, tipo, início, fim) das pausas preenchidas.
+    :return: Lista de tuplas (tipo, início, fim) em ordem cronológica.
+    """
+    intervals = []
+    prev_end = start
+
+    for _, kind, pause_start, pause_end in sorted(pauses, key=lambda p: (p[2], p[0])):
+        if _after(pause_start, prev_end):
+            intervals.append((WORK_EVENT, prev_end, pause_start))
+        intervals.append((kind, pause_start, pause_end))
+        prev_end = pause_end
+
+    if _after(end, prev_end):
+        intervals.append((WORK_EVENT, prev_end, end))
+
+    return intervals
+
+
+def sweep_driving_windows(intervals: List[tuple], max_driving: int, min_rest: int) -> List[tuple]:
+    """
+    Percorre os intervalos de um dia procurando janelas de direção de `max_driving` minutos sem
+    `min_rest` minutos de descanso acumulado.
+
+    :param intervals: Saída de `build_day_intervals`.
+    :param max_driving: Tempo máximo de direção, em minutos.
+    :param min_rest: Descanso mínimo dentro da janela, em minutos.
+    :return: Lista de tuplas (minuto em que o limite foi atingido, descanso acumulado em minutos).
+    """
+    found = []
+    driving = rest = 0
+    window_start = None
+
+    for kind, start, end in intervals:
+        duration = end - start
+
+        if kind != WORK_EVENT:
+            # Descanso só se soma ao anterior se houve direção desde então
+            rest = rest + duration if driving > 0 else duration
+            continue
+
+        window_start = start
+        left = duration
+        while left > 0:
+            until_limit = max_driving - driving
+            if left <= until_limit:
+                driving += left
+                left = 0
+                continue
+
+            left -= until_limit
+            if rest < min_rest:
+                found.append((window_start + until_limit, rest))
+
+            # O período é dividido no limite e a contagem recomeça com o restante
+            driving = rest = 0
+            window_start = start + until_limit
+
+    if intervals and driving >= max_driving and rest < min_rest:
+        found.append((intervals[-1][2], rest))
+
+    return found
+
+
+def _format_clock(minutes: int) -> str:
+    return f"{(minutes // 60) % 24:02}:{minutes % 60:02}"
+
+
+def _format_duration(minutes: int) -> str:
+    return f"{minutes // 60:02}:{minutes % 60:02}"
+
+
+def compute_driving_infractions(df: pd.DataFrame,
+                                max_driving_seconds: int = TEMPO_MAX_DIRECAO,
+                                min_rest_seconds: int = TEMPO_MIN_DESCANSO) -> List[list]:
+    """
+    Calcula as infrações tipo 5 de todos os dias do DataFrame.
+
+    :param df: DataFrame no formato de `convert_json_to_df` (horários já convertidos em datetime).
+    :param max_driving_seconds: Tempo máximo de direção contínua, em segundos (múltiplo de 60).
+    :param min_rest_seconds: Descanso mínimo a cada período de direção, em segundos (múltiplo de 60).
+    :return: Lista com uma posição por linha do DataFrame, contendo a lista de infrações do dia
+             ({infraction_type, date, time, duration}).
+    """
+    if df is None or df.empty:
+        return []
+
+    dates = pd.to_datetime(df['data']).dt.strftime('%d-%m-%Y').tolist()
+    minutes = {column: _to_minutes(df, column)
+               for column in ['inicio_jornada', 'fim_jornada'] + [c for _, i, f in PAUSE_SLOTS for c in (i, f)]}
+    return driving_infractions_from_minutes(dates, minutes, max_driving_seconds, min_rest_seconds)
+
+
+def driving_infractions_from_minutes(dates: List[str], minutes: dict,
+                                     max_driving_seconds: int = TEMPO_MAX_DIRECAO,
+                                     min_rest_seconds: int = TEMPO_MIN_DESCANSO) -> List[list]:
+    """
+    Mesmo cálculo de `compute_driving_infractions`, a partir de colunas já convertidas em minutos
+    (usado pelo registro de regras, que converte cada coluna uma única vez).
+
+    :param dates: Datas de cada linha ('DD-MM-YYYY').
+    :param minutes: Dicionário coluna -> lista de minutos (saída de `_to_minutes`) com 'inicio_jornada',
+                    'fim_jornada' e as colunas de PAUSE_SLOTS.
+    :param max_driving_seconds: Tempo máximo de direção contínua, em segundos (múltiplo de 60).
+    :param min_rest_seconds: Descanso mínimo a cada período de direção, em segundos (múltiplo de 60).
+    :return: Lista com uma posição por linha, contendo a lista de infrações do dia.
+    """
+    max_driving = max_driving_seconds // 60
+    min_rest = min_rest_seconds // 60
+
+    starts = minutes['inicio_jornada']
+    ends = minutes['fim_jornada']
+    pause_columns = [(order, kind, minutes[in_col], minutes[fim_col])
+                     for order, (kind, in_col, fim_col) in enumerate(PAUSE_SLOTS)]
+
+    results = []
+    for i in range(len(dates)):
+        pauses = [(order, kind, pause_in[i], pause_end[i])
+                  for order, kind, pause_in, pause_end in pause_columns
+                  if pause_in[i] is not None and pause_end[i] is not None]
+
+        intervals = build_day_intervals(starts[i], ends[i], pauses)
+        results.append([{
+            'infraction_type': 5,
+            'date': dates[i],
+            'time': _format_clock(minute),
+            'duration': _format_duration(rest)
+        } for minute, rest in sweep_driving_windows(intervals, max_driving, min_rest)])
+
+    return results
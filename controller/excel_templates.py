@@ -0,0 +1,186 @@
+"""
+Cache de templates Excel - Sistema RPZ v3.0.0.0
+
+Os templates de file_templates/ são lidos uma única vez (na inicialização ou no primeiro uso). Para cada
+template ficam guardados:
+
+- a planilha já carregada, que cada exportação clona em memória (sem ler o disco nem reinterpretar o XML);
+- as coordenadas das células com placeholders ('{{chave}}'), para que a substituição não percorra a
+  planilha inteira;
+- os estilos da linha modelo (fonte, preenchimento, bordas, formato e proteção).
+
+Se o arquivo do template for alterado (mtime ou tamanho), ele é recarregado no próximo uso.
+"""
+
+import copy
+import io
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from openpyxl import load_workbook
+from openpyxl.styles import Alignment
+from openpyxl.utils.indexed_list import IndexedList
+from openpyxl.worksheet.dimensions import DimensionHolder
+
+from controller.utils import CustomLogger
+from global_vars import DEBUG
+
+TEMPLATES_DIR = 'file_templates'
+
+# Linha modelo (estilos das linhas de dados) e colunas de borda (B e R) dos templates
+BASE_LINE = 11
+BORDER_COLUMNS = (2, 18)
+
+# Última coluna da linha modelo com estilos pré-calculados, no mínimo (dados de C a S no fechamento)
+_MIN_STYLED_COLUMN = 19
+
+_PLACEHOLDER_RE = re.compile(r'\{\{(.+?)\}\}')
+
+templates_logger = CustomLogger(source="EXCEL_TEMPLATES", debug=DEBUG)
+
+
+class ExcelTemplate:
+    """
+    Template Excel pré-processado.
+
+    Atributos:
+    - path (str): caminho do arquivo.
+    - signature (tuple): (mtime, tamanho) do arquivo quando foi lido.
+    - placeholder_cells (list): tuplas (coordenada, texto original) das células com placeholders da planilha ativa.
+    - base_styles (dict): coluna -> {font, fill, border, number_format, protection, alignment} da linha modelo.
+    - base_row_height (float | None): altura da linha modelo.
+    """
+
+    def __init__(self, path: str, signature: tuple, content: bytes):
+        self.path = path
+        self.signature = signature
+
+        # Planilha de referência: nunca é entregue a quem exporta, apenas clonada
+        self._workbook = load_workbook(io.BytesIO(content))
+        ws = self._workbook.active
+        self.placeholder_cells: List[Tuple[str, str]] = [
+            (cell.coordinate, cell.value)
+            for row in ws.iter_rows()
+            for cell in row
+            if isinstance(cell.value, str) and _PLACEHOLDER_RE.search(cell.value)
+        ]
+
+        self.base_styles: Dict[int, dict] = {}
+        for col in range(BORDER_COLUMNS[0], max(ws.max_column, _MIN_STYLED_COLUMN) + 1):
+            cell = ws.cell(row=BASE_LINE, column=col)
+            self.base_styles[col] = {
+                "font": copy.copy(cell.font),
+                "fill": copy.copy(cell.fill),
+                "border": copy.copy(cell.border),
+                "number_format": copy.copy(cell.number_format),
+                "protection": copy.copy(cell.protection),
+                "alignment": copy.copy(cell.alignment),
+            }
+
+        self._data_styles = {col: {**style, "alignment": Alignment(wrap_text=True)}
+                             for col, style in self.base_styles.items()}
+        self.base_row_height = ws.row_dimensions[BASE_LINE].height
+
+    def data_style(self, col: int) -> Optional[dict]:
+        """Estilo das células de dados de uma coluna: o da linha modelo com quebra de texto."""
+        return self._data_styles.get(col)
+
+    def new_workbook(self):
+        """
+        Cria uma nova planilha clonando (copy.deepcopy) a planilha do template guardada em memória.
+
+        Duas estruturas do openpyxl não sobrevivem a um deepcopy simples e são refeitas aqui:
+
+        - as tabelas de estilos (IndexedList) descartam itens repetidos ao serem recriadas, deslocando os
+          índices usados pelas células; são copiadas antes, preservando a ordem e as repetições;
+        - row_dimensions/column_dimensions perdem o default_factory e linhas/colunas que não existem no
+          template passariam a gerar KeyError; são recriadas como em Worksheet._setup.
+
+        :return: Workbook independente do cache.
+        """
+        memo = {}
+        for value in vars(self._workbook).values():
+            if isinstance(value, IndexedList):
+                memo[id(value)] = IndexedList(copy.deepcopy(list(value), memo))
+
+        wb = copy.deepcopy(self._workbook, memo)
+        for ws in wb.worksheets:
+            for attr, factory in (('row_dimensions', ws._add_row), ('column_dimensions', ws._add_column)):
+                copied = getattr(ws, attr)
+                holder = DimensionHolder(worksheet=ws, default_factory=factory)
+                holder.update(copied)
+                holder.max_outline = copied.max_outline
+                setattr(ws, attr, holder)
+        return wb
+
+    def fill_placeholders(self, ws, replace_dict: dict):
+        """
+        Substitui os placeholders nas células conhecidas do template.
+
+        :param ws: Planilha ativa de uma planilha criada por `new_workbook`.
+        :param replace_dict: Dicionário {chave: valor}; cada '{{chave}}' é substituído por str(valor).
+        """
+        for coordinate, text in self.placeholder_cells:
+            value = text
+            for chave, valor in replace_dict.items():
+                placeholder = f'{{{{{chave}}}}}'
+                if placeholder in value:
+                    value = value.replace(placeholder, str(valor))
+            ws[coordinate].value = value
+
+
+_templates: Dict[str, ExcelTemplate] = {}
+_templates_lock = threading.Lock()
+
+
+def _signature(path: str) -> tuple:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def get_template(path: str) -> ExcelTemplate:
+    """
+    Retorna o template pré-processado, lendo o arquivo apenas na primeira vez ou quando ele mudar.
+
+    :param path: Caminho do template.
+    :return: Instância de ExcelTemplate.
+    :raises FileNotFoundError: Se o arquivo não existir.
+    """
+    key = os.path.abspath(path)
+    signature = _signature(key)
+
+    template = _templates.get(key)
+    if template is not None and template.signature == signature:
+        return template
+
+    with _templates_lock:
+        template = _templates.get(key)
+        if template is None or template.signature != signature:
+            with open(key, 'rb') as f:
+                content = f.read()
+            template = ExcelTemplate(key, signature, content)
+            _templates[key] = template
+            templates_logger.print(f"Template Excel carregado: {path} ({len(template.placeholder_cells)} placeholder(s)).")
+    return template
+
+
+def preload_templates(directory: str = TEMPLATES_DIR) -> int:
+    """
+    Carrega todos os templates .xlsx de um diretório (usado na inicialização).
+
+    :return: Quantidade de templates carregados.
+    """
+    if not os.path.isdir(directory):
+        return 0
+
+    loaded = 0
+    for filename in sorted(os.listdir(directory)):
+        if filename.lower().endswith('.xlsx') and not filename.startswith('~$'):
+            try:
+                get_template(os.path.join(directory, filename))
+                loaded += 1
+            except Exception as e:
+                templates_logger.register_log(f"Erro ao carregar o template {filename}.", f'Erro: {e}')
+    return loaded
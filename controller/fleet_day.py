@@ -0,0 +1,165 @@
+"""
+Segmentação diária da frota - Sistema RPZ v3.0.0.0
+
+Este módulo gera, para uma data, o resumo de movimento de todos os caminhões de uma só vez:
+os pontos da frota são carregados em uma única consulta, agrupados por caminhão e segmentados
+em descanso/trabalho com a mesma regra de `generate_rests_df` usada na análise de jornada.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    import pandas as pd
+except ImportError:
+    print("AVISO: pandas não disponível, usando stub")
+    import pandas_stub as pd
+
+from controller.data import generate_rests_df
+from controller.utils import seconds_to_str_HM
+
+# Colunas retornadas por UploadedDataDriver.retrieve_fleet_by_datetime_range
+FLEET_COLUMNS = ['truck_id', 'data_iso', 'vel', 'latitude', 'longitude', 'uf', 'cidade', 'rua', 'ignicao']
+
+# Abaixo desse número de caminhões o custo de subir processos não compensa
+MIN_TRUCKS_FOR_POOL = 8
+
+
+def _point(hora, coords) -> Optional[Dict]:
+    """
+    Monta o dicionário compacto de um ponto (hora + coordenadas) do resumo.
+
+    :param hora: Timestamp do ponto ou None.
+    :param coords: Tupla (latitude, longitude) ou None.
+    :return: Dicionário com hora 'HH:MM', lat, lon e link do mapa, ou None se não houver ponto.
+    """
+    if hora is None or coords is None:
+        return None
+
+    lat, lon = float(coords[0]), float(coords[1])
+    return {
+        "hora": hora.strftime('%H:%M'),
+        "lat": lat,
+        "lon": lon,
+        "link": f"https://www.google.com/maps?q={lat},{lon}"
+    }
+
+
+def summarize_truck_day(truck_id: int, records: list) -> Dict:
+    """
+    Gera o resumo diário de um caminhão a partir dos seus registros brutos.
+
+    Reaproveita `generate_rests_df` nos modos 'vel' e 'ignicao', assim como `make_data_block`,
+    mas devolve apenas o necessário para a visão da frota.
+
+    :param truck_id: ID do caminhão.
+    :param records: Lista de registros (tuplas no formato de FLEET_COLUMNS) ordenados por horário.
+    :return: Dicionário com início/fim de movimento e ignição, paradas e totais do dia.
+    """
+    df = pd.DataFrame(records, columns=FLEET_COLUMNS)
+
+    segments_vel, first_start_vel, last_end_vel, first_coords_vel, last_coords_vel = \
+        generate_rests_df(df.copy(), mode='vel')
+    segments_ign, first_start_ign, last_end_ign, first_coords_ign, last_coords_ign = \
+        generate_rests_df(df.copy(), mode='ignicao')
+
+    sem_movimento = bool(segments_vel['type'].nunique() == 1 and segments_vel['type'].iloc[0] == 'rest')
+
+    summary = {
+        "truck_id": int(truck_id),
+        "pontos": len(df),
+        "sem_movimento": sem_movimento,
+        # Dia em que o caminhão não andou, mas a ignição foi ligada
+        "apenas_ignicao": bool(sem_movimento and segments_ign['type'].nunique() == 2),
+        "inicio_movimento": None,
+        "fim_movimento": None,
+        "inicio_ignicao": _point(first_start_ign, first_coords_ign),
+        "fim_ignicao": _point(last_end_ign, last_coords_ign),
+        "paradas": [],
+        "tempo_parado": "00:00",
+        "tempo_movimento": "00:00"
+    }
+
+    if sem_movimento:
+        return summary
+
+    summary["inicio_movimento"] = _point(first_start_vel, first_coords_vel)
+    summary["fim_movimento"] = _point(last_end_vel, last_coords_vel)
+
+    rests = segments_vel[segments_vel['type'] == 'rest']
+    works = segments_vel[segments_vel['type'] == 'work']
+
+    for start, end, duration, lat, lon, cidade, rua in zip(rests['start'], rests['end'], rests['duration'],
+                                                         rests['latitude'], rests['longitude'],
+                                                         rests['cidade'], rests['rua']):
+        summary["paradas"].append({
+            "inicio": start.strftime('%H:%M'),
+            "fim": end.strftime('%H:%M'),
+            "tempo": seconds_to_str_HM(duration),
+            "lat": float(lat),
+            "lon": float(lon),
+            "cidade": cidade,
+            "rua": rua
+        })
+
+    summary["tempo_parado"] = seconds_to_str_HM(rests['duration'].sum())
+    summary["tempo_movimento"] = seconds_to_str_HM(works['duration'].sum())
+
+    return summary
+
+
+def _summarize_group(args) -> Dict:
+    """Adaptador de `summarize_truck_day` para o pool de processos (recebe uma tupla)."""
+    truck_id, records = args
+    return summarize_truck_day(truck_id, records)
+
+
+def group_records_by_truck(records: list) -> Dict[int, list]:
+    """
+    Agrupa os registros da frota por caminhão mantendo a ordem de chegada.
+
+    :param records: Registros ordenados por truck_id e data_iso.
+    :return: Dicionário {truck_id: [registros]}.
+    """
+    groups = {}
+    for record in records:
+        groups.setdefault(record[0], []).append(record)
+    return groups
+
+
+def build_fleet_day(records: list, plates: Dict[int, str] = None, max_workers: int = 0) -> List[Dict]:
+    """
+    Segmenta os registros de toda a frota, caminhão a caminhão, e devolve um resumo por caminhão.
+
+    :param records: Registros da frota (FLEET_COLUMNS) obtidos em uma única consulta.
+    :param plates: Dicionário opcional {truck_id: placa} para identificar os caminhões no resumo.
+    :param max_workers: Quantidade de processos para a segmentação. 0 ou 1 processa no próprio processo.
+    :return: Lista de resumos ordenada pela placa.
+    """
+    plates = plates or {}
+    groups = list(group_records_by_truck(records).items())
+
+    if max_workers and max_workers > 1 and len(groups) >= MIN_TRUCKS_FOR_POOL:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            summaries = list(executor.map(_summarize_group, groups))
+    else:
+        summaries = [_summarize_group(group) for group in groups]
+
+    for summary in summaries:
+        summary["placa"] = plates.get(summary["truck_id"], str(summary["truck_id"]))
+
+    summaries.sort(key=lambda s: s["placa"])
+    return summaries
+
+
+def fleet_day_window(date: str) -> tuple:
+    """
+    Retorna o intervalo (início, fim) em 'YYYY-MM-DD HH:MM:SS' que cobre a data informada.
+
+    :param date: Data no formato 'YYYY-MM-DD'.
+    :return: Tupla (início do dia, fim do dia).
+    :raises ValueError: Se a data não estiver no formato esperado.
+    """
+    datetime.strptime(date, '%Y-%m-%d')
+    return f"{date} 00:00:00", f"{date} 23:59:59"
@@ -0,0 +1,141 @@
+"""
+Casamento de paradas com locais cadastrados (geofences) - Sistema RPZ v3.0.0.0
+
+Os locais ativos da tabela `geofences` são distribuídos em uma grade (a mesma do índice espacial
+de `vehicle_data`), de modo que cada parada consulta apenas os locais da sua célula.
+"""
+
+from typing import Dict, List, Optional
+
+from controller.utils import CustomLogger
+from global_vars import DEBUG
+from model.drivers.geofence_driver import parse_coordinate, parse_vertices
+from model.drivers.uploaded_data_driver import (geo_cell, haversine_m, radius_to_bbox,
+                                                GEO_ROW_FACTOR, GEO_MAX_CELLS)
+
+geofence_logger = CustomLogger(source="GEOFENCE", debug=DEBUG)
+
+
+def point_in_polygon(latitude: float, longitude: float, vertices: List[List[float]]) -> bool:
+    """
+    Verifica se um ponto está dentro de um polígono (algoritmo ray casting).
+
+    :param latitude: Latitude do ponto.
+    :param longitude: Longitude do ponto.
+    :param vertices: Lista de vértices [[lat, lon], ...].
+    :return: True se o ponto estiver dentro do polígono.
+    """
+    inside = False
+    j = len(vertices) - 1
+    for i in range(len(vertices)):
+        lat_i, lon_i = vertices[i]
+        lat_j, lon_j = vertices[j]
+        if (lon_i > longitude) != (lon_j > longitude):
+            lat_cross = (lat_j - lat_i) * (longitude - lon_i) / (lon_j - lon_i) + lat_i
+            if latitude < lat_cross:
+                inside = not inside
+        j = i
+    return inside
+
+
+class GeofenceMatcher:
+    """
+    Localiza, para uma coordenada, o local cadastrado que a contém.
+
+    Quando mais de um local contém o ponto, vence o de menor área (ex.: a doca dentro do pátio do cliente).
+    """
+
+    def __init__(self, geofences: List[tuple]):
+        """
+        :param geofences: Tuplas (id, nome, tipo, latitude, longitude, raio_m, poligono, classificacao, ativo)
+                          retornadas por GeofenceDriver.retrieve_all_geofences.
+        """
+        self.grid: Dict[int, List[dict]] = {}
+        self.large: List[dict] = []
+
+        for row in geofences:
+            fence = self._prepare(row)
+            if fence is None:
+                continue
+
+            min_lat, max_lat, min_lon, max_lon = fence['bbox']
+            first_row, first_col = divmod(geo_cell(min_lat, min_lon), GEO_ROW_FACTOR)
+            last_row, last_col = divmod(geo_cell(max_lat, max_lon), GEO_ROW_FACTOR)
+
+            # Locais muito grandes não são espalhados pela grade; são testados sempre
+            if (last_row - first_row + 1) * (last_col - first_col + 1) > GEO_MAX_CELLS:
+                self.large.append(fence)
+                continue
+
+            for grid_row in range(first_row, last_row + 1):
+                for grid_col in range(first_col, last_col + 1):
+                    self.grid.setdefault(grid_row * GEO_ROW_FACTOR + grid_col, []).append(fence)
+
+    @staticmethod
+    def _prepare(row) -> Optional[dict]:
+        """
+        Prepara um local para a grade. Locais com dados inválidos (vértice incompleto, coordenada em texto...)
+        são ignorados e registrados no log, para que um cadastro ruim não impeça a análise.
+        """
+        geofence_id, nome, tipo, latitude, longitude, raio_m, poligono, classificacao = row[:8]
+
+        try:
+            if tipo == 'circulo':
+                latitude = parse_coordinate(latitude, 'latitude', 90)
+                longitude = parse_coordinate(longitude, 'longitude', 180)
+                raio_m = parse_coordinate(raio_m, 'raio_m', 20_000_000)
+                if raio_m <= 0:
+                    raise ValueError("raio_m deve ser maior que zero.")
+                return {
+                    'id': geofence_id, 'nome': nome, 'tipo': tipo, 'classificacao': classificacao,
+                    'center': (latitude, longitude), 'raio_m': raio_m,
+                    'bbox': radius_to_bbox(latitude, longitude, raio_m),
+                    'area': raio_m * raio_m
+                }
+
+            vertices = parse_vertices(poligono)
+        except ValueError as e:
+            geofence_logger.register_log(f"Local {geofence_id} ({nome}) ignorado: cadastro inválido.", f'Erro: {e}')
+            return None
+
+        lats = [v[0] for v in vertices]
+        lons = [v[1] for v in vertices]
+        bbox = (min(lats), max(lats), min(lons), max(lons))
+        return {
+            'id': geofence_id, 'nome': nome, 'tipo': tipo, 'classificacao': classificacao,
+            'vertices': vertices, 'bbox': bbox,
+            # Área aproximada pelo retângulo envolvente, em m², suficiente para desempate
+            'area': haversine_m(bbox[0], bbox[2], bbox[1], bbox[2]) * haversine_m(bbox[0], bbox[2], bbox[0], bbox[3])
+        }
+
+    @staticmethod
+    def _contains(fence: dict, latitude: float, longitude: float) -> bool:
+        min_lat, max_lat, min_lon, max_lon = fence['bbox']
+        if not (min_lat <= latitude <= max_lat and min_lon <= longitude <= max_lon):
+            return False
+        if fence['tipo'] == 'circulo':
+            return haversine_m(fence['center'][0], fence['center'][1], latitude, longitude) <= fence['raio_m']
+        return point_in_polygon(latitude, longitude, fence['vertices'])
+
+    def match(self, latitude, longitude) -> Optional[dict]:
+        """
+        Retorna o local que contém a coordenada.
+
+        :param latitude: Latitude do ponto.
+        :param longitude: Longitude do ponto.
+        :return: Dicionário {id, nome, classificacao} ou None se nenhum local contiver o ponto.
+        """
+        if latitude is None or longitude is None:
+            return None
+
+        latitude, longitude = float(latitude), float(longitude)
+        candidates = self.grid.get(geo_cell(latitude, longitude), []) + self.large
+
+        best = None
+        for fence in candidates:
+            if self._contains(fence, latitude, longitude) and (best is None or fence['area'] < best['area']):
+                best = fence
+
+        if best is None:
+            return None
+        return {'id': best['id'], 'nome': best['nome'], 'classificacao': best['classificacao']}
@@ -5,7 +5,9 @@ except ImportError:
     import pandas_stub as pd
 from datetime import timedelta
 
-from controller.infractions_data import sum_work_and_non_work, split_work_into_chunks, split_time_delta
+from controller.infractions_data import (sum_work_and_non_work, split_work_into_chunks, split_time_delta,
+                                         parse_journey_time_columns)
+from controller.infractions_columnar import compute_infractions_columnar
 from controller.utils import CustomLogger
 from global_vars import *
 
@@ -267,120 +269,70 @@ def get_rest_between_work_infractions(row: pd.Series) -> list:
     return infractions_list
 
 
+# Mapeamento coluna do DataFrame -> chave do registro JSON enviado pela tabela da análise
+JSON_RECORD_FIELDS = [
+    ('data', "Data"), ('dia_da_semana', "Dia da Semana"), ('inicio_jornada', "Início Jornada"),
+    ('in_refeicao', "In. Refeição"), ('fim_refeicao', "Fim Refeição"), ('fim_jornada', "Fim de Jornada"),
+    ('observacao', "Observação"), ('tempo_refeicao', "Tempo Refeição"), ('intersticio', "Interstício"),
+    ('tempo_intervalo', "Tempo Intervalo"), ('tempo_carga_descarga', "Tempo Carga/Descarga"),
+    ('jornada_total', "Jornada Total"), ('tempo_direcao', "Tempo Direção"), ('direcao_sem_pausa', "Direção sem Pausa"),
+    *[(f'{prefix}_descanso_{i}', f"{label} Descanso {i}")
+      for i in range(1, 9) for prefix, label in (('in', "In."), ('fim', "Fim"))],
+    *[(f'{prefix}_car_desc_{i}', f"{label} Car/Desc {i}")
+      for i in range(1, 8) for prefix, label in (('in', "In."), ('fim', "Fim"))]
+]
+
+
 def convert_json_to_df(table_records, motorist_id, truck_id):
-    time_columns = [
-        'inicio_jornada', 'in_refeicao', 'fim_refeicao', 'fim_jornada',
-        'in_descanso_1', 'fim_descanso_1', 'in_descanso_2', 'fim_descanso_2',
-        'in_descanso_3', 'fim_descanso_3', 'in_descanso_4', 'fim_descanso_4',
-        'in_descanso_5', 'fim_descanso_5', 'in_descanso_6', 'fim_descanso_6',
-        'in_descanso_7', 'fim_descanso_7', 'in_descanso_8', 'fim_descanso_8',
-        'in_car_desc_1', 'fim_car_desc_1', 'in_car_desc_2', 'fim_car_desc_2',
-        'in_car_desc_3', 'fim_car_desc_3', 'in_car_desc_4', 'fim_car_desc_4',
-        'in_car_desc_5', 'fim_car_desc_5', 'in_car_desc_6', 'fim_car_desc_6',
-        'in_car_desc_7', 'fim_car_desc_7'
-    ]
-    df = None
+    """
+    Converte os registros da tabela da análise (JSON) em um DataFrame para o cálculo das infrações.
 
-    for record in table_records:
+    As colunas são montadas em uma única passada pelos registros e os horários são convertidos de uma
+    vez por `parse_journey_time_columns`. Registros com observação ou sem início de jornada são ignorados.
 
-        # Extração dos campos do JSON
-        data = record["Data"]
-        dia_da_semana = record["Dia da Semana"]
-        inicio_jornada = record["Início Jornada"]
-        in_refeicao = record["In. Refeição"]
-        fim_refeicao = record["Fim Refeição"]
-        fim_jornada = record["Fim de Jornada"]
-        observacao = record["Observação"]
+    :param table_records: Lista de dicionários com as chaves da tabela ("Data", "Início Jornada", ...).
+    :param motorist_id: ID do motorista.
+    :param truck_id: ID do caminhão.
+    :return: DataFrame com uma linha por data (sem duplicadas) ou None se nenhum registro for válido.
+    """
+    columns = {col: [] for col, _ in JSON_RECORD_FIELDS}
 
-        if observacao or not inicio_jornada:
+    for record in table_records:
+        if record["Observação"] or not record["Início Jornada"]:
             continue
+        for col, key in JSON_RECORD_FIELDS:
+            columns[col].append(record[key])
 
-        tempo_refeicao = record["Tempo Refeição"]
-        intersticio = record["Interstício"]
-        tempo_intervalo = record["Tempo Intervalo"]
-        tempo_carga_descarga = record["Tempo Carga/Descarga"]
-        jornada_total = record["Jornada Total"]
-        tempo_direcao = record["Tempo Direção"]
-        direcao_sem_pausa = record["Direção sem Pausa"]
-
-        # Descanso
-        descanso_1 = (record["In. Descanso 1"], record["Fim Descanso 1"])
-        descanso_2 = (record["In. Descanso 2"], record["Fim Descanso 2"])
-        descanso_3 = (record["In. Descanso 3"], record["Fim Descanso 3"])
-        descanso_4 = (record["In. Descanso 4"], record["Fim Descanso 4"])
-        descanso_5 = (record["In. Descanso 5"], record["Fim Descanso 5"])
-        descanso_6 = (record["In. Descanso 6"], record["Fim Descanso 6"])
-        descanso_7 = (record["In. Descanso 7"], record["Fim Descanso 7"])
-        descanso_8 = (record["In. Descanso 8"], record["Fim Descanso 8"])
-
-        # Carga/Descarga
-        car_desc_1 = (record["In. Car/Desc 1"], record["Fim Car/Desc 1"])
-        car_desc_2 = (record["In. Car/Desc 2"], record["Fim Car/Desc 2"])
-        car_desc_3 = (record["In. Car/Desc 3"], record["Fim Car/Desc 3"])
-        car_desc_4 = (record["In. Car/Desc 4"], record["Fim Car/Desc 4"])
-        car_desc_5 = (record["In. Car/Desc 5"], record["Fim Car/Desc 5"])
-        car_desc_6 = (record["In. Car/Desc 6"], record["Fim Car/Desc 6"])
-        car_desc_7 = (record["In. Car/Desc 7"], record["Fim Car/Desc 7"])
-
-        data_dict = {
-            'motorist_id': motorist_id,
-            'truck_id': truck_id,
-            'data': data,
-            'dia_da_semana': dia_da_semana,
-            'inicio_jornada': inicio_jornada,
-            'in_refeicao': in_refeicao,
-            'fim_refeicao': fim_refeicao,
-            'fim_jornada': fim_jornada,
-            'observacao': observacao,
-            'tempo_refeicao': tempo_refeicao,
-            'intersticio': intersticio,
-            'tempo_intervalo': tempo_intervalo,
-            'tempo_carga_descarga': tempo_carga_descarga,
-            'jornada_total': jornada_total,
-            'tempo_direcao': tempo_direcao,
-            'direcao_sem_pausa': direcao_sem_pausa,
-            'in_descanso_1': descanso_1[0], 'fim_descanso_1': descanso_1[1],
-            'in_descanso_2': descanso_2[0], 'fim_descanso_2': descanso_2[1],
-            'in_descanso_3': descanso_3[0], 'fim_descanso_3': descanso_3[1],
-            'in_descanso_4': descanso_4[0], 'fim_descanso_4': descanso_4[1],
-            'in_descanso_5': descanso_5[0], 'fim_descanso_5': descanso_5[1],
-            'in_descanso_6': descanso_6[0], 'fim_descanso_6': descanso_6[1],
-            'in_descanso_7': descanso_7[0], 'fim_descanso_7': descanso_7[1],
-            'in_descanso_8': descanso_8[0], 'fim_descanso_8': descanso_8[1],
-            'in_car_desc_1': car_desc_1[0], 'fim_car_desc_1': car_desc_1[1],
-            'in_car_desc_2': car_desc_2[0], 'fim_car_desc_2': car_desc_2[1],
-            'in_car_desc_3': car_desc_3[0], 'fim_car_desc_3': car_desc_3[1],
-            'in_car_desc_4': car_desc_4[0], 'fim_car_desc_4': car_desc_4[1],
-            'in_car_desc_5': car_desc_5[0], 'fim_car_desc_5': car_desc_5[1],
-            'in_car_desc_6': car_desc_6[0], 'fim_car_desc_6': car_desc_6[1],
-            'in_car_desc_7': car_desc_7[0], 'fim_car_desc_7': car_desc_7[1]
-        }
-        new_row_df = pd.DataFrame([data_dict])
+    if not columns['data']:
+        return None
 
-        for col in time_columns:
-            if col in new_row_df.columns:
-                # Combinando as colunas 'data' e 'col' diretamente e convertendo para datetime
-                new_row_df[col] = pd.to_datetime(new_row_df['data'].astype(str) + ' ' + new_row_df[col].astype(str),
-                                                 format='%d-%m-%Y %H:%M',
-                                                 errors='coerce')
-        new_row_df['data'] = pd.to_datetime(new_row_df['data'], format='%d-%m-%Y')
+    df = pd.DataFrame({'motorist_id': motorist_id, 'truck_id': truck_id, **columns})
+    df = parse_journey_time_columns(df)
 
-        if new_row_df.empty:
-            continue
+    return df.drop_duplicates(subset=['data'])
 
-        if df is None:
-            df = new_row_df
-        else:
-            df = pd.concat([df, new_row_df], ignore_index=True)
 
-    if df is not None and not df.empty:
-        df = df.drop_duplicates(subset=['data'])
-    return df
+def compute_infractions(df, thresholds=None, timings=None, previous=None):
+    """
+    Computa todas as infrações com base nos dados fornecidos no DataFrame.
 
+    Usa o motor colunar (controller.infractions_columnar), que produz a mesma lista de
+    `compute_infractions_rowwise` sem percorrer o DataFrame linha a linha.
 
-def compute_infractions(df):
+    :param df: DataFrame de jornadas (formato de `convert_json_to_df`).
+    :param thresholds: Limites alterados da operação ({nome: valor}, ver `ParametersDriver.get_rule_thresholds`).
+    :param timings: Dicionário opcional que recebe o tempo de avaliação de cada regra.
+    :param previous: Estado gravado do último dia trabalhado antes de `df` (ver `compute_rolling_state`), para
+                     continuar a sequência de dias em andamento sem carregar os dias anteriores.
     """
-    Computa todas as infrações com base nos dados fornecidos no DataFrame.
+    return compute_infractions_columnar(df, thresholds=thresholds, timings=timings, previous=previous)
+
+
+def compute_infractions_rowwise(df):
+    """
+    Computa todas as infrações com base nos dados fornecidos no DataFrame, linha a linha.
+    Mantida como referência para validar o motor colunar. Para o tipo 5, espera a coluna 'sorted_events'
+    (get_sorted_events_with_work_periods).
 
     Verifica e registra infrações de acordo com as condições fornecidas para:
     - Tempo de trabalho diário
@@ -424,7 +376,6 @@ def compute_infractions(df):
 
     for i in range(df.shape[0]):
         row = df.iloc[i, :]
-        print(row)
         horas_trabalhadas_delta = row['fim_jornada'] - row['inicio_jornada']
 
         # Quebra os tempos de início e fim em horas e minutos
@@ -0,0 +1,240 @@
+"""
+Varredura de infrações da frota - Sistema RPZ v3.0.0.0
+
+Calcula as infrações de todos os motoristas ativos da jornada em um período, a partir dos dados
+salvos (perm_data), sem depender de alguém abrir a tabela de cada motorista. Cada motorista é
+processado em um processo do pool e as infrações são gravadas de forma idempotente pelo hash,
+então a varredura pode ser repetida (ex.: todas as noites) sem duplicar registros.
+"""
+
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+try:
+    import pandas as pd
+except ImportError:
+    print("AVISO: pandas não disponível, usando stub")
+    import pandas_stub as pd
+
+from controller.infractions import compute_infractions
+from controller.infractions_columnar import compute_rolling_state
+from controller.utils import CustomLogger
+from global_vars import DEBUG
+
+# Dias carregados antes do período. Com o estado gravado (compliance_state) do último dia trabalhado antes do
+# período, as regras e o estado acumulado continuam dele e os dias da janela só servem para conferir que o estado
+# corresponde aos dados; sem estado correspondente, dias consecutivos e horas semanais são contados desde o
+# início da janela.
+SCAN_LEAD_DAYS = 31
+
+
+def load_journey_df(track_driver, motorist_id: int, start_date: datetime, end_date: datetime) -> Optional[pd.DataFrame]:
+    """
+    Carrega as jornadas salvas de um motorista no formato de `convert_json_to_df`.
+
+    Assim como na tabela da análise, dias com observação (folgas, atestados...) ou sem início de jornada
+    não entram no cálculo.
+
+    :param track_driver: Instância de AnalyzedTrackData.
+    :param motorist_id: ID do motorista.
+    :param start_date: Primeiro dia do período.
+    :param end_date: Último dia do período.
+    :return: DataFrame ordenado por data ou None se não houver jornadas.
+    """
+    df = track_driver.retrieve_df_by_datetime_range(start_datetime=start_date.strftime('%Y-%m-%d'),
+                                                    end_datetime=end_date.strftime('%Y-%m-%d'),
+                                                    where_columns=['motorist_id'],
+                                                    where_values=(motorist_id,))
+    if df is None or df.empty:
+        return None
+
+    has_observation = df['observacao'].fillna('').astype(str) != ''
+    df = df[~has_observation & df['inicio_jornada'].notna() & df['fim_jornada'].notna()]
+    if df.empty:
+        return None
+
+    return df.sort_values('data', kind='stable').drop_duplicates(subset=['data']).reset_index(drop=True)
+
+
+def matching_previous_state(df: pd.DataFrame, position: int, loaded_from: datetime,
+                            previous_row: Optional[tuple] = None) -> Optional[dict]:
+    """
+    Estado gravado do último dia trabalhado antes de `position`, se corresponder a `df`.
+
+    O estado (`ComplianceStateDriver.retrieve_state_before`) corresponde se for do dia anterior a `position` ou,
+    sem dias anteriores em `df`, se for mais antigo que a janela carregada.
+
+    :param df: Jornadas do motorista ordenadas por data (formato de `load_journey_df`).
+    :param position: Posição do primeiro dia a avaliar.
+    :param loaded_from: Primeiro dia da janela carregada em `df`.
+    :param previous_row: Tupla (data, dias_consecutivos, horas_semanais_s, fim_jornada) ou None.
+    :return: Estado no formato de `compute_rolling_state` ou None se não houver estado correspondente.
+    """
+    if previous_row is None:
+        return None
+
+    previous_date = datetime.strptime(previous_row[0], '%d-%m-%Y')
+    if position > 0:
+        matches = df['data'].iloc[position - 1] == previous_date
+    else:
+        matches = previous_date < loaded_from
+    if not matches:
+        return None
+    return {'data': previous_row[0], 'dias_consecutivos': previous_row[1], 'horas_semanais_s': previous_row[2],
+            'fim_jornada': previous_row[3]}
+
+
+def scan_motorist(db_path: str, motorist_id: int, start: str, end: str, thresholds: Optional[Dict] = None,
+                  previous_state: Optional[tuple] = None) -> Dict:
+    """
+    Calcula as infrações de um motorista no período (executado nos processos do pool).
+
+    :param db_path: Caminho do banco de dados.
+    :param motorist_id: ID do motorista.
+    :param start: Primeiro dia do período ('DD-MM-YYYY').
+    :param end: Último dia do período ('DD-MM-YYYY').
+    :param thresholds: Limites alterados das regras ({nome: valor}).
+    :param previous_state: Estado gravado do último dia trabalhado antes do período
+                           (`ComplianceStateDriver.retrieve_state_before`).
+    :return: Dicionário {motorist_id, infractions: [(motorist_id, truck_id, data, hora, duration, tipo)],
+             dates: datas do período, states: estados acumulados dos dias trabalhados do período,
+             timings: tempo (s) de cada regra, erro}.
+    """
+    from model.drivers.track_analyzed_data_driver import AnalyzedTrackData
+
+    result = {'motorist_id': motorist_id, 'infractions': [], 'dates': [], 'states': [], 'timings': {}, 'erro': None}
+    try:
+        start_date = datetime.strptime(start, '%d-%m-%Y')
+        end_date = datetime.strptime(end, '%d-%m-%Y')
+        result['dates'] = [(start_date + timedelta(days=i)).strftime('%d-%m-%Y')
+                           for i in range((end_date - start_date).days + 1)]
+
+        logger = CustomLogger(source="INFRACTIONS_BATCH", debug=DEBUG)
+        track_driver = AnalyzedTrackData(logger=logger, db_path=db_path)
+
+        loaded_from = start_date - timedelta(days=SCAN_LEAD_DAYS)
+        df = load_journey_df(track_driver, motorist_id, loaded_from, end_date)
+        if df is None:
+            return result
+
+        trucks_by_date = dict(zip(df['data'].dt.strftime('%d-%m-%Y'), df['truck_id']))
+
+        # Com o estado do dia anterior, só os dias do período são avaliados (regras e estado continuam dele)
+        position = int((df['data'] < start_date).sum())
+        previous = matching_previous_state(df, position, loaded_from, previous_state)
+        if previous is not None:
+            df = df.iloc[position:].reset_index(drop=True)
+
+        for infraction in compute_infractions(df, thresholds=thresholds, timings=result['timings'], previous=previous):
+            infraction_date = datetime.strptime(infraction['date'], '%d-%m-%Y')
+            if start_date <= infraction_date <= end_date:
+                result['infractions'].append((motorist_id, trucks_by_date.get(infraction['date']), infraction['date'],
+                                              infraction['time'], infraction['duration'],
+                                              infraction['infraction_type']))
+
+        period = set(result['dates'])
+        result['states'] = [state for state in compute_rolling_state(df, previous=previous) if state['data'] in period]
+    except Exception as e:
+        result['erro'] = f"{type(e).__name__}: {e}"
+        traceback.print_exc()
+
+    return result
+
+
+def _scan_motorist_args(args: tuple) -> Dict:
+    return scan_motorist(*args)
+
+
+def run_batch_scan(db_path: str, start: str, end: str, motorist_ids: Optional[List[int]] = None,
+                   max_workers: int = 0, logger: Optional[CustomLogger] = None,
+                   progress: Optional[Callable] = None) -> Dict:
+    """
+    Calcula e grava as infrações de todos os motoristas ativos da jornada (ou dos informados) no período.
+
+    :param db_path: Caminho do banco de dados.
+    :param start: Primeiro dia do período ('DD-MM-YYYY').
+    :param end: Último dia do período ('DD-MM-YYYY').
+    :param motorist_ids: IDs dos motoristas. Se None, usa `retrieve_active_motorists_for_journey`.
+    :param max_workers: Quantidade de processos. 0 usa a quantidade de CPUs; 1 processa no próprio processo.
+    :param logger: Logger para o resumo da execução.
+    :param progress: Função chamada com os contadores concluidos, total e erros a cada motorista processado.
+    :return: Resumo {motoristas, infracoes, gravadas, erros: [{motorist_id, erro}], tempo_s,
+             tempo_regras_s: tempo somado de cada regra em todos os motoristas}.
+    :raises ValueError: Se as datas forem inválidas ou o início for posterior ao fim.
+    """
+    from model.drivers.compliance_state_driver import ComplianceStateDriver
+    from model.drivers.infractions_driver import InfractionsDriver
+    from model.drivers.motorist_driver import MotoristDriver
+    from model.drivers.parameters_driver import ParametersDriver
+
+    if datetime.strptime(start, '%d-%m-%Y') > datetime.strptime(end, '%d-%m-%Y'):
+        raise ValueError("A data inicial deve ser anterior ou igual à data final.")
+
+    logger = logger or CustomLogger(source="INFRACTIONS_BATCH", debug=DEBUG)
+    started = time.perf_counter()
+
+    if motorist_ids is None:
+        motorist_driver = MotoristDriver(logger=logger, db_path=db_path)
+        motorist_ids = [row[0] for row in motorist_driver.retrieve_active_motorists_for_journey()]
+
+    thresholds = ParametersDriver(logger=logger, db_path=db_path).get_rule_thresholds()
+    state_driver = ComplianceStateDriver(logger=logger, db_path=db_path)
+    start_iso = datetime.strptime(start, '%d-%m-%Y').strftime('%Y-%m-%d')
+    workers = max_workers or os.cpu_count() or 1
+    tasks = [(db_path, motorist_id, start, end, thresholds, state_driver.retrieve_state_before(motorist_id, start_iso))
+             for motorist_id in motorist_ids]
+
+    done, errors = 0, 0
+
+    def report_progress(result=None):
+        nonlocal done, errors
+        if result is not None:
+            done += 1
+            errors += bool(result['erro'])
+        if progress:
+            progress(concluidos=done, total=len(tasks), erros=errors)
+
+    report_progress()
+    if workers > 1 and len(tasks) > 1:
+        # 'spawn': a varredura também roda em uma thread da fila de relatórios (ver controller.report_jobs)
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = [executor.submit(_scan_motorist_args, task) for task in tasks]
+            for future in as_completed(futures):
+                report_progress(future.result())
+            results = [future.result() for future in futures]
+    else:
+        results = []
+        for task in tasks:
+            results.append(_scan_motorist_args(task))
+            report_progress(results[-1])
+
+    # A gravação fica no processo principal, em uma única transação (o SQLite tem um único escritor)
+    infractions = [infraction for result in results for infraction in result['infractions']]
+    saved = InfractionsDriver(logger=logger, db_path=db_path).upsert_infractions(infractions)
+
+    for result in results:
+        if not result['erro']:
+            state_driver.replace_states(result['motorist_id'], result['dates'], result['states'])
+
+    rule_timings = {}
+    for result in results:
+        for rule, seconds in result['timings'].items():
+            rule_timings[rule] = rule_timings.get(rule, 0.0) + seconds
+
+    summary = {
+        'motoristas': len(tasks),
+        'infracoes': len(infractions),
+        'gravadas': saved,
+        'erros': [{'motorist_id': r['motorist_id'], 'erro': r['erro']} for r in results if r['erro']],
+        'tempo_s': round(time.perf_counter() - started, 2),
+        'tempo_regras_s': {rule: round(seconds, 4) for rule, seconds in rule_timings.items()}
+    }
+    logger.register_log(f"Varredura de infrações {start} a {end}: {summary['motoristas']} motorista(s), "
+                        f"{summary['infracoes']} infração(ões), {len(summary['erros'])} erro(s) em {summary['tempo_s']}s.")
+    return summary
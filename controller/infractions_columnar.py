@@ -0,0 +1,72 @@
+"""
+Motor colunar de infrações - Sistema RPZ v3.0.0.0
+
+Calcula as mesmas infrações de `compute_infractions_rowwise` (controller.infractions), mas avaliando
+cada regra como uma operação sobre colunas inteiras do DataFrame em vez de linha a linha:
+
+- Tipos 2, 3 e 4: predicados vetorizados sobre as colunas de horário/interstício.
+- Tipos 6, 7 e 8: sequências de dias consecutivos identificadas por lacunas de data (> 1 dia) e
+  contadores acumulados por sequência (cumcount/cumsum agrupados).
+- Tipo 5: motor de tempo de direção (controller.driving_time), calculado para todos os dias de uma vez.
+
+As regras em si e os contadores acumulados ficam no registro de controller.compliance_rules; este módulo
+mantém o estado de conformidade (gravado por dia) e o ponto de entrada.
+
+A lista retornada é idêntica à da versão linha a linha, inclusive na ordem das infrações.
+"""
+
+try:
+    import pandas as pd
+except ImportError:
+    print("AVISO: pandas não disponível, usando stub")
+    import pandas_stub as pd
+
+from controller.compliance_rules import evaluate_rules, rolling_counters
+
+
+def compute_rolling_state(df: pd.DataFrame, previous: dict = None) -> list:
+    """
+    Calcula, para cada dia do DataFrame, o estado acumulado usado pelas regras 6, 7 e 8.
+
+    :param df: DataFrame de jornadas ordenado por data (formato de `convert_json_to_df`).
+    :param previous: Estado gravado do último dia trabalhado antes do DataFrame (formato deste retorno). Com ele,
+                     a sequência em andamento continua a partir dos contadores gravados, sem reprocessar os dias
+                     anteriores; sem ele, a contagem começa no primeiro dia do DataFrame.
+    :return: Lista de dicionários {data ('DD-MM-YYYY'), dias_consecutivos, horas_semanais_s, fim_jornada}.
+    """
+    if df is None or df.empty:
+        return []
+
+    positions = pd.RangeIndex(df.shape[0])
+    data = pd.Series(pd.to_datetime(df['data']).values, index=positions)
+    inicio = pd.Series(pd.to_datetime(df['inicio_jornada']).values, index=positions)
+    fim = pd.Series(pd.to_datetime(df['fim_jornada']).values, index=positions)
+    work_seconds = (fim - inicio).dt.total_seconds().fillna(0.0)
+
+    _, consecutive_days, weekly_seconds = rolling_counters(data, work_seconds, previous)
+
+    return [{
+        'data': day,
+        'dias_consecutivos': int(days),
+        'horas_semanais_s': int(seconds),
+        'fim_jornada': None if pd.isna(end) else end.strftime('%Y-%m-%d %H:%M')
+    } for day, days, seconds, end in zip(data.dt.strftime('%d-%m-%Y'), consecutive_days, weekly_seconds, fim)]
+
+
+def compute_infractions_columnar(df: pd.DataFrame, thresholds: dict = None, timings: dict = None,
+                                 previous: dict = None) -> list:
+    """
+    Computa as infrações de um DataFrame de jornadas (formato de `convert_json_to_df`) avaliando as
+    regras registradas em controller.compliance_rules.
+
+    :param df: DataFrame com as colunas 'data', 'inicio_jornada', 'fim_jornada', 'in_refeicao',
+               'fim_refeicao', 'intersticio' e as colunas de descanso e carga/descarga.
+    :param thresholds: Limites alterados ({nome: valor}); None usa os de global_vars.
+    :param timings: Dicionário opcional que recebe o tempo de avaliação de cada regra.
+    :param previous: Estado gravado do último dia trabalhado antes do DataFrame (ver `compute_rolling_state`).
+                     Com ele, as regras 6, 7 e 8 continuam a sequência em andamento em vez de começar do zero.
+    :return: Lista de dicionários {infraction_type, date, time, duration, infraction_desc}.
+    :raises ValueError: Nos mesmos casos em que a versão linha a linha falha (início/fim de jornada
+                        ausente, ou interstício inválido a partir do segundo dia).
+    """
+    return evaluate_rules(df, thresholds=thresholds, timings=timings, previous=previous)
@@ -228,3 +228,42 @@ def get_sorted_events_with_work_periods(row):
         all_events.append(('trabalho', prev_end, row['fim_jornada'], work_duration))
 
     return all_events
+
+
+# Colunas de horário das jornadas (perm_data / tabela da análise), todas no formato 'HH:MM'
+JOURNEY_TIME_COLUMNS = [
+    'inicio_jornada', 'in_refeicao', 'fim_refeicao', 'fim_jornada',
+    'in_descanso_1', 'fim_descanso_1', 'in_descanso_2', 'fim_descanso_2',
+    'in_descanso_3', 'fim_descanso_3', 'in_descanso_4', 'fim_descanso_4',
+    'in_descanso_5', 'fim_descanso_5', 'in_descanso_6', 'fim_descanso_6',
+    'in_descanso_7', 'fim_descanso_7', 'in_descanso_8', 'fim_descanso_8',
+    'in_car_desc_1', 'fim_car_desc_1', 'in_car_desc_2', 'fim_car_desc_2',
+    'in_car_desc_3', 'fim_car_desc_3', 'in_car_desc_4', 'fim_car_desc_4',
+    'in_car_desc_5', 'fim_car_desc_5', 'in_car_desc_6', 'fim_car_desc_6',
+    'in_car_desc_7', 'fim_car_desc_7'
+]
+
+
+def parse_journey_time_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte as colunas de horário ('HH:MM') em datetime combinando-as com a coluna 'data' ('DD-MM-YYYY'),
+    e a própria coluna 'data' em datetime.
+
+    Todas as colunas de horário são empilhadas e convertidas com uma única chamada a `pd.to_datetime`.
+    Valores vazios ou inválidos viram NaT.
+
+    :param df: DataFrame com a coluna 'data' e as colunas de JOURNEY_TIME_COLUMNS (alterado no próprio objeto).
+    :return: O mesmo DataFrame, com as colunas convertidas.
+    """
+    present = [col for col in JOURNEY_TIME_COLUMNS if col in df.columns]
+
+    if present and not df.empty:
+        dates = df['data'].astype(str) + ' '
+        stacked = pd.concat([dates + df[col].astype(str) for col in present], ignore_index=True)
+        parsed = pd.to_datetime(stacked, format='%d-%m-%Y %H:%M', errors='coerce')
+        parsed_columns = parsed.to_numpy().reshape(len(present), df.shape[0])
+        for position, col in enumerate(present):
+            df[col] = parsed_columns[position]
+
+    df['data'] = pd.to_datetime(df['data'], format='%d-%m-%Y')
+    return df
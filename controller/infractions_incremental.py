@@ -0,0 +1,128 @@
+"""
+Recálculo incremental de infrações - Sistema RPZ v3.0.0.0
+
+Quando alguns dias de um motorista são salvos ou corrigidos, apenas a janela afetada é recalculada:
+
+- os dias alterados;
+- o dia anterior à sequência, para que o interstício e o início da sequência sejam avaliados;
+- a sequência de dias consecutivos (e portanto a semana) que contém cada dia alterado, até a
+  próxima folga, porque os contadores das regras 6, 7 e 8 dependem dos dias anteriores.
+
+O resultado é comparado com as infrações gravadas e só o que mudou é apagado ou gravado.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import pandas as pd
+except ImportError:
+    print("AVISO: pandas não disponível, usando stub")
+    import pandas_stub as pd
+
+from controller.infractions import compute_infractions
+from controller.infractions_batch import load_journey_df, matching_previous_state, SCAN_LEAD_DAYS
+from controller.infractions_columnar import compute_rolling_state
+
+
+def _run_bounds(df: pd.DataFrame) -> List[tuple]:
+    """Retorna (primeira posição, última posição) de cada sequência de dias separada por lacunas de mais de um dia."""
+    gap_positions = [i for i, days in enumerate(df['data'].diff().dt.days.tolist()) if i > 0 and days > 1]
+    starts = [0] + gap_positions
+    ends = [p - 1 for p in gap_positions] + [df.shape[0] - 1]
+    return list(zip(starts, ends))
+
+
+def affected_window(df: pd.DataFrame, changed_dates: Iterable[datetime]) -> tuple:
+    """
+    Calcula a janela de recálculo para os dias alterados.
+
+    :param df: Jornadas do motorista ordenadas por data (formato de `load_journey_df`).
+    :param changed_dates: Dias alterados.
+    :return: Tupla (posição inicial, posição final, datas afetadas em 'DD-MM-YYYY'). As posições são None
+             se nenhum dia trabalhado for afetado.
+    """
+    dates = df['data'].tolist()
+    runs = _run_bounds(df)
+    affected = set()
+    first, last = None, None
+
+    for changed in changed_dates:
+        affected.add(changed.strftime('%d-%m-%Y'))
+
+        # Primeiro dia trabalhado a partir do dia alterado: se o dia alterado deixou de ser trabalhado
+        # (virou folga, por exemplo), a sequência seguinte também muda
+        position = next((i for i, d in enumerate(dates) if d >= changed), None)
+        if position is None:
+            continue
+
+        run_start, run_end = next(bounds for bounds in runs if bounds[0] <= position <= bounds[1])
+        affected.update(d.strftime('%d-%m-%Y') for d in dates[position:run_end + 1])
+
+        # Começa no dia anterior à sequência para que o primeiro dia dela seja avaliado como tal
+        frame_start = max(run_start - 1, 0)
+        first = frame_start if first is None else min(first, frame_start)
+        last = run_end if last is None else max(last, run_end)
+
+    return first, last, affected
+
+
+def recompute_infractions_for_dates(track_driver, infraction_driver, motorist_id: int,
+                                    changed_dates: Iterable[str], state_driver=None,
+                                    thresholds: Optional[Dict] = None) -> Dict:
+    """
+    Recalcula as infrações de um motorista apenas na janela afetada pelos dias alterados e sincroniza
+    o resultado com a tabela infractions.
+
+    :param track_driver: Instância de AnalyzedTrackData (os dias alterados já devem estar salvos).
+    :param infraction_driver: Instância de InfractionsDriver.
+    :param motorist_id: ID do motorista.
+    :param changed_dates: Datas alteradas ('DD-MM-YYYY').
+    :param state_driver: Instância opcional de ComplianceStateDriver para atualizar o estado acumulado dos dias.
+    :param thresholds: Limites alterados das regras ({nome: valor}).
+    :return: Dicionário {dias_recalculados (dias trabalhados reavaliados), inseridas, atualizadas, removidas}.
+    """
+    changed = sorted({datetime.strptime(d, '%d-%m-%Y') for d in changed_dates if d})
+    result = {'dias_recalculados': 0, 'inseridas': 0, 'atualizadas': 0, 'removidas': 0}
+    if not changed:
+        return result
+
+    loaded_from = changed[0] - timedelta(days=SCAN_LEAD_DAYS)
+    df = load_journey_df(track_driver, motorist_id, loaded_from, changed[-1] + timedelta(days=SCAN_LEAD_DAYS))
+
+    infractions = []
+    states = []
+    affected = {d.strftime('%d-%m-%Y') for d in changed}
+    worked_days = 0
+
+    if df is not None:
+        first, last, affected = affected_window(df, changed)
+
+        if first is not None:
+            frame = df.iloc[first:last + 1].reset_index(drop=True)
+            worked_days = int(frame['data'].dt.strftime('%d-%m-%Y').isin(affected).sum())
+            trucks_by_date = dict(zip(frame['data'].dt.strftime('%d-%m-%Y'), frame['truck_id']))
+
+            # Continua do estado gravado antes da janela: a sequência pode ter começado antes dos dias carregados
+            previous = None
+            if state_driver is not None:
+                frame_start_iso = frame['data'].iloc[0].strftime('%Y-%m-%d')
+                previous_row = state_driver.retrieve_state_before(motorist_id, frame_start_iso)
+                previous = matching_previous_state(df, first, loaded_from, previous_row)
+
+            for infraction in compute_infractions(frame, thresholds=thresholds, previous=previous):
+                if infraction['date'] in affected:
+                    infractions.append((motorist_id, trucks_by_date.get(infraction['date']), infraction['date'],
+                                        infraction['time'], infraction['duration'], infraction['infraction_type']))
+
+            if state_driver is not None:
+                # Sem estado correspondente, a contagem parte do início dos dias carregados
+                rolling = (compute_rolling_state(frame, previous=previous) if previous is not None
+                           else compute_rolling_state(df.iloc[:last + 1])[first:])
+                states = [state for state in rolling if state['data'] in affected]
+
+    result.update(infraction_driver.sync_infractions_for_dates(motorist_id, list(affected), infractions))
+    if state_driver is not None:
+        state_driver.replace_states(motorist_id, list(affected), states)
+    result['dias_recalculados'] = worked_days
+    return result
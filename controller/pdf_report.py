@@ -0,0 +1,410 @@
+"""
+Camada de renderização PDF - Sistema RPZ v3.0.0.0
+
+Estilos de parágrafo e de tabela usados nos PDFs de jornada (`fill_pdf`) e de fechamento
+(`generate_closure_pdf_report`), criados uma única vez no carregamento do módulo e reaproveitados em todas
+as exportações (os objetos não são alterados pelo ReportLab durante a montagem do documento).
+
+Células de texto só viram `Paragraph` quando precisam: textos curtos (horários, placas, valores) que cabem
+na coluna são passados como string simples, que o ReportLab desenha sem o parser de marcação.
+"""
+
+from functools import lru_cache
+from io import BytesIO
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
+_SAMPLE_STYLES = getSampleStyleSheet()
+
+_FIT_CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=_FIT_CACHE_SIZE)
+def _fits(text: str, font_name: str, font_size: float, width: float) -> bool:
+    return stringWidth(text, font_name, font_size) <= width
+
+
+def text_cell(text: str, style: ParagraphStyle, width: float):
+    """
+    Conteúdo de uma célula de tabela: string simples se o texto não tiver marcação e couber em uma linha,
+    senão `Paragraph` (quebra de linha).
+
+    :param text: Texto da célula (pode conter marcação do ReportLab, ex.: '<br/>').
+    :param style: Estilo do parágrafo, usado também para medir o texto.
+    :param width: Largura útil da coluna em pontos (já descontado o padding).
+    """
+    if not text:
+        return ''
+    if '<' not in text and '&' not in text and _fits(text, style.fontName, style.fontSize, width):
+        return text
+    return Paragraph(text, style)
+
+
+### RELATÓRIO DE JORNADA (fill_pdf)
+
+JOURNEY_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_SAMPLE_STYLES['Heading1'],
+    fontSize=10,
+    spaceAfter=5,
+    alignment=TA_CENTER,
+    textColor=colors.darkblue
+)
+
+# Estilo para célula de infrações
+JOURNEY_INFRACTION_STYLE = ParagraphStyle(
+    'InfractionCell',
+    parent=_SAMPLE_STYLES['Normal'],
+    fontSize=6,
+    alignment=TA_LEFT,
+    wordWrap='CJK',
+    leading=8,
+    spaceAfter=0,
+    spaceBefore=0,
+)
+
+JOURNEY_TOTALS_COL_WIDTHS = [120, 80, 60, 80, 80, 80, 80, 80, 60]
+
+JOURNEY_TOTALS_TABLE_STYLE = TableStyle([
+    # Cabeçalho
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 7),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 2),
+    ('TOPPADDING', (0, 0), (-1, 0), 2),
+
+    # Valores
+    ('FONTNAME', (0, 1), (-1, 1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, 1), 8),
+    ('ALIGN', (0, 1), (-1, 1), 'CENTER'),
+
+    # Padding mínimo
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
+    ('TOPPADDING', (0, 0), (-1, -1), 0),
+    ('LEFTPADDING', (0, 0), (-1, -1), 3),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 3),
+
+    # Bordas
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('BOX', (0, 0), (-1, -1), 1, colors.black),
+])
+
+JOURNEY_CELL_PADDING = 3
+
+
+def _fit_widths(widths: list, available_width: float) -> list:
+    """Reduz proporcionalmente as larguras das colunas se passarem da largura disponível."""
+    total_width = sum(widths)
+    if total_width > available_width:
+        return [w * available_width / total_width for w in widths]
+    return list(widths)
+
+
+# A4 landscape: 842 pontos de largura, menos margens = ~780 pontos
+JOURNEY_COL_WIDTHS = _fit_widths([
+    50,   # Data
+    50,   # Dia
+    60,   # Placa
+    40,   # Início Jornada (só horário HH:mm)
+    40,   # In. Refeição (só horário HH:mm)
+    40,   # Fim Refeição (só horário HH:mm)
+    40,   # Fim Jornada (só horário HH:mm)
+    40,   # Tempo Refeição (só horário HH:mm)
+    50,   # Interstício
+    40,   # Tempo Intervalo (só horário HH:mm)
+    40,   # Tempo C/D (só horário HH:mm)
+    40,   # Jornada Total (só horário HH:mm)
+    40,   # Tempo Direção (só horário HH:mm)
+    50,   # Direção s/ Pausa
+    370   # Infrações
+], 780)
+
+JOURNEY_TABLE_STYLE = TableStyle([
+    # Cabeçalho
+    ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 6),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 2),
+    ('TOPPADDING', (0, 0), (-1, 0), 2),
+    ('LEFTPADDING', (0, 0), (-1, 0), 4),
+    ('RIGHTPADDING', (0, 0), (-1, 0), 4),
+
+    # Dados - todas as colunas centralizadas exceto infrações
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 6),
+    ('ALIGN', (0, 1), (-2, -1), 'CENTER'),  # Todas exceto última coluna
+    ('ALIGN', (-1, 1), (-1, -1), 'LEFT'),   # Última coluna (infrações) alinhada à esquerda
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 0),
+    ('TOPPADDING', (0, 1), (-1, -1), 0),
+    ('LEFTPADDING', (0, 0), (-1, -1), JOURNEY_CELL_PADDING),
+    ('RIGHTPADDING', (0, 0), (-1, -1), JOURNEY_CELL_PADDING),
+
+    # Bordas
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('BOX', (0, 0), (-1, -1), 1, colors.black),
+
+    # Linhas alternadas
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+
+    # Quebra de linha para cabeçalhos e dados
+    ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
+    ('VALIGN', (0, 1), (-1, -1), 'TOP'),
+    ('WORDWRAP', (0, 0), (-1, -1), True),
+])
+
+
+### ESPELHO DE PONTO (fechamento)
+
+CLOSURE_PAGE_SIZE = landscape(A4)
+CLOSURE_MARGINS = dict(rightMargin=1.2*cm, leftMargin=1.5*cm, topMargin=0.5*cm, bottomMargin=0.2*cm)
+# Mesma largura útil calculada pelo SimpleDocTemplate (doc.width)
+CLOSURE_DOC_WIDTH = CLOSURE_PAGE_SIZE[0] - CLOSURE_MARGINS['leftMargin'] - CLOSURE_MARGINS['rightMargin']
+
+CLOSURE_TITLE_STYLE = ParagraphStyle(
+    'MainTitle',
+    parent=_SAMPLE_STYLES['Heading1'],
+    fontSize=12,
+    spaceAfter=2,
+    alignment=TA_CENTER,
+    textColor=colors.black,
+    fontName='Helvetica-Bold'
+)
+
+CLOSURE_COMPANY_STYLE = ParagraphStyle(
+    'CompanyInfo',
+    parent=_SAMPLE_STYLES['Normal'],
+    fontSize=7,
+    spaceAfter=1,
+    alignment=TA_CENTER,
+    textColor=colors.black,
+    fontName='Helvetica'
+)
+
+# Nome + CPF do funcionário na mesma célula
+CLOSURE_EMPLOYEE_STYLE = ParagraphStyle(
+    'EmployeeBlock',
+    parent=_SAMPLE_STYLES['Normal'],
+    fontSize=8,
+    spaceAfter=0,
+    leading=11,
+    alignment=TA_LEFT,
+    textColor=colors.black,
+    fontName='Helvetica'
+)
+
+CLOSURE_PERIOD_STYLE = ParagraphStyle(
+    'PeriodInfo',
+    parent=_SAMPLE_STYLES['Normal'],
+    fontSize=7,
+    spaceAfter=2,
+    alignment=TA_LEFT,
+    textColor=colors.black,
+    fontName='Helvetica'
+)
+
+# Variante apenas +1 para a frase de período
+CLOSURE_PERIOD_BIG_STYLE = ParagraphStyle(
+    'PeriodInfoBig',
+    parent=CLOSURE_PERIOD_STYLE,
+    fontSize=8
+)
+
+CLOSURE_TOTALS_HEADER = ['INTERVALO', 'ALMOÇO', 'H. TRAB.', 'C. HORÁRIA', 'H.EXTRA50%', 'H.EXTRA100%', 'H.E. NOT.',
+                         'AD.NOT', 'DIÁRIA', 'AJ. ALIMENT.']
+CLOSURE_TOTALS_KEYS = ['intervalo', 'almoco', 'h_trab', 'carga_horaria', 'h_extra50', 'h_extra100', 'h_e_not',
+                       'ad_not', 'diaria', 'aj_aliment']
+
+# 40% menor que a largura proporcional
+CLOSURE_TOTALS_COL_WIDTHS = [CLOSURE_DOC_WIDTH / 10 * 0.6] * 10
+
+CLOSURE_TOTALS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+    ('TEXTCOLOR', (0, 1), (-1, 1), colors.blue),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 6),
+    ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 1), (-1, 1), 7),
+    ('GRID', (0, 0), (-1, -1), 0.2, colors.grey),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 0.3),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 0.3),
+    ('TOPPADDING', (0, 0), (-1, -1), 0.2),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 0.2),
+])
+
+CLOSURE_COMBINED_COL_WIDTHS = [CLOSURE_DOC_WIDTH * 0.35, CLOSURE_DOC_WIDTH * 0.65]
+
+CLOSURE_COMBINED_TABLE_STYLE = TableStyle([
+    ('VALIGN', (0, 0), (0, 0), 'TOP'),
+    ('VALIGN', (1, 0), (1, 0), 'TOP'),
+    ('ALIGN', (0, 0), (0, 0), 'LEFT'),
+    ('ALIGN', (1, 0), (1, 0), 'LEFT'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 0),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+    ('TOPPADDING', (0, 0), (-1, -1), 0),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
+])
+
+CLOSURE_HEADER = [
+    'PLACA', 'DATA', 'DIA', 'INÍCIO', 'ALMOÇO', 'FIM', 'INTERVALO', 'H.TRAB', 'CARGA HORÁRIA',
+    'H.EXTRA50%', 'H.EXTRA100%', 'H.E.NOT', 'AD.NOT', 'DIÁRIA', 'AJ.ALIMENT.'
+]
+
+CLOSURE_COL_WIDTHS = [w * CLOSURE_DOC_WIDTH for w in [
+    0.1,   # PLACA
+    0.06,  # DATA
+    0.04,  # DIA
+    0.05,  # INÍCIO
+    0.09,  # ALMOÇO
+    0.06,  # FIM
+    0.06,  # INTERVALO
+    0.06,  # H.TRAB
+    0.08,  # CARGA HORÁRIA
+    0.06,  # H.EXTRA50%
+    0.06,  # H.EXTRA100%
+    0.06,  # H.E.NOT
+    0.07,  # AD.NOT
+    0.07,  # DIÁRIA
+    0.07   # AJ.ALIMENT.
+]]
+
+CLOSURE_TABLE_STYLE = TableStyle([
+    # Cabeçalho principal
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 6),
+    ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
+
+    # Dados - centralizados horizontalmente e verticalmente
+    ('ALIGN', (0, 1), (-1, -1), 'CENTER'),
+    ('VALIGN', (0, 1), (-1, -1), 'MIDDLE'),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 6.5),
+
+    # Bordas
+    ('GRID', (0, 0), (-1, -1), 0.2, colors.grey),
+    ('LINEBELOW', (0, 0), (-1, 0), 0.3, colors.black),
+
+    # Padding reduzido ao mínimo para melhor centralização
+    ('LEFTPADDING', (0, 0), (-1, -1), 0.5),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 0.5),
+    ('TOPPADDING', (0, 0), (-1, -1), 0.3),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 0.1),
+])
+
+CLOSURE_SIGNATURE_COL_WIDTHS = [CLOSURE_DOC_WIDTH * 0.30, CLOSURE_DOC_WIDTH * 0.25, CLOSURE_DOC_WIDTH * 0.30]
+
+CLOSURE_SIGNATURE_TABLE_STYLE = TableStyle([
+    # Linhas acima somente nas colunas das assinaturas
+    ('LINEABOVE', (0, 0), (0, 0), 0.8, colors.black),
+    ('LINEABOVE', (2, 0), (2, 0), 0.8, colors.black),
+    # Rótulos centralizados nas colunas 0 e 2
+    ('ALIGN', (0, 1), (0, 1), 'CENTER'),
+    ('ALIGN', (2, 1), (2, 1), 'CENTER'),
+    ('FONTNAME', (0, 1), (0, 1), 'Helvetica-Bold'),
+    ('FONTNAME', (2, 1), (2, 1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 1), (0, 1), 6),
+    ('FONTSIZE', (2, 1), (2, 1), 6),
+    # Controlar espaçamentos
+    ('BOTTOMPADDING', (0, 0), (2, 0), 0),
+    ('TOPPADDING', (0, 1), (2, 1), 0),
+])
+
+
+def _closure_row(row) -> list:
+    """Linha da tabela principal do espelho de ponto (dicionário de `ClosureResult.pdf_rows` ou lista pronta)."""
+    if not isinstance(row, dict):
+        return row
+    return [
+        row.get('placa', ''),
+        row.get('data', ''),
+        row.get('dia_semana', ''),
+        row.get('inicio_jornada', ''),
+        f"{row.get('almoco_inicio', '')}, {row.get('almoco_fim', '')}",
+        row.get('fim_jornada', ''),
+        row.get('intervalo', ''),
+        row.get('h_trab', ''),
+        row.get('carga_horaria', ''),
+        row.get('h_extra50', ''),
+        row.get('h_extra100', ''),
+        row.get('h_e_not', ''),
+        row.get('ad_not', ''),
+        row.get('diaria', ''),
+        row.get('aj_aliment', '')
+    ]
+
+
+def generate_closure_pdf_report(motorist_name, motorist_cpf, from_date, to_date, data, totals, company_header=None,
+                                folgas_line=None) -> bytes:
+    """
+    Gera o PDF do relatório de fechamento de ponto otimizado para uma página.
+
+    :param data: Linhas do período (dicionários de `ClosureResult.pdf_rows` ou listas na ordem de CLOSURE_HEADER).
+    :param totals: Totais do período (`ClosureTotals.as_dict`).
+    :param company_header: Linha da empresa (marcação do ReportLab); usa a empresa padrão se não informada.
+    :param folgas_line: Linha de folgas abaixo da tabela.
+    :return: Bytes do PDF.
+    """
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=CLOSURE_PAGE_SIZE, **CLOSURE_MARGINS)
+
+    elements = [
+        Paragraph("ESPELHO DE PONTO", CLOSURE_TITLE_STYLE),
+        Spacer(1, 1),
+        # Informações da empresa (dinâmico quando disponível)
+        Paragraph(company_header or "<b>TRANSPORTES PAZZI LTDA</b> - CNPJ: <b>17.698.598/0001-37</b>",
+                  CLOSURE_COMPANY_STYLE),
+        Spacer(1, 1),
+    ]
+
+    # Seção de totais ultra compacta
+    totals_table = Table([CLOSURE_TOTALS_HEADER, [totals[key] for key in CLOSURE_TOTALS_KEYS]],
+                         colWidths=CLOSURE_TOTALS_COL_WIDTHS)
+    totals_table.setStyle(CLOSURE_TOTALS_TABLE_STYLE)
+
+    # Tabela combinada: nome+CPF à esquerda (na mesma célula) e totais à direita
+    left_info = Paragraph(f"FUNCIONÁRIO: <b>{motorist_name}</b><br/>CPF: <b>{motorist_cpf}</b>", CLOSURE_EMPLOYEE_STYLE)
+    combined_table = Table([[left_info, totals_table]], colWidths=CLOSURE_COMBINED_COL_WIDTHS)
+    combined_table.setStyle(CLOSURE_COMBINED_TABLE_STYLE)
+    elements.append(combined_table)
+    elements.append(Spacer(1, 1))
+
+    # Tabela principal: todas as células são textos curtos, passados como string simples
+    table_data = [CLOSURE_HEADER] + [_closure_row(row) for row in data]
+    table = Table(table_data, repeatRows=1, colWidths=CLOSURE_COL_WIDTHS)
+    table.setStyle(CLOSURE_TABLE_STYLE)
+    elements.append(table)
+    elements.append(Spacer(1, 2))
+
+    # Período de referência e folgas (linha dinâmica)
+    elements.append(Paragraph(folgas_line if folgas_line is not None else "-", CLOSURE_PERIOD_STYLE))
+    elements.append(Paragraph(f"Espelho de ponto referente a data de <b>{from_date}</b> a <b>{to_date}</b>",
+                              CLOSURE_PERIOD_BIG_STYLE))
+    # Empurrar assinaturas mais para baixo
+    elements.append(Spacer(1, 25))
+
+    # Linhas de assinatura com espaçamento central (3 colunas)
+    signature_table = Table([['', '', ''], ['FUNCIONÁRIO', '', 'RESPONSÁVEL']],
+                            colWidths=CLOSURE_SIGNATURE_COL_WIDTHS, hAlign='CENTER')
+    signature_table.setStyle(CLOSURE_SIGNATURE_TABLE_STYLE)
+    elements.append(signature_table)
+
+    doc.build(elements)
+
+    pdf_bytes = buffer.getvalue()
+    buffer.close()
+    return pdf_bytes
@@ -0,0 +1,146 @@
+"""
+Cache de relatórios renderizados - Sistema RPZ v3.0.0.0
+
+Guarda o HTML renderizado dos relatórios (jornada e modal do fechamento) por (tipo de relatório, motorista,
+período) junto com a versão dos dados do motorista (mantida por triggers, ver `DataVersionDriver`). Enquanto a
+versão não muda, a resposta sai do cache sem consultas nem renderização.
+
+As respostas levam ETag (derivado da chave e da versão) e Last-Modified, e requisições condicionais
+(If-None-Match / If-Modified-Since) recebem 304 sem corpo. O cache é limitado pelo tamanho total dos corpos
+(LRU) e expõe as métricas de acerto.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+
+from flask import make_response, request
+
+from global_vars import REPORT_CACHE_MAX_BYTES
+
+
+class CachedReport:
+    """Relatório renderizado em cache: versão dos dados, corpo, ETag e momento da renderização."""
+
+    __slots__ = ('version', 'body', 'etag', 'last_modified', 'size')
+
+    def __init__(self, version: tuple, body: str, etag: str):
+        self.version = version
+        self.body = body
+        self.etag = etag
+        # Resolução de segundos, como no cabeçalho HTTP
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        self.size = len(body.encode('utf-8'))
+
+
+class ReportCache:
+    """
+    Cache LRU de relatórios limitado pelo tamanho total dos corpos.
+
+    :param max_bytes: Tamanho máximo somado dos corpos em cache.
+    """
+
+    def __init__(self, max_bytes: int = REPORT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, CachedReport]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self.render_seconds = 0.0
+
+    @staticmethod
+    def make_etag(key: tuple, version: tuple) -> str:
+        return hashlib.sha1(repr((key, version)).encode('utf-8')).hexdigest()
+
+    def get(self, key: tuple, version: tuple) -> Optional[CachedReport]:
+        """Relatório em cache para a chave, se ainda for da versão informada."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple, version: tuple, body: str) -> CachedReport:
+        """Guarda um relatório (substituindo versões anteriores da mesma chave) e aplica o limite de tamanho."""
+        entry = CachedReport(version, body, self.make_etag(key, version))
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            if entry.size <= self.max_bytes:
+                self._entries[key] = entry
+                self._bytes += entry.size
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+        return entry
+
+    def respond(self, key: tuple, version: tuple, render: Callable[[], str]):
+        """
+        Resposta Flask do relatório: 304 se o cliente já tem esta versão, o HTML em cache se houver, ou o
+        resultado de `render()` (guardado no cache).
+
+        :param key: (tipo de relatório, motorista, início, fim).
+        :param version: Versão atual dos dados do motorista.
+        :param render: Função que renderiza o HTML (só chamada em caso de falha no cache).
+        """
+        etag = self.make_etag(key, version)
+        entry = self.get(key, version)
+
+        if etag in request.if_none_match or (
+                entry is not None and not request.if_none_match and request.if_modified_since
+                and entry.last_modified <= request.if_modified_since):
+            with self._lock:
+                self.not_modified += 1
+            response = make_response('', 304)
+        else:
+            if entry is None:
+                started = time.perf_counter()
+                entry = self.put(key, version, render())
+                with self._lock:
+                    self.misses += 1
+                    self.render_seconds += time.perf_counter() - started
+            else:
+                with self._lock:
+                    self.hits += 1
+            response = make_response(entry.body)
+
+        if entry is not None:
+            response.last_modified = entry.last_modified
+        response.set_etag(etag)
+        # O navegador pode guardar, mas deve revalidar a cada abertura
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def stats(self) -> Dict:
+        """Métricas do cache."""
+        with self._lock:
+            lookups = self.hits + self.misses + self.not_modified
+            return {
+                'entradas': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'acertos': self.hits,
+                'falhas': self.misses,
+                'nao_modificados': self.not_modified,
+                'remocoes': self.evictions,
+                'taxa_acerto': round((self.hits + self.not_modified) / lookups, 4) if lookups else 0.0,
+                'tempo_renderizacao_s': round(self.render_seconds, 4)
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+# Instância compartilhada pelas rotas de relatório
+report_cache = ReportCache()
@@ -0,0 +1,366 @@
+"""
+Fila de geração de relatórios - Sistema RPZ v3.0.0.0
+
+Relatórios pesados (Excel/PDF de jornada e de fechamento em períodos longos) são enfileirados em vez de
+gerados na thread da requisição: a rota recebe o ID do job, um pool de workers (threads ou processos,
+tamanho configurável) gera o arquivo em um diretório de artefatos e o cliente baixa o arquivo pronto.
+
+- Cada tipo de relatório é registrado com uma função geradora `(**params) -> (nome do arquivo, bytes)`.
+  Relatórios grandes demais para a memória (ex.: ZIP da exportação em lote) são registrados com
+  `writes_file=True`: a função recebe o caminho do artefato, escreve o arquivo e retorna o nome para download.
+  No modo 'process' a função precisa ser de módulo (é enviada ao processo por referência).
+- Funções registradas com `reports_progress=True` recebem também `progress`, uma função que aceita contadores
+  (ex.: `progress(concluidos=3, total=10, erros=1)`). Os contadores são gravados ao lado do artefato (funciona
+  com threads e com processos) e aparecem em 'progresso' no andamento do job.
+- Os artefatos expiram após REPORT_JOB_TTL_SECONDS (arquivo e job são removidos na limpeza, que roda a
+  cada novo job e consulta; arquivos esquecidos de execuções anteriores também são removidos).
+- Para cada tipo são medidos o tempo de espera na fila e o tempo de geração. O worker marca o início da geração
+  ao lado do artefato, e o job passa de 'pendente' para 'processando' enquanto o arquivo é gerado.
+- No modo 'process' os processos são iniciados com 'spawn' (um fork da aplicação com threads ativas pode
+  herdar locks travados).
+"""
+
+import inspect
+import json
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from controller.utils import CustomLogger
+from global_vars import DEBUG, REPORT_JOB_DIR, REPORT_JOB_EXECUTOR, REPORT_JOB_TTL_SECONDS, REPORT_JOB_WORKERS
+
+EXECUTOR_TYPES = ('thread', 'process')
+
+jobs_logger = CustomLogger(source="REPORT_JOBS", debug=DEBUG)
+
+
+def progress_path(path: str) -> str:
+    """Caminho do arquivo de progresso de um artefato."""
+    return path + '.progress'
+
+
+def write_progress(path: str, **counters):
+    """
+    Grava os contadores de progresso de um job (substitui o arquivo de uma vez, sem leitura parcial).
+
+    :param path: Caminho do arquivo de progresso (`progress_path`).
+    """
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as progress_file:
+        json.dump(counters, progress_file)
+    os.replace(temp_path, path)
+
+
+def started_path(path: str) -> str:
+    """Caminho da marca de início da geração de um artefato."""
+    return path + '.started'
+
+
+def read_started(path: str) -> Optional[float]:
+    """Instante (time.time()) em que o worker começou a gerar o artefato (None se ainda não começou)."""
+    try:
+        with open(started_path(path)) as started_file:
+            return float(started_file.read())
+    except (OSError, ValueError):
+        return None
+
+
+def read_progress(path: str) -> Optional[Dict]:
+    """Contadores de progresso de um job (None se o relatório não informa progresso)."""
+    try:
+        with open(path) as progress_file:
+            return json.load(progress_file)
+    except (OSError, ValueError):
+        return None
+
+
+def render_report(builder: Callable, params: Dict, path: str, writes_file: bool = False,
+                  reports_progress: bool = False) -> Dict:
+    """
+    Gera um relatório e grava o arquivo (executado nos workers do pool).
+
+    :param builder: Função (**params) -> (nome do arquivo, bytes) ou, com writes_file,
+                    (caminho, **params) -> nome do arquivo.
+    :param params: Parâmetros do relatório.
+    :param path: Caminho do artefato.
+    :param writes_file: Se a função escreve o próprio arquivo.
+    :param reports_progress: Se a função recebe `progress` para informar o andamento.
+    :return: Dicionário {filename, size, started, finished, erro}; started/finished em time.time().
+    """
+    result = {'filename': None, 'size': 0, 'started': time.time(), 'finished': None, 'erro': None}
+    partial_path = path + '.part'
+    with open(started_path(path), 'w') as started_file:
+        started_file.write(repr(result['started']))
+    if reports_progress:
+        params = dict(params, progress=partial(write_progress, progress_path(path)))
+    try:
+        if writes_file:
+            filename = builder(partial_path, **params)
+        else:
+            filename, content = builder(**params)
+            with open(partial_path, 'wb') as artifact:
+                artifact.write(content)
+        result['size'] = os.path.getsize(partial_path)
+        os.replace(partial_path, path)
+        result['filename'] = filename
+    except Exception as e:
+        result['erro'] = f"{type(e).__name__}: {e}"
+        traceback.print_exc()
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+    result['finished'] = time.time()
+    return result
+
+
+class ReportJob:
+    """
+    Relatório enfileirado.
+
+    Atributos:
+    - job_id (str): identificador do job (também é o nome do artefato no diretório).
+    - tipo (str): tipo de relatório registrado na fila.
+    - status (str): 'pendente', 'processando', 'concluido' ou 'erro'.
+    - filename (str): nome do arquivo para download.
+    - path (str): caminho do artefato em disco.
+    - enqueued_at / started_at / finished_at (float): instantes (time.time()) de entrada, início e fim.
+    """
+
+    def __init__(self, tipo: str, output_dir: str):
+        self.job_id = uuid.uuid4().hex
+        self.tipo = tipo
+        self.path = os.path.join(output_dir, self.job_id)
+        self.status = 'pendente'
+        self.filename: Optional[str] = None
+        self.size = 0
+        self.erro: Optional[str] = None
+        self.enqueued_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def running_since(self) -> Optional[float]:
+        """Início da geração de um job ainda pendente, marcado pelo worker (None se ainda está na fila)."""
+        return read_started(self.path) if self.status == 'pendente' else None
+
+    @property
+    def current_status(self) -> str:
+        """Status para a API: um job pendente cuja geração já começou aparece como 'processando'."""
+        return 'processando' if self.running_since is not None else self.status
+
+    @property
+    def queue_seconds(self) -> Optional[float]:
+        started = self.started_at if self.started_at is not None else self.running_since
+        return None if started is None else max(started - self.enqueued_at, 0.0)
+
+    @property
+    def render_seconds(self) -> Optional[float]:
+        return None if self.finished_at is None else self.finished_at - self.started_at
+
+    def to_dict(self) -> Dict:
+        """Andamento do job para a API."""
+        return {
+            'job_id': self.job_id,
+            'tipo': self.tipo,
+            'status': self.current_status,
+            'arquivo': self.filename if self.status == 'concluido' else None,
+            'tamanho': self.size,
+            'erro': self.erro,
+            'progresso': read_progress(progress_path(self.path)),
+            'criado_em': datetime.fromtimestamp(self.enqueued_at).strftime('%d-%m-%Y %H:%M:%S'),
+            'tempo_fila_s': None if self.queue_seconds is None else round(self.queue_seconds, 3),
+            'tempo_geracao_s': None if self.render_seconds is None else round(self.render_seconds, 3)
+        }
+
+
+class ReportJobQueue:
+    """
+    Fila de relatórios com pool de workers e diretório de artefatos com expiração.
+
+    :param output_dir: Diretório dos artefatos.
+    :param max_workers: Quantidade de workers do pool.
+    :param executor: 'thread' ou 'process'.
+    :param ttl_seconds: Tempo que um artefato pronto fica disponível para download.
+    """
+
+    def __init__(self, output_dir: str = REPORT_JOB_DIR, max_workers: int = REPORT_JOB_WORKERS,
+                 executor: str = REPORT_JOB_EXECUTOR, ttl_seconds: int = REPORT_JOB_TTL_SECONDS):
+        if executor not in EXECUTOR_TYPES:
+            raise ValueError(f"Executor inválido: {executor}. Use {', '.join(EXECUTOR_TYPES)}.")
+        self.output_dir = output_dir
+        self.max_workers = max(int(max_workers), 1)
+        self.executor_type = executor
+        self.ttl_seconds = ttl_seconds
+        # Tipo -> (função geradora, se a função escreve o próprio arquivo, se a função informa o progresso)
+        self._builders: Dict[str, Tuple[Callable, bool, bool]] = {}
+        self._jobs: Dict[str, ReportJob] = {}
+        # Métricas acumuladas por tipo (não somem quando os jobs expiram)
+        self._metrics: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        # Pool criado no primeiro job (não sobe processos só por importar o módulo)
+        self._executor = None
+        self._cleaned_orphans = False
+
+    def register(self, tipo: str, builder: Callable, writes_file: bool = False, reports_progress: bool = False):
+        """
+        Registra a função geradora de um tipo de relatório.
+
+        :param writes_file: A função recebe o caminho do artefato como primeiro argumento, escreve o arquivo
+                            e retorna só o nome para download.
+        :param reports_progress: A função recebe `progress` (função de contadores) para informar o andamento.
+        """
+        self._builders[tipo] = (builder, writes_file, reports_progress)
+
+    def submit(self, tipo: str, params: Dict) -> ReportJob:
+        """
+        Enfileira um relatório.
+
+        :param tipo: Tipo registrado com `register`.
+        :param params: Parâmetros passados à função geradora.
+        :return: ReportJob (o status é atualizado quando o worker termina).
+        :raises ValueError: Se o tipo não estiver registrado ou os parâmetros não servirem à função geradora.
+        """
+        if tipo not in self._builders:
+            raise ValueError(f"Tipo de relatório inválido: {tipo}. Use {', '.join(sorted(self._builders))}.")
+        builder, writes_file, reports_progress = self._builders[tipo]
+        try:
+            bound_params = dict(params, progress=None) if reports_progress else params
+            if writes_file:
+                inspect.signature(builder).bind(None, **bound_params)
+            else:
+                inspect.signature(builder).bind(**bound_params)
+        except TypeError as e:
+            raise ValueError(f"Parâmetros inválidos para {tipo}: {e}")
+
+        self.cleanup()
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        job = ReportJob(tipo, self.output_dir)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            if self._executor is None:
+                if self.executor_type == 'process':
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                         mp_context=multiprocessing.get_context('spawn'))
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            future = self._executor.submit(render_report, builder, params, job.path, writes_file, reports_progress)
+
+        future.add_done_callback(lambda done: self._finish(job, done))
+        return job
+
+    def _finish(self, job: ReportJob, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            # Falha do próprio worker (ex.: processo encerrado ou parâmetros que não puderam ser enviados)
+            result = {'filename': None, 'size': 0, 'started': time.time(), 'finished': time.time(),
+                      'erro': f"{type(e).__name__}: {e}"}
+
+        job.started_at = result['started']
+        job.finished_at = result['finished']
+        job.filename = result['filename']
+        job.size = result['size']
+        job.erro = result['erro']
+        job.status = 'erro' if result['erro'] else 'concluido'
+        if os.path.exists(started_path(job.path)):
+            os.remove(started_path(job.path))
+
+        with self._lock:
+            metrics = self._metrics.setdefault(job.tipo, {'concluidos': 0, 'erros': 0, 'fila_total_s': 0.0,
+                                                          'fila_max_s': 0.0, 'geracao_total_s': 0.0,
+                                                          'geracao_max_s': 0.0})
+            metrics['erros' if job.erro else 'concluidos'] += 1
+            metrics['fila_total_s'] += job.queue_seconds
+            metrics['fila_max_s'] = max(metrics['fila_max_s'], job.queue_seconds)
+            metrics['geracao_total_s'] += job.render_seconds
+            metrics['geracao_max_s'] = max(metrics['geracao_max_s'], job.render_seconds)
+
+        jobs_logger.register_log(f"Relatório {job.tipo} ({job.job_id}): {job.status}, fila {job.queue_seconds:.2f}s, "
+                                 f"geração {job.render_seconds:.2f}s.", job.erro)
+
+    def get(self, job_id: str, tipos: Optional[Iterable[str]] = None) -> Optional[ReportJob]:
+        """
+        Job pelo ID (None se não existir, tiver expirado ou não for de um dos tipos informados).
+
+        :param tipos: Tipos aceitos (cada blueprint só enxerga os seus relatórios).
+        """
+        self.cleanup()
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or (tipos is not None and job.tipo not in tipos):
+            return None
+        return job
+
+    def cleanup(self):
+        """Remove os artefatos e jobs expirados (e, na primeira chamada, arquivos órfãos do diretório)."""
+        now = time.time()
+        with self._lock:
+            expired = [job for job in self._jobs.values()
+                       if job.finished_at is not None and now - job.finished_at > self.ttl_seconds]
+            for job in expired:
+                del self._jobs[job.job_id]
+            known = set(self._jobs)
+            clean_orphans = not self._cleaned_orphans
+            self._cleaned_orphans = True
+
+        for job in expired:
+            for path in (job.path, progress_path(job.path), started_path(job.path)):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        if clean_orphans and os.path.isdir(self.output_dir):
+            for name in os.listdir(self.output_dir):
+                path = os.path.join(self.output_dir, name)
+                if name.split('.')[0] not in known and now - os.path.getmtime(path) > self.ttl_seconds:
+                    os.remove(path)
+
+    def stats(self) -> Dict:
+        """
+        Jobs na fila ('pendentes') e em geração ('processando') e, por tipo, quantidade de jobs e tempos médios
+        e máximos de fila e de geração.
+        """
+        with self._lock:
+            pending: Dict[str, int] = {}
+            running: Dict[str, int] = {}
+            for job in self._jobs.values():
+                status = job.current_status
+                if status == 'pendente':
+                    pending[job.tipo] = pending.get(job.tipo, 0) + 1
+                elif status == 'processando':
+                    running[job.tipo] = running.get(job.tipo, 0) + 1
+            metrics = {tipo: dict(values) for tipo, values in self._metrics.items()}
+
+        by_type = {}
+        for tipo in sorted(set(metrics) | set(pending) | set(running)):
+            values = metrics.get(tipo, {})
+            finished = values.get('concluidos', 0) + values.get('erros', 0)
+            by_type[tipo] = {
+                'pendentes': pending.get(tipo, 0),
+                'processando': running.get(tipo, 0),
+                'concluidos': values.get('concluidos', 0),
+                'erros': values.get('erros', 0),
+                'fila_media_s': round(values['fila_total_s'] / finished, 3) if finished else None,
+                'fila_max_s': round(values['fila_max_s'], 3) if finished else None,
+                'geracao_media_s': round(values['geracao_total_s'] / finished, 3) if finished else None,
+                'geracao_max_s': round(values['geracao_max_s'], 3) if finished else None
+            }
+
+        return {
+            'executor': self.executor_type,
+            'workers': self.max_workers,
+            'ttl_s': self.ttl_seconds,
+            'pendentes': sum(pending.values()),
+            'processando': sum(running.values()),
+            'tipos': by_type
+        }
+
+
+# Fila compartilhada pelas rotas de relatório
+report_jobs = ReportJobQueue()
@@ -0,0 +1,135 @@
+"""
+Utilitários de exportação em fluxo (NDJSON/CSV) - Sistema RPZ v3.0.0.0
+
+As funções deste módulo recebem iteradores de linhas vindas de um cursor do banco e produzem
+o conteúdo linha a linha, para ser enviado por uma `Response` geradora do Flask sem
+materializar o resultado em memória.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterable, Iterator, List
+
+STREAM_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8'
+}
+
+
+def parse_columns_param(value: str, allowed: List[str]) -> List[str]:
+    """
+    Converte o parâmetro 'columns' (separado por vírgula) em lista validada de colunas.
+
+    :param value: Valor do parâmetro (ex.: 'data_iso,latitude,longitude'). Vazio retorna todas.
+    :param allowed: Colunas permitidas, na ordem padrão.
+    :return: Lista de colunas solicitadas.
+    :raises ValueError: Se alguma coluna não for permitida.
+    """
+    if not value:
+        return list(allowed)
+
+    columns = [col.strip() for col in value.split(',') if col.strip()]
+    invalid = [col for col in columns if col not in allowed]
+    if invalid:
+        raise ValueError(f"Colunas inválidas: {', '.join(invalid)}")
+    return columns
+
+
+def downsample(rows: Iterable[tuple], step: int = 1, min_interval: int = 0,
+               key_index: int = None, ts_index: int = None) -> Iterator[tuple]:
+    """
+    Reduz a densidade de pontos de um fluxo sem precisar conhecer o tamanho total.
+
+    :param rows: Iterador de tuplas.
+    :param step: Mantém 1 a cada `step` linhas (por chave, se `key_index` for informado).
+    :param min_interval: Intervalo mínimo em segundos entre pontos mantidos da mesma chave.
+                         Exige `ts_index` apontando para uma coluna 'YYYY-MM-DD HH:MM:SS'.
+    :param key_index: Índice da coluna que separa as séries (ex.: truck_id). None = série única.
+    :param ts_index: Índice da coluna de data/hora usada por `min_interval`.
+    :return: Iterador com as linhas mantidas.
+    """
+    step = max(int(step or 1), 1)
+    min_interval = max(int(min_interval or 0), 0)
+
+    counters = {}
+    last_kept = {}
+
+    for row in rows:
+        key = row[key_index] if key_index is not None else None
+
+        position = counters.get(key, 0)
+        counters[key] = position + 1
+        if position % step:
+            continue
+
+        if min_interval and ts_index is not None:
+            ts = datetime.strptime(str(row[ts_index])[:19], '%Y-%m-%d %H:%M:%S')
+            previous = last_kept.get(key)
+            if previous is not None and (ts - previous).total_seconds() < min_interval:
+                continue
+            last_kept[key] = ts
+
+        yield row
+
+
+def project(rows: Iterable[tuple], indexes: List[int]) -> Iterator[tuple]:
+    """
+    Seleciona apenas as posições informadas de cada linha.
+
+    :param rows: Iterador de tuplas.
+    :param indexes: Índices a manter, na ordem de saída.
+    :return: Iterador de tuplas projetadas.
+    """
+    for row in rows:
+        yield tuple(row[i] for i in indexes)
+
+
+def ndjson_lines(rows: Iterable[tuple], columns: List[str]) -> Iterator[str]:
+    """
+    Converte linhas em JSON delimitado por quebra de linha (um objeto por linha).
+
+    :param rows: Iterador de tuplas.
+    :param columns: Nomes das colunas, na ordem das tuplas.
+    :return: Iterador de strings terminadas em '\\n'.
+    """
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str) + '\n'
+
+
+def csv_lines(rows: Iterable[tuple], columns: List[str], delimiter: str = ';') -> Iterator[str]:
+    """
+    Converte linhas em CSV, começando pelo cabeçalho.
+
+    :param rows: Iterador de tuplas.
+    :param columns: Nomes das colunas (cabeçalho).
+    :param delimiter: Separador de campos (padrão ';', compatível com o Excel em pt-BR).
+    :return: Iterador de strings, uma por linha.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter)
+
+    def flush(values):
+        writer.writerow(values)
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return line
+
+    yield flush(columns)
+    for row in rows:
+        yield flush(row)
+
+
+def encode_stream(rows: Iterable[tuple], columns: List[str], fmt: str) -> Iterator[str]:
+    """
+    Escolhe o serializador conforme o formato ('ndjson' ou 'csv').
+
+    :raises ValueError: Se o formato não for suportado.
+    """
+    if fmt == 'ndjson':
+        return ndjson_lines(rows, columns)
+    if fmt == 'csv':
+        return csv_lines(rows, columns)
+    raise ValueError(f"Formato inválido: {fmt}. Use 'ndjson' ou 'csv'")
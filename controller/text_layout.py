@@ -0,0 +1,161 @@
+"""
+Medição de texto para altura de linhas - Sistema RPZ v3.0.0.0
+
+Estimativa de quantas linhas um texto ocupa em uma coluna, usada para ajustar a altura das linhas
+nas exportações Excel e PDF:
+
+- tabela de larguras por caractere pré-calculada para cada tamanho de fonte (consulta em dicionário);
+- larguras de palavras e resultados por célula memorizados em LRU (horários, placas e observações se
+  repetem muito entre linhas e exportações);
+- API em lote (`measure_column`) para medir uma coluna inteira de uma vez.
+
+Os resultados são os mesmos das estimativas que existiam em `fill_excel` e `calculate_pdf_row_height`.
+"""
+
+import math
+from functools import lru_cache
+from typing import Dict, List
+
+# Fatores de largura (em relação à largura média do caractere), na mesma ordem de prioridade da estimativa
+_UPPER_FACTOR = 1.1
+_DIGIT_FACTOR = 0.9
+_WIDE_FACTOR = 1.3
+_NARROW_FACTOR = 0.6
+_SPACE_FACTOR = 0.5
+
+# Caracteres pré-calculados nas tabelas (ASCII e Latin-1, que cobrem os textos do sistema)
+_PRECOMPUTED_CHARS = [chr(code) for code in range(0x250)]
+
+_CELL_CACHE_SIZE = 65536
+_WORD_CACHE_SIZE = 65536
+
+
+def _char_width(char: str, font_width_px: float) -> float:
+    """Largura aproximada de um caractere em pixels."""
+    if char.isupper():
+        return font_width_px * _UPPER_FACTOR  # Letras maiúsculas são mais largas
+    elif char.isdigit():
+        return font_width_px * _DIGIT_FACTOR  # Números são mais estreitos
+    elif char in 'WwMm':
+        return font_width_px * _WIDE_FACTOR  # Caracteres muito largos
+    elif char in 'IiLl':
+        return font_width_px * _NARROW_FACTOR  # Caracteres muito estreitos
+    elif char.isspace():
+        return font_width_px * _SPACE_FACTOR  # Espaços são mais estreitos
+    else:
+        return font_width_px  # Largura padrão
+
+
+class CharWidthTable(dict):
+    """Tabela caractere -> largura (px) de um tamanho de fonte; caracteres fora da tabela são calculados e guardados."""
+
+    def __init__(self, font_size: float):
+        self.font_width_px = font_size * 0.75
+        super().__init__((char, _char_width(char, self.font_width_px)) for char in _PRECOMPUTED_CHARS)
+
+    def __missing__(self, char: str) -> float:
+        width = _char_width(char, self.font_width_px)
+        self[char] = width
+        return width
+
+
+_width_tables: Dict[float, CharWidthTable] = {}
+
+
+def char_widths(font_size: float) -> CharWidthTable:
+    """Retorna a tabela de larguras de um tamanho de fonte (criada no primeiro uso)."""
+    table = _width_tables.get(font_size)
+    if table is None:
+        table = _width_tables.setdefault(font_size, CharWidthTable(font_size))
+    return table
+
+
+@lru_cache(maxsize=_WORD_CACHE_SIZE)
+def text_width(text: str, font_size: float) -> float:
+    """Largura aproximada de um texto (palavra ou linha) em pixels."""
+    table = char_widths(font_size)
+    return sum(table[char] for char in text)
+
+
+@lru_cache(maxsize=_CELL_CACHE_SIZE)
+def excel_line_count(cell_value: str, column_width: float, font_size: float = 11) -> int:
+    """
+    Número de linhas que um texto ocupa em uma célula do Excel com quebra de texto.
+    Palavras não são quebradas no meio.
+
+    :param cell_value: Conteúdo da célula.
+    :param column_width: Largura da coluna em caracteres (unidade do Excel).
+    :param font_size: Tamanho da fonte.
+    :return: Número de linhas necessárias.
+    """
+    if not cell_value or cell_value.strip() == "":
+        return 1
+
+    # Quebras de linha explícitas
+    explicit_lines = cell_value.count('\n') + 1
+
+    # Excel usa aproximadamente 7 pixels por caractere de largura de coluna (com 5% de margem)
+    column_width_px = column_width * 7 * 0.95
+    space_width = char_widths(font_size)[' ']
+
+    text_lines = 0
+    for line in cell_value.split('\n'):
+        if not line.strip():
+            text_lines += 1  # Linha vazia conta como uma linha
+        elif text_width(line, font_size) <= column_width_px:
+            text_lines += 1
+        else:
+            current_line_width = 0
+            lines_needed = 1
+            for word in line.split():
+                word_width = text_width(word, font_size)
+                if current_line_width + word_width <= column_width_px:
+                    current_line_width += word_width + space_width
+                else:
+                    lines_needed += 1
+                    current_line_width = word_width + space_width
+            text_lines += lines_needed
+
+    return max(explicit_lines, text_lines)
+
+
+def measure_column(values: List[str], column_width: float, font_size: float = 11) -> List[int]:
+    """
+    Mede uma coluna inteira de uma vez.
+
+    :param values: Textos das células da coluna (None é tratado como vazio).
+    :param column_width: Largura da coluna em caracteres (unidade do Excel).
+    :param font_size: Tamanho da fonte.
+    :return: Número de linhas de cada célula, na mesma ordem.
+    """
+    return [excel_line_count("" if value is None else str(value), column_width, font_size) for value in values]
+
+
+@lru_cache(maxsize=_CELL_CACHE_SIZE)
+def pdf_line_count(cell_value: str, column_width: float, font_size: float = 6) -> int:
+    """
+    Número de linhas que um texto ocupa em uma célula de tabela PDF (largura média de caractere).
+
+    :param cell_value: Conteúdo da célula.
+    :param column_width: Largura da coluna em pontos.
+    :param font_size: Tamanho da fonte.
+    :return: Número de linhas necessárias.
+    """
+    # Largura aproximada de um caractere em pontos e quantos cabem na coluna
+    chars_per_line = max(1, int(column_width / (font_size * 0.6)))
+
+    explicit_lines = cell_value.count('\n') + 1
+    text_lines = 0
+    for line in cell_value.split('\n'):
+        if line.strip() and len(line) > chars_per_line:
+            text_lines += math.ceil(len(line) / chars_per_line)
+        else:
+            text_lines += 1
+
+    return max(explicit_lines, text_lines)
+
+
+def cache_info() -> dict:
+    """Estatísticas dos caches (acertos, falhas e tamanho)."""
+    return {name: func.cache_info()._asdict()
+            for name, func in (('palavras', text_width), ('excel', excel_line_count), ('pdf', pdf_line_count))}
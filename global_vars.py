@@ -46,3 +46,25 @@ MAX_HORAS_SEMANAIS = 259200
 
 # Tempo mínimo de descanso semanal (35 horas)
 MIN_DESCANSO_SEMANAL = 126000
+
+# Processos usados na segmentação diária da frota (0 = processa na própria requisição)
+FLEET_DAY_WORKERS = int(os.getenv('FLEET_DAY_WORKERS', '0'))
+
+# Distância máxima (metros) para aproveitar o endereço de um ponto conhecido em pontos sem rua (SASGC)
+ADDRESS_MAX_DISTANCE_M = 150
+
+# Processos usados na varredura de infrações da frota (0 = quantidade de CPUs)
+INFRACTION_SCAN_WORKERS = int(os.getenv('INFRACTION_SCAN_WORKERS', '0'))
+
+# Processos usados na exportação em lote do fechamento (0 = quantidade de CPUs)
+CLOSURE_EXPORT_WORKERS = int(os.getenv('CLOSURE_EXPORT_WORKERS', '0'))
+
+# Tamanho máximo somado dos relatórios renderizados em cache (bytes)
+REPORT_CACHE_MAX_BYTES = int(os.getenv('REPORT_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+
+# Fila de geração de relatórios: workers do pool ('thread' ou 'process'), diretório dos arquivos gerados e
+# tempo (segundos) que um arquivo pronto fica disponível para download
+REPORT_JOB_WORKERS = int(os.getenv('REPORT_JOB_WORKERS', '2'))
+REPORT_JOB_EXECUTOR = os.getenv('REPORT_JOB_EXECUTOR', 'thread')
+REPORT_JOB_DIR = os.getenv('REPORT_JOB_DIR', os.path.join('exports', 'reports'))
+REPORT_JOB_TTL_SECONDS = int(os.getenv('REPORT_JOB_TTL_SECONDS', '3600'))
@@ -0,0 +1,144 @@
+from controller.utils import CustomLogger
+from model.drivers.general_driver import GeneralDriver
+from model.drivers.uploaded_data_driver import geo_cell
+from typing import Iterable, List
+import sqlite3
+
+# Casas decimais usadas para deduplicar coordenadas no índice (~11 m)
+ADDRESS_COORD_DECIMALS = 4
+# Limite de parâmetros por consulta IN (o SQLite aceita no mínimo 999)
+ADDRESS_QUERY_CHUNK = 900
+# Tabelas de pontos lidas pela carga inicial do índice e linhas lidas/gravadas por lote
+ADDRESS_SOURCE_TABLES = ('vehicle_data', 'vehicle_data_fecham')
+ADDRESS_BACKFILL_BATCH = 20000
+
+
+class AddressIndexDriver(GeneralDriver):
+    """
+    Classe para gerenciamento da tabela address_index, um índice persistente de endereços conhecidos
+    (rua/cidade/UF por coordenada) usado para completar pontos de rastreadores que não informam a rua.
+
+    Parâmetros:
+    - logger (CustomLogger): instância de logger personalizada.
+    - db_path (str): caminho para o banco de dados SQLite.
+
+    Tabela associada:
+    - address_index(cell, latitude, longitude, uf, cidade, rua)
+      * cell: célula da grade espacial (mesma de vehicle_data_geo)
+      * latitude/longitude arredondadas em ADDRESS_COORD_DECIMALS casas
+    """
+
+    def __init__(self, logger: CustomLogger, db_path: str):
+        super().__init__(logger=logger, db_path=db_path)
+        self.create_table()
+
+    def create_table(self):
+        self.logger.print("Executando create table para address_index")
+
+        query = '''
+        CREATE TABLE IF NOT EXISTS address_index (
+            cell INTEGER NOT NULL,
+            latitude REAL NOT NULL,
+            longitude REAL NOT NULL,
+            uf TEXT,
+            cidade TEXT,
+            rua TEXT NOT NULL,
+            PRIMARY KEY (cell, latitude, longitude)
+        ) WITHOUT ROWID;
+        '''
+        self.exec_query(query, log_success=False)
+
+        self.logger.print("Tabela address_index criada com sucesso.")
+
+    def backfill(self, tables: Iterable[str] = ADDRESS_SOURCE_TABLES, batch_size: int = ADDRESS_BACKFILL_BATCH,
+                 progress=None) -> int:
+        """
+        Alimenta o índice com os pontos com endereço que já estão no banco.
+
+        Executado por scripts/admin/backfill_address_index.py, e não na inicialização da aplicação.
+
+        As tabelas são lidas em lotes pelo rowid e cada lote é gravado na sua própria transação, sem manter um
+        cursor de leitura aberto durante as gravações. Como os endereços são gravados com INSERT OR REPLACE, a
+        carga pode ser interrompida e executada de novo.
+
+        :param tables: Tabelas de pontos (com latitude, longitude, uf, cidade e rua). As inexistentes são ignoradas.
+        :param batch_size: Linhas lidas e gravadas por lote.
+        :param progress: Função opcional chamada após cada lote com (tabela, último rowid, total gravado).
+        :return: Quantidade de linhas enviadas ao índice.
+        """
+        total = 0
+        for table in tables:
+            table_exists = self.exec_query("SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+                                           params=(table,), fetchone=True, log_success=False)
+            if not table_exists:
+                continue
+
+            last_rowid = 0
+            while True:
+                rows = self.exec_query(f"SELECT rowid, latitude, longitude, uf, cidade, rua FROM {table} "
+                                       f"WHERE rowid > ? AND rua IS NOT NULL AND TRIM(rua) != '' "
+                                       f"ORDER BY rowid LIMIT ?",
+                                       params=(last_rowid, batch_size), fetchone=False, log_success=False)
+                if not rows:
+                    break
+                last_rowid = rows[-1][0]
+                total += self.add_addresses(row[1:] for row in rows)
+                if progress:
+                    progress(table, last_rowid, total)
+
+        self.logger.register_log(f"Índice de endereços alimentado com {total} ponto(s).")
+        return total
+
+    def add_addresses(self, rows: Iterable) -> int:
+        """
+        Adiciona (ou atualiza) endereços no índice em uma única transação.
+
+        :param rows: Iterável de tuplas (latitude, longitude, uf, cidade, rua). Linhas sem rua são ignoradas.
+        :return: Quantidade de linhas enviadas ao banco.
+        """
+        data_tuples = []
+        for latitude, longitude, uf, cidade, rua in rows:
+            if latitude is None or longitude is None or rua is None or not str(rua).strip():
+                continue
+            try:
+                lat = round(float(latitude), ADDRESS_COORD_DECIMALS)
+                lon = round(float(longitude), ADDRESS_COORD_DECIMALS)
+            except (TypeError, ValueError):
+                continue
+            if lat != lat or lon != lon:  # NaN
+                continue
+            data_tuples.append((geo_cell(lat, lon), lat, lon, uf, cidade, str(rua).strip()))
+
+        if not data_tuples:
+            return 0
+
+        query = '''
+            INSERT OR REPLACE INTO address_index (cell, latitude, longitude, uf, cidade, rua)
+            VALUES (?, ?, ?, ?, ?, ?)
+        '''
+        try:
+            with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+                conn.executemany(query, data_tuples)
+                conn.commit()
+        except Exception as e:
+            self.logger.register_log("Erro ao atualizar o índice de endereços.", f'Erro: {e}')
+            raise
+
+        self.logger.print(f"{len(data_tuples)} endereço(s) adicionados ao índice.")
+        return len(data_tuples)
+
+    def retrieve_by_cells(self, cells: Iterable[int]) -> List[tuple]:
+        """
+        Retorna os endereços das células informadas, consultando em lotes.
+
+        :param cells: Células da grade espacial.
+        :return: Lista de tuplas (cell, latitude, longitude, uf, cidade, rua).
+        """
+        cells = list(set(cells))
+        results = []
+        for i in range(0, len(cells), ADDRESS_QUERY_CHUNK):
+            chunk = cells[i:i + ADDRESS_QUERY_CHUNK]
+            query = f"SELECT cell, latitude, longitude, uf, cidade, rua FROM address_index " \
+                    f"WHERE cell IN ({', '.join(['?' for _ in chunk])})"
+            results.extend(self.exec_query(query, params=tuple(chunk), fetchone=False, log_success=False))
+        return results
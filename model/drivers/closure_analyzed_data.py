@@ -78,6 +78,9 @@ class AnalyzedClosureData(GeneralDriver):
             FOREIGN KEY (truck_id)   REFERENCES trucks(id)
         )'''
         self.exec_query(query_perm_data, log_success=False)
+
+        # Período no formato ISO e índice (motorista, data) para os relatórios por período
+        self.create_date_iso_column('perm_data_fecham', 'idx_perm_data_fecham_motorist_date')
         self.logger.print("Tabelas de fechamento criadas com sucesso.")
 
     def add_perm_data_fecham(self, motorist_id: int, truck_id: int, data: str, dia_da_semana: str,
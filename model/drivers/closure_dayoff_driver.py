@@ -27,6 +27,9 @@ class ClosureDayOffDriver(GeneralDriver):
         '''
         self.exec_query(query_dayoff, log_success=False)
 
+        # Período no formato ISO e índice (motorista, data) para os relatórios por período
+        self.create_date_iso_column('dayoff_fecham', 'idx_dayoff_fecham_motorist_date')
+
         self.logger.print("Tabelas de Dayoff para fechamento criadas com sucesso.")
 
     def insert_dayoff(self, motorist_id: int, data: str, motivo: str, daily_value: float = None, food_value: float = None) -> int:
@@ -0,0 +1,20 @@
+from model.drivers.data_version_driver import DataVersionDriver
+
+
+class ClosureVersionDriver(DataVersionDriver):
+    """
+    Versão por motorista dos dados usados no relatório de fechamento (closure_data_version).
+
+    Tabela associada:
+    - closure_data_version(motorist_id, version)
+    """
+
+    VERSION_TABLE = 'closure_data_version'
+    TRIGGER_TAG = 'closure_version'
+    SOURCE_TABLES = {
+        'perm_data_fecham': 'motorist_id',
+        'dayoff_fecham': 'motorist_id',
+        'closure_block_classifications': 'motorist_id',
+        'motorists': 'id',
+        'trucks': None,
+    }
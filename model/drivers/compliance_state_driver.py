@@ -0,0 +1,106 @@
+from controller.utils import CustomLogger
+from model.drivers.general_driver import GeneralDriver
+from typing import List, Optional, Tuple
+from datetime import datetime
+import sqlite3
+
+
+class ComplianceStateDriver(GeneralDriver):
+    """
+    Classe para gerenciamento da tabela compliance_state, que guarda, para cada motorista e dia trabalhado,
+    os contadores acumulados das regras de dias consecutivos e horas semanais. Com o estado do dia N,
+    o dia N+1 pode ser avaliado sem reprocessar toda a sequência.
+
+    Parâmetros:
+    - logger (CustomLogger): instância de logger personalizada.
+    - db_path (str): caminho para o banco de dados SQLite.
+
+    Tabela associada:
+    - compliance_state(motorist_id, data_iso, data, dias_consecutivos, horas_semanais_s, fim_jornada)
+      * data_iso: 'YYYY-MM-DD' (ordenação); data: 'DD-MM-YYYY' (mesmo formato das demais tabelas)
+      * fim_jornada: 'YYYY-MM-DD HH:MM'
+    """
+
+    def __init__(self, logger: CustomLogger, db_path: str):
+        super().__init__(logger=logger, db_path=db_path)
+        self.create_table()
+
+    def create_table(self):
+        self.logger.print("Executando create table para compliance_state")
+        query = '''
+        CREATE TABLE IF NOT EXISTS compliance_state (
+            motorist_id INTEGER NOT NULL,
+            data_iso TEXT NOT NULL,
+            data TEXT NOT NULL,
+            dias_consecutivos INTEGER NOT NULL,
+            horas_semanais_s INTEGER NOT NULL,
+            fim_jornada TEXT,
+            PRIMARY KEY (motorist_id, data_iso)
+        ) WITHOUT ROWID;
+        '''
+        self.exec_query(query, log_success=False)
+        self.logger.print("Tabela compliance_state criada com sucesso.")
+
+    def replace_states(self, motorist_id: int, dates: List[str], states: List[dict]) -> int:
+        """
+        Substitui os estados de um motorista nas datas informadas em uma única transação.
+
+        :param motorist_id: ID do motorista.
+        :param dates: Datas recalculadas ('DD-MM-YYYY'); estados dessas datas que não vierem em `states` são apagados.
+        :param states: Estados no formato de `compute_rolling_state`.
+        :return: Quantidade de estados gravados.
+        """
+        delete_tuples = [(motorist_id, datetime.strptime(d, '%d-%m-%Y').strftime('%Y-%m-%d')) for d in set(dates)]
+        insert_tuples = [(motorist_id, datetime.strptime(s['data'], '%d-%m-%Y').strftime('%Y-%m-%d'), s['data'],
+                          s['dias_consecutivos'], s['horas_semanais_s'], s['fim_jornada']) for s in states]
+
+        try:
+            with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+                conn.executemany("DELETE FROM compliance_state WHERE motorist_id = ? AND data_iso = ?", delete_tuples)
+                conn.executemany('''
+                    INSERT OR REPLACE INTO compliance_state
+                        (motorist_id, data_iso, data, dias_consecutivos, horas_semanais_s, fim_jornada)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', insert_tuples)
+                conn.commit()
+        except Exception as e:
+            self.logger.register_log(f"Erro ao gravar o estado de conformidade do motorista {motorist_id}.", f'Erro: {e}')
+            raise
+
+        return len(insert_tuples)
+
+    def retrieve_state_before(self, motorist_id: int, date_iso: str) -> Optional[Tuple]:
+        """
+        Retorna o último estado do motorista anterior a uma data.
+
+        :param motorist_id: ID do motorista.
+        :param date_iso: Data no formato 'YYYY-MM-DD'.
+        :return: Tupla (data, dias_consecutivos, horas_semanais_s, fim_jornada) ou None.
+        """
+        query = "SELECT data, dias_consecutivos, horas_semanais_s, fim_jornada FROM compliance_state " \
+                "WHERE motorist_id = ? AND data_iso < ? ORDER BY data_iso DESC LIMIT 1"
+        return self.exec_query(query, params=(motorist_id, date_iso), fetchone=True, log_success=False)
+
+    def retrieve_latest_state(self, motorist_id: int) -> Optional[Tuple]:
+        """
+        Retorna o estado mais recente do motorista.
+
+        :return: Tupla (data, dias_consecutivos, horas_semanais_s, fim_jornada) ou None.
+        """
+        query = "SELECT data, dias_consecutivos, horas_semanais_s, fim_jornada FROM compliance_state " \
+                "WHERE motorist_id = ? ORDER BY data_iso DESC LIMIT 1"
+        return self.exec_query(query, params=(motorist_id,), fetchone=True, log_success=False)
+
+    def retrieve_latest_states(self) -> List[Tuple]:
+        """
+        Retorna o estado mais recente de cada motorista.
+
+        :return: Lista de tuplas (motorist_id, data, dias_consecutivos, horas_semanais_s, fim_jornada).
+        """
+        query = '''
+            SELECT c.motorist_id, c.data, c.dias_consecutivos, c.horas_semanais_s, c.fim_jornada
+            FROM compliance_state c
+            JOIN (SELECT motorist_id, MAX(data_iso) AS data_iso FROM compliance_state GROUP BY motorist_id) last
+              ON last.motorist_id = c.motorist_id AND last.data_iso = c.data_iso
+        '''
+        return self.exec_query(query, fetchone=False, log_success=False)
@@ -0,0 +1,75 @@
+from controller.utils import CustomLogger
+from model.drivers.general_driver import GeneralDriver
+from typing import List, Tuple
+
+
+class DataExportDriver(GeneralDriver):
+    """
+    Leitura em fluxo, por período, das tabelas de dados brutos exportáveis (jornadas, folgas e infrações).
+
+    Não cria tabelas: cada tabela é criada (com a coluna date_iso e o índice motorista + data) pelo seu
+    próprio driver. As linhas saem ordenadas por motorista e data, na ordem do índice, então o SQLite não
+    precisa ordenar o resultado em memória.
+
+    Cada blueprint cria a sua instância com as tabelas do seu setor, já que o acesso é controlado por blueprint:
+    - TRACK_TABLES: perm_data, dayoff e infractions (rastreamento)
+    - CLOSURE_TABLES: perm_data_fecham e dayoff_fecham (fechamento)
+
+    :param tables: Tabelas exportáveis por esta instância (subconjunto de TABLES).
+    """
+
+    TRACK_TABLES = ('perm_data', 'dayoff', 'infractions')
+    CLOSURE_TABLES = ('perm_data_fecham', 'dayoff_fecham')
+    TABLES = TRACK_TABLES + CLOSURE_TABLES
+
+    def __init__(self, logger: CustomLogger, db_path: str, tables: Tuple[str, ...] = TRACK_TABLES):
+        super().__init__(logger=logger, db_path=db_path)
+        invalid = [table for table in tables if table not in self.TABLES]
+        if invalid:
+            raise ValueError(f"Tabelas não exportáveis: {invalid}")
+        self.tables = tuple(tables)
+
+    def get_columns(self, table: str) -> List[str]:
+        """
+        Colunas exportáveis de uma tabela (todas, exceto a coluna auxiliar date_iso).
+
+        :raises ValueError: Se a tabela não for exportável.
+        """
+        if table not in self.tables:
+            raise ValueError(f"Tabela inválida: {table}. Use uma de: {', '.join(self.tables)}")
+        rows = self.exec_query(f"SELECT name FROM pragma_table_info('{table}') ORDER BY cid", log_success=False)
+        return [row[0] for row in rows if row[0] != 'date_iso']
+
+    def iter_period(self, table: str, from_date: str, to_date: str, columns: List[str],
+                    motorist_ids: List[int] = None, batch_size: int = 1000):
+        """
+        Percorre as linhas de um período com um cursor, sem carregar o resultado em memória.
+
+        :param table: Tabela exportável por esta instância.
+        :param from_date: Data inicial 'YYYY-MM-DD'.
+        :param to_date: Data final 'YYYY-MM-DD'.
+        :param columns: Colunas a retornar (subconjunto de `get_columns(table)`).
+        :param motorist_ids: IDs dos motoristas (opcional). Sem eles, percorre todos.
+        :param batch_size: Quantidade de linhas lidas do cursor por vez.
+        :return: Gerador de tuplas na ordem de `columns`.
+        :raises ValueError: Se a tabela ou alguma coluna não for exportável.
+        """
+        allowed = self.get_columns(table)
+        invalid = [col for col in columns if col not in allowed]
+        if invalid:
+            raise ValueError(f"Colunas inválidas: {invalid}")
+
+        conditions = ["date_iso BETWEEN ? AND ?"]
+        params = [from_date, to_date]
+        if motorist_ids:
+            conditions.append(f"motorist_id IN ({', '.join(['?' for _ in motorist_ids])})")
+            params.extend(motorist_ids)
+
+        query = (
+            f"SELECT {', '.join(columns)} FROM {table} "
+            f"WHERE {' AND '.join(conditions)} ORDER BY motorist_id, date_iso"
+        )
+
+        self.logger.print(f"Iniciando exportação em fluxo da tabela '{table}' entre '{from_date}' e '{to_date}' "
+                          f"(motoristas={motorist_ids or 'todos'}).")
+        return self.iter_query(query, tuple(params), batch_size=batch_size)
@@ -0,0 +1,77 @@
+from controller.utils import CustomLogger
+from model.drivers.general_driver import GeneralDriver
+from typing import Dict, Optional, Tuple
+
+
+class DataVersionDriver(GeneralDriver):
+    """
+    Base das tabelas de versão por motorista. A versão é incrementada por triggers a cada alteração nas
+    tabelas de origem, então vale para qualquer escrita (rotas, scripts, outros processos) e permite
+    reaproveitar um cálculo ou relatório enquanto a versão não mudar.
+
+    As subclasses definem:
+    - VERSION_TABLE (str): tabela de versões (motorist_id, version).
+    - TRIGGER_TAG (str): parte do nome dos triggers ('{tabela}_{TRIGGER_TAG}_{ai|au|ad}').
+    - SOURCE_TABLES (dict): tabela de origem -> coluna com o ID do motorista (None = alteração global).
+
+    motorist_id = 0 guarda a versão global (ex.: alterações em trucks, que afetam as placas de todos).
+    """
+
+    GLOBAL_KEY = 0
+    VERSION_TABLE: str = ''
+    TRIGGER_TAG: str = ''
+    SOURCE_TABLES: Dict[str, Optional[str]] = {}
+
+    def __init__(self, logger: CustomLogger, db_path: str):
+        super().__init__(logger=logger, db_path=db_path)
+        self.create_table()
+
+    def create_table(self):
+        self.logger.print(f"Executando create table para {self.VERSION_TABLE}")
+        query = f'''
+        CREATE TABLE IF NOT EXISTS {self.VERSION_TABLE} (
+            motorist_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        );
+        '''
+        self.exec_query(query, log_success=False)
+        self.create_triggers()
+        self.logger.print(f"Tabela {self.VERSION_TABLE} criada com sucesso.")
+
+    def create_triggers(self):
+        """
+        Cria os triggers de versão nas tabelas de origem que já existem. Tabelas criadas depois (ex.: pela
+        migração das classificações) recebem os triggers na próxima inicialização.
+        """
+        existing = {row[0] for row in self.exec_query("SELECT name FROM sqlite_master WHERE type='table'",
+                                                      log_success=False) or []}
+        bump = (f"INSERT INTO {self.VERSION_TABLE} (motorist_id, version) VALUES ({{key}}, 1) "
+                f"ON CONFLICT(motorist_id) DO UPDATE SET version = version + 1;")
+
+        for table, column in self.SOURCE_TABLES.items():
+            if table not in existing:
+                continue
+            for suffix, event, row_ref in (('ai', 'INSERT', 'NEW'), ('au', 'UPDATE', 'NEW'), ('ad', 'DELETE', 'OLD')):
+                key = f"{row_ref}.{column}" if column else str(self.GLOBAL_KEY)
+                statements = bump.format(key=key)
+                if event == 'UPDATE' and column:
+                    # Mudança de motorista em uma linha afeta o antigo e o novo
+                    statements += " " + bump.format(key=f"OLD.{column}")
+                self.exec_query(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_{self.TRIGGER_TAG}_{suffix} AFTER {event} ON {table} BEGIN
+                        {statements}
+                    END;
+                """, log_success=False)
+
+    def get_version(self, motorist_id: int) -> Tuple[int, int]:
+        """
+        Versão atual dos dados de um motorista.
+
+        :param motorist_id: ID do motorista.
+        :return: Tupla (versão do motorista, versão global).
+        """
+        row = self.exec_query(f"""
+            SELECT COALESCE((SELECT version FROM {self.VERSION_TABLE} WHERE motorist_id = ?), 0),
+                   COALESCE((SELECT version FROM {self.VERSION_TABLE} WHERE motorist_id = ?), 0)
+        """, (int(motorist_id), self.GLOBAL_KEY), fetchone=True, log_success=False)
+        return tuple(row) if row else (0, 0)
@@ -82,3 +82,63 @@ class GeneralDriver:
                 result = 0  # Para INSERT/UPDATE/DELETE, retorna 0 se falhou
 
         return result
+
+    def iter_query(self, query: str, params=(), batch_size: int = 1000):
+        """
+        Percorre o resultado de um SELECT com um cursor, lendo `batch_size` linhas por vez, sem carregar tudo
+        em memória.
+
+        A conexão fica aberta enquanto o gerador estiver sendo consumido e é fechada ao final
+        (ou quando o gerador é descartado).
+
+        :param query: Consulta SELECT.
+        :param params: Parâmetros da consulta.
+        :param batch_size: Quantidade de linhas lidas do cursor por vez.
+        :return: Gerador de tuplas.
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row
+        except Exception as e:
+            self.logger.register_log(f"Erro na leitura em fluxo: {query}. Parâmetros: {params}.", f'Erro: {e}')
+            raise
+        finally:
+            conn.close()
+
+    def create_date_iso_column(self, table: str, index_name: str, index_prefix: tuple = ('motorist_id',)):
+        """
+        Cria a coluna date_iso ('YYYY-MM-DD', mantida por triggers a partir de data 'DD-MM-YYYY') e um índice
+        (index_prefix..., date_iso), para filtrar e ordenar períodos no SQL.
+
+        :param table: Tabela com a coluna data.
+        :param index_name: Nome do índice.
+        :param index_prefix: Colunas que antecedem date_iso no índice.
+        """
+        columns = [row[0] for row in self.exec_query(f"SELECT name FROM pragma_table_info('{table}')",
+                                                     log_success=False)]
+        iso_expr = "substr({0}, 7, 4) || '-' || substr({0}, 4, 2) || '-' || substr({0}, 1, 2)"
+
+        if columns and 'date_iso' not in columns:
+            self.exec_query(f"ALTER TABLE {table} ADD COLUMN date_iso TEXT", log_success=False)
+            self.exec_query(f"UPDATE {table} SET date_iso = {iso_expr.format('data')}", log_success=False)
+
+        self.exec_query(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_date_iso_ai AFTER INSERT ON {table} BEGIN
+                UPDATE {table} SET date_iso = {iso_expr.format('NEW.data')} WHERE rowid = NEW.rowid;
+            END;
+        """, log_success=False)
+        self.exec_query(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_date_iso_au AFTER UPDATE OF data ON {table} BEGIN
+                UPDATE {table} SET date_iso = {iso_expr.format('NEW.data')} WHERE rowid = NEW.rowid;
+            END;
+        """, log_success=False)
+
+        self.exec_query(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({', '.join(index_prefix)}, date_iso)",
+                        log_success=False)
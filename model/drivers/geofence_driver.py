@@ -0,0 +1,173 @@
+from controller.utils import CustomLogger
+from model.drivers.general_driver import GeneralDriver
+from typing import List, Optional, Tuple
+import json
+
+GEOFENCE_TYPES = ('circulo', 'poligono')
+GEOFENCE_CLASSIFICATIONS = ('REFEIÇÃO', 'DESCANSO', 'CARGA/DESCARGA')
+
+
+def parse_coordinate(value, field: str, limit: float) -> float:
+    """
+    Converte uma coordenada (ou o raio) para float e confere o intervalo [-limit, limit].
+
+    :param value: Valor recebido (número ou texto numérico).
+    :param field: Nome do campo, para a mensagem de erro.
+    :param limit: Valor absoluto máximo aceito.
+    :raises ValueError: Se o valor não for numérico ou estiver fora do intervalo.
+    """
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Valor inválido para {field}: {value!r}.")
+    if not -limit <= number <= limit:
+        raise ValueError(f"{field} fora do intervalo permitido: {number}.")
+    return number
+
+
+def parse_vertices(poligono) -> List[List[float]]:
+    """
+    Valida os vértices de um polígono.
+
+    :param poligono: Lista de vértices [[lat, lon], ...] ou o mesmo conteúdo em JSON.
+    :return: Lista de vértices [[lat, lon], ...] com valores float.
+    :raises ValueError: Se houver menos de 3 vértices ou algum vértice não for um par lat/lon válido.
+    """
+    if isinstance(poligono, str):
+        try:
+            poligono = json.loads(poligono)
+        except ValueError:
+            raise ValueError("Polígono inválido: JSON malformado.")
+    if not isinstance(poligono, (list, tuple)) or len(poligono) < 3:
+        raise ValueError("Locais do tipo 'poligono' exigem ao menos 3 vértices.")
+
+    vertices = []
+    for vertex in poligono:
+        if not isinstance(vertex, (list, tuple)) or len(vertex) != 2:
+            raise ValueError(f"Vértice inválido: {vertex!r}. Use [lat, lon].")
+        vertices.append([parse_coordinate(vertex[0], 'latitude', 90), parse_coordinate(vertex[1], 'longitude', 180)])
+    return vertices
+
+
+class GeofenceDriver(GeneralDriver):
+    """
+    Classe para gerenciamento da tabela geofences, que armazena locais conhecidos (clientes, garagens,
+    pontos de apoio) usados para sugerir a classificação das paradas na análise de jornada.
+
+    Parâmetros:
+    - logger (CustomLogger): instância de logger personalizada.
+    - db_path (str): caminho para o banco de dados SQLite.
+
+    Tabela associada:
+    - geofences(id, nome, tipo, latitude, longitude, raio_m, poligono, classificacao, ativo)
+      * tipo 'circulo': usa latitude, longitude e raio_m
+      * tipo 'poligono': usa poligono (JSON com a lista de vértices [[lat, lon], ...])
+    """
+
+    def __init__(self, logger: CustomLogger, db_path: str):
+        super().__init__(logger=logger, db_path=db_path)
+        self.create_table()
+
+    def create_table(self):
+        self.logger.print("Executando create table para geofences")
+        query = '''
+        CREATE TABLE IF NOT EXISTS geofences (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            tipo TEXT NOT NULL CHECK(tipo in ('circulo', 'poligono')),
+            latitude REAL,
+            longitude REAL,
+            raio_m REAL,
+            poligono TEXT,
+            classificacao TEXT,
+            ativo INTEGER NOT NULL DEFAULT 1
+        );
+        '''
+        self.exec_query(query, log_success=False)
+        self.logger.print("Tabela geofences criada com sucesso.")
+
+    def create_geofence(self, nome: str, tipo: str, classificacao: Optional[str] = None,
+                        latitude: Optional[float] = None, longitude: Optional[float] = None,
+                        raio_m: Optional[float] = None, poligono: Optional[list] = None) -> int:
+        """
+        Cadastra um novo local.
+
+        :param nome: Nome do local (ex.: 'Garagem Matriz', 'Cliente X').
+        :param tipo: 'circulo' ou 'poligono'.
+        :param classificacao: Classificação sugerida para paradas no local (REFEIÇÃO, DESCANSO, CARGA/DESCARGA).
+        :param latitude: Latitude do centro (tipo 'circulo').
+        :param longitude: Longitude do centro (tipo 'circulo').
+        :param raio_m: Raio em metros (tipo 'circulo').
+        :param poligono: Lista de vértices [[lat, lon], ...] (tipo 'poligono').
+        :return: Quantidade de linhas afetadas.
+        :raises ValueError: Se o tipo, a classificação, as coordenadas, o raio ou os vértices forem inválidos.
+        """
+        if tipo not in GEOFENCE_TYPES:
+            raise ValueError(f"Tipo inválido: {tipo}. Use 'circulo' ou 'poligono'.")
+        if classificacao and classificacao not in GEOFENCE_CLASSIFICATIONS:
+            raise ValueError(f"Classificação inválida: {classificacao}.")
+        if tipo == 'circulo':
+            if latitude is None or longitude is None or raio_m is None:
+                raise ValueError("Locais do tipo 'circulo' exigem latitude, longitude e raio_m maior que zero.")
+            latitude = parse_coordinate(latitude, 'latitude', 90)
+            longitude = parse_coordinate(longitude, 'longitude', 180)
+            # Meia circunferência da Terra: qualquer raio maior cobre o planeta todo
+            raio_m = parse_coordinate(raio_m, 'raio_m', 20_000_000)
+            if raio_m <= 0:
+                raise ValueError("Locais do tipo 'circulo' exigem latitude, longitude e raio_m maior que zero.")
+        else:
+            poligono = parse_vertices(poligono)
+
+        self.logger.print(f"Adicionando local: {nome} ({tipo}).")
+
+        query = '''
+            INSERT INTO geofences (nome, tipo, latitude, longitude, raio_m, poligono, classificacao)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        '''
+        params = (nome.strip().upper(), tipo, latitude, longitude, raio_m,
+                  json.dumps(poligono) if poligono else None, classificacao)
+
+        return self.exec_query(query=query, params=params)
+
+    def delete_geofence(self, geofence_id: int) -> int:
+        """
+        Remove um local cadastrado.
+
+        :param geofence_id: ID do local.
+        :return: Quantidade de linhas afetadas.
+        """
+        self.logger.register_log(f"Removendo local {geofence_id} da tabela geofences.")
+        return self.exec_query("DELETE FROM geofences WHERE id = ?", params=(geofence_id,))
+
+    def set_active(self, geofence_id: int, ativo: bool) -> int:
+        """
+        Ativa ou desativa um local sem removê-lo.
+
+        :param geofence_id: ID do local.
+        :param ativo: True para ativar, False para desativar.
+        :return: Quantidade de linhas afetadas.
+        """
+        return self.exec_query("UPDATE geofences SET ativo = ? WHERE id = ?", params=(int(bool(ativo)), geofence_id))
+
+    def retrieve_geofence(self, geofence_id: int) -> Optional[Tuple]:
+        """
+        Consulta um local pelo ID.
+
+        :return: Tupla (id, nome, tipo, latitude, longitude, raio_m, poligono, classificacao, ativo) ou None.
+        """
+        query = "SELECT id, nome, tipo, latitude, longitude, raio_m, poligono, classificacao, ativo " \
+                "FROM geofences WHERE id = ?"
+        return self.exec_query(query, params=(geofence_id,), fetchone=True, log_success=False)
+
+    def retrieve_all_geofences(self, only_active: bool = False) -> List[Tuple]:
+        """
+        Retorna os locais cadastrados.
+
+        :param only_active: Se True, retorna apenas os locais ativos.
+        :return: Lista de tuplas (id, nome, tipo, latitude, longitude, raio_m, poligono, classificacao, ativo).
+        """
+        query = "SELECT id, nome, tipo, latitude, longitude, raio_m, poligono, classificacao, ativo FROM geofences"
+        if only_active:
+            query += " WHERE ativo = 1"
+        query += " ORDER BY nome"
+        return self.exec_query(query, fetchone=False, log_success=False)
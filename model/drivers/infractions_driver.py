@@ -2,7 +2,8 @@ from controller.utils import CustomLogger
 from model.drivers.general_driver import GeneralDriver
 import pandas as pd
 import sqlite3
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
+from datetime import datetime
 import hashlib
 from global_vars import INFRACTION_DICT
 
@@ -33,6 +34,18 @@ class InfractionsDriver(GeneralDriver):
         '''
         self.exec_query(query, log_success=False)
         self.logger.print("Tabela de infrações criada com sucesso.")
+        self.create_listing_indexes()
+
+    def create_listing_indexes(self):
+        """
+        Cria a coluna date_iso ('YYYY-MM-DD', mantida por triggers a partir de data) e os índices usados
+        pela listagem paginada de infrações.
+        """
+        self.create_date_iso_column('infractions', 'idx_infractions_motorist_date')
+        self.exec_query("CREATE INDEX IF NOT EXISTS idx_infractions_lido_date ON infractions (lido, date_iso, hash)",
+                        log_success=False)
+        self.exec_query("CREATE INDEX IF NOT EXISTS idx_infractions_date ON infractions (date_iso, hash)",
+                        log_success=False)
 
     def _build_where_clause(self, where_columns: List[str], where_values: Tuple[str]) -> str:
         """ Gera a cláusula WHERE com base nas colunas e valores fornecidos. """
@@ -40,6 +53,57 @@ class InfractionsDriver(GeneralDriver):
             raise ValueError("O número de colunas e valores deve ser igual.")
         return " AND ".join([f"{col}=?" for col in where_columns])
 
+    @staticmethod
+    def infraction_hash(motorist_id, data: str, hora: str, tipo_infracao: int) -> str:
+        """ Hash que identifica uma infração (motorista, data, hora e tipo). """
+        return hashlib.sha256(f"{motorist_id}{data}{hora}{tipo_infracao}".encode('utf-8')).hexdigest()
+
+    def upsert_infractions(self, infractions: List[Tuple]) -> int:
+        """
+        Grava várias infrações em uma única transação, de forma idempotente pelo hash.
+
+        Diferente de `create_infraction`, uma infração que já existe mantém o status de leitura e o link
+        da tratativa (só duração, caminhão e descrição são atualizados), e infrações que o usuário
+        removeu (tabela removed_infractions) não são recriadas.
+
+        :param infractions: Lista de tuplas (motorist_id, truck_id, data, hora, duration, tipo_infracao).
+        :return: Número de linhas inseridas ou atualizadas.
+        """
+        if not infractions:
+            return 0
+
+        removed_exists = self.exec_query("SELECT name FROM sqlite_master WHERE type='table' AND name='removed_infractions'",
+                                         fetchone=True, log_success=False)
+        not_removed = "NOT EXISTS (SELECT 1 FROM removed_infractions r WHERE r.hash = ?)" if removed_exists else "? IS NOT NULL"
+
+        query = f"""
+            INSERT INTO infractions (hash, motorist_id, truck_id, data, hora, duration, tipo_infracao, desc_infracao, lido)
+            SELECT ?, ?, ?, ?, ?, ?, ?, ?, 0
+            WHERE {not_removed}
+            ON CONFLICT(hash) DO UPDATE SET
+                truck_id = excluded.truck_id,
+                duration = excluded.duration,
+                desc_infracao = excluded.desc_infracao
+        """
+
+        data_tuples = []
+        for motorist_id, truck_id, data, hora, duration, tipo_infracao in infractions:
+            hash_value = self.infraction_hash(motorist_id, data, hora, tipo_infracao)
+            data_tuples.append((hash_value, motorist_id, truck_id, data, hora, duration, tipo_infracao,
+                                INFRACTION_DICT.get(tipo_infracao), hash_value))
+
+        try:
+            with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+                cursor = conn.executemany(query, data_tuples)
+                conn.commit()
+                row_count = cursor.rowcount
+        except Exception as e:
+            self.logger.register_log("Erro ao gravar infrações em lote.", f'Erro: {e}')
+            raise
+
+        self.logger.print(f"{row_count} infração(ões) gravadas em lote.")
+        return row_count
+
     def create_infraction(self, motorist_id: str, truck_id: int, data: str, hora: str, duration: str,
                           tipo_infracao: int) -> int:
         """
@@ -64,7 +128,7 @@ class InfractionsDriver(GeneralDriver):
         """
 
         # Gerando um hash único para cada infração
-        hash_value = hashlib.sha256(f"{motorist_id}{data}{hora}{tipo_infracao}".encode('utf-8')).hexdigest()
+        hash_value = self.infraction_hash(motorist_id, data, hora, tipo_infracao)
 
         self.logger.print(
             f"Adicionando infração: motorista={motorist_id}, data={data}, tipo_infracao={tipo_infracao}, hash={hash_value}")
@@ -196,4 +260,207 @@ class InfractionsDriver(GeneralDriver):
         """
         query = "SELECT link_tratativa FROM infractions WHERE hash = ?"
         result = self.exec_query(query=query, params=(infraction_hash,), fetchone=True)
-        return result[0] if result else None
\ No newline at end of file
+        return result[0] if result else None
+
+    def sync_infractions_for_dates(self, motorist_id: int, dates: List[str], infractions: List[Tuple]) -> dict:
+        """
+        Sincroniza as infrações gravadas de um motorista em um conjunto de datas com uma lista recalculada,
+        apagando e gravando apenas o que mudou (em uma única transação).
+
+        Infrações que continuam existindo mantêm o status de leitura e o link da tratativa, e infrações que o
+        usuário removeu (tabela removed_infractions) não são recriadas.
+
+        :param motorist_id: ID do motorista.
+        :param dates: Datas recalculadas ('DD-MM-YYYY'). Infrações gravadas nessas datas que não estão em
+                      `infractions` são apagadas.
+        :param infractions: Lista de tuplas (motorist_id, truck_id, data, hora, duration, tipo_infracao).
+        :return: Dicionário {inseridas, atualizadas, removidas}.
+        """
+        dates = list(set(dates))
+        result = {'inseridas': 0, 'atualizadas': 0, 'removidas': 0}
+        if not dates:
+            return result
+
+        new_rows = {self.infraction_hash(m, d, h, t): (m, tr, d, h, du, t) for m, tr, d, h, du, t in infractions}
+
+        try:
+            with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+                placeholders = ', '.join(['?' for _ in dates])
+                stored = {row[0]: row[1:] for row in conn.execute(
+                    f"SELECT hash, truck_id, duration FROM infractions WHERE motorist_id = ? AND data IN ({placeholders})",
+                    [motorist_id] + dates)}
+
+                removed = set()
+                if conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='removed_infractions'").fetchone():
+                    removed = {row[0] for row in conn.execute(
+                        f"SELECT hash FROM removed_infractions WHERE motorist_id = ? AND data IN ({placeholders})",
+                        [motorist_id] + dates)}
+
+                to_delete = [(h,) for h in stored if h not in new_rows]
+                to_insert = [(h, *row, INFRACTION_DICT.get(row[5])) for h, row in new_rows.items()
+                             if h not in stored and h not in removed]
+                to_update = [(row[1], row[4], h) for h, row in new_rows.items()
+                             if h in stored and stored[h] != (row[1], row[4])]
+
+                conn.executemany("DELETE FROM infractions WHERE hash = ?", to_delete)
+                conn.executemany("""
+                    INSERT INTO infractions (hash, motorist_id, truck_id, data, hora, duration, tipo_infracao, desc_infracao, lido)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)
+                """, to_insert)
+                conn.executemany("UPDATE infractions SET truck_id = ?, duration = ? WHERE hash = ?", to_update)
+                conn.commit()
+        except Exception as e:
+            self.logger.register_log(f"Erro ao sincronizar infrações do motorista {motorist_id}.", f'Erro: {e}')
+            raise
+
+        result.update(inseridas=len(to_insert), atualizadas=len(to_update), removidas=len(to_delete))
+        self.logger.print(f"Infrações do motorista {motorist_id} sincronizadas: {result}")
+        return result
+
+    @staticmethod
+    def _listing_conditions(filters: Dict, include_type: bool = True) -> Tuple[List[str], List]:
+        """ Monta as condições da listagem paginada a partir dos filtros. """
+        conditions, params = [], []
+
+        if filters.get('motorist_id') is not None:
+            conditions.append("i.motorist_id = ?")
+            params.append(int(filters['motorist_id']))
+        if filters.get('truck_id') is not None:
+            conditions.append("i.truck_id = ?")
+            params.append(int(filters['truck_id']))
+        if include_type and filters.get('tipos'):
+            tipos = [int(t) for t in filters['tipos']]
+            conditions.append(f"i.tipo_infracao IN ({', '.join(['?' for _ in tipos])})")
+            params.extend(tipos)
+        if filters.get('lido') is not None:
+            conditions.append("i.lido = ?")
+            params.append(1 if filters['lido'] else 0)
+        if filters.get('data_inicio'):
+            conditions.append("i.date_iso >= ?")
+            params.append(datetime.strptime(filters['data_inicio'], '%d-%m-%Y').strftime('%Y-%m-%d'))
+        if filters.get('data_fim'):
+            conditions.append("i.date_iso <= ?")
+            params.append(datetime.strptime(filters['data_fim'], '%d-%m-%Y').strftime('%Y-%m-%d'))
+        if filters.get('justificada') is not None:
+            conditions.append("COALESCE(i.link_tratativa, '') != ''" if filters['justificada']
+                              else "COALESCE(i.link_tratativa, '') = ''")
+
+        return conditions, params
+
+    def retrieve_infractions_page(self, filters: Dict, limit: int = 50, cursor: Optional[str] = None) -> Dict:
+        """
+        Lista infrações com filtros e paginação por chave (data mais recente primeiro), junto com a contagem
+        por tipo, em uma única conexão.
+
+        :param filters: Dicionário com os filtros opcionais: motorist_id, truck_id, tipos (lista), lido (bool),
+                        data_inicio e data_fim ('DD-MM-YYYY') e justificada (bool).
+        :param limit: Quantidade de infrações por página.
+        :param cursor: Cursor devolvido pela página anterior ('YYYY-MM-DD|hash') ou None para a primeira página.
+        :return: Dicionário {items, next_cursor, contagem_por_tipo, total}.
+        :raises ValueError: Se algum filtro ou o cursor for inválido.
+        """
+        conditions, params = self._listing_conditions(filters)
+        page_conditions, page_params = list(conditions), list(params)
+
+        if cursor:
+            cursor_date, _, cursor_hash = cursor.partition('|')
+            if not cursor_hash:
+                raise ValueError("Cursor inválido.")
+            page_conditions.append("(i.date_iso < ? OR (i.date_iso = ? AND i.hash < ?))")
+            page_params.extend([cursor_date, cursor_date, cursor_hash])
+
+        where = f"WHERE {' AND '.join(page_conditions)}" if page_conditions else ""
+        page_query = f"""
+            SELECT i.hash, i.motorist_id, m.nome, i.truck_id, t.placa, i.data, i.hora, i.duration,
+                   i.tipo_infracao, i.desc_infracao, i.lido, i.link_tratativa, i.date_iso
+            FROM infractions i
+            LEFT JOIN motorists m ON m.id = i.motorist_id
+            LEFT JOIN trucks t ON t.id = i.truck_id
+            {where}
+            ORDER BY i.date_iso DESC, i.hash DESC
+            LIMIT ?
+        """
+
+        # A contagem por tipo ignora o filtro de tipo, para que a tela mostre quantas há de cada um
+        count_conditions, count_params = self._listing_conditions(filters, include_type=False)
+        count_where = f"WHERE {' AND '.join(count_conditions)}" if count_conditions else ""
+        count_query = f"SELECT i.tipo_infracao, COUNT(*) FROM infractions i {count_where} GROUP BY i.tipo_infracao"
+
+        try:
+            with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+                rows = conn.execute(page_query, page_params + [limit + 1]).fetchall()
+                counts = {tipo: total for tipo, total in conn.execute(count_query, count_params).fetchall()}
+        except Exception as e:
+            self.logger.register_log("Erro ao listar infrações.", f'Erro: {e}')
+            raise
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        items = [{
+            'hash': row[0], 'motorist_id': row[1], 'motorista': row[2], 'truck_id': row[3], 'placa': row[4],
+            'data': row[5], 'hora': row[6], 'duration': row[7], 'tipo_infracao': row[8], 'desc_infracao': row[9],
+            'lido': bool(row[10]), 'link_tratativa': row[11]
+        } for row in rows]
+
+        return {
+            'items': items,
+            'next_cursor': f"{rows[-1][12]}|{rows[-1][0]}" if has_more and rows else None,
+            'contagem_por_tipo': counts,
+            'total': sum(counts.values()) if not filters.get('tipos') else
+            sum(total for tipo, total in counts.items() if tipo in {int(t) for t in filters['tipos']})
+        }
+
+    BULK_ACTIONS = ('lido', 'remover', 'link')
+
+    def bulk_update(self, action: str, items: List[Tuple[str, Optional[str]]]) -> List[Dict]:
+        """
+        Aplica uma ação a várias infrações em uma única transação.
+
+        Ações:
+        - 'lido': marca as infrações como lidas.
+        - 'remover': arquiva as infrações em removed_infractions e as apaga da tabela principal.
+        - 'link': grava o link da tratativa (segundo elemento de cada item).
+
+        :param action: Uma das ações de BULK_ACTIONS.
+        :param items: Lista de tuplas (hash, link). O link só é usado na ação 'link'.
+        :return: Lista de resultados por item, na ordem recebida: {hash, status ('ok' ou 'nao_encontrada')}.
+        :raises ValueError: Se a ação for inválida.
+        """
+        if action not in self.BULK_ACTIONS:
+            raise ValueError(f"Ação inválida: {action}. Use {', '.join(self.BULK_ACTIONS)}.")
+
+        hashes = list(dict.fromkeys(h for h, _ in items))
+        if not hashes:
+            return []
+
+        try:
+            with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+                existing = set()
+                for i in range(0, len(hashes), 900):
+                    chunk = hashes[i:i + 900]
+                    existing.update(row[0] for row in conn.execute(
+                        f"SELECT hash FROM infractions WHERE hash IN ({', '.join(['?' for _ in chunk])})", chunk))
+
+                found = [(h, link) for h, link in items if h in existing]
+
+                if action == 'lido':
+                    conn.executemany("UPDATE infractions SET lido = 1 WHERE hash = ?", [(h,) for h, _ in found])
+                elif action == 'link':
+                    conn.executemany("UPDATE infractions SET link_tratativa = ? WHERE hash = ?",
+                                     [(link, h) for h, link in found])
+                else:
+                    conn.executemany("""
+                        INSERT OR REPLACE INTO removed_infractions
+                            (hash, motorist_id, truck_id, data, hora, duration, tipo_infracao, desc_infracao, link_justification)
+                        SELECT hash, motorist_id, truck_id, data, hora, duration, tipo_infracao, desc_infracao, link_tratativa
+                        FROM infractions WHERE hash = ?
+                    """, [(h,) for h, _ in found])
+                    conn.executemany("DELETE FROM infractions WHERE hash = ?", [(h,) for h, _ in found])
+
+                conn.commit()
+        except Exception as e:
+            self.logger.register_log(f"Erro ao aplicar a ação '{action}' em lote.", f'Erro: {e}')
+            raise
+
+        self.logger.register_log(f"Ação '{action}' aplicada em lote a {len(existing)} infração(ões).")
+        return [{'hash': h, 'status': 'ok' if h in existing else 'nao_encontrada'} for h, _ in items]
@@ -0,0 +1,21 @@
+from model.drivers.data_version_driver import DataVersionDriver
+
+
+class JourneyVersionDriver(DataVersionDriver):
+    """
+    Versão por motorista dos dados usados no relatório de jornada (journey_data_version): jornadas salvas,
+    folgas e infrações do motorista, além do nome do motorista e das placas.
+
+    Tabela associada:
+    - journey_data_version(motorist_id, version)
+    """
+
+    VERSION_TABLE = 'journey_data_version'
+    TRIGGER_TAG = 'journey_version'
+    SOURCE_TABLES = {
+        'perm_data': 'motorist_id',
+        'dayoff': 'motorist_id',
+        'infractions': 'motorist_id',
+        'motorists': 'id',
+        'trucks': None,
+    }
@@ -66,6 +66,16 @@ class ParametersDriver(GeneralDriver):
         '''
         self.exec_query(query_feriados, log_success=False)
 
+        # Tabela para os limites das regras de infração alterados nesta operação
+        query_limites = '''
+        CREATE TABLE IF NOT EXISTS limites_regras (
+            nome TEXT PRIMARY KEY,
+            valor INTEGER NOT NULL,
+            data_atualizacao TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+        '''
+        self.exec_query(query_limites, log_success=False)
+
         # Verificar se já existem parâmetros antes de inserir valores padrão
         self._insert_default_values_if_needed()
 
@@ -223,6 +233,41 @@ class ParametersDriver(GeneralDriver):
         result = self.exec_query(query, params=(valor, tipo_parametro))
         return result if isinstance(result, int) else 0
 
+    def get_rule_thresholds(self) -> Dict[str, int]:
+        """
+        Retorna os limites das regras de infração alterados nesta operação.
+
+        :return: Dicionário {nome do limite (ex.: 'TEMPO_ALMOCO'): valor}. Limites não alterados não aparecem.
+        """
+        result = self.exec_query("SELECT nome, valor FROM limites_regras", fetchone=False, log_success=False)
+        if not result or isinstance(result, int):
+            return {}
+        return {nome: int(valor) for nome, valor in result}
+
+    def set_rule_thresholds(self, thresholds: Dict[str, int]) -> int:
+        """
+        Grava (ou remove, quando o valor é None) limites das regras de infração desta operação.
+
+        :param thresholds: Dicionário {nome do limite: valor ou None para voltar ao padrão}.
+        :return: Quantidade de limites gravados ou removidos.
+        """
+        upserts = [(name, int(value)) for name, value in thresholds.items() if value is not None]
+        deletes = [(name,) for name, value in thresholds.items() if value is None]
+
+        try:
+            with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+                conn.executemany('''
+                    INSERT INTO limites_regras (nome, valor) VALUES (?, ?)
+                    ON CONFLICT(nome) DO UPDATE SET valor = excluded.valor, data_atualizacao = CURRENT_TIMESTAMP
+                ''', upserts)
+                conn.executemany("DELETE FROM limites_regras WHERE nome = ?", deletes)
+                conn.commit()
+        except Exception as e:
+            self.logger.register_log("Erro ao gravar os limites das regras de infração.", f'Erro: {e}')
+            raise
+
+        return len(upserts) + len(deletes)
+
     def _normalize(self, s: str) -> str:
         """
         Normaliza uma string removendo acentos e convertendo para maiúsculas.
@@ -29,6 +29,10 @@ class RemovedInfractionsDriver(GeneralDriver):
         );
         '''
         self.exec_query(query, log_success=False)
+        # Exportação filtrada por período no SQL (por motorista ou de todos os motoristas)
+        self.create_date_iso_column('removed_infractions', 'idx_removed_infractions_motorist_date')
+        self.exec_query("CREATE INDEX IF NOT EXISTS idx_removed_infractions_date ON removed_infractions (date_iso)",
+                        log_success=False)
         self.logger.print("Tabela de infrações removidas criada com sucesso.")
 
     def add_removed_infraction(self, infraction_data: tuple) -> int:
@@ -59,6 +63,46 @@ class RemovedInfractionsDriver(GeneralDriver):
         """
         return self.exec_query(query=query, fetchone=False)
 
+    def iter_removed_infractions(self, motorist_id: Optional[int] = None, tipo_infracao: Optional[int] = None,
+                                 data_inicio: Optional[str] = None, data_fim: Optional[str] = None,
+                                 batch_size: int = 1000):
+        """
+        Percorre as infrações removidas com um cursor, filtrando no SQL e sem carregar o resultado em memória.
+
+        :param motorist_id: ID do motorista (opcional).
+        :param tipo_infracao: Tipo da infração (opcional).
+        :param data_inicio: Data inicial 'YYYY-MM-DD' (opcional).
+        :param data_fim: Data final 'YYYY-MM-DD' (opcional).
+        :param batch_size: Quantidade de linhas lidas do cursor por vez.
+        :return: Gerador de tuplas (motorista, placa, data, hora, duration, tipo_infracao, desc_infracao,
+                 link_justification, data_remocao), da data mais recente para a mais antiga.
+        """
+        conditions, params = [], []
+        if motorist_id is not None:
+            conditions.append("r.motorist_id = ?")
+            params.append(motorist_id)
+        if tipo_infracao is not None:
+            conditions.append("r.tipo_infracao = ?")
+            params.append(tipo_infracao)
+        if data_inicio:
+            conditions.append("r.date_iso >= ?")
+            params.append(data_inicio)
+        if data_fim:
+            conditions.append("r.date_iso <= ?")
+            params.append(data_fim)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"""
+            SELECT m.nome, t.placa, r.data, r.hora, r.duration, r.tipo_infracao, r.desc_infracao,
+                   r.link_justification, r.data_remocao
+            FROM removed_infractions r
+            LEFT JOIN motorists m ON r.motorist_id = m.id
+            LEFT JOIN trucks t ON r.truck_id = t.id
+            {where}
+            ORDER BY r.date_iso DESC, r.hora DESC
+        """
+        return self.iter_query(query, tuple(params), batch_size=batch_size)
+
     def get_removed_infraction(self, hash_value: str) -> Optional[tuple]:
         """
         Busca uma infração removida específica pelo hash.
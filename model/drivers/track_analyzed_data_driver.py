@@ -1,5 +1,6 @@
 from controller.utils import CustomLogger
 from model.drivers.general_driver import GeneralDriver
+from controller.infractions_data import parse_journey_time_columns
 from typing import Optional, Tuple, Dict
 import pandas as pd
 import sqlite3
@@ -70,6 +71,9 @@ class AnalyzedTrackData(GeneralDriver):
         '''
         self.exec_query(query, log_success=False)
 
+        # Período no formato ISO e índice (motorista, data) para as consultas e exportações por período
+        self.create_date_iso_column('perm_data', 'idx_perm_data_motorist_date')
+
         self.logger.print("Create table executado com sucesso.")
 
 
@@ -649,27 +653,8 @@ class AnalyzedTrackData(GeneralDriver):
         df = pd.read_sql_query(query, conn, params=tuple(params))
         conn.close()
 
-        time_columns = [
-            'inicio_jornada', 'in_refeicao', 'fim_refeicao', 'fim_jornada',
-            'in_descanso_1', 'fim_descanso_1', 'in_descanso_2', 'fim_descanso_2',
-            'in_descanso_3', 'fim_descanso_3', 'in_descanso_4', 'fim_descanso_4',
-            'in_descanso_5', 'fim_descanso_5', 'in_descanso_6', 'fim_descanso_6',
-            'in_descanso_7', 'fim_descanso_7', 'in_descanso_8', 'fim_descanso_8',
-            'in_car_desc_1', 'fim_car_desc_1', 'in_car_desc_2', 'fim_car_desc_2',
-            'in_car_desc_3', 'fim_car_desc_3', 'in_car_desc_4', 'fim_car_desc_4',
-            'in_car_desc_5', 'fim_car_desc_5', 'in_car_desc_6', 'fim_car_desc_6',
-            'in_car_desc_7', 'fim_car_desc_7'
-        ]
-
-        # Convertendo todas as colunas de data/hora para datetime, caso exista.
-        for col in time_columns:
-            if col in df.columns:
-                # Combinando as colunas 'data' e 'col' diretamente e convertendo para datetime
-                df[col] = pd.to_datetime(df['data'].astype(str) + ' ' + df[col].astype(str), format='%d-%m-%Y %H:%M',
-                                         errors='coerce')
-
-        # Agora converte a coluna 'data' para datetime no formato correto
-        df['data'] = pd.to_datetime(df['data'], format='%d-%m-%Y')
+        # Convertendo as colunas de data/hora para datetime
+        df = parse_journey_time_columns(df)
 
         return df
 
@@ -732,26 +717,8 @@ class AnalyzedTrackData(GeneralDriver):
         df = pd.read_sql_query(query, conn, params=tuple(params))
         conn.close()
 
-        time_columns = [
-            'inicio_jornada', 'in_refeicao', 'fim_refeicao', 'fim_jornada',
-            'in_descanso_1', 'fim_descanso_1', 'in_descanso_2', 'fim_descanso_2',
-            'in_descanso_3', 'fim_descanso_3', 'in_descanso_4', 'fim_descanso_4',
-            'in_descanso_5', 'fim_descanso_5', 'in_descanso_6', 'fim_descanso_6',
-            'in_descanso_7', 'fim_descanso_7', 'in_descanso_8', 'fim_descanso_8',
-            'in_car_desc_1', 'fim_car_desc_1', 'in_car_desc_2', 'fim_car_desc_2',
-            'in_car_desc_3', 'fim_car_desc_3', 'in_car_desc_4', 'fim_car_desc_4',
-            'in_car_desc_5', 'fim_car_desc_5', 'in_car_desc_6', 'fim_car_desc_6',
-            'in_car_desc_7', 'fim_car_desc_7'
-        ]
-
-        # Convertendo todas as colunas de data/hora para datetime, caso exista.
-        for col in time_columns:
-            if col in df.columns:
-                df[col] = pd.to_datetime(df['data'].astype(str) + ' ' + df[col].astype(str), format='%d-%m-%Y %H:%M',
-                                         errors='coerce')
-
-        # Agora converte a coluna 'data' para datetime no formato correto
-        df['data'] = pd.to_datetime(df['data'], format='%d-%m-%Y')
+        # Convertendo as colunas de data/hora para datetime
+        df = parse_journey_time_columns(df)
 
         return df
 
@@ -825,26 +792,8 @@ class AnalyzedTrackData(GeneralDriver):
 
         if output_format == 'df':
 
-            time_columns = [
-                'inicio_jornada', 'in_refeicao', 'fim_refeicao', 'fim_jornada',
-                'in_descanso_1', 'fim_descanso_1', 'in_descanso_2', 'fim_descanso_2',
-                'in_descanso_3', 'fim_descanso_3', 'in_descanso_4', 'fim_descanso_4',
-                'in_descanso_5', 'fim_descanso_5', 'in_descanso_6', 'fim_descanso_6',
-                'in_descanso_7', 'fim_descanso_7', 'in_descanso_8', 'fim_descanso_8',
-                'in_car_desc_1', 'fim_car_desc_1', 'in_car_desc_2', 'fim_car_desc_2',
-                'in_car_desc_3', 'fim_car_desc_3', 'in_car_desc_4', 'fim_car_desc_4',
-                'in_car_desc_5', 'fim_car_desc_5', 'in_car_desc_6', 'fim_car_desc_6',
-                'in_car_desc_7', 'fim_car_desc_7'
-            ]
-
-            # Convertendo todas as colunas de data/hora para datetime, caso exista.
-            for col in time_columns:
-                if col in df.columns:
-                    df[col] = pd.to_datetime(df['data'].astype(str) + ' ' + df[col].astype(str), format='%d-%m-%Y %H:%M',
-                                             errors='coerce')
-
-            # Agora converte a coluna 'data' para datetime no formato correto
-            df['data'] = pd.to_datetime(df['data'], format='%d-%m-%Y')
+            # Convertendo as colunas de data/hora para datetime
+            df = parse_journey_time_columns(df)
 
             return df
 
@@ -32,6 +32,8 @@ class TrackDayOffDriver(GeneralDriver):
         '''
         try:
             self.exec_query(query, log_success=True)
+            # Período no formato ISO e índice (motorista, data) para as consultas e exportações por período
+            self.create_date_iso_column('dayoff', 'idx_dayoff_motorist_date')
             self.logger.print("Tabela dayoff criada com sucesso.")
         except Exception as e:
             self.logger.print(f"[ERRO] Falha ao criar tabela dayoff: {e}")
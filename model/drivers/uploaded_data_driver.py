@@ -1,10 +1,61 @@
 from controller.utils import CustomLogger
 from model.drivers.general_driver import GeneralDriver
 import pandas as pd
+import math
 import sqlite3
 from typing import List, Tuple, Optional
 
+# Tamanho da célula da grade espacial em graus (~1,1 km no equador)
+GEO_CELL_SIZE = 0.01
+# Deslocamentos que tornam os índices de linha/coluna da grade sempre positivos
+GEO_ROW_OFFSET = 9000
+GEO_COL_OFFSET = 18000
+GEO_ROW_FACTOR = 100000
+# Acima dessa quantidade de células a consulta usa o filtro direto por latitude/longitude
+GEO_MAX_CELLS = 2000
+# Raio médio da Terra em metros
+EARTH_RADIUS_M = 6371000.0
+
+
+def geo_cell(latitude: float, longitude: float) -> int:
+    """
+    Calcula a célula da grade espacial de uma coordenada.
+
+    A mesma fórmula é replicada em SQL nos gatilhos de `create_spatial_index`.
+
+    :param latitude: Latitude em graus.
+    :param longitude: Longitude em graus.
+    :return: Identificador inteiro da célula.
+    """
+    row = math.floor(latitude / GEO_CELL_SIZE) + GEO_ROW_OFFSET
+    col = math.floor(longitude / GEO_CELL_SIZE) + GEO_COL_OFFSET
+    return row * GEO_ROW_FACTOR + col
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Distância em metros entre duas coordenadas (fórmula de haversine).
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def radius_to_bbox(latitude: float, longitude: float, radius_m: float) -> tuple:
+    """
+    Retorna o retângulo (min_lat, max_lat, min_lon, max_lon) que envolve o círculo informado.
+    """
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    dlon = math.degrees(radius_m / (EARTH_RADIUS_M * max(math.cos(math.radians(latitude)), 1e-6)))
+    return latitude - dlat, latitude + dlat, longitude - dlon, longitude + dlon
+
+
 class UploadedDataDriver(GeneralDriver):
+    # Tabelas com índice espacial: só as posições do rastreamento são consultadas por área
+    SPATIAL_TABLES = ('vehicle_data',)
+
     def __init__(self, logger: CustomLogger, db_path: str, table: str = 'vehicle_data'):
         """
         Inicializa a classe UploadedDataDriver.
@@ -15,8 +66,11 @@ class UploadedDataDriver(GeneralDriver):
         """
         super().__init__(logger=logger, db_path=db_path)
         self.table = table
+        self.geo_table = f"{table}_geo" if table in self.SPATIAL_TABLES else None
         self.columns = ["truck_id", "data_iso", "vel", "latitude", "longitude", "uf", "cidade", "rua", "ignicao"]
         self.create_table()
+        if self.geo_table:
+            self.create_spatial_index()
 
     def create_table(self):
         """
@@ -44,6 +98,75 @@ class UploadedDataDriver(GeneralDriver):
         self.exec_query(query, log_success=False)
         self.logger.print("Tabela 'data' criada com sucesso.")
 
+    def create_spatial_index(self):
+        """
+        Cria o índice espacial em grade da tabela ('<tabela>_geo') e os gatilhos que o mantêm
+        atualizado a cada inserção, exclusão ou alteração de coordenadas.
+
+        O índice guarda (célula, data_iso, truck_id), de modo que consultas por área e janela de tempo
+        leem apenas as células envolvidas. Na primeira criação, os pontos já existentes são indexados.
+        """
+        self.logger.print(f"Criando índice espacial '{self.geo_table}'.")
+
+        existing = self.exec_query("SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+                                   params=(self.geo_table,), fetchone=True, log_success=False)
+
+        # floor() em SQL: CAST trunca em direção a zero, então corrige os valores negativos
+        def sql_floor(expr):
+            return f"(CAST({expr} AS INTEGER) - (({expr}) < CAST({expr} AS INTEGER)))"
+
+        def sql_cell(prefix):
+            lat = f"{prefix}.latitude / {GEO_CELL_SIZE}"
+            lon = f"{prefix}.longitude / {GEO_CELL_SIZE}"
+            return (f"(({sql_floor(lat)} + {GEO_ROW_OFFSET}) * {GEO_ROW_FACTOR} + "
+                    f"({sql_floor(lon)} + {GEO_COL_OFFSET}))")
+
+        queries = [
+            f'''
+                CREATE TABLE IF NOT EXISTS {self.geo_table} (
+                    cell INTEGER NOT NULL,
+                    data_iso TEXT NOT NULL,
+                    truck_id INTEGER NOT NULL,
+                    PRIMARY KEY (cell, data_iso, truck_id)
+                ) WITHOUT ROWID
+            ''',
+            f'''
+                CREATE TRIGGER IF NOT EXISTS {self.geo_table}_ai AFTER INSERT ON {self.table}
+                BEGIN
+                    INSERT OR REPLACE INTO {self.geo_table} (cell, data_iso, truck_id)
+                    VALUES ({sql_cell('NEW')}, NEW.data_iso, NEW.truck_id);
+                END
+            ''',
+            f'''
+                CREATE TRIGGER IF NOT EXISTS {self.geo_table}_ad AFTER DELETE ON {self.table}
+                BEGIN
+                    DELETE FROM {self.geo_table}
+                    WHERE cell = {sql_cell('OLD')} AND data_iso = OLD.data_iso AND truck_id = OLD.truck_id;
+                END
+            ''',
+            f'''
+                CREATE TRIGGER IF NOT EXISTS {self.geo_table}_au
+                AFTER UPDATE OF truck_id, data_iso, latitude, longitude ON {self.table}
+                BEGIN
+                    DELETE FROM {self.geo_table}
+                    WHERE cell = {sql_cell('OLD')} AND data_iso = OLD.data_iso AND truck_id = OLD.truck_id;
+                    INSERT OR REPLACE INTO {self.geo_table} (cell, data_iso, truck_id)
+                    VALUES ({sql_cell('NEW')}, NEW.data_iso, NEW.truck_id);
+                END
+            '''
+        ]
+        for query in queries:
+            self.exec_query(query, log_success=False)
+
+        if not existing:
+            row_count = self.exec_query(
+                f"INSERT OR IGNORE INTO {self.geo_table} (cell, data_iso, truck_id) "
+                f"SELECT {sql_cell(self.table)}, data_iso, truck_id FROM {self.table}",
+                log_success=False)
+            self.logger.register_log(f"Índice espacial '{self.geo_table}' criado com {row_count} ponto(s).")
+
+        self.logger.print(f"Índice espacial '{self.geo_table}' pronto.")
+
     def get_unique_truck_ids_and_plates(self):
         """
         Retorna os valores únicos de 'id' e 'placa' da tabela 'trucks', associando com a chave estrangeira 'truck_id'.
@@ -274,4 +397,160 @@ class UploadedDataDriver(GeneralDriver):
                 f"FROM {self.table} WHERE {conditions}"
 
         records = self.exec_query(query=query, params=where_values, fetchone=False, log_success=False)
-        return records
\ No newline at end of file
+        return records
+
+    def retrieve_fleet_by_datetime_range(self, start_datetime: str, end_datetime: str,
+                                         truck_ids: list = None) -> list:
+        """
+        Consulta, em uma única query, os registros de todos os caminhões (ou dos caminhões informados)
+        dentro de um intervalo de data e hora, já ordenados por caminhão e horário.
+
+        :param start_datetime: Data e hora inicial no formato 'YYYY-MM-DD HH:MM:SS'.
+        :param end_datetime: Data e hora final no formato 'YYYY-MM-DD HH:MM:SS'.
+        :param truck_ids: Lista opcional de IDs de caminhões para restringir a consulta.
+        :return: Lista de registros (truck_id, data_iso, vel, latitude, longitude, uf, cidade, rua, ignicao).
+        """
+        self.logger.print(
+            f"Consultando registros da frota entre '{start_datetime}' e '{end_datetime}' na tabela '{self.table}'.")
+
+        conditions = ["data_iso BETWEEN ? AND ?"]
+        params = [start_datetime, end_datetime]
+
+        if truck_ids:
+            conditions.append(f"truck_id IN ({', '.join(['?' for _ in truck_ids])})")
+            params.extend(truck_ids)
+
+        query = (
+            f"SELECT truck_id, data_iso, vel, latitude, longitude, uf, cidade, rua, ignicao "
+            f"FROM {self.table} WHERE {' AND '.join(conditions)} "
+            f"ORDER BY truck_id, data_iso"
+        )
+
+        return self.exec_query(query=query, params=tuple(params), fetchone=False, log_success=False)
+
+    def iter_by_datetime_range(self, start_datetime: str, end_datetime: str, truck_id: int = None,
+                               columns: list = None, batch_size: int = 1000):
+        """
+        Percorre os registros de um intervalo de data e hora com um cursor (`iter_query`), sem carregar tudo
+        em memória.
+
+        :param start_datetime: Data e hora inicial no formato 'YYYY-MM-DD HH:MM:SS'.
+        :param end_datetime: Data e hora final no formato 'YYYY-MM-DD HH:MM:SS'.
+        :param truck_id: ID do caminhão (opcional). Sem ele, percorre a frota inteira.
+        :param columns: Colunas a retornar (subconjunto de self.columns). Padrão: todas.
+        :param batch_size: Quantidade de linhas lidas do cursor por vez.
+        :return: Gerador de tuplas na ordem de `columns`.
+        :raises ValueError: Se alguma coluna não existir na tabela.
+        """
+        columns = columns or self.columns
+        invalid = [col for col in columns if col not in self.columns]
+        if invalid:
+            raise ValueError(f"Colunas inválidas: {invalid}")
+
+        conditions = ["data_iso BETWEEN ? AND ?"]
+        params = [start_datetime, end_datetime]
+        if truck_id is not None:
+            conditions.append("truck_id = ?")
+            params.append(truck_id)
+
+        query = (
+            f"SELECT {', '.join(columns)} FROM {self.table} "
+            f"WHERE {' AND '.join(conditions)} ORDER BY truck_id, data_iso"
+        )
+
+        self.logger.print(f"Iniciando leitura em fluxo da tabela '{self.table}' entre "
+                          f"'{start_datetime}' e '{end_datetime}' (truck_id={truck_id}).")
+        return self.iter_query(query, tuple(params), batch_size=batch_size)
+
+    def retrieve_in_bbox(self, min_lat: float, max_lat: float, min_lon: float, max_lon: float,
+                         start_datetime: str, end_datetime: str, truck_ids: list = None,
+                         stopped_only: bool = False) -> list:
+        """
+        Consulta os pontos dentro de um retângulo de coordenadas e de uma janela de tempo,
+        usando o índice espacial em grade para ler apenas as células envolvidas.
+
+        :param min_lat: Latitude mínima.
+        :param max_lat: Latitude máxima.
+        :param min_lon: Longitude mínima.
+        :param max_lon: Longitude máxima.
+        :param start_datetime: Data e hora inicial no formato 'YYYY-MM-DD HH:MM:SS'.
+        :param end_datetime: Data e hora final no formato 'YYYY-MM-DD HH:MM:SS'.
+        :param truck_ids: Lista opcional de IDs de caminhões.
+        :param stopped_only: Se True, retorna apenas pontos com velocidade zero.
+        :return: Lista de registros (truck_id, data_iso, vel, latitude, longitude, uf, cidade, rua, ignicao)
+                 ordenados por caminhão e horário.
+        """
+        if min_lat > max_lat or min_lon > max_lon:
+            raise ValueError("Retângulo inválido: os mínimos devem ser menores que os máximos.")
+
+        first_row, first_col = divmod(geo_cell(min_lat, min_lon), GEO_ROW_FACTOR)
+        last_row, last_col = divmod(geo_cell(max_lat, max_lon), GEO_ROW_FACTOR)
+        total_cells = (last_row - first_row + 1) * (last_col - first_col + 1)
+
+        conditions = ["v.latitude BETWEEN ? AND ?", "v.longitude BETWEEN ? AND ?"]
+        params = [min_lat, max_lat, min_lon, max_lon]
+
+        if truck_ids:
+            conditions.append(f"v.truck_id IN ({', '.join(['?' for _ in truck_ids])})")
+            params.extend(truck_ids)
+        if stopped_only:
+            conditions.append("v.vel = 0")
+
+        columns = ", ".join(f"v.{col}" for col in self.columns)
+
+        if self.geo_table and total_cells <= GEO_MAX_CELLS:
+            # Cada linha da grade vira uma faixa contígua de células
+            ranges = " OR ".join(["g.cell BETWEEN ? AND ?"] * (last_row - first_row + 1))
+            range_params = []
+            for row in range(first_row, last_row + 1):
+                range_params.extend([row * GEO_ROW_FACTOR + first_col, row * GEO_ROW_FACTOR + last_col])
+
+            query = (
+                f"SELECT {columns} FROM {self.geo_table} g "
+                f"JOIN {self.table} v ON v.truck_id = g.truck_id AND v.data_iso = g.data_iso "
+                f"WHERE ({ranges}) AND g.data_iso BETWEEN ? AND ? AND {' AND '.join(conditions)} "
+                f"ORDER BY v.truck_id, v.data_iso"
+            )
+            params = range_params + [start_datetime, end_datetime] + params
+        else:
+            query = (
+                f"SELECT {columns} FROM {self.table} v "
+                f"WHERE v.data_iso BETWEEN ? AND ? AND {' AND '.join(conditions)} "
+                f"ORDER BY v.truck_id, v.data_iso"
+            )
+            params = [start_datetime, end_datetime] + params
+
+        self.logger.print(f"Consultando pontos em área ({total_cells} célula(s)) entre "
+                          f"'{start_datetime}' e '{end_datetime}' na tabela '{self.table}'.")
+
+        return self.exec_query(query=query, params=tuple(params), fetchone=False, log_success=False)
+
+    def retrieve_in_radius(self, latitude: float, longitude: float, radius_m: float,
+                           start_datetime: str, end_datetime: str, truck_ids: list = None,
+                           stopped_only: bool = False) -> list:
+        """
+        Consulta os pontos a até `radius_m` metros de uma coordenada, dentro de uma janela de tempo.
+
+        :param latitude: Latitude do centro.
+        :param longitude: Longitude do centro.
+        :param radius_m: Raio em metros.
+        :param start_datetime: Data e hora inicial no formato 'YYYY-MM-DD HH:MM:SS'.
+        :param end_datetime: Data e hora final no formato 'YYYY-MM-DD HH:MM:SS'.
+        :param truck_ids: Lista opcional de IDs de caminhões.
+        :param stopped_only: Se True, retorna apenas pontos com velocidade zero.
+        :return: Lista de tuplas (registro..., distancia_m) ordenadas por caminhão e horário.
+        """
+        if radius_m <= 0:
+            raise ValueError("O raio deve ser maior que zero.")
+
+        min_lat, max_lat, min_lon, max_lon = radius_to_bbox(latitude, longitude, radius_m)
+        candidates = self.retrieve_in_bbox(min_lat, max_lat, min_lon, max_lon,
+                                           start_datetime, end_datetime,
+                                           truck_ids=truck_ids, stopped_only=stopped_only)
+
+        results = []
+        for record in candidates:
+            distance = haversine_m(latitude, longitude, record[3], record[4])
+            if distance <= radius_m:
+                results.append(tuple(record) + (round(distance, 1),))
+        return results
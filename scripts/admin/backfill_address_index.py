@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Carga inicial do índice de endereços (address_index) com os pontos que já estão no banco.
+
+Depois da carga, o índice é mantido pelos uploads Sascar/Positron; o script só precisa ser executado uma vez
+(ou de novo após uma importação direta no banco). Pode ser interrompido e executado outra vez sem duplicar
+endereços.
+
+Uso (a partir da raiz do projeto):
+    python scripts/admin/backfill_address_index.py          # lotes de 20000 linhas
+    python scripts/admin/backfill_address_index.py 5000     # lotes de 5000 linhas
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from controller.utils import CustomLogger
+from global_vars import DB_PATH, DEBUG
+from model.drivers.address_index_driver import AddressIndexDriver, ADDRESS_BACKFILL_BATCH
+
+
+if __name__ == "__main__":
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else ADDRESS_BACKFILL_BATCH
+
+    logger = CustomLogger(source="ADDRESS_INDEX", debug=DEBUG)
+    driver = AddressIndexDriver(logger=logger, db_path=DB_PATH)
+
+    print(f"📍 Alimentando o índice de endereços em lotes de {batch_size} linha(s)...")
+
+    def report(table, rowid, sent):
+        print(f"   {table}: até o rowid {rowid} ({sent} enviadas)")
+
+    started = time.perf_counter()
+    total = driver.backfill(batch_size=batch_size, progress=report)
+    print(f"✅ {total} ponto(s) enviados ao índice em {time.perf_counter() - started:.1f}s")
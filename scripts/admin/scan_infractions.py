@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Varredura de infrações de todos os motoristas ativos da jornada.
+
+Uso (a partir da raiz do projeto):
+    python scripts/admin/scan_infractions.py                         # ontem
+    python scripts/admin/scan_infractions.py 01-05-2025 31-05-2025   # período
+    python scripts/admin/scan_infractions.py 01-05-2025 31-05-2025 4 # período com 4 processos
+
+Pode ser agendado para rodar todas as noites: infrações já gravadas não são duplicadas.
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from controller.infractions_batch import run_batch_scan
+from global_vars import DB_PATH, INFRACTION_SCAN_WORKERS
+
+
+if __name__ == "__main__":
+    yesterday = (datetime.now() - timedelta(days=1)).strftime('%d-%m-%Y')
+    start = sys.argv[1] if len(sys.argv) > 1 else yesterday
+    end = sys.argv[2] if len(sys.argv) > 2 else start
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else INFRACTION_SCAN_WORKERS
+
+    print(f"🔎 Varrendo infrações de {start} a {end}...")
+    summary = run_batch_scan(DB_PATH, start, end, max_workers=workers)
+
+    print(f"📋 Motoristas: {summary['motoristas']}")
+    print(f"⚠️  Infrações encontradas: {summary['infracoes']} (gravadas: {summary['gravadas']})")
+    for error in summary['erros']:
+        print(f"❌ Motorista {error['motorist_id']}: {error['erro']}")
+    print(f"✅ Concluído em {summary['tempo_s']}s")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark do fechamento por período em função do tamanho do histórico do motorista.
+
+Para cada tamanho de histórico (em anos), grava em um banco temporário um motorista com uma jornada por dia
+útil e folgas nos fins de semana e mede, para o último mês do histórico:
+
+- consulta: `ClosureReportService.compute` (filtro e ordenação no SQL, índice motorist_id + date_iso);
+- consulta_antiga: a leitura anterior (todo o histórico ordenado por strftime(substr(...)) e filtro em Python);
+- excel: geração completa do Excel de fechamento (`fill_excel_fecham` + save), se o openpyxl estiver instalado.
+
+A consulta e o Excel devem ficar praticamente constantes com o aumento do histórico.
+
+Uso (a partir da raiz do projeto):
+    python scripts/bench/closure_period_bench.py
+    python scripts/bench/closure_period_bench.py --anos 1 5 10 20 --repeat 30
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from io import BytesIO
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+WEEK_DAYS = ['Segunda-feira', 'Terça-feira', 'Quarta-feira', 'Quinta-feira', 'Sexta-feira', 'Sábado', 'Domingo']
+END_DATE = datetime(2025, 6, 30)
+
+
+def seed_history(db_file: str, years: int) -> int:
+    """Grava o histórico sintético do motorista 1 e retorna a quantidade de linhas gravadas."""
+    conn = sqlite3.connect(db_file)
+    conn.execute("INSERT INTO motorists (id, nome) VALUES (1, 'MOTORISTA BENCHMARK')")
+    conn.execute("INSERT INTO trucks (id, placa) VALUES (1, 'RPZ0001')")
+
+    journeys, dayoffs = [], []
+    day = END_DATE - timedelta(days=365 * years - 1)
+    while day <= END_DATE:
+        data = day.strftime('%d-%m-%Y')
+        if day.weekday() >= 5:
+            dayoffs.append((1, data, 'FOLGA', 0.0, 0.0))
+        else:
+            journeys.append((1, 1, data, WEEK_DAYS[day.weekday()], '07:00', '11:00', '12:00', '17:30', '',
+                             '01:00', '00:15', '09:30', '08:00', '01:30', '00:00', '00:00', 90.0, 25.5))
+        day += timedelta(days=1)
+
+    conn.executemany('''
+        INSERT INTO perm_data_fecham (motorist_id, truck_id, data, dia_da_semana, inicio_jornada, in_refeicao,
+            fim_refeicao, fim_jornada, observacao, tempo_refeicao, tempo_intervalo, jornada_total, carga_horaria,
+            hextra_50, hextra_100, he_noturno, daily_value, food_value)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', journeys)
+    conn.executemany("INSERT INTO dayoff_fecham (motorist_id, data, motivo, daily_value, food_value) "
+                     "VALUES (?, ?, ?, ?, ?)", dayoffs)
+    conn.commit()
+    conn.close()
+    return len(journeys) + len(dayoffs)
+
+
+def legacy_fetch(db_file: str, motorist_id: int, start: datetime, end: datetime) -> list:
+    """Leitura anterior: todo o histórico ordenado por expressão e filtrado em Python."""
+    conn = sqlite3.connect(db_file)
+    cursor = conn.cursor()
+    order_by = "ORDER BY strftime('%Y-%m-%d', substr({0}, 7, 4) || '-' || substr({0}, 4, 2) || '-' || substr({0}, 1, 2))"
+    cursor.execute(f"""
+        SELECT p.data, p.dia_da_semana, p.inicio_jornada, p.in_refeicao, p.fim_refeicao, p.fim_jornada,
+               p.observacao, p.tempo_refeicao, p.tempo_intervalo, p.jornada_total, p.carga_horaria, p.hextra_50,
+               p.hextra_100, p.he_noturno, p.daily_value, p.food_value, t.placa
+        FROM perm_data_fecham p LEFT JOIN trucks t ON p.truck_id = t.id
+        WHERE p.motorist_id = ? {order_by.format('p.data')}
+    """, (motorist_id,))
+    journeys = [row for row in cursor.fetchall() if start <= datetime.strptime(row[0], '%d-%m-%Y') <= end]
+    cursor.execute(f"SELECT data, motivo, daily_value, food_value FROM dayoff_fecham WHERE motorist_id = ? "
+                   f"{order_by.format('data')}", (motorist_id,))
+    dayoffs = [row for row in cursor.fetchall() if start <= datetime.strptime(row[0], '%d-%m-%Y') <= end]
+    conn.close()
+    return journeys + dayoffs
+
+
+def median_ms(func, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def run(years_list, repeat: int):
+    from controller.utils import CustomLogger
+    from controller.closure_report import ClosureReportService
+    from model.drivers.motorist_driver import MotoristDriver
+    from model.drivers.truck_driver import TruckDriver
+
+    try:
+        from controller.data import fill_excel_fecham
+    except ImportError:
+        fill_excel_fecham = None
+
+    logger = CustomLogger(source="CLOSURE_BENCH", debug=False)
+    start = END_DATE.replace(day=1)
+
+    print(f"{'anos':>5} {'linhas':>8} {'consulta (ms)':>14} {'consulta_antiga (ms)':>21} {'excel (ms)':>11}")
+    for years in years_list:
+        with tempfile.TemporaryDirectory(prefix='closure_bench_') as workdir:
+            db_file = os.path.join(workdir, 'bench.db')
+            MotoristDriver(logger=logger, db_path=db_file)
+            TruckDriver(logger=logger, db_path=db_file)
+            service = ClosureReportService(logger=logger, db_path=db_file)
+            rows = seed_history(db_file, years)
+
+            query_ms = median_ms(lambda: service.compute(1, start, END_DATE), repeat)
+            legacy_ms = median_ms(lambda: legacy_fetch(db_file, 1, start, END_DATE), repeat)
+
+            excel = '-'
+            if fill_excel_fecham is not None:
+                def build_excel():
+                    result = service.compute(1, start, END_DATE)
+                    wb = fill_excel_fecham(name=result.motorist_name, start=start.strftime('%d/%m/%Y'),
+                                           end=END_DATE.strftime('%d/%m/%Y'), tabela=result.excel_rows(),
+                                           totals=result.excel_totals())
+                    wb.save(BytesIO())
+                excel = f"{median_ms(build_excel, max(1, repeat // 5)):.1f}"
+
+            print(f"{years:>5} {rows:>8} {query_ms:>14.2f} {legacy_ms:>21.2f} {excel:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--anos', type=int, nargs='+', default=[1, 5, 10, 20], help='Tamanhos de histórico (anos)')
+    parser.add_argument('--repeat', type=int, default=20, help='Repetições por medida (mediana)')
+    args = parser.parse_args()
+
+    # Os templates Excel são resolvidos a partir da raiz do projeto
+    os.chdir(ROOT)
+    run(args.anos, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark da geração dos PDFs de um período de 31 dias.
+
+Mede (mediana em ms):
+
+- jornada: `fill_pdf` (relatório de jornada), com infrações em parte dos dias;
+- fechamento: `generate_closure_pdf_report` (espelho de ponto).
+
+Para comparar antes/depois, rode o mesmo script na versão atual e em um checkout anterior (sem
+controller/pdf_report.py o espelho de ponto é importado de view/closure_routes.py).
+
+Resultado de referência (31 dias, --repeat 200, mediana de 3 execuções alternadas na mesma máquina):
+
+    relatório    antes (ms)   depois (ms)
+    jornada           81.7          77.3
+    fechamento        25.9          24.2
+
+"antes" é o commit anterior ao reaproveitamento dos estilos do ReportLab. O ganho é pequeno (5-7%): a maior
+parte do tempo está no layout das tabelas e na escrita do PDF, não na criação dos estilos.
+
+Uso (a partir da raiz do projeto):
+    python scripts/bench/pdf_report_bench.py
+    python scripts/bench/pdf_report_bench.py --dias 31 --repeat 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+WEEK_DAYS = ['Segunda-feira', 'Terça-feira', 'Quarta-feira', 'Quinta-feira', 'Sexta-feira', 'Sábado', 'Domingo']
+START_DATE = datetime(2025, 5, 1)
+INFRACTIONS = ("Tempo de direção sem pausa excedido (05:40);|Interstício inferior a 11 horas (09:15);"
+               "|Jornada diária superior ao limite (12:30)")
+
+
+def journey_rows(days: int) -> list:
+    """Linhas do relatório de jornada (mesma ordem de colunas usada por fill_pdf)."""
+    rows = []
+    for offset in range(days):
+        day = START_DATE + timedelta(days=offset)
+        # Infrações em um a cada três dias, como nos relatórios reais
+        infractions = INFRACTIONS if offset % 3 == 0 else ''
+        rows.append([day.strftime('%d-%m-%Y'), WEEK_DAYS[day.weekday()], 'RPZ0001', '07:00', '11:00', '12:00',
+                     '17:30', '01:00', '11:30', '00:15', '00:40', '09:30', '07:10', '05:40', infractions])
+    return rows
+
+
+def closure_rows(days: int) -> list:
+    """Linhas do espelho de ponto (formato de ClosureResult.pdf_rows)."""
+    rows = []
+    for offset in range(days):
+        day = START_DATE + timedelta(days=offset)
+        rows.append({
+            'placa': 'RPZ0001', 'data': day.strftime('%d/%m/%Y'), 'dia_semana': WEEK_DAYS[day.weekday()][:3],
+            'inicio_jornada': '07:00', 'almoco_inicio': '11:00', 'almoco_fim': '12:00', 'fim_jornada': '17:30',
+            'intervalo': '00:15', 'h_trab': '09:30', 'carga_horaria': '08:00', 'h_extra50': '01:30',
+            'h_extra100': '00:00', 'h_e_not': '00:00', 'ad_not': '00:00', 'diaria': 'R$ 90,00',
+            'aj_aliment': 'R$ 25,50'
+        })
+    return rows
+
+
+JOURNEY_TOTALS = {'refeicao': '31:00', 'intersticio': '356:30', 'intervalo': '07:45', 'carga': '20:40',
+                  'jornada': '294:30', 'direcao': '222:10', 'sem_pausa': '175:40', 'infracoes': 11}
+CLOSURE_TOTALS = {'intervalo': '07:45', 'almoco': '31:00', 'h_trab': '294:30', 'carga_horaria': '248:00',
+                  'h_extra50': '46:30', 'h_extra100': '00:00', 'h_e_not': '00:00', 'ad_not': '00:00',
+                  'diaria': 'R$ 2.790,00', 'aj_aliment': 'R$ 790,50'}
+
+
+def median_ms(func, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def run(days: int, repeat: int):
+    from controller.data import fill_pdf
+    try:
+        from controller.pdf_report import generate_closure_pdf_report
+    except ImportError:
+        from view.closure_routes import generate_closure_pdf_report
+
+    journey = journey_rows(days)
+    closure = closure_rows(days)
+    end = (START_DATE + timedelta(days=days - 1)).strftime('%d/%m/%Y')
+    start = START_DATE.strftime('%d/%m/%Y')
+
+    def build_journey():
+        return fill_pdf(name='MOTORISTA BENCHMARK', start=start, end=end, tabela=journey, totals=JOURNEY_TOTALS)
+
+    def build_closure():
+        return generate_closure_pdf_report(motorist_name='MOTORISTA BENCHMARK', motorist_cpf='000.000.000-00',
+                                           from_date=start, to_date=end, data=closure, totals=CLOSURE_TOTALS,
+                                           folgas_line='Folgas: -')
+
+    # Aquecimento (imports, fontes e caches)
+    build_journey()
+    build_closure()
+
+    print(f"{'relatório':<12} {'dias':>5} {'mediana (ms)':>13} {'tamanho (KB)':>13}")
+    for label, func in (('jornada', build_journey), ('fechamento', build_closure)):
+        size_kb = len(func()) / 1024
+        print(f"{label:<12} {days:>5} {median_ms(func, repeat):>13.2f} {size_kb:>13.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dias', type=int, default=31, help='Dias do período')
+    parser.add_argument('--repeat', type=int, default=30, help='Repetições por medida (mediana)')
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    run(args.dias, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,597 @@
+#!/usr/bin/env python3
+"""
+Replay dos cálculos de conformidade e fechamento sobre um conjunto fixo de entradas (golden dataset).
+
+As saídas das implementações atuais são gravadas uma vez ("freeze") em scripts/replay/golden/ e qualquer
+nova implementação pode ser comparada com elas ("diff") e cronometrada ("time") antes de substituir a atual.
+
+Suítes:
+- infracoes: `compute_infractions` sobre jornadas sintéticas (vários motoristas, folgas, sequências longas,
+  refeições curtas, interstícios curtos, pausas de carga/descarga).
+- descansos: `generate_rests_df` (velocidade e ignição) dia a dia sobre os arquivos de raw_data/ e sobre
+  posições sintéticas.
+- carga_horaria: `CargaHorariaCalculator` sobre todas as combinações de critério, dia da semana, feriado e
+  carga horária configurada.
+- fechamento: células do Excel de `/closure_reports_download` (linhas e totais do espelho de ponto, os mesmos
+  dados do PDF) sobre um banco temporário com jornadas e folgas sintéticas.
+
+Uso (a partir da raiz do projeto):
+    python scripts/replay/golden_replay.py freeze                    # grava as saídas atuais de todas as suítes
+    python scripts/replay/golden_replay.py freeze infracoes          # só uma suíte
+    python scripts/replay/golden_replay.py diff                      # compara as implementações atuais
+    python scripts/replay/golden_replay.py diff infracoes --engine infracoes=linha_a_linha
+    python scripts/replay/golden_replay.py diff infracoes --engine infracoes=meu.modulo:minha_funcao
+    python scripts/replay/golden_replay.py time descansos --repeat 5
+
+O motor de cada suíte pode ser trocado com --engine suíte=nome (motores conhecidos, ver ENGINES) ou
+suíte=modulo:funcao. Para a suíte fechamento, o motor é o caminho da rota.
+"""
+import io
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import traceback
+from datetime import date, datetime, time as dt_time, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+import pandas as pd
+
+GOLDEN_DIR = os.path.join(ROOT, 'scripts', 'replay', 'golden')
+RAW_DATA_DIR = os.path.join(ROOT, 'raw_data')
+SEED = 20250501
+
+WEEK_DAYS = ['Segunda-feira', 'Terça-feira', 'Quarta-feira', 'Quinta-feira', 'Sexta-feira', 'Sábado', 'Domingo']
+
+
+# ---------------------------------------------------------------------------------------------------------------
+# Normalização das saídas
+# ---------------------------------------------------------------------------------------------------------------
+
+def to_jsonable(value):
+    """Converte a saída de um motor em uma estrutura JSON estável (datas em ISO, NaN/NaT como None)."""
+    if isinstance(value, pd.DataFrame):
+        return {'colunas': [str(c) for c in value.columns],
+                'linhas': [[to_jsonable(v) for v in row] for row in value.itertuples(index=False, name=None)]}
+    if isinstance(value, pd.Series):
+        return [to_jsonable(v) for v in value.tolist()]
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, (pd.Timestamp, datetime, date, dt_time)):
+        return None if pd.isna(value) else value.isoformat()
+    if isinstance(value, timedelta):
+        return None if pd.isna(value) else value.total_seconds()
+    if value is None or isinstance(value, (str, bool)):
+        return value
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float):
+        return round(value, 6)
+    return value
+
+
+def run_case(engine_runner, engine, case_input):
+    """Executa um caso; exceções também fazem parte da saída esperada."""
+    try:
+        return to_jsonable(engine_runner(engine, case_input))
+    except Exception as e:
+        return {'erro': f"{type(e).__name__}: {e}"}
+
+
+def first_difference(expected, actual, path='$'):
+    """Retorna o caminho e os valores da primeira diferença entre duas saídas, ou None se forem iguais."""
+    if type(expected) is not type(actual):
+        return path, expected, actual
+    if isinstance(expected, dict):
+        for key in sorted(set(expected) | set(actual)):
+            if key not in expected or key not in actual:
+                return f'{path}.{key}', expected.get(key), actual.get(key)
+            found = first_difference(expected[key], actual[key], f'{path}.{key}')
+            if found:
+                return found
+        return None
+    if isinstance(expected, list):
+        for i, (e, a) in enumerate(zip(expected, actual)):
+            found = first_difference(e, a, f'{path}[{i}]')
+            if found:
+                return found
+        if len(expected) != len(actual):
+            return f'{path}.length', len(expected), len(actual)
+        return None
+    return None if expected == actual else (path, expected, actual)
+
+
+# ---------------------------------------------------------------------------------------------------------------
+# Suíte: infrações
+# ---------------------------------------------------------------------------------------------------------------
+
+def _hm(moment: datetime) -> str:
+    return moment.strftime('%H:%M')
+
+
+def synthetic_journey_records(rng: random.Random, start: datetime, days: int) -> list:
+    """
+    Gera os registros da tabela da análise (mesmas chaves do JSON enviado pela tela) de um motorista.
+    """
+    from controller.infractions import JSON_RECORD_FIELDS
+
+    records = []
+    previous_end = None
+    run_length = 0
+
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        record = {key: '' for _, key in JSON_RECORD_FIELDS}
+        record['Data'] = day.strftime('%d-%m-%Y')
+        record['Dia da Semana'] = WEEK_DAYS[day.weekday()]
+
+        # Folgas: em geral após 5-6 dias, às vezes só após 8 (dias consecutivos), às vezes seguidas
+        off_probability = 0.05 if run_length < 5 else (0.15 if rng.random() < 0.3 else 0.6)
+        if rng.random() < off_probability:
+            if rng.random() < 0.5:
+                record['Observação'] = rng.choice(['FOLGA', 'ATESTADO', 'FÉRIAS'])
+            records.append(record)
+            run_length = 0
+            continue
+
+        begin = day.replace(hour=rng.randint(3, 9), minute=rng.choice([0, 5, 10, 15, 30, 45]))
+        if previous_end is not None and rng.random() < 0.15:
+            # Interstício curto
+            begin = max(begin, previous_end + timedelta(hours=rng.randint(6, 10)))
+            if begin.date() != day.date():
+                begin = day.replace(hour=9, minute=0)
+        end = min(begin + timedelta(minutes=rng.randint(7 * 60, 15 * 60)), day.replace(hour=23, minute=50))
+
+        record['Início Jornada'] = _hm(begin)
+        record['Fim de Jornada'] = _hm(end)
+
+        cursor = begin + timedelta(minutes=rng.randint(60, 200))
+        if rng.random() < 0.9:
+            meal = rng.choice([30, 45, 60, 60, 75, 90])
+            record['In. Refeição'] = _hm(cursor)
+            record['Fim Refeição'] = _hm(cursor + timedelta(minutes=meal))
+            cursor += timedelta(minutes=meal + rng.randint(60, 240))
+
+        for i in range(1, rng.randint(1, 5)):
+            if cursor + timedelta(minutes=20) >= end:
+                break
+            rest = rng.choice([5, 10, 15, 20, 30])
+            record[f'In. Descanso {i}'] = _hm(cursor)
+            record[f'Fim Descanso {i}'] = _hm(cursor + timedelta(minutes=rest))
+            cursor += timedelta(minutes=rest + rng.randint(30, 400))
+
+        if rng.random() < 0.3:
+            slot_start = begin + timedelta(minutes=rng.randint(10, 60))
+            if slot_start + timedelta(minutes=40) < end:
+                record['In. Car/Desc 1'] = _hm(slot_start)
+                record['Fim Car/Desc 1'] = _hm(slot_start + timedelta(minutes=rng.randint(10, 40)))
+
+        if previous_end is not None:
+            gap_minutes = int((begin - previous_end).total_seconds() // 60)
+            record['Interstício'] = f'{gap_minutes // 60:02}:{gap_minutes % 60:02}'
+
+        records.append(record)
+        previous_end = end
+        run_length += 1
+
+    return records
+
+
+def build_infraction_cases() -> dict:
+    rng = random.Random(SEED)
+    cases = {}
+    for motorist in range(1, 9):
+        start = datetime(2025, 1, 1) + timedelta(days=rng.randint(0, 200))
+        cases[f'motorista_{motorist}'] = synthetic_journey_records(rng, start, rng.choice([7, 30, 45, 60]))
+
+    # Bordas: um único dia e dia com interstício inválido a partir do segundo dia
+    single = synthetic_journey_records(random.Random(SEED + 1), datetime(2025, 3, 3), 1)
+    cases['dia_unico'] = single
+    broken = synthetic_journey_records(random.Random(SEED + 2), datetime(2025, 3, 3), 10)
+    worked = [r for r in broken if r['Início Jornada'] and not r['Observação']]
+    if len(worked) > 1:
+        worked[1]['Interstício'] = 'xx'
+    cases['intersticio_invalido'] = broken
+    return cases
+
+
+def _infractions_rowwise(df):
+    from controller.infractions import compute_infractions_rowwise
+    from controller.infractions_data import get_sorted_events_with_work_periods
+
+    df = df.copy()
+    df['sorted_events'] = df.apply(get_sorted_events_with_work_periods, axis=1)
+    return compute_infractions_rowwise(df)
+
+
+def run_infractions(engine, records):
+    from controller.infractions import convert_json_to_df
+
+    df = convert_json_to_df(table_records=records, motorist_id=1, truck_id=1)
+    if df is None:
+        return []
+    df['week_start'] = 0
+    return engine(df)
+
+
+# ---------------------------------------------------------------------------------------------------------------
+# Suíte: descansos
+# ---------------------------------------------------------------------------------------------------------------
+
+POSITION_COLUMNS = ['truck_id', 'data_iso', 'vel', 'latitude', 'longitude', 'uf', 'cidade', 'rua', 'ignicao']
+
+
+def synthetic_positions(rng: random.Random, day: datetime) -> pd.DataFrame:
+    """Gera as posições de um dia (uma a cada 2 minutos) alternando blocos de direção e de parada."""
+    rows = []
+    moment = day.replace(hour=rng.randint(0, 5))
+    end = day.replace(hour=23, minute=58)
+    moving = False
+    while moment < end:
+        block = rng.randint(3, 90)
+        for _ in range(block):
+            if moment >= end:
+                break
+            vel = rng.randint(20, 90) if moving else (rng.choice([0, 0, 0, 3]))
+            ignition = 'Ligada' if moving or rng.random() < 0.2 else 'Desligada'
+            rows.append((1, moment.strftime('%Y-%m-%d %H:%M:%S'), vel, -19.9 + rng.random() / 100,
+                         -43.9 + rng.random() / 100, 'MG', 'Belo Horizonte', f'Rua {rng.randint(1, 40)}', ignition))
+            moment += timedelta(minutes=2)
+        moving = not moving
+    return pd.DataFrame(rows, columns=POSITION_COLUMNS)
+
+
+def build_rest_cases() -> dict:
+    from controller.data import extract_data
+
+    cases = {}
+    for system in sorted(os.listdir(RAW_DATA_DIR)) if os.path.isdir(RAW_DATA_DIR) else []:
+        folder = os.path.join(RAW_DATA_DIR, system)
+        for filename in sorted(os.listdir(folder)):
+            try:
+                df = extract_data(filepath=os.path.join(folder, filename), system_type=system)
+            except Exception as e:
+                print(f"⚠️  {system}/{filename} ignorado: {type(e).__name__}: {e}")
+                continue
+            if df is None or df.empty:
+                continue
+            df['truck_id'] = 1
+            df = df.dropna(subset=['data_iso'])
+            for day_iso in sorted(df['data_iso'].str[:10].unique()):
+                day_df = df[df['data_iso'].str[:10] == day_iso][POSITION_COLUMNS].reset_index(drop=True)
+                cases[f'{system}/{filename}/{day_iso}'] = day_df
+
+    rng = random.Random(SEED)
+    for offset in range(5):
+        day = datetime(2025, 5, 5) + timedelta(days=offset)
+        cases[f'sintetico/{day:%Y-%m-%d}'] = synthetic_positions(rng, day)
+    return cases
+
+
+def run_rests(engine, day_df):
+    return {mode: engine(day_df.copy(), mode=mode) for mode in ('vel', 'ignicao')}
+
+
+# ---------------------------------------------------------------------------------------------------------------
+# Suíte: carga horária
+# ---------------------------------------------------------------------------------------------------------------
+
+def build_workload_cases() -> dict:
+    criterios = ['GARAGEM', 'CARGA/DESCARGA', 'FÉRIAS', 'ATESTADO', 'AFASTAMENTO', 'FOLGA', 'LIC. ÓBITO']
+    cases = {}
+    for criterio in criterios:
+        for dia_semana in WEEK_DAYS:
+            for feriado in (False, True):
+                for configurada in ('Padrão', '06:00', '10:00'):
+                    cases[f'{criterio}|{dia_semana}|{"feriado" if feriado else "normal"}|{configurada}'] = {
+                        'criterio': criterio, 'dia_semana': dia_semana, 'data': '25-12-2025',
+                        'feriados': ['25-12-2025'] if feriado else [], 'configurada': configurada
+                    }
+    return cases
+
+
+def run_workload(engine, case):
+    return {
+        'carga_horaria': engine.calcular_carga_horaria_especial(case['criterio'], case['dia_semana'], case['data'],
+                                                                case['feriados'], case['configurada']),
+        'horas_trabalhadas': [engine.calcular_horas_trabalhadas_especial(minutes, case['criterio'])
+                              for minutes in (0, 300, 600)],
+        'hora_extra_50': [engine.calcular_hora_extra_50_especial(minutes, case['configurada'], case['criterio'])
+                          for minutes in (0, 300, 600)]
+    }
+
+
+# ---------------------------------------------------------------------------------------------------------------
+# Suíte: fechamento
+# ---------------------------------------------------------------------------------------------------------------
+
+def _minutes_hm(minutes: int) -> str:
+    return f'{minutes // 60:02}:{minutes % 60:02}'
+
+
+def seed_closure_db(db_file: str, rng: random.Random) -> list:
+    """
+    Grava motoristas, caminhões, jornadas, folgas e classificações sintéticas no banco temporário.
+
+    :return: Lista de motorist_id gravados.
+    """
+    conn = sqlite3.connect(db_file)
+    motorist_ids = []
+    for motorist_id in range(1, 5):
+        conn.execute("INSERT INTO motorists (id, nome) VALUES (?, ?)", (motorist_id, f'MOTORISTA {motorist_id}'))
+        conn.execute("INSERT INTO trucks (id, placa) VALUES (?, ?)", (motorist_id, f'RPZ{motorist_id:04}'))
+        motorist_ids.append(motorist_id)
+
+        for offset in range(62):
+            day = datetime(2025, 4, 20) + timedelta(days=offset)
+            data = day.strftime('%d-%m-%Y')
+            if rng.random() < 0.18:
+                conn.execute("INSERT INTO dayoff_fecham (motorist_id, data, motivo, daily_value, food_value) "
+                             "VALUES (?, ?, ?, ?, ?)",
+                             (motorist_id, data, rng.choice(['FOLGA', 'FÉRIAS', 'ATESTADO']), 0.0, 0.0))
+                continue
+
+            begin = rng.randint(4 * 60, 9 * 60)
+            total = rng.randint(6 * 60, 13 * 60)
+            meal = rng.choice([0, 45, 60, 90])
+            interval = rng.choice([0, 10, 25, 40])
+            carga = 0 if day.weekday() == 6 else (240 if day.weekday() == 5 else 480)
+            extra = total - carga
+            conn.execute('''
+                INSERT INTO perm_data_fecham (motorist_id, truck_id, data, dia_da_semana, inicio_jornada, in_refeicao,
+                    fim_refeicao, fim_jornada, observacao, tempo_refeicao, tempo_intervalo, jornada_total, carga_horaria,
+                    hextra_50, hextra_100, he_noturno, daily_value, food_value)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (motorist_id, motorist_id, data, WEEK_DAYS[day.weekday()], _minutes_hm(begin),
+                  _minutes_hm(begin + 240) if meal else '', _minutes_hm(begin + 240 + meal) if meal else '',
+                  _minutes_hm(min(begin + total + meal, 23 * 60 + 59)), '', _minutes_hm(meal), _minutes_hm(interval),
+                  _minutes_hm(total), _minutes_hm(carga),
+                  ('-' if extra < 0 else '') + _minutes_hm(abs(extra)) if day.weekday() != 6 else '00:00',
+                  _minutes_hm(total) if day.weekday() == 6 else '00:00',
+                  _minutes_hm(rng.choice([0, 0, 30, 75])), rng.choice([90.0, 90.0, 120.0]), rng.choice([0.0, 25.5])))
+
+            if rng.random() < 0.2:
+                try:
+                    conn.execute("INSERT INTO closure_block_classifications (motorist_id, data, truck_id, classification) "
+                                 "VALUES (?, ?, ?, ?)",
+                                 (motorist_id, data, motorist_id,
+                                  rng.choice(['VALIDO', 'GARAGEM', 'CARGA_DESCARGA', 'INVALIDO'])))
+                except sqlite3.OperationalError:
+                    pass
+    conn.commit()
+    conn.close()
+    return motorist_ids
+
+
+class ClosureReplay:
+    """
+    Executa a rota de fechamento com o cliente de testes do Flask, com o diretório de trabalho em uma pasta
+    temporária (o caminho do banco em global_vars e o dos modelos do Excel são relativos).
+    """
+
+    def __init__(self):
+        self.previous_cwd = os.getcwd()
+        self.workdir = tempfile.mkdtemp(prefix='golden_replay_')
+        os.chdir(self.workdir)
+        os.makedirs('dbs', exist_ok=True)
+        # Os modelos do Excel também são lidos por caminho relativo
+        shutil.copytree(os.path.join(ROOT, 'file_templates'), 'file_templates')
+
+        from app import app
+        from global_vars import DB_PATH
+
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        with self.client.session_transaction() as session:
+            session['user'] = {'name': 'Replay', 'email': 'replay@local', 'is_admin': True}
+
+        self.motorist_ids = seed_closure_db(DB_PATH, random.Random(SEED))
+
+    def close(self):
+        os.chdir(self.previous_cwd)
+
+    def cases(self) -> dict:
+        periods = [('2025-05-01', '2025-05-31'), ('2025-04-20', '2025-06-20'), ('2025-06-10', '2025-06-12')]
+        return {f'motorista_{m}|{start}|{end}': {'motorist_id': m, 'from_date': start, 'to_date': end,
+                                                 'format': 'excel'}
+                for m in self.motorist_ids for start, end in periods}
+
+    def run(self, route, params):
+        response = self.client.get(route, query_string=params)
+        if response.mimetype != 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet':
+            body = response.get_data(as_text=True)
+            return {'status': response.status_code,
+                    'corpo': [line.strip() for line in body.splitlines() if line.strip()]}
+
+        # Só os valores das células: o arquivo em si muda a cada geração (datas internas do .xlsx)
+        from openpyxl import load_workbook
+        sheet = load_workbook(io.BytesIO(response.get_data())).active
+        rows = [list(row) for row in sheet.iter_rows(values_only=True) if any(v not in (None, '') for v in row)]
+        return {'status': response.status_code, 'celulas': rows}
+
+
+# ---------------------------------------------------------------------------------------------------------------
+# Registro das suítes e motores
+# ---------------------------------------------------------------------------------------------------------------
+
+def _current_infractions(df):
+    from controller.infractions import compute_infractions
+    return compute_infractions(df)
+
+
+def _current_rests(df, mode):
+    from controller.data import generate_rests_df
+    return generate_rests_df(df, mode=mode)
+
+
+def _current_workload():
+    from controller.carga_horaria_calculator import CargaHorariaCalculator
+    return CargaHorariaCalculator
+
+
+# Motores conhecidos de cada suíte; o primeiro é o usado no freeze
+ENGINES = {
+    'infracoes': {'atual': lambda: _current_infractions, 'linha_a_linha': lambda: _infractions_rowwise},
+    'descansos': {'atual': lambda: _current_rests},
+    'carga_horaria': {'atual': _current_workload},
+    'fechamento': {'atual': lambda: '/closure_reports_download'},
+}
+
+SUITES = {
+    'infracoes': (build_infraction_cases, run_infractions),
+    'descansos': (build_rest_cases, run_rests),
+    'carga_horaria': (build_workload_cases, run_workload),
+}
+
+
+def resolve_engine(suite: str, spec: str = None):
+    """Resolve o motor de uma suíte a partir do nome conhecido ou de 'modulo:funcao' (caminho da rota no fechamento)."""
+    if not spec:
+        return ENGINES[suite]['atual']()
+    if spec in ENGINES[suite]:
+        return ENGINES[suite][spec]()
+    if suite == 'fechamento':
+        return spec
+    module_name, _, attribute = spec.partition(':')
+    module = __import__(module_name, fromlist=[attribute])
+    return getattr(module, attribute)
+
+
+def replay_suite(suite: str, engine, repeat: int = 1) -> tuple:
+    """
+    Executa todos os casos de uma suíte.
+
+    :return: Tupla (saídas por caso, tempo médio (s) por caso).
+    """
+    closure = None
+    if suite == 'fechamento':
+        closure = ClosureReplay()
+        cases, runner = closure.cases(), closure.run
+    else:
+        builder, runner = SUITES[suite]
+        cases = builder()
+
+    outputs, timings = {}, {}
+    try:
+        for case_id, case_input in cases.items():
+            started = time.perf_counter()
+            for _ in range(repeat):
+                outputs[case_id] = run_case(runner, engine, case_input)
+            timings[case_id] = (time.perf_counter() - started) / repeat
+    finally:
+        if closure is not None:
+            closure.close()
+
+    return outputs, timings
+
+
+def golden_path(suite: str) -> str:
+    return os.path.join(GOLDEN_DIR, f'{suite}.json')
+
+
+def freeze(suites: list):
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    for suite in suites:
+        outputs, timings = replay_suite(suite, resolve_engine(suite))
+        with open(golden_path(suite), 'w', encoding='utf-8') as f:
+            json.dump({'gerado_em': datetime.now().isoformat(timespec='seconds'),
+                       'tempo_total_s': round(sum(timings.values()), 4),
+                       'casos': outputs}, f, ensure_ascii=False, indent=1, sort_keys=True)
+        print(f"🧊 {suite}: {len(outputs)} caso(s) gravados em {os.path.relpath(golden_path(suite), ROOT)} "
+              f"({sum(timings.values()):.3f}s)")
+
+
+def diff(suites: list, engines: dict, repeat: int = 1, compare: bool = True) -> bool:
+    ok = True
+    for suite in suites:
+        golden = None
+        if compare:
+            if not os.path.exists(golden_path(suite)):
+                print(f"❌ {suite}: saídas de referência não encontradas, execute 'freeze' antes")
+                ok = False
+                continue
+            with open(golden_path(suite), encoding='utf-8') as f:
+                golden = json.load(f)
+
+        outputs, timings = replay_suite(suite, resolve_engine(suite, engines.get(suite)), repeat=repeat)
+        total = sum(timings.values())
+        slowest = sorted(timings.items(), key=lambda item: item[1], reverse=True)[:3]
+
+        print(f"⏱️  {suite} [{engines.get(suite) or 'atual'}]: {len(outputs)} caso(s) em {total:.4f}s"
+              + (f" (referência: {golden['tempo_total_s']:.4f}s)" if golden else ""))
+        for case_id, seconds in slowest:
+            print(f"     {seconds * 1000:9.2f} ms  {case_id}")
+
+        if golden is None:
+            continue
+
+        # As saídas são comparadas depois de passar pelo mesmo JSON da gravação
+        outputs = json.loads(json.dumps(outputs, ensure_ascii=False))
+        expected = golden['casos']
+        mismatches = []
+        for case_id in sorted(set(expected) | set(outputs)):
+            found = first_difference(expected.get(case_id), outputs.get(case_id))
+            if found:
+                mismatches.append((case_id, found))
+
+        if mismatches:
+            ok = False
+            print(f"❌ {suite}: {len(mismatches)} caso(s) divergentes")
+            for case_id, (path, was, now) in mismatches[:20]:
+                print(f"     {case_id} em {path}: esperado {was!r}, obtido {now!r}")
+        else:
+            print(f"✅ {suite}: saídas idênticas às de referência")
+    return ok
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if not args or args[0] not in ('freeze', 'diff', 'time'):
+        print(__doc__)
+        sys.exit(1)
+
+    command, rest = args[0], args[1:]
+    engines = {}
+    repeat = 1
+    selected = []
+    i = 0
+    while i < len(rest):
+        if rest[i] == '--engine':
+            suite_name, _, spec = rest[i + 1].partition('=')
+            engines[suite_name] = spec
+            i += 2
+        elif rest[i] == '--repeat':
+            repeat = int(rest[i + 1])
+            i += 2
+        else:
+            selected.append(rest[i])
+            i += 1
+
+    all_suites = list(ENGINES)
+    selected = selected or all_suites
+    unknown = [s for s in selected if s not in ENGINES]
+    if unknown:
+        print(f"❌ Suíte(s) desconhecida(s): {', '.join(unknown)}. Use: {', '.join(all_suites)}")
+        sys.exit(1)
+
+    try:
+        if command == 'freeze':
+            freeze(selected)
+        else:
+            sys.exit(0 if diff(selected, engines, repeat=repeat, compare=command == 'diff') else 1)
+    except Exception:
+        traceback.print_exc()
+        sys.exit(1)
@@ -1,4 +1,5 @@
-from flask import Blueprint, render_template, request, flash, jsonify, send_file, redirect
+from flask import Blueprint, render_template, request, flash, jsonify, send_file, redirect, Response, \
+    stream_with_context
 from controller.decorators import route_access_required
 from controller.utils import CustomLogger
 from model.drivers.uploaded_data_driver import UploadedDataDriver
@@ -8,7 +9,7 @@ from model.drivers.motorist_driver import MotoristDriver
 from model.drivers.parameters_driver import ParametersDriver
 from model.drivers.closure_analyzed_data import AnalyzedClosureData
 from model.validation.calculation_validator import CalculationValidator
-from global_vars import DEBUG, DB_PATH
+from global_vars import DEBUG, DB_PATH, CLOSURE_EXPORT_WORKERS
 try:
     import pandas as pd
 except ImportError:
@@ -22,17 +23,18 @@ from werkzeug.utils import secure_filename
 import json
 from datetime import datetime, timedelta, date
 from io import BytesIO
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import cm
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
 # from controller.data import GeneralDriver  # Removido - não existe
 from model.drivers.company_driver import CompanyDriver
 from model.drivers.closure_block_classifications_driver import ClosureBlockClassificationsDriver
+from model.drivers.data_export_driver import DataExportDriver
+from model.drivers.address_index_driver import AddressIndexDriver
+from controller.address_enrichment import enrich_missing_addresses, index_known_addresses
+from controller.closure_export import check_closure_export, write_closure_zip
+from controller.closure_report import ClosureReportService, MotoristNotFoundError
+from controller.report_cache import report_cache
+from controller.report_jobs import report_jobs
+from controller.pdf_report import generate_closure_pdf_report
+from controller.streaming import STREAM_FORMATS, parse_columns_param, encode_stream
 
 def get_weekday_name(data_str):
     """Converte uma data no formato DD-MM-YYYY para o nome do dia da semana."""
@@ -67,6 +69,9 @@ company_driver = CompanyDriver(logger=routes_logger, db_path=DB_PATH)
 
 # Inicializar driver para classificações de blocos
 closure_classifications_driver = ClosureBlockClassificationsDriver(logger=routes_logger, db_path=DB_PATH)
+address_index_driver = AddressIndexDriver(logger=routes_logger, db_path=DB_PATH)
+data_export_driver = DataExportDriver(logger=routes_logger, db_path=DB_PATH, tables=DataExportDriver.CLOSURE_TABLES)
+closure_report_service = ClosureReportService(logger=routes_logger, db_path=DB_PATH)
 
 # Inicializar validador de cálculos
 calculation_validator = CalculationValidator(logger=routes_logger)
@@ -221,6 +226,17 @@ def upload_closure():
                     df['truck_id'] = truck_id
                     routes_logger.register_log(f'[DEBUG] truck_id adicionado ao DataFrame: {truck_id}')
 
+            # SASGC não informa a rua: completa com o endereço conhecido mais próximo.
+            # Os demais rastreadores alimentam o índice de endereços.
+            try:
+                if tracker_type.lower() == 'sasgc':
+                    filled = enrich_missing_addresses(df, address_index_driver)
+                    routes_logger.register_log(f'[DEBUG] Endereços completados pelo índice: {filled} ponto(s)')
+                else:
+                    index_known_addresses(df, address_index_driver)
+            except Exception as e:
+                routes_logger.register_log(f'[ERRO] Falha no enriquecimento de endereços: {e}')
+
             # Garante a ordem das colunas
             df = df[closure_driver.columns]
             routes_logger.register_log(f'[DEBUG] DataFrame ajustado para colunas: {closure_driver.columns}')
@@ -677,487 +693,46 @@ def get_closure_report():
         motorist_id = request.args.get('motorist_id')
         from_date = request.args.get('from_date')
         to_date = request.args.get('to_date')
-        
+
         if not motorist_id or not from_date or not to_date:
             return jsonify({"error": "Parâmetros obrigatórios não fornecidos"}), 400
-        
-        # Buscar dados do motorista
-        motorist_data = motorist_driver.retrieve_motorist(['id'], (int(motorist_id),))
-        if not motorist_data:
-            return jsonify({"error": "Motorista não encontrado"}), 404
-        
-        motorist_name = motorist_data[1]
-        
-        # Buscar dados de jornada do período
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # Converter datas para formato DD-MM-YYYY para buscar na tabela
-        try:
-            from_date_obj = datetime.strptime(from_date, '%Y-%m-%d')
-            to_date_obj = datetime.strptime(to_date, '%Y-%m-%d')
-            from_date_br = from_date_obj.strftime('%d-%m-%Y')
-            to_date_br = to_date_obj.strftime('%d-%m-%Y')
-        except:
-            from_date_br = from_date
-            to_date_br = to_date
-        
-        print(f"Debug: Buscando dados de {from_date_br} a {to_date_br}")
-        
-        # Primeiro, verificar quantidade de dados em perm e dayoff para o motorista
-        cursor.execute("SELECT COUNT(*) FROM perm_data_fecham WHERE motorist_id = ?", (motorist_id,))
-        total_perm = cursor.fetchone()[0]
-        print(f"Debug: Total de registros de jornada para motorista {motorist_id}: {total_perm}")
-
-        cursor.execute("SELECT COUNT(*) FROM dayoff_fecham WHERE motorist_id = ?", (motorist_id,))
-        total_dayoff_count = cursor.fetchone()[0]
-        print(f"Debug: Total de registros de dayoff para motorista {motorist_id}: {total_dayoff_count}")
-
-        # Só retornar vazio se não existir NENHUM registro em nenhuma das tabelas
-        if total_perm == 0 and total_dayoff_count == 0:
-            conn.close()
-            return render_template('closure_report_modal.html', 
-                                 motorist_id=motorist_id,
-                                 motorist_name=motorist_name,
-                                 from_date=from_date_obj.strftime('%d-%m-%Y') if 'from_date_obj' in locals() else from_date,
-                                 to_date=to_date_obj.strftime('%d-%m-%Y') if 'to_date_obj' in locals() else to_date,
-                                 jornada_data=[],
-                                 folgas=[])
-        
-        # Verificar quais datas existem para o motorista
-        cursor.execute("SELECT DISTINCT data FROM perm_data_fecham WHERE motorist_id = ? ORDER BY data", (motorist_id,))
-        datas_existentes = cursor.fetchall()
-        print(f"Debug: Datas existentes para motorista {motorist_id}: {[d[0] for d in datas_existentes]}")
-        
-        # Verificar se a tabela trucks existe
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='trucks'")
-        trucks_exists = cursor.fetchone() is not None
-        
-        print(f"Debug: Buscando dados de {from_date_br} a {to_date_br}")
-        
-        # Buscar dados de perm_data_fecham - buscar todos e filtrar em Python
-        if trucks_exists:
-            # Buscar dados com JOIN para pegar a placa
-            cursor.execute("""
-                SELECT p.data, p.dia_da_semana, p.inicio_jornada, p.in_refeicao, p.fim_refeicao, p.fim_jornada,
-                       p.observacao, p.tempo_refeicao, p.tempo_intervalo, p.jornada_total, p.carga_horaria, p.hextra_50,
-                       p.hextra_100, p.he_noturno, p.daily_value, p.food_value, t.placa, p.truck_id
-                FROM perm_data_fecham p
-                LEFT JOIN trucks t ON p.truck_id = t.id
-                WHERE p.motorist_id = ?
-                ORDER BY strftime('%Y-%m-%d', 
-                    substr(p.data, 7, 4) || '-' || 
-                    substr(p.data, 4, 2) || '-' || 
-                    substr(p.data, 1, 2)
-                )
-            """, (motorist_id,))
-        else:
-            # Buscar dados sem JOIN (tabela trucks não existe)
-            cursor.execute("""
-                SELECT data, dia_da_semana, inicio_jornada, in_refeicao, fim_refeicao, fim_jornada,
-                       observacao, tempo_refeicao, tempo_intervalo, jornada_total, carga_horaria, hextra_50,
-                       hextra_100, he_noturno, daily_value, food_value
-                FROM perm_data_fecham 
-                WHERE motorist_id = ?
-                ORDER BY strftime('%Y-%m-%d', 
-                    substr(data, 7, 4) || '-' || 
-                    substr(data, 4, 2) || '-' || 
-                    substr(data, 1, 2)
-                )
-            """, (motorist_id,))
-        
-        jornada_data = cursor.fetchall()
-        
-        print(f"Debug: {len(jornada_data)} registros encontrados para motorista {motorist_id}")
-        
-        # Filtrar dados de jornada pelo período em Python
-        jornada_filtrada = []
-        for row in jornada_data:
-            data = row[0]  # data é o primeiro campo
-            try:
-                # Converter data DD-MM-YYYY para datetime
-                data_obj = datetime.strptime(data, '%d-%m-%Y')
-                from_date_obj = datetime.strptime(from_date_br, '%d-%m-%Y')
-                to_date_obj = datetime.strptime(to_date_br, '%d-%m-%Y')
-                
-                if from_date_obj <= data_obj <= to_date_obj:
-                    jornada_filtrada.append(row)
-            except:
-                pass
-        
-        print(f"Debug: {len(jornada_filtrada)} registros de jornada no período {from_date_br} a {to_date_br}")
-        
-        # Buscar classificações dos blocos para o período
-        classificacoes = {}
-        try:
-            cursor.execute("""
-                SELECT data, classification, notes, truck_id
-                FROM closure_block_classifications 
-                WHERE motorist_id = ?
-                ORDER BY strftime('%Y-%m-%d', 
-                    substr(data, 7, 4) || '-' || 
-                    substr(data, 4, 2) || '-' || 
-                    substr(data, 1, 2)
-                )
-            """, (motorist_id,))
-            
-            classificacoes_data = cursor.fetchall()
-            print(f"Debug: {len(classificacoes_data)} classificações encontradas para motorista {motorist_id}")
-            
-            # Filtrar classificações pelo período e criar dicionário
-            for row in classificacoes_data:
-                data = row[0]
-                classification = row[1]
-                notes = row[2]
-                truck_id = row[3]
-                
-                try:
-                    # Converter data DD-MM-YYYY para datetime
-                    data_obj = datetime.strptime(data, '%d-%m-%Y')
-                    from_date_obj = datetime.strptime(from_date_br, '%d-%m-%Y')
-                    to_date_obj = datetime.strptime(to_date_br, '%d-%m-%Y')
-                    
-                    if from_date_obj <= data_obj <= to_date_obj:
-                        # Usar data como chave, com truck_id como sub-chave se disponível
-                        key = f"{data}_{truck_id}" if truck_id else data
-                        classificacoes[key] = {
-                            'classification': classification,
-                            'notes': notes,
-                            'truck_id': truck_id
-                        }
-                except:
-                    pass
-                    
-            print(f"Debug: {len(classificacoes)} classificações no período {from_date_br} a {to_date_br}")
-        except Exception as e:
-            print(f"Debug: Erro ao buscar classificações: {e}")
-            classificacoes = {}
-        
-        # Buscar dados de dayoff_fecham - buscar todos e filtrar em Python
-        cursor.execute("""
-            SELECT data, motivo, daily_value, food_value
-            FROM dayoff_fecham 
-            WHERE motorist_id = ?
-            ORDER BY strftime('%Y-%m-%d', 
-                substr(data, 7, 4) || '-' || 
-                substr(data, 4, 2) || '-' || 
-                substr(data, 1, 2)
-            )
-        """, (motorist_id,))
-        
-        dayoff_data = cursor.fetchall()
-        
-        print(f"Debug: {len(dayoff_data)} registros de dayoff encontrados para motorista {motorist_id}")
-        
-        # Filtrar dados de dayoff pelo período em Python
-        dayoff_filtrada = []
-        for row in dayoff_data:
-            data = row[0]  # data é o primeiro campo
-            try:
-                # Converter data DD-MM-YYYY para datetime
-                data_obj = datetime.strptime(data, '%d-%m-%Y')
-                from_date_obj = datetime.strptime(from_date_br, '%d-%m-%Y')
-                to_date_obj = datetime.strptime(to_date_br, '%d-%m-%Y')
-                
-                if from_date_obj <= data_obj <= to_date_obj:
-                    dayoff_filtrada.append(row)
-            except:
-                pass
-        
-        print(f"Debug: {len(dayoff_filtrada)} registros de dayoff no período {from_date_br} a {to_date_br}")
-        
-        # Processar dados de jornada
-        processed_data = []
-        
-        # Variáveis para calcular totais
-        total_intervalo = 0
-        total_almoco = 0
-        total_h_trab = 0
-        total_carga_horaria = 0
-        total_h_extra50 = 0
-        total_h_extra100 = 0
-        total_h_e_not = 0
-        total_diaria = 0.0
-        total_aj_aliment = 0.0
-        
-        # Função para converter tempo HH:MM para minutos
-        def tempo_para_minutos(tempo_str):
-            if not tempo_str or tempo_str == "NULL" or tempo_str == "":
-                return 0
-            try:
-                if ':' in tempo_str:
-                    # Verificar se é negativo
-                    is_negative = tempo_str.startswith('-')
-                    # Remover o sinal negativo se existir
-                    tempo_limpo = tempo_str.replace('-', '')
-                    horas, minutos = map(int, tempo_limpo.split(':'))
-                    resultado = horas * 60 + minutos
-                    # Aplicar sinal negativo se necessário
-                    return -resultado if is_negative else resultado
-                else:
-                    return 0
-            except:
-                return 0
-        
-        # Função para converter minutos para HH:MM
-        def minutos_para_tempo(minutos):
-            if minutos == 0:
-                return "00:00"
-            
-            # Verificar se é negativo
-            is_negative = minutos < 0
-            minutos_abs = abs(minutos)
-            
-            horas = minutos_abs // 60
-            mins = minutos_abs % 60
-            
-            resultado = f"{horas:02d}:{mins:02d}"
-            # Adicionar sinal negativo se necessário
-            return f"-{resultado}" if is_negative else resultado
-        
-        # Função para abreviar dia da semana
-        def abreviar_dia_semana(dia_completo):
-            abreviacoes = {
-                'Segunda-feira': 'Seg.',
-                'Terça-feira': 'Ter.',
-                'Quarta-feira': 'Qua.',
-                'Quinta-feira': 'Qui.',
-                'Sexta-feira': 'Sex.',
-                'Sábado': 'Sáb.',
-                'Domingo': 'Dom.'
-            }
-            return abreviacoes.get(dia_completo, dia_completo)
-        
-        # Processar dados de jornada (perm_data_fecham)
-        for row in jornada_filtrada:
-            if trucks_exists and len(row) == 17:
-                # Com JOIN (inclui placa)
-                data, dia_semana, inicio_jornada, in_refeicao, fim_refeicao, fim_jornada, \
-                observacao, tempo_refeicao, tempo_intervalo, jornada_total, carga_horaria, hextra_50, \
-                hextra_100, he_noturno, daily_value, food_value, placa = row
-            else:
-                # Sem JOIN (sem placa)
-                data, dia_semana, inicio_jornada, in_refeicao, fim_refeicao, fim_jornada, \
-                observacao, tempo_refeicao, tempo_intervalo, jornada_total, carga_horaria, hextra_50, \
-                hextra_100, he_noturno, daily_value, food_value = row
-                placa = ""
-            
-            # Formatar valores monetários
-            def formatar_moeda(valor):
-                if not valor or valor == "NULL" or valor == "":
-                    return "R$ 0,00"
-                try:
-                    # Remover .0 e converter para float
-                    valor_limpo = str(valor).replace('.0', '')
-                    valor_float = float(valor_limpo)
-                    # Formatar como moeda brasileira
-                    return f"R$ {valor_float:.2f}".replace('.', ',')
-                except:
-                    return "R$ 0,00"
-            
-            diaria_formatada = formatar_moeda(daily_value)
-            alimentacao_formatada = formatar_moeda(food_value)
-            
-            # Calcular totais
-            total_intervalo += tempo_para_minutos(tempo_intervalo)
-            total_almoco += tempo_para_minutos(tempo_refeicao)
-            total_h_trab += tempo_para_minutos(jornada_total)
-            total_carga_horaria += tempo_para_minutos(carga_horaria)
-            total_h_extra50 += tempo_para_minutos(hextra_50)
-            total_h_extra100 += tempo_para_minutos(hextra_100)
-            total_h_e_not += tempo_para_minutos(he_noturno)
-            
-            # Totais monetários
-            try:
-                if daily_value and daily_value != "NULL" and daily_value != "":
-                    total_diaria += float(str(daily_value).replace('.0', ''))
-            except:
-                pass
-            
-            try:
-                if food_value and food_value != "NULL" and food_value != "":
-                    total_aj_aliment += float(str(food_value).replace('.0', ''))
-            except:
-                pass
-            
-            # Buscar classificação para esta data
-            classificacao_info = None
-            if trucks_exists and len(row) == 17:
-                # Com JOIN (inclui truck_id)
-                truck_id = row[16]  # truck_id é o último campo
-                key = f"{data}_{truck_id}" if truck_id else data
-                classificacao_info = classificacoes.get(key)
-            else:
-                # Sem JOIN (sem truck_id)
-                classificacao_info = classificacoes.get(data)
-            
-            # Determinar classificação e cor
-            classificacao_display = 'VÁLIDO'
-            classificacao_class = 'badge-valid'
-            if classificacao_info:
-                classification = classificacao_info['classification']
-                if classification == 'VALIDO':
-                    classificacao_display = 'VÁLIDO'
-                    classificacao_class = 'badge-valid'
-                elif classification == 'GARAGEM':
-                    classificacao_display = 'GARAGEM'
-                    classificacao_class = 'badge-garagem'
-                elif classification == 'CARGA_DESCARGA':
-                    classificacao_display = 'CARGA/DESCARGA'
-                    classificacao_class = 'badge-carga-descarga'
-                elif classification == 'INVALIDO':
-                    classificacao_display = 'INVÁLIDO'
-                    classificacao_class = 'badge-invalid'
-            
-            processed_data.append({
-                'placa': placa or '',
-                'data': data,
-                'dia_semana': abreviar_dia_semana(dia_semana),
-                'classificacao': classificacao_display,
-                'classificacao_class': classificacao_class,
-                'inicio_jornada': inicio_jornada or '',
-                'almoco_inicio': in_refeicao or '',
-                'almoco_fim': fim_refeicao or '',
-                'fim_jornada': fim_jornada or '',
-                'intervalo': tempo_intervalo or '',
-                'almoco': tempo_refeicao or '',
-                'h_trab': jornada_total or '',
-                'carga_horaria': carga_horaria or '',
-                'h_extra50': hextra_50 or '',
-                'h_extra100': hextra_100 or '',
-                'h_e_not': he_noturno or '',
-                'ad_not': he_noturno or '',  # Adicional noturno = hora extra noturna
-                'diaria': diaria_formatada,
-                'aj_aliment': alimentacao_formatada
-            })
-        
-        # Formatar totais
-        totais = {
-            'intervalo': minutos_para_tempo(total_intervalo),
-            'almoco': minutos_para_tempo(total_almoco),
-            'h_trab': minutos_para_tempo(total_h_trab),
-            'carga_horaria': minutos_para_tempo(total_carga_horaria),
-            'h_extra50': minutos_para_tempo(total_h_extra50),
-            'h_extra100': minutos_para_tempo(total_h_extra100),
-            'h_e_not': minutos_para_tempo(total_h_e_not),
-            'ad_not': minutos_para_tempo(total_h_e_not),  # Adicional noturno = hora extra noturna
-            'diaria': f"R$ {total_diaria:.2f}".replace('.', ','),
-            'aj_aliment': f"R$ {total_aj_aliment:.2f}".replace('.', ',')
-        }
-        
-        # Processar dados de folga (dayoff_fecham) e adicionar à tabela principal
-        for row in dayoff_filtrada:
-            data, motivo, daily_value_dayoff, food_value_dayoff = row
-            
-            # Formatar valores monetários para dayoff
-            def formatar_moeda_dayoff(valor):
-                if not valor or valor == "NULL" or valor == "":
-                    return "R$ 0,00"
-                try:
-                    valor_limpo = str(valor).replace('.0', '')
-                    valor_float = float(valor_limpo)
-                    return f"R$ {valor_float:.2f}".replace('.', ',')
-                except:
-                    return "R$ 0,00"
-            
-            diaria_formatada_dayoff = formatar_moeda_dayoff(daily_value_dayoff)
-            alimentacao_formatada_dayoff = formatar_moeda_dayoff(food_value_dayoff)
-            
-            # Calcular dia da semana para a data
-            try:
-                data_obj = datetime.strptime(data, '%d-%m-%Y')
-                dias_semana = {
-                    0: 'Segunda-feira',
-                    1: 'Terça-feira',
-                    2: 'Quarta-feira',
-                    3: 'Quinta-feira',
-                    4: 'Sexta-feira',
-                    5: 'Sábado',
-                    6: 'Domingo'
-                }
-                dia_semana_completo = dias_semana[data_obj.weekday()]
-                dia_semana_abreviado = abreviar_dia_semana(dia_semana_completo)
-            except:
-                dia_semana_abreviado = "Data inválida"
-            
-            # Buscar classificação para esta data de dayoff
-            classificacao_info_dayoff = classificacoes.get(data)
-            classificacao_display_dayoff = 'VÁLIDO'
-            classificacao_class_dayoff = 'badge-valid'
-            if classificacao_info_dayoff:
-                classification = classificacao_info_dayoff['classification']
-                if classification == 'VALIDO':
-                    classificacao_display_dayoff = 'VÁLIDO'
-                    classificacao_class_dayoff = 'badge-valid'
-                elif classification == 'GARAGEM':
-                    classificacao_display_dayoff = 'GARAGEM'
-                    classificacao_class_dayoff = 'badge-garagem'
-                elif classification == 'CARGA_DESCARGA':
-                    classificacao_display_dayoff = 'CARGA/DESCARGA'
-                    classificacao_class_dayoff = 'badge-carga-descarga'
-                elif classification == 'INVALIDO':
-                    classificacao_display_dayoff = 'INVÁLIDO'
-                    classificacao_class_dayoff = 'badge-invalid'
-            
-            # Adicionar registro de dayoff à tabela principal
-            processed_data.append({
-                'placa': motivo,  # Motivo no lugar da placa
-                'data': data,
-                'dia_semana': dia_semana_abreviado,
-                'classificacao': classificacao_display_dayoff,
-                'classificacao_class': classificacao_class_dayoff,
-                'inicio_jornada': '',
-                'almoco_inicio': '',
-                'almoco_fim': '',
-                'fim_jornada': '',
-                'intervalo': '',
-                'almoco': '',
-                'h_trab': '',
-                'carga_horaria': '',
-                'h_extra50': '',
-                'h_extra100': '',
-                'h_e_not': '',
-                'ad_not': '',
-                'diaria': diaria_formatada_dayoff,
-                'aj_aliment': alimentacao_formatada_dayoff,
-                'observacao': motivo  # Motivo na observação
-            })
-        
-        # Ordenar todos os dados por data
-        processed_data.sort(key=lambda x: datetime.strptime(x['data'], '%d-%m-%Y'))
-        
-        # Processar dados de folga para exibição separada (se necessário)
-        folgas = []
-        for row in dayoff_filtrada:
-            data, motivo = row[0], row[1]  # data e motivo são os primeiros campos
-            folgas.append({
-                'data': data,
-                'motivo': motivo
-            })
-        
-        # Fechar conexão com o banco
-        conn.close()
-        
-        # Renderizar template do modal com datas formatadas corretamente e totais
+
         try:
-            return render_template('closure_report_modal.html', 
-                                 motorist_id=motorist_id,
-                                 motorist_name=motorist_name,
-                                 from_date=from_date_obj.strftime('%d-%m-%Y') if 'from_date_obj' in locals() else from_date,
-                                 to_date=to_date_obj.strftime('%d-%m-%Y') if 'to_date_obj' in locals() else to_date,
-                                 jornada_data=processed_data,
-                                 folgas=folgas,
-                                 totais=totais)
-        except Exception as template_error:
-            routes_logger.register_log(f"Erro ao renderizar template: {template_error}")
-            routes_logger.register_log(f"Dados processados: {len(processed_data) if 'processed_data' in locals() else 'N/A'}")
-            routes_logger.register_log(f"Totais: {totais if 'totais' in locals() else 'N/A'}")
-            raise template_error
-        
+            return report_cache.respond(('fechamento', int(motorist_id), from_date, to_date),
+                                        closure_report_service.version_driver.get_version(motorist_id),
+                                        lambda: render_closure_report(motorist_id, from_date, to_date))
+        except MotoristNotFoundError as e:
+            return jsonify({"error": str(e)}), 404
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
     except Exception as e:
         routes_logger.register_log(f"Erro ao gerar relatório de fechamento: {e}")
         return jsonify({"error": f"Erro interno: {str(e)}"}), 500
 
+def render_closure_report(motorist_id, from_date, to_date) -> str:
+    """
+    Renderiza o modal do relatório de fechamento (closure_report_modal.html).
+
+    :raises MotoristNotFoundError: Se o motorista não existir.
+    :raises ValueError: Se as datas forem inválidas.
+    """
+    result = closure_report_service.get(motorist_id, from_date, to_date)
+    template_args = dict(motorist_id=motorist_id,
+                         motorist_name=result.motorist_name,
+                         from_date=result.from_date.strftime('%d-%m-%Y'),
+                         to_date=result.to_date.strftime('%d-%m-%Y'))
+
+    # Só retornar vazio se não existir NENHUM registro de jornada ou folga para o motorista
+    if not result.has_records:
+        return render_template('closure_report_modal.html', jornada_data=[], folgas=[], **template_args)
+
+    return render_template('closure_report_modal.html',
+                           jornada_data=result.modal_rows(),
+                           folgas=result.folgas(),
+                           totais=result.totals.as_dict(),
+                           **template_args)
+
 @closure_bp.route('/infractions_fechamento', methods=['GET'])
 @route_access_required
 def infractions_fechamento():
@@ -2263,6 +1838,45 @@ def save_dayoff():
             "message": f"Erro ao salvar dados: {str(e)}"
         }), 500
 
+def build_closure_pdf(motorist_id, from_date, to_date):
+    """
+    Gera o PDF de fechamento (espelho de ponto) de um motorista no período.
+
+    :param motorist_id: ID do motorista.
+    :param from_date: Data inicial ('YYYY-MM-DD').
+    :param to_date: Data final ('YYYY-MM-DD').
+    :return: Tupla (nome do arquivo, conteúdo do PDF em bytes).
+    :raises MotoristNotFoundError: Se o motorista não existir.
+    """
+    result = closure_report_service.get(motorist_id, from_date, to_date)
+    routes_logger.register_log(f"Dados do motorista: nome={result.motorist_name}, cpf={result.motorist_cpf}")
+
+    # Montar cabeçalho dinâmico da empresa
+    company_header = None
+    try:
+        if result.motorist_company:
+            comp = company_driver.retrieve_company(['enterprise'], (result.motorist_company,))
+            if comp:
+                company_header = f"<b>{comp[1]}</b> - CNPJ: <b>{comp[2]}</b>"
+    except Exception:
+        company_header = None
+
+    pdf_buffer = generate_closure_pdf_report(
+        motorist_name=result.motorist_name,
+        motorist_cpf=result.motorist_cpf,
+        from_date=result.from_date.strftime('%d/%m/%Y'),
+        to_date=result.to_date.strftime('%d/%m/%Y'),
+        data=result.pdf_rows(),
+        totals=result.totals.as_dict(),
+        company_header=company_header,
+        folgas_line=result.folgas_line()
+    )
+
+    filename = f"espelho_ponto_{result.motorist_name.replace(' ', '_')}_{result.from_date.strftime('%d_%m_%Y')}_a_{result.to_date.strftime('%d_%m_%Y')}.pdf"
+    return filename, pdf_buffer
+
+
+
 @closure_bp.route('/api/closure/generate-pdf', methods=['GET'])
 @route_access_required
 def generate_closure_pdf():
@@ -2279,345 +1893,13 @@ def generate_closure_pdf():
             routes_logger.register_log("Erro: Parâmetros obrigatórios não fornecidos")
             return jsonify({"error": "Parâmetros obrigatórios não fornecidos"}), 400
 
-        # Buscar dados do motorista usando motorist_driver
-        motorist_data = motorist_driver.retrieve_motorist(["id"], (motorist_id,))
-        if not motorist_data:
-            routes_logger.register_log(f"Erro: Motorista {motorist_id} não encontrado")
-            return jsonify({"error": "Motorista não encontrado"}), 404
-
-        motorist_name = motorist_data[1] if motorist_data else 'Motorista'  # nome está na posição 1
-        motorist_cpf = motorist_data[3] if motorist_data else ''  # cpf está na posição 3
-        motorist_company = motorist_data[30] if motorist_data and len(motorist_data) > 30 else ''  # empresa
-        
-        routes_logger.register_log(f"Dados do motorista: nome={motorist_name}, cpf={motorist_cpf}")
-
-        # Buscar dados do relatório (reutilizar lógica do get_closure_report)
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-
-        try:
-            from_date_obj = datetime.strptime(from_date, '%Y-%m-%d')
-            to_date_obj = datetime.strptime(to_date, '%Y-%m-%d')
-            from_date_br = from_date_obj.strftime('%d-%m-%Y')
-            to_date_br = to_date_obj.strftime('%d-%m-%Y')
-        except:
-            from_date_br = from_date
-            to_date_br = to_date
-
-        # Verificar se tabela trucks existe
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='trucks'")
-        trucks_exists = cursor.fetchone() is not None
-
-        # Buscar dados de perm_data_fecham
-        if trucks_exists:
-            cursor.execute("""
-                SELECT p.data, p.dia_da_semana, p.inicio_jornada, p.in_refeicao, p.fim_refeicao, p.fim_jornada,
-                       p.observacao, p.tempo_refeicao, p.tempo_intervalo, p.jornada_total, p.carga_horaria, p.hextra_50,
-                       p.hextra_100, p.he_noturno, p.daily_value, p.food_value, t.placa
-                FROM perm_data_fecham p
-                LEFT JOIN trucks t ON p.truck_id = t.id
-                WHERE p.motorist_id = ?
-                ORDER BY strftime('%Y-%m-%d',
-                    substr(p.data, 7, 4) || '-' ||
-                    substr(p.data, 4, 2) || '-' ||
-                    substr(p.data, 1, 2)
-                )
-            """, (motorist_id,))
-        else:
-            cursor.execute("""
-                SELECT data, dia_da_semana, inicio_jornada, in_refeicao, fim_refeicao, fim_jornada,
-                       observacao, tempo_refeicao, tempo_intervalo, jornada_total, carga_horaria, hextra_50,
-                       hextra_100, he_noturno, daily_value, food_value
-                FROM perm_data_fecham
-                WHERE motorist_id = ?
-                ORDER BY strftime('%Y-%m-%d',
-                    substr(data, 7, 4) || '-' ||
-                    substr(data, 4, 2) || '-' ||
-                    substr(data, 1, 2)
-                )
-            """, (motorist_id,))
-
-        jornada_data = cursor.fetchall()
-
-        # Filtrar dados pelo período
-        jornada_filtrada = []
-        for row in jornada_data:
-            data = row[0]
-            try:
-                data_obj = datetime.strptime(data, '%d-%m-%Y')
-                from_date_obj = datetime.strptime(from_date_br, '%d-%m-%Y')
-                to_date_obj = datetime.strptime(to_date_br, '%d-%m-%Y')
-
-                if from_date_obj <= data_obj <= to_date_obj:
-                    jornada_filtrada.append(row)
-            except:
-                pass
-
-        # Buscar dados de dayoff_fecham
-        cursor.execute("""
-            SELECT data, motivo, daily_value, food_value
-            FROM dayoff_fecham
-            WHERE motorist_id = ?
-            ORDER BY strftime('%Y-%m-%d',
-                substr(data, 7, 4) || '-' ||
-                substr(data, 4, 2) || '-' ||
-                substr(data, 1, 2)
-            )
-        """, (motorist_id,))
-
-        dayoff_data = cursor.fetchall()
-
-        # Filtrar dados de dayoff pelo período
-        dayoff_filtrada = []
-        for row in dayoff_data:
-            data = row[0]
-            try:
-                data_obj = datetime.strptime(data, '%d-%m-%Y')
-                from_date_obj = datetime.strptime(from_date_br, '%d-%m-%Y')
-                to_date_obj = datetime.strptime(to_date_br, '%d-%m-%Y')
-
-                if from_date_obj <= data_obj <= to_date_obj:
-                    dayoff_filtrada.append(row)
-            except:
-                pass
-
-        # Processar dados para PDF
-        processed_data = []
-        total_intervalo = 0
-        total_almoco = 0
-        total_h_trab = 0
-        total_carga_horaria = 0
-        total_h_extra50 = 0
-        total_h_extra100 = 0
-        total_h_e_not = 0
-        total_diaria = 0.0
-        total_aj_aliment = 0.0
-
-        def tempo_para_minutos(tempo_str):
-            if not tempo_str or tempo_str == "NULL" or tempo_str == "":
-                return 0
-            try:
-                if ':' in tempo_str:
-                    is_negative = tempo_str.startswith('-')
-                    tempo_limpo = tempo_str.replace('-', '')
-                    horas, minutos = map(int, tempo_limpo.split(':'))
-                    resultado = horas * 60 + minutos
-                    return -resultado if is_negative else resultado
-                else:
-                    return 0
-            except:
-                return 0
-
-        def minutos_para_tempo(minutos):
-            if minutos == 0:
-                return "00:00"
-            is_negative = minutos < 0
-            minutos_abs = abs(minutos)
-            horas = minutos_abs // 60
-            mins = minutos_abs % 60
-            resultado = f"{horas:02d}:{mins:02d}"
-            return f"-{resultado}" if is_negative else resultado
-
-        def abreviar_dia_semana(dia_completo):
-            abreviacoes = {
-                'Segunda-feira': 'SEG',
-                'Terça-feira': 'TER',
-                'Quarta-feira': 'QUA',
-                'Quinta-feira': 'QUI',
-                'Sexta-feira': 'SEX',
-                'Sábado': 'SÁB',
-                'Domingo': 'DOM'
-            }
-            return abreviacoes.get(dia_completo, dia_completo)
-
-        def formatar_moeda(valor):
-            if not valor or valor == "NULL" or valor == "" or valor == 0 or valor == "0":
-                return "R$ 0,00"
-            try:
-                valor_float = float(str(valor).replace('.0', ''))
-                return f"R$ {valor_float:.2f}".replace('.', ',')
-            except:
-                return "R$ 0,00"
-
-        # Processar dados de jornada
-        for row in jornada_filtrada:
-            if trucks_exists:
-                (data, dia_semana, inicio_jornada, in_refeicao, fim_refeicao, fim_jornada,
-                 observacao, tempo_refeicao, tempo_intervalo, jornada_total, carga_horaria, hextra_50,
-                 hextra_100, he_noturno, daily_value, food_value, placa) = row
-            else:
-                (data, dia_semana, inicio_jornada, in_refeicao, fim_refeicao, fim_jornada,
-                 observacao, tempo_refeicao, tempo_intervalo, jornada_total, carga_horaria, hextra_50,
-                 hextra_100, he_noturno, daily_value, food_value) = row
-                placa = ''
-
-            # Converter data para formato DD/MM/YYYY
-            try:
-                data_obj = datetime.strptime(data, '%d-%m-%Y')
-                data_formatada = data_obj.strftime('%d/%m/%Y')
-            except:
-                data_formatada = data
-
-            diaria_formatada = formatar_moeda(daily_value)
-            alimentacao_formatada = formatar_moeda(food_value)
-
-            # Calcular totais
-            total_intervalo += tempo_para_minutos(tempo_intervalo)
-            total_almoco += tempo_para_minutos(tempo_refeicao)
-            total_h_trab += tempo_para_minutos(jornada_total)
-            total_carga_horaria += tempo_para_minutos(carga_horaria)
-            total_h_extra50 += tempo_para_minutos(hextra_50)
-            total_h_extra100 += tempo_para_minutos(hextra_100)
-            total_h_e_not += tempo_para_minutos(he_noturno)
-
-            try:
-                if daily_value and daily_value != "NULL" and daily_value != "":
-                    total_diaria += float(str(daily_value).replace('.0', ''))
-            except: pass
-            try:
-                if food_value and food_value != "NULL" and food_value != "":
-                    total_aj_aliment += float(str(food_value).replace('.0', ''))
-            except: pass
-
-            processed_data.append({
-                'placa': placa or '',
-                'data': data_formatada,
-                'dia_semana': abreviar_dia_semana(dia_semana),
-                'inicio_jornada': inicio_jornada or '',
-                'almoco_inicio': in_refeicao or '',
-                'almoco_fim': fim_refeicao or '',
-                'fim_jornada': fim_jornada or '',
-                'intervalo': tempo_intervalo or '',
-                'almoco': tempo_refeicao or '',
-                'h_trab': jornada_total or '',
-                'carga_horaria': carga_horaria or '',
-                'h_extra50': hextra_50 or '',
-                'h_extra100': hextra_100 or '',
-                'h_e_not': he_noturno or '',
-                'ad_not': he_noturno or '',  # AD. NOT igual a H.E. NOT.
-                'diaria': diaria_formatada,
-                'aj_aliment': alimentacao_formatada,
-                'observacao': observacao or ''
-            })
-
-        # Processar dados de dayoff
-        for row in dayoff_filtrada:
-            data, motivo, daily_value_dayoff, food_value_dayoff = row
-
-            try:
-                data_obj = datetime.strptime(data, '%d-%m-%Y')
-                data_formatada = data_obj.strftime('%d/%m/%Y')
-                dias_semana = {0: 'Segunda-feira', 1: 'Terça-feira', 2: 'Quarta-feira',
-                               3: 'Quinta-feira', 4: 'Sexta-feira', 5: 'Sábado', 6: 'Domingo'}
-                dia_semana_completo = dias_semana[data_obj.weekday()]
-                dia_semana_abreviado = abreviar_dia_semana(dia_semana_completo)
-            except:
-                data_formatada = data
-                dia_semana_abreviado = "Data inválida"
-
-            diaria_formatada_dayoff = formatar_moeda(daily_value_dayoff)
-            alimentacao_formatada_dayoff = formatar_moeda(food_value_dayoff)
-
-            processed_data.append({
-                'placa': motivo,  # Motivo no lugar da placa
-                'data': data_formatada,
-                'dia_semana': dia_semana_abreviado,
-                'inicio_jornada': '',
-                'almoco_inicio': '',
-                'almoco_fim': '',
-                'fim_jornada': '',
-                'intervalo': '',
-                'almoco': '',
-                'h_trab': '',
-                'carga_horaria': '',
-                'h_extra50': '',
-                'h_extra100': '',
-                'h_e_not': '',
-                'ad_not': '',
-                'diaria': diaria_formatada_dayoff,
-                'aj_aliment': alimentacao_formatada_dayoff,
-                'observacao': motivo  # Motivo na observação
-            })
-
-        # Ordenar por data
-        processed_data.sort(key=lambda x: datetime.strptime(x['data'], '%d/%m/%Y'))
-
-        # Verificar consistência dos dados
-        if processed_data:
-            expected_keys = {'placa', 'data', 'dia_semana', 'inicio_jornada', 'almoco_inicio', 'almoco_fim', 
-                           'fim_jornada', 'intervalo', 'almoco', 'h_trab', 'carga_horaria', 'h_extra50', 
-                           'h_extra100', 'h_e_not', 'ad_not', 'diaria', 'aj_aliment', 'observacao'}
-            for i, row in enumerate(processed_data):
-                if not isinstance(row, dict) or not all(key in row for key in expected_keys):
-                    routes_logger.register_log(f"Erro: Linha {i} não tem estrutura correta")
-                    routes_logger.register_log(f"Linha {i}: {row}")
-                    raise ValueError(f"Estrutura incorreta na linha {i}")
-
-        # Calcular totais finais
-        totais = {
-            'intervalo': minutos_para_tempo(total_intervalo),
-            'almoco': minutos_para_tempo(total_almoco),
-            'h_trab': minutos_para_tempo(total_h_trab),
-            'carga_horaria': minutos_para_tempo(total_carga_horaria),
-            'h_extra50': minutos_para_tempo(total_h_extra50),
-            'h_extra100': minutos_para_tempo(total_h_extra100),
-            'h_e_not': minutos_para_tempo(total_h_e_not),
-            'ad_not': minutos_para_tempo(total_h_e_not),
-            'diaria': f"R$ {total_diaria:.2f}".replace('.', ','),
-            'aj_aliment': f"R$ {total_aj_aliment:.2f}".replace('.', ',')
-        }
-
-        # Montar cabeçalho dinâmico da empresa
-        try:
-            company_header = None
-            if motorist_company:
-                comp = company_driver.retrieve_company(['enterprise'], (motorist_company,))
-                if comp:
-                    company_enterprise = comp[1]
-                    company_cnpj = comp[2]
-                    company_header = f"<b>{company_enterprise}</b> - CNPJ: <b>{company_cnpj}</b>"
-        except Exception as _e:
-            company_header = None
-
-        # Montar linha dinâmica de folgas (abrangendo todos os motivos)
         try:
-            folgas_line = "-"
-            # dayoff_filtrada contém dados filtrados por período acima
-            motivos_to_dates = {}
-            for row in dayoff_filtrada:
-                data_str, motivo, _dv, _fv = row
-                try:
-                    d = datetime.strptime(data_str, '%d-%m-%Y').strftime('%d/%m/%Y')
-                except:
-                    d = data_str.replace('-', '/')
-                motivo_key = (motivo or '').strip().upper()
-                if not motivo_key:
-                    motivo_key = 'N/A'
-                motivos_to_dates.setdefault(motivo_key, []).append(d)
-            if motivos_to_dates:
-                parts = []
-                for motivo_key in sorted(motivos_to_dates.keys()):
-                    datas_ordenadas = sorted(motivos_to_dates[motivo_key], key=lambda s: datetime.strptime(s, '%d/%m/%Y'))
-                    parts.append(f"{motivo_key} (" + ", ".join(datas_ordenadas) + ")")
-                folgas_line = "; ".join(parts)
-        except Exception as _e:
-            folgas_line = "-"
-
-        conn.close()
-
-        # Gerar PDF
-        pdf_buffer = generate_closure_pdf_report(
-            motorist_name=motorist_name,
-            motorist_cpf=motorist_cpf,
-            from_date=from_date_obj.strftime('%d/%m/%Y'),
-            to_date=to_date_obj.strftime('%d/%m/%Y'),
-            data=processed_data,
-            totals=totais,
-            company_header=company_header,
-            folgas_line=folgas_line
-        )
-
-        filename = f"espelho_ponto_{motorist_name.replace(' ', '_')}_{from_date_obj.strftime('%d_%m_%Y')}_a_{to_date_obj.strftime('%d_%m_%Y')}.pdf"
+            filename, pdf_buffer = build_closure_pdf(motorist_id, from_date, to_date)
+        except MotoristNotFoundError as e:
+            routes_logger.register_log(f"Erro: Motorista {motorist_id} não encontrado")
+            return jsonify({"error": str(e)}), 404
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         routes_logger.register_log(f"PDF gerado com sucesso: {filename}")
 
@@ -2631,304 +1913,8 @@ def generate_closure_pdf():
     except Exception as e:
         routes_logger.register_log(f"Erro ao gerar PDF de fechamento: {e}")
         routes_logger.register_log(f"Traceback: {traceback.format_exc()}")
-        
-        # Log adicional para debug
-        try:
-            routes_logger.register_log(f"Dados processados: {len(processed_data) if 'processed_data' in locals() else 'N/A'} linhas")
-            if 'processed_data' in locals() and processed_data:
-                routes_logger.register_log(f"Primeira linha: {processed_data[0] if processed_data else 'N/A'}")
-                routes_logger.register_log(f"Número de colunas na primeira linha: {len(processed_data[0]) if processed_data else 'N/A'}")
-        except Exception as debug_error:
-            routes_logger.register_log(f"Erro no debug: {debug_error}")
-        
         return jsonify({"error": f"Erro interno: {str(e)}"}), 500
 
-
-def generate_closure_pdf_report(motorist_name, motorist_cpf, from_date, to_date, data, totals, company_header=None, folgas_line=None):
-    """
-    Gera o PDF do relatório de fechamento de ponto otimizado para uma página
-    """
-    buffer = BytesIO()
-    
-    # Configurar documento PDF em landscape com margens mínimas para maximizar espaço
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=landscape(A4),
-        rightMargin=1.2*cm,
-        leftMargin=1.5*cm,
-        topMargin=0.5*cm,
-        bottomMargin=0.2*cm
-    )
-    
-    # Estilos
-    styles = getSampleStyleSheet()
-    
-    # Estilo para título principal - reduzido para economizar espaço
-    title_style = ParagraphStyle(
-        'MainTitle',
-        parent=styles['Heading1'],
-        fontSize=12,
-        spaceAfter=2,
-        alignment=TA_CENTER,
-        textColor=colors.black,
-        fontName='Helvetica-Bold'
-    )
-    
-    # Estilo para informações da empresa - reduzido
-    company_style = ParagraphStyle(
-        'CompanyInfo',
-        parent=styles['Normal'],
-        fontSize=7,
-        spaceAfter=1,
-        alignment=TA_CENTER,
-        textColor=colors.black,
-        fontName='Helvetica'
-    )
-    
-    # Estilo para informações do funcionário - reduzido
-    employee_style = ParagraphStyle(
-        'EmployeeInfo',
-        parent=styles['Normal'],
-        fontSize=8,
-        spaceAfter=1,
-        alignment=TA_LEFT,
-        textColor=colors.black,
-        fontName='Helvetica'
-    )
-    
-    # Estilo para período - reduzido
-    period_style = ParagraphStyle(
-        'PeriodInfo',
-        parent=styles['Normal'],
-        fontSize=7,
-        spaceAfter=2,
-        alignment=TA_LEFT,
-        textColor=colors.black,
-        fontName='Helvetica'
-    )
-    
-    # Estilo para assinaturas - reduzido
-    signature_style = ParagraphStyle(
-        'Signature',
-        parent=styles['Normal'],
-        fontSize=6,
-        spaceAfter=2,
-        alignment=TA_CENTER,
-        textColor=colors.black,
-        fontName='Helvetica'
-    )
-    
-    # Variante apenas +1 para a frase de período
-    period_style_big = ParagraphStyle(
-        'PeriodInfoBig',
-        parent=period_style,
-        fontSize=8
-    )
-    
-    # Elementos do PDF - otimizados para uma página
-    elements = []
-    
-    # Calcular altura disponível na página (para referência)
-    page_height = landscape(A4)[1] - (0.3*cm + 0.3*cm)  # Altura total menos margens
-    
-    # Título principal
-    elements.append(Paragraph("ESPELHO DE PONTO", title_style))
-    elements.append(Spacer(1, 1))
-    
-    # Informações da empresa (dinâmico quando disponível)
-    elements.append(Paragraph(company_header or "<b>TRANSPORTES PAZZI LTDA</b> - CNPJ: <b>17.698.598/0001-37</b>", company_style))
-    elements.append(Spacer(1, 1))
-    
-    # Informações do funcionário e totais lado a lado
-    employee_info = [
-        [Paragraph(f"FUNCIONÁRIO: {motorist_name}", employee_style), ""],
-        [Paragraph(f"CPF: {motorist_cpf}", employee_style), ""]
-    ]
-    
-    # Seção de totais ultra compacta
-    totals_data = [
-        ['INTERVALO', 'ALMOÇO', 'H. TRAB.', 'C. HORÁRIA', 'H.EXTRA50%', 'H.EXTRA100%', 'H.E. NOT.', 'AD.NOT', 'DIÁRIA', 'AJ. ALIMENT.'],
-        [totals['intervalo'], totals['almoco'], totals['h_trab'], totals['carga_horaria'], totals['h_extra50'], totals['h_extra100'], totals['h_e_not'], totals['ad_not'], totals['diaria'], totals['aj_aliment']]
-    ]
-    
-    # Calcular larguras menores para a tabela de totais
-    totals_col_widths = [doc.width/10 * 0.6] * 10  # 40% menor que a largura original
-    
-    totals_table = Table(totals_data, colWidths=totals_col_widths)
-    totals_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-        ('TEXTCOLOR', (0, 1), (-1, 1), colors.blue),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 6),
-        ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 1), (-1, 1), 7),
-        ('GRID', (0, 0), (-1, -1), 0.2, colors.grey),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 0.3),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 0.3),
-        ('TOPPADDING', (0, 0), (-1, -1), 0.2),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 0.2),
-    ]))
-    
-    # Criar tabela combinada: nome+CPF à esquerda (na mesma célula) e totais à direita
-    left_info = Paragraph(
-        f"FUNCIONÁRIO: <b>{motorist_name}</b><br/>CPF: <b>{motorist_cpf}</b>",
-        ParagraphStyle(
-            'EmployeeBlock', parent=employee_style, spaceAfter=0, leading=11, alignment=TA_LEFT
-        )
-    )
-
-    combined_table = Table(
-        [[left_info, totals_table]],
-        colWidths=[doc.width * 0.35, doc.width * 0.65]
-    )
-
-    combined_table.setStyle(TableStyle([
-        ('VALIGN', (0, 0), (0, 0), 'TOP'),
-        ('VALIGN', (1, 0), (1, 0), 'TOP'),
-        ('ALIGN', (0, 0), (0, 0), 'LEFT'),
-        ('ALIGN', (1, 0), (1, 0), 'LEFT'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 0),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-        ('TOPPADDING', (0, 0), (-1, -1), 0),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
-    ]))
-    
-    elements.append(combined_table)
-    elements.append(Spacer(1, 1))
-    
-    # Cabeçalho da tabela principal com colunas otimizadas - corrigido
-    header = [
-        'PLACA', 'DATA', 'DIA', 'INÍCIO', 'ALMOÇO', 'FIM', 'INTERVALO', 'H.TRAB', 'CARGA HORÁRIA',
-        'H.EXTRA50%', 'H.EXTRA100%', 'H.E.NOT', 'AD.NOT', 'DIÁRIA', 'AJ.ALIMENT.'
-    ]
-    
-    # Preparar dados da tabela
-    table_data = [header]
-    
-    # Adicionar dados - converter dicionários para listas
-    for row in data:
-        if isinstance(row, dict):
-            # Converter dicionário para lista na ordem correta - corrigido
-            table_data.append([
-                row.get('placa', ''),
-                row.get('data', ''),
-                row.get('dia_semana', ''),
-                row.get('inicio_jornada', ''),
-                f"{row.get('almoco_inicio', '')}, {row.get('almoco_fim', '')}",
-                row.get('fim_jornada', ''),
-                row.get('intervalo', ''),
-                row.get('h_trab', ''),
-                row.get('carga_horaria', ''),
-                row.get('h_extra50', ''),
-                row.get('h_extra100', ''),
-                row.get('h_e_not', ''),
-                row.get('ad_not', ''),
-                row.get('diaria', ''),
-                row.get('aj_aliment', '')
-            ])
-        else:
-            # Se já for lista, usar diretamente
-            table_data.append(row)
-    
-    # Calcular larguras das colunas para otimizar espaço - versão corrigida
-    col_widths = [
-        0.1,  # PLACA
-        0.06,  # DATA
-        0.04,  # DIA
-        0.05,  # INÍCIO
-        0.09,  # ALMOÇO
-        0.06,  # FIM
-        0.06,  # INTERVALO
-        0.06,  # H.TRAB
-        0.08,  # CARGA HORÁRIA
-        0.06,  # H.EXTRA50%
-        0.06,  # H.EXTRA100%
-        0.06,  # H.E.NOT
-        0.07,  # AD.NOT
-        0.07,  # DIÁRIA
-        0.07   # AJ.ALIMENT.
-    ]
-    
-    # Criar tabela com larguras otimizadas
-    table = Table(table_data, repeatRows=1, colWidths=[w * doc.width for w in col_widths])
-    
-    # Estilo da tabela com altura e largura ajustadas - otimizado para uma página
-    table_style = TableStyle([
-        # Cabeçalho principal
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 6),
-        ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
-        
-        # Dados - centralizados horizontalmente e verticalmente
-        ('ALIGN', (0, 1), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 1), (-1, -1), 'MIDDLE'),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 6.5),
-        
-        # Bordas
-        ('GRID', (0, 0), (-1, -1), 0.2, colors.grey),
-        ('LINEBELOW', (0, 0), (-1, 0), 0.3, colors.black),
-        
-        # Padding reduzido ao mínimo para melhor centralização
-        ('LEFTPADDING', (0, 0), (-1, -1), 0.5),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 0.5),
-        ('TOPPADDING', (0, 0), (-1, -1), 0.3),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 0.1),
-    ])
-    
-    table.setStyle(table_style)
-    elements.append(table)
-    elements.append(Spacer(1, 2))
-    
-    # Período de referência e folgas (linha dinâmica)
-    elements.append(Paragraph(folgas_line if folgas_line is not None else "-", period_style))
-    elements.append(Paragraph(f"Espelho de ponto referente a data de <b>{from_date}</b> a <b>{to_date}</b>", period_style_big))
-    # Empurrar assinaturas mais para baixo
-    elements.append(Spacer(1, 25))
-    
-    # Linhas de assinatura com espaçamento central (3 colunas)
-    signature_table = Table(
-        [
-            ['', '', ''],
-            ['FUNCIONÁRIO', '', 'RESPONSÁVEL']
-        ],
-        colWidths=[doc.width * 0.30, doc.width * 0.25, doc.width * 0.30],
-        hAlign='CENTER'
-    )
-
-    signature_table.setStyle(TableStyle([
-        # Linhas acima somente nas colunas das assinaturas
-        ('LINEABOVE', (0, 0), (0, 0), 0.8, colors.black),
-        ('LINEABOVE', (2, 0), (2, 0), 0.8, colors.black),
-        # Rótulos centralizados nas colunas 0 e 2
-        ('ALIGN', (0, 1), (0, 1), 'CENTER'),
-        ('ALIGN', (2, 1), (2, 1), 'CENTER'),
-        ('FONTNAME', (0, 1), (0, 1), 'Helvetica-Bold'),
-        ('FONTNAME', (2, 1), (2, 1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 1), (0, 1), 6),
-        ('FONTSIZE', (2, 1), (2, 1), 6),
-        # Controlar espaçamentos
-        ('BOTTOMPADDING', (0, 0), (2, 0), 0),
-        ('TOPPADDING', (0, 1), (2, 1), 0),
-    ]))
-    
-    elements.append(signature_table)
-    
-    # Construir PDF
-    doc.build(elements)
-    
-    # Retornar bytes do PDF
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
-    
-    return pdf_bytes
-
 @closure_bp.route('/api/closure/export_excel', methods=['POST'])
 @route_access_required
 def export_excel_closure():
@@ -2995,195 +1981,242 @@ def closure_reports_download():
         routes_logger.register_log(f"Erro no download de relatórios: {e}")
         return jsonify({"error": f"Erro interno: {str(e)}"}), 500
 
+def build_closure_excel(motorist_id, from_date, to_date):
+    """
+    Gera o Excel de fechamento (espelho de ponto) de um motorista no período.
+
+    :param motorist_id: ID do motorista.
+    :param from_date: Data inicial ('YYYY-MM-DD').
+    :param to_date: Data final ('YYYY-MM-DD').
+    :return: Tupla (nome do arquivo, conteúdo do .xlsx em bytes).
+    :raises MotoristNotFoundError: Se o motorista não existir.
+    """
+    from controller.data import fill_excel_fecham
+
+    result = closure_report_service.get(motorist_id, from_date, to_date)
+
+    wb = fill_excel_fecham(
+        name=result.motorist_name,
+        start=result.from_date.strftime('%d/%m/%Y'),
+        end=result.to_date.strftime('%d/%m/%Y'),
+        tabela=result.excel_rows(),
+        totals=result.excel_totals()
+    )
+
+    output = BytesIO()
+    wb.save(output)
+
+    filename = f"espelho_ponto_{result.motorist_name.replace(' ', '_')}_{result.from_date.strftime('%d_%m_%Y')}_a_{result.to_date.strftime('%d_%m_%Y')}.xlsx"
+    return filename, output.getvalue()
+
+
+
 def generate_excel_from_params(motorist_id, from_date, to_date):
     """Gera Excel a partir dos parâmetros fornecidos"""
     try:
-        # Importar a função fill_excel_fecham
-        from controller.data import fill_excel_fecham
-        
-        # Buscar dados do motorista
-        motorist_data = motorist_driver.retrieve_motorist(['id'], (int(motorist_id),))
-        if not motorist_data:
-            return jsonify({"error": "Motorista não encontrado"}), 404
-        
-        motorist_name = motorist_data[1]
-        
-        # Buscar dados usando a mesma lógica do get_closure_report
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # Converter datas para formato brasileiro
         try:
-            from_date_obj = datetime.strptime(from_date, '%Y-%m-%d')
-            to_date_obj = datetime.strptime(to_date, '%Y-%m-%d')
-            from_date_br = from_date_obj.strftime('%d-%m-%Y')
-            to_date_br = to_date_obj.strftime('%d-%m-%Y')
-        except:
-            from_date_br = from_date
-            to_date_br = to_date
-        
-        # Buscar dados de jornada (mesma lógica do get_closure_report)
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='trucks'")
-        trucks_exists = cursor.fetchone() is not None
-        
-        if trucks_exists:
-            cursor.execute("""
-                SELECT p.data, p.dia_da_semana, p.inicio_jornada, p.in_refeicao, p.fim_refeicao, p.fim_jornada,
-                       p.observacao, p.tempo_refeicao, p.tempo_intervalo, p.jornada_total, p.carga_horaria, p.hextra_50,
-                       p.hextra_100, p.he_noturno, p.daily_value, p.food_value, t.placa
-                FROM perm_data_fecham p
-                LEFT JOIN trucks t ON p.truck_id = t.id
-                WHERE p.motorist_id = ?
-                ORDER BY strftime('%Y-%m-%d', 
-                    substr(p.data, 7, 4) || '-' || 
-                    substr(p.data, 4, 2) || '-' || 
-                    substr(p.data, 1, 2)
-                )
-            """, (motorist_id,))
-        else:
-            cursor.execute("""
-                SELECT data, dia_da_semana, inicio_jornada, in_refeicao, fim_refeicao, fim_jornada,
-                       observacao, tempo_refeicao, tempo_intervalo, jornada_total, carga_horaria, hextra_50,
-                       hextra_100, he_noturno, daily_value, food_value
-                FROM perm_data_fecham 
-                WHERE motorist_id = ?
-                ORDER BY strftime('%Y-%m-%d', 
-                    substr(data, 7, 4) || '-' || 
-                    substr(data, 4, 2) || '-' || 
-                    substr(data, 1, 2)
-                )
-            """, (motorist_id,))
-        
-        jornada_data = cursor.fetchall()
-        
-        # Filtrar dados pelo período
-        jornada_filtrada = []
-        for row in jornada_data:
-            data = row[0]
-            try:
-                data_obj = datetime.strptime(data, '%d-%m-%Y')
-                from_date_obj = datetime.strptime(from_date_br, '%d-%m-%Y')
-                to_date_obj = datetime.strptime(to_date_br, '%d-%m-%Y')
-                
-                if from_date_obj <= data_obj <= to_date_obj:
-                    jornada_filtrada.append(row)
-            except:
-                pass
-        
-        # Buscar dados de dayoff
-        cursor.execute("""
-            SELECT data, motivo, daily_value, food_value
-            FROM dayoff_fecham 
-            WHERE motorist_id = ?
-            ORDER BY strftime('%Y-%m-%d', 
-                substr(data, 7, 4) || '-' || 
-                substr(data, 4, 2) || '-' || 
-                substr(data, 1, 2)
-            )
-        """, (motorist_id,))
-        
-        dayoff_data = cursor.fetchall()
-        
-        # Filtrar dayoff pelo período
-        dayoff_filtrada = []
-        for row in dayoff_data:
-            data = row[0]
-            try:
-                data_obj = datetime.strptime(data, '%d-%m-%Y')
-                from_date_obj = datetime.strptime(from_date_br, '%d-%m-%Y')
-                to_date_obj = datetime.strptime(to_date_br, '%d-%m-%Y')
-                
-                if from_date_obj <= data_obj <= to_date_obj:
-                    dayoff_filtrada.append(row)
-            except:
-                pass
-        
-        conn.close()
-        
-        # Processar dados para o formato do Excel (mesma lógica do get_closure_report mas simplificada)
-        processed_data = []
-        totais = {
-            'intervalo': '00:00',
-            'refeicao': '00:00', 
-            'h_trab': '00:00',
-            'carga_horaria': '00:00',
-            'h_extra50': '00:00',
-            'h_e_not': '00:00',
-            'ad_not': '00:00',
-            'diaria': 'R$ 0,00',
-            'aj_aliment': 'R$ 0,00'
-        }
-        
-        # Processar dados de jornada
-        for row in jornada_filtrada:
-            if trucks_exists and len(row) == 17:
-                data, dia_semana, inicio_jornada, in_refeicao, fim_refeicao, fim_jornada, \
-                observacao, tempo_refeicao, tempo_intervalo, jornada_total, carga_horaria, hextra_50, \
-                hextra_100, he_noturno, daily_value, food_value, placa = row
-            else:
-                data, dia_semana, inicio_jornada, in_refeicao, fim_refeicao, fim_jornada, \
-                observacao, tempo_refeicao, tempo_intervalo, jornada_total, carga_horaria, hextra_50, \
-                hextra_100, he_noturno, daily_value, food_value = row
-                placa = ""
-            
-            # Formatar dados para o Excel
-            processed_data.append([
-                placa or '',
-                data or '',
-                dia_semana or '',
-                inicio_jornada or '',
-                f"{in_refeicao or ''}, {fim_refeicao or ''}",
-                fim_jornada or '',
-                tempo_intervalo or '',
-                jornada_total or '',
-                carga_horaria or '',
-                hextra_50 or '',
-                he_noturno or '',  # Adicional Noturno usa he_noturno
-                he_noturno or '',
-                f"R$ {float(daily_value or 0):.2f}".replace('.', ','),
-                f"R$ {float(food_value or 0):.2f}".replace('.', ',')
-            ])
-        
-        # Processar dados de dayoff
-        for row in dayoff_filtrada:
-            data, motivo, daily_value, food_value = row
-            processed_data.append([
-                motivo or '',  # Motivo no lugar da placa
-                data or '',
-                '',  # Dia da semana vazio para dayoff
-                '', '', '', '', '', '', '', '', '',  # Campos de jornada vazios
-                f"R$ {float(daily_value or 0):.2f}".replace('.', ','),
-                f"R$ {float(food_value or 0):.2f}".replace('.', ',')
-            ])
-        
-        # Ordenar por data
-        processed_data.sort(key=lambda x: datetime.strptime(x[1], '%d-%m-%Y') if x[1] else datetime.min)
-        
-        # Gerar Excel
-        wb = fill_excel_fecham(
-            name=motorist_name,
-            start=from_date_obj.strftime('%d/%m/%Y') if 'from_date_obj' in locals() else from_date,
-            end=to_date_obj.strftime('%d/%m/%Y') if 'to_date_obj' in locals() else to_date,
-            tabela=processed_data,
-            totals=totais
-        )
-        
-        output = BytesIO()
-        wb.save(output)
-        output.seek(0)
-        
-        filename = f"espelho_ponto_{motorist_name.replace(' ', '_')}_{from_date_obj.strftime('%d_%m_%Y')}_a_{to_date_obj.strftime('%d_%m_%Y')}.xlsx"
-        
+            filename, content = build_closure_excel(motorist_id, from_date, to_date)
+        except MotoristNotFoundError as e:
+            return jsonify({"error": str(e)}), 404
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
         routes_logger.register_log(f"Excel gerado via modal com sucesso: {filename}")
-        
-        return send_file(output, as_attachment=True, download_name=filename,
+
+        return send_file(BytesIO(content), as_attachment=True, download_name=filename,
                          mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    
+
     except Exception as e:
         routes_logger.register_log(f"Erro ao gerar Excel via modal: {e}")
         return jsonify({"error": f"Erro interno: {str(e)}"}), 500
 
 
+# Relatórios de fechamento que podem ser gerados pela fila (params: motorist_id, from_date, to_date)
+CLOSURE_JOB_TYPES = {
+    'fechamento_pdf': build_closure_pdf,
+    'fechamento_excel': build_closure_excel,
+}
+for _tipo, _builder in CLOSURE_JOB_TYPES.items():
+    report_jobs.register(_tipo, _builder)
+
+
+def build_closure_batch(path, from_date, to_date, motorist_ids, formatos, workers=CLOSURE_EXPORT_WORKERS,
+                        progress=None):
+    """
+    Grava o ZIP da exportação em lote do fechamento (função geradora do job 'fechamento_lote').
+
+    :param path: Caminho do ZIP (artefato da fila).
+    :param from_date: Data inicial ('YYYY-MM-DD').
+    :param to_date: Data final ('YYYY-MM-DD').
+    :param motorist_ids: IDs dos motoristas.
+    :param formatos: Formatos a gerar ('pdf', 'excel').
+    :param workers: Quantidade de processos (0 = quantidade de CPUs).
+    :param progress: Função de contadores da fila (documentos concluídos, total e erros).
+    :return: Nome do ZIP para download.
+    """
+    return write_closure_zip({'pdf': build_closure_pdf, 'excel': build_closure_excel}, path, from_date, to_date,
+                             motorist_ids, formatos, max_workers=workers, progress=progress)
+
+
+# A exportação em lote usa a mesma fila (diretório de artefatos e expiração) dos demais relatórios
+CLOSURE_BATCH_JOB_TYPE = 'fechamento_lote'
+report_jobs.register(CLOSURE_BATCH_JOB_TYPE, build_closure_batch, writes_file=True, reports_progress=True)
+
+
+@closure_bp.route('/api/closure/export-batch', methods=['POST'])
+@route_access_required
+def start_closure_batch_export():
+    """
+    Enfileira a exportação em lote do fechamento: PDF e/ou Excel de cada motorista em um único ZIP.
+
+    JSON: from_date e to_date ('YYYY-MM-DD'), motorist_ids (padrão: motoristas ativos do fechamento),
+    formatos (padrão: ['pdf', 'excel']) e workers (opcional, limitado à quantidade de CPUs). O andamento
+    (documentos concluídos, total e erros em 'progresso') é consultado em /api/closure/export-batch/<job_id>;
+    os documentos que falharem são listados no resumo.json do ZIP.
+    """
+    dados = request.get_json(silent=True) or {}
+    from_date = dados.get('from_date')
+    to_date = dados.get('to_date')
+    if not from_date or not to_date:
+        return jsonify({"error": "Parâmetros obrigatórios não fornecidos"}), 400
+
+    try:
+        if dados.get('motorist_ids'):
+            motorist_ids = [int(m) for m in dados['motorist_ids']]
+        else:
+            motorist_ids = [row[0] for row in motorist_driver.retrieve_active_motorists_for_closure() or []]
+        formatos = check_closure_export(from_date, to_date, motorist_ids, dados.get('formatos'))
+        # Um processo por CPU no máximo (sem limite, um lote da frota abriria um processo por documento)
+        workers = min(max(int(dados.get('workers') or CLOSURE_EXPORT_WORKERS), 0), os.cpu_count() or 1)
+        job = report_jobs.submit(CLOSURE_BATCH_JOB_TYPE, {'from_date': from_date, 'to_date': to_date,
+                                                          'motorist_ids': motorist_ids, 'formatos': formatos,
+                                                          'workers': workers})
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": f"Parâmetros inválidos: {e}"}), 400
+    except Exception as e:
+        routes_logger.register_log("Erro ao iniciar a exportação em lote do fechamento.", f'Erro: {e}')
+        return jsonify({"error": "Erro ao iniciar a exportação em lote"}), 500
+
+    routes_logger.register_log(f"Exportação em lote do fechamento enfileirada: {job.job_id} "
+                               f"({len(motorist_ids)} motorista(s), {', '.join(formatos)})")
+    return jsonify({"status": "ok", "motoristas": len(motorist_ids), "formatos": formatos, **job.to_dict()}), 202
+
+
+@closure_bp.route('/api/closure/export-batch/<job_id>', methods=['GET'])
+@route_access_required
+def closure_batch_export_status(job_id):
+    """Andamento de uma exportação em lote do fechamento."""
+    job = report_jobs.get(job_id, tipos=(CLOSURE_BATCH_JOB_TYPE,))
+    if job is None:
+        return jsonify({"error": "Exportação não encontrada ou expirada"}), 404
+    return jsonify(job.to_dict())
+
+
+@closure_bp.route('/api/closure/export-batch/<job_id>/download', methods=['GET'])
+@route_access_required
+def download_closure_batch_export(job_id):
+    """Download do ZIP de uma exportação em lote concluída."""
+    job = report_jobs.get(job_id, tipos=(CLOSURE_BATCH_JOB_TYPE,))
+    if job is None:
+        return jsonify({"error": "Exportação não encontrada ou expirada"}), 404
+    if job.status != 'concluido':
+        return jsonify({"error": "A exportação ainda não foi concluída", **job.to_dict()}), 409
+    if not os.path.exists(job.path):
+        return jsonify({"error": "Arquivo da exportação não está mais disponível"}), 410
+
+    return send_file(os.path.abspath(job.path), as_attachment=True, download_name=job.filename,
+                     mimetype='application/zip')
+
+
+@closure_bp.route('/api/closure/report-jobs', methods=['POST'])
+@route_access_required
+def enqueue_closure_report_job():
+    """
+    Enfileira o PDF ou o Excel de fechamento de um motorista e retorna o ID do job (202). O andamento é
+    consultado em /api/closure/report-jobs/<job_id>.
+
+    JSON: tipo ('fechamento_pdf' ou 'fechamento_excel'), motorist_id, from_date e to_date ('YYYY-MM-DD').
+    """
+    dados = request.get_json(silent=True) or {}
+    tipo = dados.get('tipo')
+    if tipo not in CLOSURE_JOB_TYPES:
+        return jsonify({"error": f"Tipo inválido. Use {', '.join(CLOSURE_JOB_TYPES)}"}), 400
+    if not dados.get('motorist_id') or not dados.get('from_date') or not dados.get('to_date'):
+        return jsonify({"error": "Parâmetros obrigatórios não fornecidos"}), 400
+
+    try:
+        job = report_jobs.submit(tipo, {'motorist_id': int(dados['motorist_id']),
+                                        'from_date': dados['from_date'],
+                                        'to_date': dados['to_date']})
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": f"Parâmetros inválidos: {e}"}), 400
+
+    routes_logger.register_log(f"Relatório de fechamento enfileirado: {job.job_id} ({tipo})")
+    return jsonify({"status": "ok", **job.to_dict()}), 202
+
+
+@closure_bp.route('/api/closure/report-jobs/<job_id>', methods=['GET'])
+@route_access_required
+def closure_report_job_status(job_id):
+    """Andamento de um relatório de fechamento enfileirado."""
+    job = report_jobs.get(job_id, tipos=CLOSURE_JOB_TYPES)
+    if job is None:
+        return jsonify({"error": "Relatório não encontrado ou expirado"}), 404
+    return jsonify(job.to_dict())
+
+
+@closure_bp.route('/api/closure/report-jobs/<job_id>/download', methods=['GET'])
+@route_access_required
+def download_closure_report_job(job_id):
+    """Download do arquivo de um relatório de fechamento concluído."""
+    job = report_jobs.get(job_id, tipos=CLOSURE_JOB_TYPES)
+    if job is None:
+        return jsonify({"error": "Relatório não encontrado ou expirado"}), 404
+    if job.status != 'concluido':
+        return jsonify({"error": "O relatório ainda não foi concluído", **job.to_dict()}), 409
+    if not os.path.exists(job.path):
+        return jsonify({"error": "Arquivo do relatório não está mais disponível"}), 410
+
+    return send_file(os.path.abspath(job.path), as_attachment=True, download_name=job.filename)
+
+
+@closure_bp.route('/api/closure/export/<table>', methods=['GET'])
+@route_access_required
+def stream_closure_export_table(table):
+    """
+    Exporta em fluxo os dados brutos do fechamento de um período: perm_data_fecham ou dayoff_fecham. As linhas
+    são enviadas à medida que são lidas do banco (memória constante).
+
+    Query params:
+    - from_date, to_date: 'YYYY-MM-DD' (obrigatórios)
+    - motorist_id: IDs dos motoristas separados por vírgula (opcional; sem ele exporta todos)
+    - format: 'ndjson' (padrão) ou 'csv'
+    - columns: colunas separadas por vírgula (padrão: todas)
+    """
+    fmt = request.args.get('format', 'ndjson').lower()
+    from_date = request.args.get('from_date', '')
+    to_date = request.args.get('to_date', '')
+
+    try:
+        if fmt not in STREAM_FORMATS:
+            raise ValueError(f"Formato inválido: {fmt}. Use 'ndjson' ou 'csv'")
+        from_date = datetime.strptime(from_date, '%Y-%m-%d').strftime('%Y-%m-%d')
+        to_date = datetime.strptime(to_date, '%Y-%m-%d').strftime('%Y-%m-%d')
+        motorist_ids = [int(value) for value in request.args.get('motorist_id', '').split(',') if value.strip()]
+        columns = parse_columns_param(request.args.get('columns', ''), data_export_driver.get_columns(table))
+        rows = data_export_driver.iter_period(table, from_date, to_date, columns, motorist_ids=motorist_ids)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Parâmetros inválidos: {e}"}), 400
+
+    routes_logger.register_log(f"Exportação em fluxo de {table}: motoristas={motorist_ids or 'todos'}, "
+                               f"{from_date} a {to_date}, formato={fmt}.")
+
+    filename = f"{table}_{from_date}_a_{to_date}.{'csv' if fmt == 'csv' else 'ndjson'}"
+    return Response(stream_with_context(encode_stream(rows, columns, fmt)),
+                    mimetype=STREAM_FORMATS[fmt],
+                    headers={"Content-Disposition": f"attachment; filename={filename}"})
+
+
 # ============================================================================
 # APIs para Classificação de Blocos (Fase 2)
 # ============================================================================
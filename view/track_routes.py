@@ -1,6 +1,7 @@
 # Rotas disponíveis para todos os usuários autenticados que possuem acesso ao módulo de Jornada.
 
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify, send_file
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify, send_file, \
+    Response, stream_with_context
 try:
     import pandas as pd
 except ImportError:
@@ -11,7 +12,7 @@ from datetime import datetime, timedelta, date
 import sqlite3
 
 import openpyxl
-from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import PatternFill
 
 import json
@@ -21,10 +22,18 @@ import os
 
 from controller.utils import convert_date_format, CustomLogger
 from controller.google_sheets import GoogleSheetsManager
-from controller.data import extract_data, allowed_file, fill_excel, fill_pdf, make_data_block
+from controller.data import extract_data, allowed_file, fill_excel, fill_pdf, make_data_block, fill_journey_report
 from controller.decorators import route_access_required
 from controller.infractions import compute_infractions, convert_json_to_df
-from controller.infractions_data import get_sorted_events_with_work_periods
+from controller.infractions_batch import run_batch_scan
+from controller.infractions_incremental import recompute_infractions_for_dates
+from controller.compliance_rules import DEFAULT_THRESHOLDS, describe_rules
+from controller.fleet_day import build_fleet_day, fleet_day_window
+from controller.geofence import GeofenceMatcher
+from controller.address_enrichment import enrich_missing_addresses, index_known_addresses
+from controller.streaming import STREAM_FORMATS, parse_columns_param, downsample, project, encode_stream
+from controller.report_cache import report_cache
+from controller.report_jobs import report_jobs
 
 from werkzeug.utils import secure_filename
 
@@ -35,8 +44,14 @@ from model.drivers.uploaded_data_driver import UploadedDataDriver
 from model.drivers.truck_driver import TruckDriver
 from model.drivers.track_dayoff_driver import TrackDayOffDriver
 from model.drivers.removed_infractions_driver import RemovedInfractionsDriver
+from model.drivers.compliance_state_driver import ComplianceStateDriver
+from model.drivers.parameters_driver import ParametersDriver
+from model.drivers.geofence_driver import GeofenceDriver
+from model.drivers.address_index_driver import AddressIndexDriver
+from model.drivers.journey_version_driver import JourneyVersionDriver
+from model.drivers.data_export_driver import DataExportDriver
 
-from global_vars import DEBUG, DB_PATH, INFRACTION_DICT
+from global_vars import DEBUG, DB_PATH, INFRACTION_DICT, FLEET_DAY_WORKERS, INFRACTION_SCAN_WORKERS
 
 track_bp = Blueprint('jornada', __name__)
 
@@ -47,7 +62,13 @@ uploaded_track_driver = UploadedDataDriver(logger=routes_logger, db_path=DB_PATH
 truck_driver = TruckDriver(logger=routes_logger, db_path=DB_PATH)
 dayoff_driver = TrackDayOffDriver(logger=routes_logger, db_path=DB_PATH)
 removed_infractions_driver = RemovedInfractionsDriver(logger=routes_logger, db_path=DB_PATH)
+compliance_state_driver = ComplianceStateDriver(logger=routes_logger, db_path=DB_PATH)
+parameters_driver = ParametersDriver(logger=routes_logger, db_path=DB_PATH)
 perm_uploaded_track_driver = AnalyzedTrackData(logger=routes_logger, db_path=DB_PATH)
+geofence_driver = GeofenceDriver(logger=routes_logger, db_path=DB_PATH)
+address_index_driver = AddressIndexDriver(logger=routes_logger, db_path=DB_PATH)
+journey_version_driver = JourneyVersionDriver(logger=routes_logger, db_path=DB_PATH)
+data_export_driver = DataExportDriver(logger=routes_logger, db_path=DB_PATH, tables=DataExportDriver.TRACK_TABLES)
 
 def verify_conflicts(motorist_id: int, dates: list, db_conn) -> tuple:
     """
@@ -207,6 +228,18 @@ def upload_file():
                     routes_logger.print("Extraindo Sascar")
                     df = extract_data(filepath=file_path, system_type='sascar', truck_driver=truck_driver)
 
+                # SASGC não informa a rua: completa com o endereço conhecido mais próximo.
+                # Os demais rastreadores alimentam o índice de endereços.
+                try:
+                    if tracker_type == 'sasgc':
+                        filled = enrich_missing_addresses(df, address_index_driver)
+                        routes_logger.print(f"Endereços completados pelo índice: {filled} ponto(s).")
+                    else:
+                        index_known_addresses(df, address_index_driver)
+                except Exception as e:
+                    routes_logger.register_log(f"Erro no enriquecimento de endereços do arquivo {file_path}.",
+                                               f"Erro: {e}")
+
                 # Insere os dados processados no banco de dados
                 uploaded_track_driver.insert_from_dataframe(df)
 
@@ -317,6 +350,9 @@ def track_analysis():
             'ignicao'
         ]
 
+        # Locais cadastrados para sugerir a classificação das paradas (carregados uma vez por análise)
+        geofence_matcher = GeofenceMatcher(geofence_driver.retrieve_all_geofences(only_active=True))
+
         for date in dates:
             # Registro de cada dia da placa especificada
             records = uploaded_track_driver.retrieve_by_datetime_range(start_datetime=date + " 00:00",
@@ -328,7 +364,7 @@ def track_analysis():
             records_df = pd.DataFrame(records, columns=colunas)
             routes_logger.print(records_df)
             # DEBUG: Gerando blocos
-            block = make_data_block(records_df, date)
+            block = make_data_block(records_df, date, geofence_matcher=geofence_matcher)
 
             blocks.append(block)
 
@@ -354,6 +390,455 @@ def track_analysis():
     )
 
 
+def _load_fleet_day(date: str) -> list:
+    """
+    Carrega os pontos de toda a frota para a data informada em uma única consulta
+    e devolve o resumo diário de cada caminhão.
+
+    :param date: Data no formato 'YYYY-MM-DD'.
+    :return: Lista de resumos por caminhão (ver controller.fleet_day.summarize_truck_day).
+    """
+    start_datetime, end_datetime = fleet_day_window(date)
+    records = uploaded_track_driver.retrieve_fleet_by_datetime_range(start_datetime=start_datetime,
+                                                                     end_datetime=end_datetime)
+    plates = {truck[0]: truck[1] for truck in truck_driver.retrieve_all_trucks()}
+
+    return build_fleet_day(records, plates=plates, max_workers=FLEET_DAY_WORKERS)
+
+
+@track_bp.route('/fleet_day', methods=['GET'])
+@route_access_required
+def fleet_day():
+    date = request.args.get('date', '')
+    summaries = []
+
+    if date:
+        try:
+            summaries = _load_fleet_day(date)
+        except ValueError:
+            flash("Data inválida. Use o formato AAAA-MM-DD.")
+        except Exception as e:
+            flash("Erro ao gerar a visão da frota. Consulte o log ROUTES para maiores informações.")
+            routes_logger.register_log("Erro ao gerar a visão diária da frota.", f"Erro: {e}")
+
+    return render_template('fleet_day.html', date=date, caminhoes=summaries)
+
+
+@track_bp.route('/api/fleet-day', methods=['GET'])
+@route_access_required
+def api_fleet_day():
+    date = request.args.get('date', '')
+
+    if not date:
+        return jsonify({"error": "Parâmetro 'date' é obrigatório (AAAA-MM-DD)"}), 400
+
+    try:
+        summaries = _load_fleet_day(date)
+    except ValueError:
+        return jsonify({"error": "Data inválida. Use o formato AAAA-MM-DD"}), 400
+    except Exception as e:
+        routes_logger.register_log("Erro ao gerar a visão diária da frota.", f"Erro: {e}")
+        return jsonify({"error": f"Erro interno: {str(e)}"}), 500
+
+    return jsonify({"date": date, "total": len(summaries), "caminhoes": summaries})
+
+
+
+def _normalize_stream_datetime(value: str, end_of_day: bool = False) -> str:
+    """
+    Aceita 'YYYY-MM-DD' ou 'YYYY-MM-DD HH:MM[:SS]' e devolve 'YYYY-MM-DD HH:MM:SS'.
+
+    :raises ValueError: Se o valor não estiver em nenhum dos formatos aceitos.
+    """
+    value = (value or '').strip().replace('T', ' ')
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M'):
+        try:
+            return datetime.strptime(value, fmt).strftime('%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            continue
+    day = datetime.strptime(value, '%Y-%m-%d').strftime('%Y-%m-%d')
+    return f"{day} 23:59:59" if end_of_day else f"{day} 00:00:00"
+
+
+@track_bp.route('/api/track-points', methods=['GET'])
+@route_access_required
+def stream_track_points():
+    """
+    Exporta em fluxo os pontos brutos de rastreamento (tabela vehicle_data).
+
+    Query params:
+    - start, end: 'YYYY-MM-DD' ou 'YYYY-MM-DD HH:MM[:SS]' (obrigatórios)
+    - truck_id: ID do caminhão (opcional; sem ele exporta a frota inteira)
+    - format: 'ndjson' (padrão) ou 'csv'
+    - columns: colunas separadas por vírgula (padrão: todas)
+    - step: mantém 1 a cada N pontos de cada caminhão
+    - interval: intervalo mínimo em segundos entre pontos mantidos de cada caminhão
+    """
+    fmt = request.args.get('format', 'ndjson').lower()
+    truck_id = request.args.get('truck_id') or None
+
+    try:
+        if fmt not in STREAM_FORMATS:
+            raise ValueError(f"Formato inválido: {fmt}. Use 'ndjson' ou 'csv'")
+        start_datetime = _normalize_stream_datetime(request.args.get('start'))
+        end_datetime = _normalize_stream_datetime(request.args.get('end'), end_of_day=True)
+        columns = parse_columns_param(request.args.get('columns', ''), uploaded_track_driver.columns)
+        step = int(request.args.get('step', 1))
+        interval = int(request.args.get('interval', 0))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Parâmetros inválidos: {e}"}), 400
+
+    # A amostragem precisa do caminhão e do horário mesmo que não sejam exportados
+    query_columns = list(columns)
+    for required in ('truck_id', 'data_iso'):
+        if required not in query_columns:
+            query_columns.append(required)
+
+    rows = uploaded_track_driver.iter_by_datetime_range(start_datetime=start_datetime,
+                                                        end_datetime=end_datetime,
+                                                        truck_id=truck_id,
+                                                        columns=query_columns)
+    rows = downsample(rows, step=step, min_interval=interval,
+                      key_index=query_columns.index('truck_id'),
+                      ts_index=query_columns.index('data_iso'))
+    rows = project(rows, [query_columns.index(col) for col in columns])
+
+    routes_logger.register_log(f"Exportação em fluxo de pontos: truck_id={truck_id}, "
+                               f"{start_datetime} a {end_datetime}, formato={fmt}.")
+
+    filename = f"pontos_{truck_id or 'frota'}_{start_datetime[:10]}_a_{end_datetime[:10]}.{'csv' if fmt == 'csv' else 'ndjson'}"
+    return Response(stream_with_context(encode_stream(rows, columns, fmt)),
+                    mimetype=STREAM_FORMATS[fmt],
+                    headers={"Content-Disposition": f"attachment; filename={filename}"})
+
+
+@track_bp.route('/api/export/<table>', methods=['GET'])
+@route_access_required
+def stream_export_table(table):
+    """
+    Exporta em fluxo os dados brutos de um período: perm_data, dayoff ou infractions. As linhas são enviadas
+    à medida que são lidas do banco (memória constante). As tabelas do fechamento são exportadas em
+    /api/closure/export/<table>.
+
+    Query params:
+    - from_date, to_date: 'YYYY-MM-DD' (obrigatórios)
+    - motorist_id: IDs dos motoristas separados por vírgula (opcional; sem ele exporta todos)
+    - format: 'ndjson' (padrão) ou 'csv'
+    - columns: colunas separadas por vírgula (padrão: todas)
+    """
+    fmt = request.args.get('format', 'ndjson').lower()
+    from_date = request.args.get('from_date', '')
+    to_date = request.args.get('to_date', '')
+
+    try:
+        if fmt not in STREAM_FORMATS:
+            raise ValueError(f"Formato inválido: {fmt}. Use 'ndjson' ou 'csv'")
+        from_date = datetime.strptime(from_date, '%Y-%m-%d').strftime('%Y-%m-%d')
+        to_date = datetime.strptime(to_date, '%Y-%m-%d').strftime('%Y-%m-%d')
+        motorist_ids = [int(value) for value in request.args.get('motorist_id', '').split(',') if value.strip()]
+        columns = parse_columns_param(request.args.get('columns', ''), data_export_driver.get_columns(table))
+        rows = data_export_driver.iter_period(table, from_date, to_date, columns, motorist_ids=motorist_ids)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Parâmetros inválidos: {e}"}), 400
+
+    routes_logger.register_log(f"Exportação em fluxo de {table}: motoristas={motorist_ids or 'todos'}, "
+                               f"{from_date} a {to_date}, formato={fmt}.")
+
+    filename = f"{table}_{from_date}_a_{to_date}.{'csv' if fmt == 'csv' else 'ndjson'}"
+    return Response(stream_with_context(encode_stream(rows, columns, fmt)),
+                    mimetype=STREAM_FORMATS[fmt],
+                    headers={"Content-Disposition": f"attachment; filename={filename}"})
+
+
+
+@track_bp.route('/api/track-points/nearby', methods=['GET'])
+@route_access_required
+def track_points_nearby():
+    """
+    Lista os caminhões que passaram (ou pararam) em uma área dentro de uma janela de tempo.
+
+    Query params:
+    - start, end: 'YYYY-MM-DD' ou 'YYYY-MM-DD HH:MM[:SS]' (obrigatórios)
+    - lat, lon, radius: centro e raio em metros (padrão 500), ou
+    - min_lat, max_lat, min_lon, max_lon: retângulo de busca
+    - stopped: '1' para considerar apenas pontos com velocidade zero
+    - truck_id: restringe a um caminhão (opcional)
+    - detail: '1' para incluir os pontos encontrados de cada caminhão
+    """
+    try:
+        start_datetime = _normalize_stream_datetime(request.args.get('start'))
+        end_datetime = _normalize_stream_datetime(request.args.get('end'), end_of_day=True)
+        stopped_only = request.args.get('stopped') == '1'
+        detail = request.args.get('detail') == '1'
+        truck_ids = [request.args.get('truck_id')] if request.args.get('truck_id') else None
+
+        if request.args.get('lat') and request.args.get('lon'):
+            records = uploaded_track_driver.retrieve_in_radius(latitude=float(request.args.get('lat')),
+                                                               longitude=float(request.args.get('lon')),
+                                                               radius_m=float(request.args.get('radius', 500)),
+                                                               start_datetime=start_datetime,
+                                                               end_datetime=end_datetime,
+                                                               truck_ids=truck_ids,
+                                                               stopped_only=stopped_only)
+        else:
+            records = uploaded_track_driver.retrieve_in_bbox(min_lat=float(request.args.get('min_lat')),
+                                                             max_lat=float(request.args.get('max_lat')),
+                                                             min_lon=float(request.args.get('min_lon')),
+                                                             max_lon=float(request.args.get('max_lon')),
+                                                             start_datetime=start_datetime,
+                                                             end_datetime=end_datetime,
+                                                             truck_ids=truck_ids,
+                                                             stopped_only=stopped_only)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Parâmetros inválidos: {e}"}), 400
+    except Exception as e:
+        routes_logger.register_log("Erro na consulta espacial de pontos.", f"Erro: {e}")
+        return jsonify({"error": f"Erro interno: {str(e)}"}), 500
+
+    plates = {truck[0]: truck[1] for truck in truck_driver.retrieve_all_trucks()}
+    trucks = {}
+
+    for record in records:
+        truck_id, data_iso = record[0], record[1]
+        entry = trucks.get(truck_id)
+        if entry is None:
+            entry = trucks[truck_id] = {
+                "truck_id": truck_id,
+                "placa": plates.get(truck_id, str(truck_id)),
+                "pontos": 0,
+                "primeiro": data_iso,
+                "ultimo": data_iso,
+                "distancia_min_m": None
+            }
+            if detail:
+                entry["registros"] = []
+
+        entry["pontos"] += 1
+        entry["ultimo"] = data_iso
+        if len(record) > len(uploaded_track_driver.columns):
+            distance = record[-1]
+            if entry["distancia_min_m"] is None or distance < entry["distancia_min_m"]:
+                entry["distancia_min_m"] = distance
+        if detail:
+            entry["registros"].append(dict(zip(uploaded_track_driver.columns + ['distancia_m'], record)))
+
+    return jsonify({"start": start_datetime, "end": end_datetime, "total": len(trucks),
+                    "caminhoes": sorted(trucks.values(), key=lambda t: t["placa"])})
+
+
+
+@track_bp.route('/api/geofences', methods=['GET'])
+@route_access_required
+def list_geofences():
+    columns = ['id', 'nome', 'tipo', 'latitude', 'longitude', 'raio_m', 'poligono', 'classificacao', 'ativo']
+    geofences = []
+    for row in geofence_driver.retrieve_all_geofences():
+        geofence = dict(zip(columns, row))
+        geofence['poligono'] = json.loads(geofence['poligono']) if geofence['poligono'] else None
+        geofences.append(geofence)
+    return jsonify(geofences)
+
+
+@track_bp.route('/api/geofences', methods=['POST'])
+@route_access_required
+def create_geofence():
+    """
+    Cadastra um local para classificação automática de paradas.
+
+    Corpo JSON:
+    - nome, tipo ('circulo' | 'poligono'), classificacao ('REFEIÇÃO' | 'DESCANSO' | 'CARGA/DESCARGA')
+    - circulo: latitude, longitude, raio_m
+    - poligono: poligono ([[lat, lon], ...])
+    """
+    data = request.get_json() or {}
+
+    if not data.get('nome') or not data.get('tipo'):
+        return jsonify({"error": "Campos 'nome' e 'tipo' são obrigatórios"}), 400
+
+    try:
+        geofence_driver.create_geofence(nome=data['nome'],
+                                        tipo=data['tipo'],
+                                        classificacao=data.get('classificacao') or None,
+                                        latitude=data.get('latitude'),
+                                        longitude=data.get('longitude'),
+                                        raio_m=data.get('raio_m'),
+                                        poligono=data.get('poligono'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    routes_logger.register_log(f"Local cadastrado: {data['nome']} ({data['tipo']}).")
+    return jsonify({"mensagem": "Local cadastrado com sucesso!", "status": "ok"})
+
+
+@track_bp.route('/api/geofences/<int:geofence_id>', methods=['DELETE'])
+@route_access_required
+def delete_geofence(geofence_id):
+    if not geofence_driver.delete_geofence(geofence_id):
+        return jsonify({"error": "Local não encontrado"}), 404
+    return jsonify({"mensagem": "Local removido com sucesso!", "status": "ok"})
+
+
+def build_batch_scan(inicio, fim, motorist_ids=None, workers=INFRACTION_SCAN_WORKERS, progress=None):
+    """
+    Executa a varredura de infrações (função geradora do job 'varredura_infracoes').
+
+    :param inicio: Primeiro dia do período ('DD-MM-YYYY').
+    :param fim: Último dia do período ('DD-MM-YYYY').
+    :param motorist_ids: IDs dos motoristas (padrão: motoristas ativos da jornada).
+    :param workers: Quantidade de processos (0 = quantidade de CPUs).
+    :param progress: Função de contadores da fila (motoristas concluídos, total e erros).
+    :return: Tupla (nome do arquivo, resumo de `run_batch_scan` em JSON).
+    """
+    summary = run_batch_scan(DB_PATH, inicio, fim, motorist_ids=motorist_ids, max_workers=workers, progress=progress)
+    return f"varredura_infracoes_{inicio}_a_{fim}.json", json.dumps(summary, ensure_ascii=False).encode('utf-8')
+
+
+# A varredura usa a mesma fila (workers, diretório de artefatos e expiração) dos relatórios
+BATCH_SCAN_JOB_TYPE = 'varredura_infracoes'
+report_jobs.register(BATCH_SCAN_JOB_TYPE, build_batch_scan, reports_progress=True)
+
+
+@track_bp.route('/api/infractions/batch-scan', methods=['POST'])
+@route_access_required
+def infractions_batch_scan():
+    """
+    Enfileira a varredura das infrações de todos os motoristas ativos da jornada em um período e retorna o ID do
+    job (202); somente administradores. O andamento (motoristas concluídos, total e erros em 'progresso') e, ao
+    final, o resumo da varredura são consultados em /api/infractions/batch-scan/<job_id>.
+
+    JSON: inicio e fim ('DD-MM-YYYY', padrão: ontem), motorist_ids (opcional) e workers (opcional, limitado à
+    quantidade de CPUs).
+    """
+    if not session.get('user', {}).get('is_admin'):
+        return jsonify({"error": "Apenas administradores podem executar a varredura de infrações"}), 403
+
+    dados = request.get_json(silent=True) or {}
+    yesterday = (datetime.now() - timedelta(days=1)).strftime('%d-%m-%Y')
+    start = dados.get('inicio') or yesterday
+    end = dados.get('fim') or start
+
+    try:
+        if datetime.strptime(start, '%d-%m-%Y') > datetime.strptime(end, '%d-%m-%Y'):
+            raise ValueError("A data inicial deve ser anterior ou igual à data final.")
+        motorist_ids = [int(m) for m in dados['motorist_ids']] if dados.get('motorist_ids') else None
+        workers = min(max(int(dados.get('workers') or INFRACTION_SCAN_WORKERS), 0), os.cpu_count() or 1)
+        job = report_jobs.submit(BATCH_SCAN_JOB_TYPE, {'inicio': start, 'fim': end, 'motorist_ids': motorist_ids,
+                                                       'workers': workers})
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": f"Parâmetros inválidos: {e}"}), 400
+    except Exception as e:
+        routes_logger.register_log("Erro ao iniciar a varredura de infrações.", f'Erro: {e}')
+        return jsonify({"error": "Erro ao iniciar a varredura de infrações"}), 500
+
+    routes_logger.register_log(f"Varredura de infrações enfileirada: {job.job_id} ({start} a {end})")
+    return jsonify({"status": "ok", "inicio": start, "fim": end, **job.to_dict()}), 202
+
+
+@track_bp.route('/api/infractions/batch-scan/<job_id>', methods=['GET'])
+@route_access_required
+def infractions_batch_scan_status(job_id):
+    """Andamento de uma varredura de infrações; quando concluída, inclui o resumo em 'resumo'."""
+    if not session.get('user', {}).get('is_admin'):
+        return jsonify({"error": "Apenas administradores podem consultar a varredura de infrações"}), 403
+
+    job = report_jobs.get(job_id, tipos=(BATCH_SCAN_JOB_TYPE,))
+    if job is None:
+        return jsonify({"error": "Varredura não encontrada ou expirada"}), 404
+
+    status = job.to_dict()
+    if job.status == 'concluido' and os.path.exists(job.path):
+        with open(job.path, encoding='utf-8') as summary_file:
+            status['resumo'] = json.load(summary_file)
+    return jsonify(status)
+
+
+@track_bp.route('/api/report-cache/stats', methods=['GET'])
+@route_access_required
+def report_cache_stats():
+    """
+    Métricas do cache de relatórios (jornada e fechamento): entradas, bytes, acertos, falhas, respostas 304,
+    remoções e taxa de acerto.
+    """
+    return jsonify(report_cache.stats())
+
+
+@track_bp.route('/api/compliance-rules', methods=['GET'])
+@route_access_required
+def list_compliance_rules():
+    """
+    Lista as regras de infração registradas, as colunas que usam e os limites em uso nesta operação.
+    """
+    return jsonify({"regras": describe_rules(parameters_driver.get_rule_thresholds()),
+                    "padroes": DEFAULT_THRESHOLDS})
+
+
+@track_bp.route('/api/compliance-rules', methods=['PUT'])
+@route_access_required
+def update_compliance_rules():
+    """
+    Altera os limites das regras de infração desta operação (somente administradores).
+
+    JSON: parametros: {nome do limite: valor inteiro (segundos, ou dias para MAX_DIAS_CONSECUTIVOS_TRABALHADOS)
+    ou null para voltar ao padrão}. As infrações já gravadas não são recalculadas.
+    """
+    if not session.get('user', {}).get('is_admin'):
+        return jsonify({"error": "Apenas administradores podem alterar os limites das regras"}), 403
+
+    parametros = (request.get_json(silent=True) or {}).get('parametros') or {}
+    if not isinstance(parametros, dict) or not parametros:
+        return jsonify({"error": "Informe os parâmetros a alterar"}), 400
+
+    desconhecidos = [name for name in parametros if name not in DEFAULT_THRESHOLDS]
+    if desconhecidos:
+        return jsonify({"error": f"Parâmetros desconhecidos: {', '.join(desconhecidos)}"}), 400
+
+    try:
+        thresholds = {name: None if value is None else int(value) for name, value in parametros.items()}
+    except (TypeError, ValueError):
+        return jsonify({"error": "Os parâmetros devem ser números inteiros"}), 400
+    if any(value is not None and value <= 0 for value in thresholds.values()):
+        return jsonify({"error": "Os parâmetros devem ser maiores que zero"}), 400
+
+    parameters_driver.set_rule_thresholds(thresholds)
+    routes_logger.register_log(f"Limites das regras de infração alterados: {thresholds}")
+    return jsonify({"status": "ok", "regras": describe_rules(parameters_driver.get_rule_thresholds())})
+
+
+def _compliance_state_json(motorist_id, state) -> dict:
+    data, dias_consecutivos, horas_semanais_s, fim_jornada = state
+    # A sequência só continua se o último dia trabalhado foi hoje ou ontem
+    em_sequencia = (date.today() - datetime.strptime(data, '%d-%m-%Y').date()).days <= 1
+    return {
+        "motorist_id": motorist_id,
+        "ultimo_dia": data,
+        "fim_jornada": fim_jornada,
+        "dias_consecutivos": dias_consecutivos if em_sequencia else 0,
+        "horas_semanais": f"{horas_semanais_s // 3600:02}:{(horas_semanais_s % 3600) // 60:02}" if em_sequencia else "00:00",
+        "em_sequencia": em_sequencia,
+        "dias_consecutivos_ultimo_dia": dias_consecutivos,
+        "horas_semanais_ultimo_dia_s": horas_semanais_s
+    }
+
+
+@track_bp.route('/api/compliance-state', methods=['GET'])
+@route_access_required
+def compliance_states():
+    """Sequência de dias trabalhados e horas acumuladas de todos os motoristas, a partir do estado gravado."""
+    states = compliance_state_driver.retrieve_latest_states()
+    return jsonify([_compliance_state_json(row[0], row[1:]) for row in states])
+
+
+@track_bp.route('/api/compliance-state/<int:motorist_id>', methods=['GET'])
+@route_access_required
+def compliance_state(motorist_id):
+    """Sequência de dias trabalhados e horas acumuladas de um motorista, a partir do estado gravado."""
+    state = compliance_state_driver.retrieve_latest_state(motorist_id)
+    if not state:
+        return jsonify({"error": "Nenhum estado registrado para o motorista"}), 404
+    return jsonify(_compliance_state_json(motorist_id, state))
+
+
+
 ### Inserir dados
 @track_bp.route('/insert_data', methods=['GET'])
 @route_access_required
@@ -668,6 +1153,10 @@ def check_updates_page():
 @track_bp.route('/infractions', methods=['GET'])
 @route_access_required
 def infractions_page():
+    """
+    Tela de infrações. A página só traz os filtros e a lista de motoristas; as infrações são carregadas pelo
+    navegador em /api/infractions, uma página por vez (paginação por cursor).
+    """
     # Obtém os valores dos filtros da URL
     motorist_filter = request.args.get('motorist_id', '')
     tipo_infracao_filter = request.args.get('tipo_infracao', '')
@@ -678,33 +1167,100 @@ def infractions_page():
     all_motorists.sort(key=lambda x: x[1].upper() if x[1] else '')
     all_motorists = [(motorist[0], motorist[1]) for motorist in all_motorists]
 
-    # Construir as condições de filtro
-    where_columns = []
-    where_values = []
-    
-    if motorist_filter:
-        where_columns.append('motorist_id')
-        where_values.append(motorist_filter)
-    
-    if tipo_infracao_filter:
-        where_columns.append('tipo_infracao')
-        where_values.append(tipo_infracao_filter)
-
-    # Se houver filtros, aplica-os, caso contrário retorna todas as infrações
-    if where_columns and where_values:
-        infractions = infraction_driver.retrieve_infractions(where_columns=where_columns,
-                                                           where_values=tuple(where_values))
-    else:
-        infractions = infraction_driver.retrieve_all_infractions()
-
-    # Passa as infrações, motoristas e tipos de infração para o template
     return render_template('infractions_page.html',
-                         infractions=infractions,
                          all_motorists=all_motorists,
                          infraction_types=INFRACTION_DICT,
                          motorist_id=motorist_filter,
                          tipo_infracao=tipo_infracao_filter)
 
+def _parse_bool_arg(value):
+    if value is None or value == '':
+        return None
+    if value.lower() in ('1', 'true', 'sim'):
+        return True
+    if value.lower() in ('0', 'false', 'nao', 'não'):
+        return False
+    raise ValueError(f"Valor booleano inválido: {value}")
+
+
+def _parse_int_arg(value, name):
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} deve ser um número inteiro: {value}")
+
+
+@track_bp.route('/api/infractions', methods=['GET'])
+@route_access_required
+def list_infractions():
+    """
+    Lista infrações com filtros e paginação por cursor.
+
+    Parâmetros (query string): motorist_id, truck_id, tipo (repetido ou separado por vírgula), lido (0/1),
+    de e ate ('DD-MM-YYYY'), justificada (0/1), limit (padrão 50, máximo 500) e cursor (next_cursor da página anterior).
+    """
+    try:
+        tipos = [t for value in request.args.getlist('tipo') for t in value.split(',') if t.strip()]
+        filters = {
+            'motorist_id': _parse_int_arg(request.args.get('motorist_id'), 'motorist_id'),
+            'truck_id': _parse_int_arg(request.args.get('truck_id'), 'truck_id'),
+            'tipos': tipos,
+            'lido': _parse_bool_arg(request.args.get('lido')),
+            'data_inicio': request.args.get('de'),
+            'data_fim': request.args.get('ate'),
+            'justificada': _parse_bool_arg(request.args.get('justificada'))
+        }
+        limit = _parse_int_arg(request.args.get('limit'), 'limit')
+        limit = 50 if limit is None else min(max(limit, 1), 500)
+        page = infraction_driver.retrieve_infractions_page(filters, limit=limit, cursor=request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({"error": f"Parâmetros inválidos: {e}"}), 400
+    except Exception as e:
+        routes_logger.register_log("Erro ao listar infrações.", f'Erro: {e}')
+        return jsonify({"error": "Erro ao listar infrações"}), 500
+
+    return jsonify(page)
+
+
+@track_bp.route('/api/infractions/bulk', methods=['POST'])
+@route_access_required
+def bulk_infractions():
+    """
+    Aplica uma ação a várias infrações de uma vez.
+
+    JSON: acao ('lido', 'remover' ou 'link') e hashes (lista). Para 'link', informe link (mesmo link para todas)
+    ou itens: [{hash, link}].
+    """
+    dados = request.get_json(silent=True) or {}
+    acao = dados.get('acao')
+
+    if dados.get('itens'):
+        items = [(item.get('hash'), item.get('link')) for item in dados['itens'] if item.get('hash')]
+    else:
+        items = [(h, dados.get('link')) for h in dados.get('hashes') or [] if h]
+
+    if not items:
+        return jsonify({"error": "Nenhuma infração informada"}), 400
+    if acao == 'link' and any(not link for _, link in items):
+        return jsonify({"error": "Informe o link da tratativa"}), 400
+
+    try:
+        results = infraction_driver.bulk_update(acao, items)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        routes_logger.register_log("Erro ao processar infrações em lote.", f'Erro: {e}')
+        return jsonify({"error": "Erro ao processar infrações em lote"}), 500
+
+    return jsonify({
+        "status": "ok",
+        "processadas": sum(1 for r in results if r['status'] == 'ok'),
+        "resultados": results
+    })
+
+
 @track_bp.route('/infraction_details')
 @route_access_required
 def infraction_details():
@@ -739,57 +1295,70 @@ def infraction_details():
 
     return render_template('infractions_details.html', data_dict=data_dict)
 
+REMOVED_INFRACTIONS_COLUMNS = ['Motorista', 'Placa', 'Data', 'Hora', 'Duração', 'Tipo Infração', 'Descrição',
+                               'Link Justificativa', 'Data Remoção']
+
+
 @track_bp.route('/download_removed_infractions')
 @route_access_required
 def download_removed_infractions():
+    """
+    Planilha das infrações removidas, com os mesmos filtros da tela de infrações.
+
+    Parâmetros (query string, opcionais): motorist_id, tipo_infracao, de e ate ('DD-MM-YYYY'). As linhas são
+    filtradas no SQL e gravadas em sequência numa planilha write_only, sem montar a lista em memória.
+    """
     try:
-        # Buscar todas as infrações removidas
-        removed_infractions = removed_infractions_driver.retrieve_all_removed_infractions()
-        
-        if not removed_infractions:
+        rows = removed_infractions_driver.iter_removed_infractions(
+            motorist_id=request.args.get('motorist_id', type=int),
+            tipo_infracao=request.args.get('tipo_infracao', type=int),
+            data_inicio=convert_date_format(request.args['de'], '%d-%m-%Y', '%Y-%m-%d')
+            if request.args.get('de') else None,
+            data_fim=convert_date_format(request.args['ate'], '%d-%m-%Y', '%Y-%m-%d')
+            if request.args.get('ate') else None
+        )
+        first_row = next(rows, None)
+
+        if first_row is None:
             flash("Nenhuma infração removida encontrada.")
             return redirect(url_for('jornada.infractions_page'))
-        
-        # Criar DataFrame
-        df = pd.DataFrame(removed_infractions, columns=[
-            'ID', 'Motorista', 'Placa', 'Data', 'Hora', 'Tipo Infração', 
-            'Velocidade', 'Local', 'Data Remoção', 'Usuário Remoção'
-        ])
-        
-        # Criar arquivo Excel
+
+        workbook = openpyxl.Workbook(write_only=True)
+        worksheet = workbook.create_sheet('Infrações Removidas')
+
+        # Formatar cabeçalhos
+        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        header = []
+        for value in REMOVED_INFRACTIONS_COLUMNS:
+            cell = WriteOnlyCell(worksheet, value=value)
+            cell.fill = header_fill
+            cell.font = openpyxl.styles.Font(color="FFFFFF", bold=True)
+            header.append(cell)
+        worksheet.append(header)
+
+        worksheet.append(list(first_row))
+        for row in rows:
+            worksheet.append(list(row))
+
         output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Infrações Removidas', index=False)
-            
-            # Formatar planilha
-            workbook = writer.book
-            worksheet = writer.sheets['Infrações Removidas']
-            
-            # Formatar cabeçalhos
-            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            for cell in worksheet[1]:
-                cell.fill = header_fill
-                cell.font = openpyxl.styles.Font(color="FFFFFF", bold=True)
-        
+        workbook.save(output)
         output.seek(0)
-        
+
         # Nome do arquivo
         filename = f"infracoes_removidas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        
+
         return send_file(
             output,
             mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
             as_attachment=True,
             download_name=filename
         )
-        
+
     except Exception as e:
         routes_logger.register_log(f"[ERRO] download_removed_infractions: {e}")
         flash("Erro ao gerar relatório de infrações removidas.")
         return redirect(url_for('jornada.infractions_page'))
-    
 
-    
 @track_bp.route('/remove_infraction', methods=['POST'])
 @route_access_required
 def remove_infraction():
@@ -814,12 +1383,122 @@ def remove_infraction():
         routes_logger.register_log("Erro ao remover infração", str(e))
         return 'Erro ao remover infração', 500
 
+class JourneyReportEmptyError(Exception):
+    """Período sem jornadas no relatório de jornada (só este erro vira "Nenhum registro encontrado.")."""
+
+
+def build_journey_report(motorist_id, truck_id, from_date, to_date):
+    """
+    Gera o relatório de jornada em Excel (jornadas do período com as infrações de cada dia).
+
+    :param motorist_id: ID do motorista (opcional se truck_id for informado).
+    :param truck_id: ID do caminhão (opcional se motorist_id for informado).
+    :param from_date: Data inicial ('YYYY-MM-DD').
+    :param to_date: Data final ('YYYY-MM-DD').
+    :return: Tupla (nome do arquivo, bytes do Excel).
+    :raises ValueError: Se não houver motorista nem caminhão.
+    :raises JourneyReportEmptyError: Se não houver jornadas no período.
+    """
+    if not (motorist_id or truck_id):
+        raise ValueError("Selecione um Motorista e/ou Caminhão.")
+
+    conditions = []
+    params = [from_date, to_date]
+    if motorist_id:
+        conditions.append("motorist_id = ?")
+        params.append(motorist_id)
+    if truck_id:
+        conditions.append("truck_id = ?")
+        params.append(truck_id)
+    filters = " AND ".join(conditions)
+
+    query = "SELECT motorists.nome, trucks.placa, data, dia_da_semana, inicio_jornada, in_refeicao, fim_refeicao, fim_jornada, " \
+        f"observacao, tempo_refeicao, intersticio, tempo_intervalo, tempo_carga_descarga, jornada_total, " \
+        f"tempo_direcao, direcao_sem_pausa, in_descanso_1, fim_descanso_1, in_descanso_2, fim_descanso_2, " \
+        f"in_descanso_3, fim_descanso_3, in_descanso_4, fim_descanso_4, in_descanso_5, fim_descanso_5, " \
+        f"in_descanso_6, fim_descanso_6, in_descanso_7, fim_descanso_7, in_descanso_8, fim_descanso_8, " \
+        f"in_car_desc_1, fim_car_desc_1, in_car_desc_2, fim_car_desc_2, in_car_desc_3, fim_car_desc_3, " \
+        f"in_car_desc_4, fim_car_desc_4, in_car_desc_5, fim_car_desc_5, in_car_desc_6, fim_car_desc_6, " \
+        f"in_car_desc_7, fim_car_desc_7 " \
+        f"FROM perm_data " \
+        f"JOIN motorists ON perm_data.motorist_id = motorists.id " \
+        f"JOIN trucks ON perm_data.truck_id = trucks.id " \
+        f"WHERE perm_data.date_iso BETWEEN ? AND ? AND {filters}"
+
+    infractions_query = f"""
+    SELECT data, hora, duration, desc_infracao 
+    FROM infractions 
+    WHERE date_iso BETWEEN ? AND ? AND {filters}"""
+
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        df_perm_data = pd.read_sql_query(query, conn, params=params)
+        df_infractions = pd.read_sql_query(infractions_query, conn, params=params)
+    finally:
+        conn.close()
+
+    if df_perm_data.empty:
+        raise JourneyReportEmptyError("Nenhum registro encontrado.")
+
+    # Criar o arquivo Excel em memória
+    output = BytesIO()
+    wb = fill_journey_report(df_perm_data, df_infractions)
+    wb.save(output)
+
+    # Gerar o nome do arquivo com base nos parâmetros
+    if motorist_id and truck_id:
+        motorist_name = df_perm_data.iloc[0]['nome']
+        plate = df_perm_data.iloc[0]['placa']
+        file_name = f"report_motorista_{motorist_name.replace(' ', '_')}_placa_{plate}_from_{from_date}_to_{to_date}.xlsx"
+    elif motorist_id:
+        motorist_name = df_perm_data.iloc[0]['nome']
+        file_name = f"report_motorista_{motorist_name.replace(' ', '_')}_from_{from_date}_to_{to_date}.xlsx"
+    else:
+        plate = df_perm_data.iloc[0]['placa']
+        file_name = f"report_placa_{plate}_from_{from_date}_to_{to_date}.xlsx"
+
+    return file_name, output.getvalue()
+
+
+def build_journey_pdf(nome_motorista, data_inicio, data_fim, tabela, totais):
+    """
+    Gera o PDF de jornada (mesmo conteúdo de /api/export_pdf).
+
+    :return: Tupla (nome do arquivo, bytes do PDF).
+    """
+    pdf_bytes = fill_pdf(name=nome_motorista, start=data_inicio, end=data_fim, tabela=tabela, totals=totais)
+    filename = f'jornada_motorista_{nome_motorista.replace(" ", "_")}_{data_inicio.replace("/", "-")}_a_{data_fim.replace("/", "-")}.pdf'
+    return filename, pdf_bytes
+
+
+def build_journey_excel(nome_motorista, data_inicio, data_fim, tabela, totais):
+    """
+    Gera o Excel de jornada (mesmo conteúdo de /api/export_excel).
+
+    :return: Tupla (nome do arquivo, bytes do Excel).
+    """
+    wb = fill_excel(name=nome_motorista, start=data_inicio, end=data_fim, tabela=tabela, totals=totais)
+    output = BytesIO()
+    wb.save(output)
+    filename = f"jornada_motorista_{nome_motorista.replace(' ', '_')}_" \
+               f"{data_inicio.replace('/', '-')}_a_{data_fim.replace('/', '-')}.xlsx"
+    return filename, output.getvalue()
+
+
+# Relatórios de jornada que podem ser gerados pela fila (ver /api/report-jobs)
+JOURNEY_JOB_TYPES = {
+    'jornada_relatorio': build_journey_report,
+    'jornada_pdf': build_journey_pdf,
+    'jornada_excel': build_journey_excel,
+}
+for _tipo, _builder in JOURNEY_JOB_TYPES.items():
+    report_jobs.register(_tipo, _builder)
+
+
 @track_bp.route('/download-report', methods=['POST', 'GET'])
 @route_access_required
 def download_report():
     if request.method == "POST":
-        file_name = None
-
         try:
             motorist_id = request.form.get('motorist_id')
             truck_id = request.form.get('truck_id')
@@ -842,149 +1521,16 @@ def download_report():
                 flash("Ocorreu um erro durante a conversão de data.")
                 return redirect("/download-report")
 
-            query = "SELECT motorists.nome, trucks.placa, data, dia_da_semana, inicio_jornada, in_refeicao, fim_refeicao, fim_jornada, " \
-                f"observacao, tempo_refeicao, intersticio, tempo_intervalo, tempo_carga_descarga, jornada_total, " \
-                f"tempo_direcao, direcao_sem_pausa, in_descanso_1, fim_descanso_1, in_descanso_2, fim_descanso_2, " \
-                f"in_descanso_3, fim_descanso_3, in_descanso_4, fim_descanso_4, in_descanso_5, fim_descanso_5, " \
-                f"in_descanso_6, fim_descanso_6, in_descanso_7, fim_descanso_7, in_descanso_8, fim_descanso_8, " \
-                f"in_car_desc_1, fim_car_desc_1, in_car_desc_2, fim_car_desc_2, in_car_desc_3, fim_car_desc_3, " \
-                f"in_car_desc_4, fim_car_desc_4, in_car_desc_5, fim_car_desc_5, in_car_desc_6, fim_car_desc_6, " \
-                f"in_car_desc_7, fim_car_desc_7 " \
-                f"FROM perm_data " \
-                f"JOIN motorists ON perm_data.motorist_id = motorists.id " \
-                f"JOIN trucks ON perm_data.truck_id = trucks.id " \
-                f"WHERE strftime('%Y-%m-%d', substr(data, 7, 4) || '-' || substr(data, 4, 2) || '-' || substr(data, 1, 2)) " \
-                f"BETWEEN '{from_date}' AND '{to_date}' AND "
-
-            arguments = []
-
-            if motorist_id:
-                arguments.append(f"motorist_id='{motorist_id}'")
-            if truck_id:
-                arguments.append(f"truck_id='{truck_id}'")
-
-            arguments = " AND ".join(arguments)
-            query = query + arguments
-
-            conn = sqlite3.connect(DB_PATH)
-            df_perm_data = pd.read_sql_query(query, conn)
-
-            query = f"""
-            SELECT data, hora, duration, desc_infracao 
-            FROM infractions 
-            WHERE strftime('%Y-%m-%d', substr(data, 7, 4) || '-' || substr(data, 4, 2) || '-' || substr(data, 1, 2)) 
-            BETWEEN '{from_date}' AND '{to_date}' AND """
-            query = query + arguments
-
-            df_infractions = pd.read_sql_query(query, conn)
-
-            # Criar o arquivo Excel se os dados existirem
-            if not df_perm_data.empty:
-                # Criar um arquivo Excel em memória
-                output = BytesIO()
-                wb = Workbook()
-                ws = wb.active
-
-                # Cabeçalhos para a planilha de dados de jornada
-                journey_columns = [
-                    "Nome Motorista", "Placa do Caminhão", "Data", "Dia da Semana", "Início da Jornada", "Fim Jornada",
-                    "Observação", "Tempo de Refeição", "Tempo Intervalo", "Jornada Total", "Tempo de Direção", "Direção sem Pausa",
-                    "1° Descanso Início", "1° Descanso Fim", "2° Descanso Início", "2° Descanso Fim", "3° Descanso Início",
-                    "3° Descanso Fim", "4° Descanso Início", "4° Descanso Fim", "5° Descanso Início", "5° Descanso Fim",
-                    "6° Descanso Início", "6° Descanso Fim", "7° Descanso Início", "7° Descanso Fim", "8° Descanso Início",
-                    "8° Descanso Fim", "1° Carregamento Descanso Início", "1° Carregamento Descanso Fim",
-                    "2° Carregamento Descanso Início", "2° Carregamento Descanso Fim", "3° Carregamento Descanso Início",
-                    "3° Carregamento Descanso Fim", "4° Carregamento Descanso Início", "4° Carregamento Descanso Fim",
-                    "5° Carregamento Descanso Início", "5° Carregamento Descanso Fim", "6° Carregamento Descanso Início",
-                    "6° Carregamento Descanso Fim", "7° Carregamento Descanso Início", "7° Carregamento Descanso Fim"
-                ]
-                #
-
-                # Cabeçalhos para a planilha de infrações
-                infraction_columns = [
-                    "Data", "Hora", "Duração", "Descrição"
-                ]
-
-                # Formatação do cabeçalho de dados de jornada
-                header_fill = PatternFill(start_color="4176a8", end_color="4176a8", fill_type="solid")
-                # Formatação do cabeçalho de infrações (fundo mais claro)
-                infraction_header_fill = PatternFill(start_color="A9C8E3", end_color="A9C8E3", fill_type="solid")
-
-                # Preencher os dados de jornada e infrações
-                for i, row in df_perm_data.iterrows():
-                    ws.append(journey_columns)
-
-                    for cell in ws[ws.max_row]:
-                        cell.fill = header_fill
-                    # Adicionar dados de jornada
-                    ws.append([row['nome'], row['placa'], row['data'], row['dia_da_semana'], row['inicio_jornada'], row['fim_jornada'],
-                               row['observacao'], row['tempo_refeicao'], row['tempo_intervalo'], row['jornada_total'], row['tempo_direcao'],
-                               row['direcao_sem_pausa'], row['in_descanso_1'], row['fim_descanso_1'], row['in_descanso_2'], row['fim_descanso_2'],
-                               row['in_descanso_3'], row['fim_descanso_3'], row['in_descanso_4'], row['fim_descanso_4'], row['in_descanso_5'],
-                               row['fim_descanso_5'], row['in_descanso_6'], row['fim_descanso_6'], row['in_descanso_7'], row['fim_descanso_7'],
-                               row['in_descanso_8'], row['fim_descanso_8'], row['in_car_desc_1'], row['fim_car_desc_1'], row['in_car_desc_2'],
-                               row['fim_car_desc_2'], row['in_car_desc_3'], row['fim_car_desc_3'], row['in_car_desc_4'], row['fim_car_desc_4'],
-                               row['in_car_desc_5'], row['fim_car_desc_5'], row['in_car_desc_6'], row['fim_car_desc_6'], row['in_car_desc_7'],
-                               row['fim_car_desc_7']])
-
-                    # Adicionar uma linha em branco entre os dias
-                    ws.append(['Infrações'])
-
-                    # Adicionar as infrações do dia, se existirem
-                    data_perm = row['data']
-                    infractions_for_date = df_infractions[df_infractions['data'] == data_perm]
-
-                    if not infractions_for_date.empty:
-                        # Adicionar o cabeçalho de infrações
-                        ws.append(infraction_columns)
-                        # Aplicar o fundo mais claro para o cabeçalho de infrações
-                        for cell in ws[ws.max_row]:
-                            cell.fill = infraction_header_fill
-
-                        # Preencher com as infrações desse dia
-                        for _, infraction_row in infractions_for_date.iterrows():
-                            ws.append([infraction_row['data'], infraction_row['hora'], infraction_row['duration'], infraction_row['desc_infracao']])
-
-                    # Adicionar uma linha em branco após as infrações
-                    ws.append([])
-
-                # Ajustar a largura das colunas para que o conteúdo fique visível
-                for col in ws.columns:
-                    max_length = 0
-                    column = col[0].column_letter  # A referência da coluna
-                    for cell in col:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = (max_length + 2)
-                    ws.column_dimensions[column].width = adjusted_width
-
-                # Salvar o arquivo Excel em memória
-                wb.save(output)
-                output.seek(0)
-
-                # Gerar o nome do arquivo com base nos parâmetros
-                if motorist_id and truck_id:
-                    motorist_name = df_perm_data.iloc[0]['nome']
-                    plate = df_perm_data.iloc[0]['placa']
-                    file_name = f"report_motorista_{motorist_name.replace(' ', '_')}_placa_{plate}_from_{from_date}_to_{to_date}.xlsx"
-                elif motorist_id:
-                    motorist_name = df_perm_data.iloc[0]['nome']
-                    file_name = f"report_motorista_{motorist_name.replace(' ', '_')}_from_{from_date}_to_{to_date}.xlsx"
-                elif truck_id:
-                    plate = df_perm_data.iloc[0]['placa']
-                    file_name = f"report_placa_{plate}_from_{from_date}_to_{to_date}.xlsx"
-
-                # Retornar o arquivo Excel para o usuário
-                return send_file(output, as_attachment=True,
-                                 download_name=file_name,
-                                 mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-
-            else:
+            try:
+                file_name, content = build_journey_report(motorist_id, truck_id, from_date, to_date)
+            except JourneyReportEmptyError:
                 flash("Nenhum registro encontrado.")
                 return redirect("/download-report")
+
+            # Retornar o arquivo Excel para o usuário
+            return send_file(BytesIO(content), as_attachment=True,
+                             download_name=file_name,
+                             mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
         except Exception as e:
             routes_logger.register_log(f"Ocorreu um erro durante a geração de relatório.", f"Erro: {e}")
             flash("Falha durante a geração de arquivo para download.")
@@ -1052,8 +1598,7 @@ def get_infractions():
                                 truck_id=truck_id)
 
         df['week_start'] = 0
-        df['sorted_events'] = df.apply(get_sorted_events_with_work_periods, axis=1)
-        infractions_list = compute_infractions(df)
+        infractions_list = compute_infractions(df, thresholds=parameters_driver.get_rule_thresholds())
 
         return_infractions = []
 
@@ -1130,8 +1675,6 @@ def save_table():
         else:
             registros_antigos.append(registro)
     
-    # Para cálculo de infrações, usar todos os registros
-    tabela_completa = tabela
     # Para salvamento, usar apenas os novos
     tabela_para_salvar = registros_novos
 
@@ -1211,49 +1754,25 @@ def save_table():
             except Exception as e:
                 routes_logger.print(f"Erro ao excluir dados temporários. Erro: {e}.")
 
-            # Salvando infrações (usar todos os registros para cálculo correto)
+            # Recalculando infrações apenas na janela afetada pelos dias salvos
             try:
-                df = convert_json_to_df(table_records=tabela_completa,
-                                        motorist_id=motorist_id,
-                                        truck_id=truck_id)
-
-                if df is not None and not df.empty:
-                    df['week_start'] = 0
-                    df['sorted_events'] = df.apply(get_sorted_events_with_work_periods, axis=1)
-                    routes_logger.print(f"Gerando infrações para o motorista {motorist_name}.")
-
-                    try:
-                        infractions_list = compute_infractions(df)
-                    except:
-                        traceback.print_exc()
-                        raise
+                datas_salvas = set(datas_novas) | {registro.get('Data') for registro in tabela_para_salvar}
+                routes_logger.print(f"Gerando infrações para o motorista {motorist_name}.")
 
-                    # Filtrar infrações apenas dos registros novos
-                    datas_novas_set = set(datas_novas)
-                    infracoes_novas = []
-                    
-                    for infraction in infractions_list:
-                        if infraction is not None and infraction.get('infraction_type'):
-                            # Verificar se a infração é de uma data nova
-                            if infraction.get("date") in datas_novas_set:
-                                infracoes_novas.append(infraction)
-                    
-                    # Salvar apenas as infrações dos registros novos
-                    for infraction in infracoes_novas:
-                        infraction_driver.create_infraction(motorist_id=motorist_id,
-                                                            truck_id=truck_id,
-                                                            data=infraction.get("date"),
-                                                            hora=infraction.get("time"),
-                                                            duration=infraction.get("duration"),
-                                                            tipo_infracao=infraction.get('infraction_type'))
+                sync_result = recompute_infractions_for_dates(perm_uploaded_track_driver, infraction_driver,
+                                                              motorist_id, datas_salvas,
+                                                              state_driver=compliance_state_driver,
+                                                              thresholds=parameters_driver.get_rule_thresholds())
+                routes_logger.print(f"Infrações sincronizadas para o motorista {motorist_name}: {sync_result}")
 
+                if sync_result['dias_recalculados']:
                     return jsonify({"mensagem": "Tabela recebida com sucesso!", "status": "ok"})
-
                 else:
                     return jsonify({"mensagem": "Tabela recebida com sucesso mas não houve "
                                                 "dias trabalhados para processar as infrações!", "status": "ok"})
 
             except Exception as e:
+                traceback.print_exc()
                 routes_logger.register_log(f"Erro ao gerar infrações para o motorista {motorist_name}.", f'Erro: {e}')
                 return jsonify({"mensagem": "Erro ao processar JSON", "erro": str(e)}), 400
 
@@ -1426,6 +1945,10 @@ def check_motorist_updates():
 @track_bp.route('/api/get-report', methods=['GET'])
 @route_access_required
 def get_report():
+    """
+    Relatório de jornada do motorista no período (HTML do modal). A resposta sai do cache de relatórios
+    enquanto os dados do motorista não mudarem e leva ETag/Last-Modified (304 se o navegador já tiver a versão).
+    """
     motorist_id = request.args.get('motorist_id')
     from_date = request.args.get('from_date')
     to_date = request.args.get('to_date')
@@ -1433,12 +1956,26 @@ def get_report():
     if not from_date or not to_date:
         return "Datas obrigatórias não fornecidas", 400
 
-    if isinstance(from_date, str):
-        from_date = from_date.replace('/', '-')
+    if not motorist_id or not str(motorist_id).isdigit():
+        return "Motorista não informado", 400
 
-    if isinstance(to_date, str):
-        to_date = to_date.replace('/', '-')
+    from_date = from_date.replace('/', '-')
+    to_date = to_date.replace('/', '-')
 
+    return report_cache.respond(('jornada', int(motorist_id), from_date, to_date),
+                                journey_version_driver.get_version(motorist_id),
+                                lambda: render_journey_report(motorist_id, from_date, to_date))
+
+
+def render_journey_report(motorist_id, from_date: str, to_date: str) -> str:
+    """
+    Renderiza o relatório de jornada (partials/result_modal_partial.html).
+
+    :param motorist_id: ID do motorista.
+    :param from_date: Data inicial ('YYYY-MM-DD').
+    :param to_date: Data final ('YYYY-MM-DD').
+    :return: HTML renderizado.
+    """
     # Pegando informações de jornadas
 
     query = f"""
@@ -1619,6 +2156,66 @@ def export_pdf():
         return jsonify({'error': 'Erro ao gerar PDF'}), 500
 
 
+@track_bp.route('/api/report-jobs', methods=['POST'])
+@route_access_required
+def enqueue_report_job():
+    """
+    Enfileira um relatório de jornada e retorna o ID do job (202). O andamento é consultado em
+    /api/report-jobs/<job_id> e o arquivo pronto é baixado em /api/report-jobs/<job_id>/download.
+
+    Body JSON:
+    - tipo: 'jornada_relatorio' (params: motorist_id, truck_id, from_date, to_date), 'jornada_pdf' ou
+      'jornada_excel' (params: nome_motorista, data_inicio, data_fim, tabela, totais)
+    - params: parâmetros do relatório
+    """
+    data = request.get_json(silent=True) or {}
+    tipo = data.get('tipo')
+    params = data.get('params') or {}
+
+    if tipo not in JOURNEY_JOB_TYPES:
+        return jsonify({"error": f"Tipo inválido. Use {', '.join(JOURNEY_JOB_TYPES)}"}), 400
+
+    try:
+        job = report_jobs.submit(tipo, params)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    routes_logger.register_log(f"Relatório enfileirado: {job.job_id} ({tipo})")
+    return jsonify({"status": "ok", **job.to_dict()}), 202
+
+
+@track_bp.route('/api/report-jobs/stats', methods=['GET'])
+@route_access_required
+def report_jobs_stats():
+    """Métricas da fila de relatórios: jobs pendentes e tempos de fila e de geração por tipo."""
+    return jsonify(report_jobs.stats())
+
+
+@track_bp.route('/api/report-jobs/<job_id>', methods=['GET'])
+@route_access_required
+def report_job_status(job_id):
+    """Andamento de um relatório de jornada enfileirado."""
+    job = report_jobs.get(job_id, tipos=JOURNEY_JOB_TYPES)
+    if job is None:
+        return jsonify({"error": "Relatório não encontrado ou expirado"}), 404
+    return jsonify(job.to_dict())
+
+
+@track_bp.route('/api/report-jobs/<job_id>/download', methods=['GET'])
+@route_access_required
+def download_report_job(job_id):
+    """Download do arquivo de um relatório de jornada concluído."""
+    job = report_jobs.get(job_id, tipos=JOURNEY_JOB_TYPES)
+    if job is None:
+        return jsonify({"error": "Relatório não encontrado ou expirado"}), 404
+    if job.status != 'concluido':
+        return jsonify({"error": "O relatório ainda não foi concluído", **job.to_dict()}), 409
+    if not os.path.exists(job.path):
+        return jsonify({"error": "Arquivo do relatório não está mais disponível"}), 410
+
+    return send_file(os.path.abspath(job.path), as_attachment=True, download_name=job.filename)
+
+
 @track_bp.route('/api/get-motorist-details', methods=['GET'])
 @route_access_required
 def get_motorist_details():
@@ -1826,10 +2423,9 @@ def substituir_registros():
 
             if df is not None and not df.empty:
                 df['week_start'] = 0
-                df['sorted_events'] = df.apply(get_sorted_events_with_work_periods, axis=1)
                 routes_logger.print(f"Gerando infrações para o motorista {motorist_name}.")
 
-                infractions_list = compute_infractions(df)
+                infractions_list = compute_infractions(df, thresholds=parameters_driver.get_rule_thresholds())
                 routes_logger.register_log(f"Infrações registradas no banco de dados: {infractions_list}")
 
                 for infraction in infractions_list: